@@ -11,6 +11,7 @@ import asyncio
 import logging
 
 from app.core.database import get_db
+from app.core.replicas import get_read_db
 from app.core.deps import get_current_user
 from app.services.ai_insights_service import ai_insights_service
 from app.models.user import User
@@ -69,7 +70,8 @@ async def detect_anomalies(
     time_range: str = Query("24h", description="Time range for analysis"),
     pipeline_id: Optional[str] = Query(None, description="Specific pipeline ID to analyze"),
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    read_db: AsyncSession = Depends(get_read_db)
 ):
     """Detect anomalies in pipeline performance and data quality."""
     
@@ -82,7 +84,8 @@ async def detect_anomalies(
             org_id=str(current_user.organization_id),
             start_date=start_date,
             end_date=end_date,
-            db=db
+            db=db,
+            read_db=read_db
         )
         
         # Filter by pipeline if specified
@@ -8,7 +8,7 @@ import asyncio
 from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.replicas import get_read_db
 from app.core.deps import get_current_user
 from app.core.websocket import websocket_manager, MessageType
 from app.models.user import User
@@ -31,7 +31,7 @@ router = APIRouter(prefix="/analytics", tags=["Analytics & Insights"])
 async def get_analytics_dashboard(
     time_range: str = Query("7d", pattern="^(1d|7d|30d|90d)$"),
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get comprehensive analytics dashboard for the organization."""
     
@@ -54,7 +54,7 @@ async def get_pipeline_analytics(
     pipeline_id: str,
     time_range: str = Query("30d", pattern="^(7d|30d|90d)$"),
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get detailed analytics for a specific pipeline."""
     
@@ -108,7 +108,7 @@ async def get_performance_metrics(
     time_range: str = Query("7d", pattern="^(1d|7d|30d|90d)$"),
     metric_type: Optional[MetricType] = Query(None),
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get performance metrics with filtering options."""
     
@@ -189,7 +189,7 @@ async def get_execution_history_chart(
     pipeline_id: Optional[str] = Query(None),
     time_range: str = Query("30d", pattern="^(7d|30d|90d)$"),
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get execution history chart data."""
     
@@ -229,7 +229,7 @@ async def get_execution_history_chart(
 async def get_success_rate_chart(
     time_range: str = Query("30d", pattern="^(7d|30d|90d)$"),
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get success rate trend chart."""
     
@@ -272,7 +272,7 @@ async def get_success_rate_chart(
 async def get_data_volume_chart(
     time_range: str = Query("30d", pattern="^(7d|30d|90d)$"),
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get data volume processing chart."""
     
@@ -320,7 +320,7 @@ async def export_analytics_data(
     export_request: AnalyticsExportRequest,
     background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Export analytics data in various formats."""
     
@@ -25,7 +25,10 @@ from ....core.rate_limiter import (
 )
 from ....core.audit_logger import log_user_login, audit_logger, AuditEventType, AuditSeverity
 from ....core.redis import CacheService
-from ....models.user import User, Organization, APIKey, UserRole
+from ....core.principal_cache import principal_cache
+from ....core.api_key_auth import api_key_cache
+from ....models.user import User, Organization, UserRole
+from ....models.api_key import APIKey
 from ....schemas.auth import (
     UserLogin, UserRegister, TokenResponse, TokenRefresh, AccessTokenResponse,
     PasswordChange, APIKeyCreate, APIKeyResponse, APIKeyInfo, UserProfile,
@@ -735,6 +738,7 @@ async def logout(
         from ....core.redis import CacheService
         cache_key = f"user_profile_{current_user.id}"
         await CacheService.delete(cache_key)
+        await principal_cache.invalidate(current_user.id)
         
         # Update last activity
         current_user.last_login = datetime.utcnow()
@@ -994,6 +998,7 @@ async def update_profile(
         # Invalidate user profile cache
         cache_key = f"user_profile_{current_user.id}"
         await CacheService.delete(cache_key)
+        await principal_cache.invalidate(current_user.id)
 
         # Log profile update
         await audit_logger.log_event(
@@ -1090,6 +1095,9 @@ async def change_password(
     db: Annotated[AsyncSession, Depends(get_db)]
 ):
     """Change user password."""
+    # Cached principals carry no password hash
+    await db.refresh(current_user, ["hashed_password"])
+    
     # Verify current password
     if not SecurityUtils.verify_password(password_data.current_password, current_user.hashed_password):
         raise HTTPException(
@@ -1105,6 +1113,7 @@ async def change_password(
     from ....core.redis import CacheService
     cache_key = f"user_profile_{current_user.id}"
     await CacheService.delete(cache_key)
+    await principal_cache.invalidate(current_user.id)
     
     return {"message": "Password updated successfully"}
 
@@ -1120,14 +1129,16 @@ async def create_api_key(
     api_key_value = SecurityUtils.generate_api_key()
     
     # Hash the API key for secure storage
-    key_hash = SecurityUtils.get_password_hash(api_key_value)
+    key_hash = SecurityUtils.hash_api_key(api_key_value)
     
-    # Create API key record
+    # Create API key record, indexed by the key ID embedded in the key
     api_key = APIKey(
-        id=uuid.uuid4(),
+        id=SecurityUtils.get_api_key_id(api_key_value),
         user_id=current_user.id,
         name=key_data.name,
         key_hash=key_hash,  # Store hashed version
+        key_type="private",
+        scopes=key_data.scopes or [],
         expires_at=key_data.expires_at,
         is_active=True
     )
@@ -1160,7 +1171,7 @@ async def list_api_keys(
             id=str(key.id),
             name=key.name,
             created_at=key.created_at,
-            last_used=key.last_used,
+            last_used=key.last_used_at,
             expires_at=key.expires_at,
             is_active=key.is_active
         )
@@ -1174,18 +1185,10 @@ async def delete_api_key(
     db: Annotated[AsyncSession, Depends(get_db)]
 ):
     """Delete an API key."""
-    try:
-        key_uuid = uuid.UUID(key_id)
-    except ValueError:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid API key ID"
-        )
-    
     # Get API key
     result = await db.execute(
         select(APIKey).where(
-            APIKey.id == key_uuid,
+            APIKey.id == key_id,
             APIKey.user_id == current_user.id
         )
     )
@@ -1200,6 +1203,7 @@ async def delete_api_key(
     # Delete API key
     await db.delete(api_key)
     await db.commit()
+    await api_key_cache.invalidate("user", key_id)
     
     return {"message": "API key deleted successfully"}
 
@@ -1210,18 +1214,10 @@ async def toggle_api_key(
     db: Annotated[AsyncSession, Depends(get_db)]
 ):
     """Toggle API key active status."""
-    try:
-        key_uuid = uuid.UUID(key_id)
-    except ValueError:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid API key ID"
-        )
-    
     # Get API key
     result = await db.execute(
         select(APIKey).where(
-            APIKey.id == key_uuid,
+            APIKey.id == key_id,
             APIKey.user_id == current_user.id
         )
     )
@@ -1236,6 +1232,7 @@ async def toggle_api_key(
     # Toggle status
     api_key.is_active = not api_key.is_active
     await db.commit()
+    await api_key_cache.invalidate("user", key_id)
     
     return {
         "message": f"API key {'activated' if api_key.is_active else 'deactivated'} successfully",
@@ -1278,6 +1275,7 @@ async def verify_email(
         from ....core.redis import CacheService
         cache_key = f"user_profile_{user.id}"
         await CacheService.delete(cache_key)
+        await principal_cache.invalidate(user.id)
         
         return {"message": "Email verified successfully"}
         
@@ -1348,6 +1346,7 @@ async def reset_password(
         from ....core.redis import CacheService
         cache_key = f"user_profile_{user.id}"
         await CacheService.delete(cache_key)
+        await principal_cache.invalidate(user.id)
         
         return {"message": "Password reset successfully"}
         
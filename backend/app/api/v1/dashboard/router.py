@@ -10,6 +10,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, and_
 
 from app.core.database import get_db
+from app.core.replicas import get_read_db
 from app.core.deps import get_current_user
 from app.models.user import User
 from app.models.pipeline import ETLPipeline, PipelineExecution, PipelineStatus, ExecutionStatus
@@ -30,7 +31,7 @@ router = APIRouter(
 async def get_dashboard_stats(
     time_range: str = Query("7d", pattern="^(1d|7d|30d|90d)$"),
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get comprehensive dashboard statistics.
@@ -382,7 +383,7 @@ async def get_dashboard_health(
 @router.get("/quick-stats")
 async def get_quick_stats(
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get quick dashboard statistics for overview cards."""
     
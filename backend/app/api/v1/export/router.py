@@ -14,7 +14,8 @@ from fastapi.responses import FileResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, Field, validator
 
-from app.core.deps import get_current_user, get_db
+from app.core.deps import get_current_user
+from app.core.replicas import get_read_db
 from app.core.tenant_deps import get_current_tenant
 from app.models.user import User
 from app.models.tenant import Tenant
@@ -76,7 +77,7 @@ async def create_export(
     background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     current_tenant: Optional[Tenant] = Depends(get_current_tenant),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Create a new data export job.
@@ -275,7 +276,7 @@ async def quick_export(
     format_type: str = Query("csv", description="Export format"),
     current_user: User = Depends(get_current_user),
     current_tenant: Optional[Tenant] = Depends(get_current_tenant),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Quick export for immediate download of small datasets.
@@ -386,7 +387,7 @@ async def create_export_from_template(
     filters: Optional[Dict[str, Any]] = None,
     current_user: User = Depends(get_current_user),
     current_tenant: Optional[Tenant] = Depends(get_current_tenant),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Create export using a predefined template.
@@ -1,12 +1,12 @@
 """
 Monitoring and metrics API endpoints.
 """
-from fastapi import APIRouter, Response, Depends, HTTPException, status
+from fastapi import APIRouter, Request, Response, Depends, HTTPException, status
 from typing import Dict, Any, Optional
 import logging
 from datetime import datetime
 
-from app.services.metrics_service import get_metrics_data, metrics
+from app.services.metrics_service import get_metrics_data, metrics, OPENMETRICS_CONTENT_TYPE
 from app.services.performance_service import performance_monitor
 from app.core.deps import get_current_user
 from app.models.user import User
@@ -53,17 +53,19 @@ async def health_check():
 
 
 @router.get("/metrics")
-async def get_prometheus_metrics():
+async def get_prometheus_metrics(request: Request):
     """
     Prometheus metrics endpoint.
     
-    Returns metrics in Prometheus format for scraping.
+    Returns metrics in Prometheus format for scraping, or in OpenMetrics
+    format (which includes exemplars) when the scraper asks for it.
     """
     try:
-        metrics_data = await get_metrics_data()
+        openmetrics = "application/openmetrics-text" in request.headers.get("accept", "")
+        metrics_data = await get_metrics_data(openmetrics=openmetrics)
         return Response(
             content=metrics_data,
-            media_type=CONTENT_TYPE_LATEST
+            media_type=OPENMETRICS_CONTENT_TYPE if openmetrics else CONTENT_TYPE_LATEST
         )
     except Exception as e:
         logger.error(f"Failed to generate metrics: {e}")
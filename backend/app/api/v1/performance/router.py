@@ -97,7 +97,7 @@ async def clear_cache(
             message = f"Cache entries matching pattern '{pattern}' have been cleared"
         else:
             # Clear all cache (be careful with this)
-            await cache_manager.l1_cache.cache.clear()
+            await cache_manager.l1_cache.clear()
             await cache_manager.invalidate_pattern("*")
             message = "All cache entries have been cleared"
         
@@ -123,15 +123,16 @@ async def warm_cache(
 ):
     """Warm up cache with frequently accessed data."""
     try:
-        from app.core.cache_manager import warm_cache_on_startup
+        from app.core.cache_warming import cache_warmer
         
-        await warm_cache_on_startup()
+        warm_result = await cache_warmer.warm()
         
         logger.info(f"Cache warming triggered by user {current_user.id}")
         
         return {
             "success": True,
             "message": "Cache warming completed successfully",
+            "data": warm_result,
             "timestamp": datetime.utcnow().isoformat()
         }
     except Exception as e:
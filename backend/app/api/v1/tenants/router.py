@@ -72,6 +72,9 @@ async def create_tenant(
         await db.commit()
         await db.refresh(tenant)
         
+        # Drop a cached "unknown slug" so the new tenant resolves immediately
+        await TenantService._clear_tenant_cache(tenant.id, tenant.slug)
+        
         logger.info(f"Created new tenant: {tenant.name} ({tenant.slug})")
         return TenantResponse.model_validate(tenant)
         
@@ -202,6 +205,9 @@ async def update_tenant(
         await db.commit()
         await db.refresh(tenant)
         
+        # The old slug's entry is tagged with the tenant; a new slug may have a cached miss
+        await TenantService._clear_tenant_cache(tenant.id, tenant.slug)
+        
         logger.info(f"Updated tenant: {tenant.name} ({tenant.slug})")
         return TenantResponse.model_validate(tenant)
         
@@ -260,6 +266,8 @@ async def update_tenant_branding(
         await db.commit()
         await db.refresh(tenant)
         
+        await TenantService._clear_tenant_cache(tenant.id)
+        
         logger.info(f"Updated branding for tenant: {tenant.name}")
         return TenantResponse.model_validate(tenant)
         
@@ -388,11 +396,12 @@ async def create_tenant_api_key(
             )
         
         # Generate API key
-        from app.core.security import generate_api_key, hash_api_key
+        from app.core.security import generate_api_key, get_api_key_id
         api_key_plain, api_key_hash = generate_api_key()
         
-        # Create API key record
+        # Create API key record, indexed by the key ID embedded in the key
         tenant_api_key = TenantApiKey(
+            id=get_api_key_id(api_key_plain),
             tenant_id=tenant_id,
             key_name=api_key_data.key_name,
             api_key_hash=api_key_hash,
@@ -495,6 +504,9 @@ async def revoke_tenant_api_key(
         api_key.is_active = False
         await db.commit()
         
+        # Cached API key lookups are tagged with the tenant
+        await TenantService._clear_tenant_cache(tenant_id)
+        
         logger.info(f"Revoked API key {key_id} for tenant {tenant_id}")
         return {"message": "API key revoked successfully"}
         
@@ -0,0 +1,233 @@
+"""
+API key authentication.
+
+Every API key issued by the platform has the form ``dk_<key id>_<secret>``.
+The key ID is the primary key of the stored record, and the stored hash is
+an HMAC-SHA256 of the whole key under a server-side secret. Verification
+is therefore one indexed lookup by key ID followed by one constant-time
+digest comparison, instead of a bcrypt round (~100 ms) per request.
+
+Looked-up records are kept in the multi-layer cache keyed by key ID, so a
+repeat request is verified from the in-process LRU without touching Redis
+or the database. The cache holds only the stored hash, never the key
+itself, and the hash is re-checked on every request. Revoking, rotating or
+deleting a key calls ``invalidate``, which also evicts other processes'
+copies.
+
+Keys hashed before this scheme (unkeyed SHA-256 from ``APIKeyManager``,
+bcrypt from ``SecurityUtils`` and tenant keys) are still accepted while
+``API_KEY_LEGACY_VERIFICATION`` is on: a key that matches its legacy hash
+is re-hashed to HMAC on first use, so each one pays the slow check once.
+"""
+
+from typing import Any, Awaitable, Callable, Dict, Optional
+import copy
+import hashlib
+import hmac
+import logging
+import secrets
+import time
+
+import bcrypt
+
+from .config import settings
+from .cache_manager import cache_manager, single_flight
+
+logger = logging.getLogger(__name__)
+
+
+# Prefix of every API key issued by the platform
+API_KEY_PREFIX = "dk"
+API_KEY_CACHE_PREFIX = "auth:api_key"
+# Stored for key IDs that have no active record
+_MISSING = {"__api_key_missing__": True}
+_BCRYPT_PREFIXES = ("$2a$", "$2b$", "$2y$")
+
+
+def generate_api_key() -> str:
+    """Generate a new ``dk_<key id>_<secret>`` API key."""
+    # Hex key IDs never contain the "_" separator
+    return f"{API_KEY_PREFIX}_{secrets.token_hex(8)}_{secrets.token_urlsafe(32)}"
+
+
+def get_api_key_id(api_key: str) -> Optional[str]:
+    """Return the key ID embedded in an API key, or None if it is malformed."""
+    parts = api_key.split("_", 2) if api_key else []
+    if len(parts) != 3 or parts[0] != API_KEY_PREFIX or not parts[1] or not parts[2]:
+        return None
+    return parts[1]
+
+
+def hash_api_key(api_key: str) -> str:
+    """Keyed HMAC-SHA256 of an API key, hex encoded."""
+    secret = settings.API_KEY_HASH_SECRET
+    if not secret:
+        # SECRET_KEY is random per process unless configured, which would
+        # make every stored hash unverifiable after a restart
+        if settings.ENVIRONMENT == "production":
+            raise RuntimeError("API_KEY_HASH_SECRET must be set in production")
+        secret = settings.SECRET_KEY
+    return hmac.new(secret.encode(), api_key.encode(), hashlib.sha256).hexdigest()
+
+
+def verify_api_key(plain_key: str, hashed_key: str) -> bool:
+    """Check an API key against its stored hash in constant time."""
+    if not plain_key or not hashed_key:
+        return False
+    return hmac.compare_digest(hash_api_key(plain_key), hashed_key)
+
+
+def is_legacy_hash(hashed_key: Optional[str]) -> bool:
+    """Whether a stored hash predates HMAC hashing (bcrypt)."""
+    return bool(hashed_key) and hashed_key.startswith(_BCRYPT_PREFIXES)
+
+
+def verify_legacy_api_key(plain_key: str, hashed_key: str) -> bool:
+    """Check an API key against a pre-HMAC hash: bcrypt or unkeyed SHA-256."""
+    if not settings.API_KEY_LEGACY_VERIFICATION or not plain_key or not hashed_key:
+        return False
+    if is_legacy_hash(hashed_key):
+        try:
+            return bcrypt.checkpw(plain_key.encode(), hashed_key.encode())
+        except ValueError:
+            return False
+    return hmac.compare_digest(hashlib.sha256(plain_key.encode()).hexdigest(), hashed_key)
+
+
+class APIKeyCache:
+    """Caches API key records by key ID and verifies presented keys against them."""
+
+    def __init__(
+        self,
+        ttl: Optional[int] = None,
+        negative_ttl: Optional[int] = None,
+        touch_interval: Optional[int] = None
+    ):
+        self.ttl = ttl or settings.API_KEY_CACHE_TTL_SECONDS
+        self.negative_ttl = negative_ttl or settings.API_KEY_CACHE_NEGATIVE_TTL_SECONDS
+        self.touch_interval = touch_interval or settings.API_KEY_LAST_USED_INTERVAL_SECONDS
+        self._touched: Dict[str, float] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def cache_key(kind: str, key_id: str) -> str:
+        return f"{API_KEY_CACHE_PREFIX}:{kind}:{key_id}"
+
+    async def authenticate(
+        self,
+        kind: str,
+        api_key: str,
+        load: Callable[[str], Awaitable[Optional[Dict[str, Any]]]],
+        rehash: Optional[Callable[[str, str], Awaitable[Any]]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Return the record for ``api_key`` if the key is genuine, else ``None``.
+
+        ``load(key_id)`` returns the active record as a dict with at least a
+        ``key_hash`` entry, or ``None``. It only runs on a cache miss, and
+        concurrent misses for one key ID share a single call.
+
+        A key that only matches a legacy hash is accepted when ``rehash`` is
+        given; ``rehash(key_id, new_hash)`` stores its HMAC hash.
+        """
+        key_id = get_api_key_id(api_key)
+        if key_id is None:
+            return None
+
+        key = self.cache_key(kind, key_id)
+        try:
+            record = await cache_manager.get(key)
+        except Exception as e:
+            logger.warning(f"API key cache lookup failed for {key_id}: {e}")
+            record = None
+
+        if record is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+            record = await single_flight.do(key, lambda: self._fill(key, key_id, load))
+
+        if not record or record == _MISSING:
+            return None
+        if not verify_api_key(api_key, record.get("key_hash")):
+            if rehash is None or not verify_legacy_api_key(api_key, record.get("key_hash")):
+                return None
+            record = await self._upgrade(kind, key_id, api_key, record, rehash)
+        # Callers get their own copy of the cached entry
+        return copy.deepcopy(record)
+
+    async def _upgrade(
+        self,
+        kind: str,
+        key_id: str,
+        api_key: str,
+        record: Dict[str, Any],
+        rehash: Callable[[str, str], Awaitable[Any]]
+    ) -> Dict[str, Any]:
+        new_hash = hash_api_key(api_key)
+        try:
+            await rehash(key_id, new_hash)
+            await self.invalidate(kind, key_id)
+            logger.info(f"Re-hashed legacy API key {key_id} with HMAC")
+        except Exception as e:
+            # The key is still genuine; the upgrade is retried on its next use
+            logger.warning(f"Failed to re-hash legacy API key {key_id}: {e}")
+            return record
+        return {**record, "key_hash": new_hash}
+
+    async def _fill(
+        self,
+        key: str,
+        key_id: str,
+        load: Callable[[str], Awaitable[Optional[Dict[str, Any]]]]
+    ) -> Dict[str, Any]:
+        record = await load(key_id)
+        if record is None:
+            await self._store(key, _MISSING, self.negative_ttl)
+            return _MISSING
+        await self._store(key, record, self.ttl)
+        return record
+
+    async def _store(self, key: str, value: Dict[str, Any], ttl: int):
+        try:
+            await cache_manager.set(key, value, l1_ttl=ttl, l2_ttl=ttl)
+        except Exception as e:
+            logger.warning(f"API key cache store failed for {key}: {e}")
+
+    async def invalidate(self, kind: str, key_id: str) -> bool:
+        """Drop a key's cached record in every process."""
+        self._touched.pop(key_id, None)
+        try:
+            return await cache_manager.delete(self.cache_key(kind, key_id))
+        except Exception as e:
+            logger.warning(f"API key cache invalidation failed for {key_id}: {e}")
+            return False
+
+    def touch_due(self, key_id: str) -> bool:
+        """
+        Whether this process should record a use of ``key_id`` now.
+
+        Last-used timestamps are written at most once per
+        ``touch_interval`` per key and process rather than on every request.
+        """
+        now = time.monotonic()
+        last = self._touched.get(key_id)
+        if last is not None and now - last < self.touch_interval:
+            return False
+        if len(self._touched) >= 10000:
+            self._touched.clear()
+        self._touched[key_id] = now
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0
+        }
+
+
+# Global API key cache instance
+api_key_cache = APIKeyCache()
@@ -17,6 +17,9 @@ from sqlalchemy import select, update, and_, or_
 
 from ..core.config import settings
 from ..core.redis import redis_manager
+from ..core.api_key_auth import (
+    API_KEY_PREFIX, api_key_cache, generate_api_key, get_api_key_id, hash_api_key
+)
 from ..models.api_key import APIKey, APIKeyScope
 
 
@@ -40,7 +43,7 @@ class APIKeyManager:
     """
     
     def __init__(self):
-        self.key_prefix = "dk"  # DReflowPro Key
+        self.key_prefix = API_KEY_PREFIX  # DReflowPro Key
         self.key_length = 32
         self.hash_algorithm = "sha256"
         self.rate_limit_window = 3600  # 1 hour in seconds
@@ -64,12 +67,8 @@ class APIKeyManager:
         Returns:
             Tuple of (plain_key, hashed_key)
         """
-        # Generate random key
-        random_bytes = secrets.token_bytes(self.key_length)
-        key_id = secrets.token_urlsafe(8)
-        
         # Create the full key: prefix_keyid_randomkey
-        plain_key = f"{self.key_prefix}_{key_id}_{secrets.token_urlsafe(24)}"
+        plain_key = generate_api_key()
         
         # Hash the key for storage
         hashed_key = self._hash_key(plain_key)
@@ -84,9 +83,9 @@ class APIKeyManager:
             plain_key: Plain text API key
             
         Returns:
-            Hashed key
+            Hashed key (keyed HMAC-SHA256, see app/core/api_key_auth.py)
         """
-        return hashlib.sha256(plain_key.encode()).hexdigest()
+        return hash_api_key(plain_key)
     
     def _sign_data(self, data: str, secret: str) -> str:
         """
@@ -139,7 +138,7 @@ class APIKeyManager:
             plain_key, hashed_key = self.generate_api_key(key_type)
             
             # Extract key ID from plain key
-            key_id = plain_key.split("_")[1]
+            key_id = get_api_key_id(plain_key)
             
             # Set default rate limit if not provided
             if rate_limit is None:
@@ -206,67 +205,38 @@ class APIKeyManager:
             Tuple of (is_valid, key_details, error_message)
         """
         try:
-            # Hash the provided key
-            hashed_key = self._hash_key(api_key)
-            
-            # Extract key ID from the key
-            try:
-                key_parts = api_key.split("_")
-                if len(key_parts) != 3 or key_parts[0] != self.key_prefix:
-                    return False, None, "Invalid API key format"
-                key_id = key_parts[1]
-            except:
+            if get_api_key_id(api_key) is None:
                 return False, None, "Invalid API key format"
             
-            # Look up the key in database
-            stmt = select(APIKey).where(
-                and_(
-                    APIKey.id == key_id,
-                    APIKey.key_hash == hashed_key,
-                    APIKey.is_active == True
-                )
-            )
-            
-            result = await db.execute(stmt)
-            api_key_record = result.scalar_one_or_none()
-            
+            api_key_record = await self.authenticate(api_key, db)
             if not api_key_record:
                 return False, None, "Invalid or inactive API key"
             
             # Check expiration
-            if api_key_record.expires_at and api_key_record.expires_at < datetime.utcnow():
+            if api_key_record["expires_at"] and api_key_record["expires_at"] < datetime.utcnow():
                 return False, None, "API key has expired"
             
             # Check required scope
-            if required_scope and required_scope not in api_key_record.scopes:
+            if required_scope and required_scope not in (api_key_record["scopes"] or []):
                 return False, None, f"API key lacks required scope: {required_scope}"
             
             # Check origin restrictions
-            if api_key_record.allowed_origins and request_origin:
-                if request_origin not in api_key_record.allowed_origins:
+            if api_key_record["allowed_origins"] and request_origin:
+                if request_origin not in api_key_record["allowed_origins"]:
                     return False, None, f"Origin not allowed: {request_origin}"
             
             # Check IP restrictions
-            if api_key_record.allowed_ips and request_ip:
-                if request_ip not in api_key_record.allowed_ips:
+            if api_key_record["allowed_ips"] and request_ip:
+                if request_ip not in api_key_record["allowed_ips"]:
                     return False, None, f"IP not allowed: {request_ip}"
             
-            # Update last used timestamp
-            stmt = (
-                update(APIKey)
-                .where(APIKey.id == key_id)
-                .values(last_used_at=datetime.utcnow())
-            )
-            await db.execute(stmt)
-            await db.commit()
-            
             # Return key details
             key_details = {
-                "key_id": api_key_record.id,
-                "user_id": str(api_key_record.user_id),
-                "type": api_key_record.key_type,
-                "scopes": api_key_record.scopes,
-                "rate_limit": api_key_record.rate_limit
+                "key_id": api_key_record["key_id"],
+                "user_id": api_key_record["user_id"],
+                "type": api_key_record["key_type"],
+                "scopes": api_key_record["scopes"],
+                "rate_limit": api_key_record["rate_limit"]
             }
             
             return True, key_details, None
@@ -274,6 +244,68 @@ class APIKeyManager:
         except Exception as e:
             return False, None, f"Error validating API key: {str(e)}"
     
+    async def authenticate(self, api_key: str, db: Session) -> Optional[Dict[str, Any]]:
+        """
+        Verify an API key and return its record
+        
+        Looks the key up by its key ID (cached per process) and compares
+        HMACs in constant time. Keys still stored with the old unkeyed
+        SHA-256 hash are accepted once and re-hashed with HMAC. The last-used
+        timestamp is written at most once per
+        ``API_KEY_LAST_USED_INTERVAL_SECONDS``.
+        
+        Args:
+            api_key: API key to verify
+            db: Database session
+            
+        Returns:
+            Record dictionary if the key is genuine and active, None otherwise
+        """
+        async def load(key_id: str) -> Optional[Dict[str, Any]]:
+            result = await db.execute(
+                select(APIKey).where(
+                    and_(
+                        APIKey.id == key_id,
+                        APIKey.is_active == True
+                    )
+                )
+            )
+            record = result.scalar_one_or_none()
+            return self._record(record) if record else None
+        
+        async def rehash(key_id: str, key_hash: str):
+            await db.execute(update(APIKey).where(APIKey.id == key_id).values(key_hash=key_hash))
+            await db.commit()
+        
+        api_key_record = await api_key_cache.authenticate("user", api_key, load, rehash)
+        if not api_key_record:
+            return None
+        
+        if api_key_cache.touch_due(api_key_record["key_id"]):
+            await db.execute(
+                update(APIKey)
+                .where(APIKey.id == api_key_record["key_id"])
+                .values(last_used_at=datetime.utcnow())
+            )
+            await db.commit()
+        
+        return api_key_record
+    
+    @staticmethod
+    def _record(api_key: APIKey) -> Dict[str, Any]:
+        """Cacheable snapshot of an API key row"""
+        return {
+            "key_id": api_key.id,
+            "key_hash": api_key.key_hash,
+            "user_id": str(api_key.user_id),
+            "key_type": api_key.key_type,
+            "scopes": api_key.scopes,
+            "rate_limit": api_key.rate_limit,
+            "expires_at": api_key.expires_at,
+            "allowed_origins": api_key.allowed_origins,
+            "allowed_ips": api_key.allowed_ips
+        }
+    
     async def check_rate_limit(
         self,
         key_id: str,
@@ -391,6 +423,7 @@ class APIKeyManager:
             
             if new_result["success"]:
                 await db.commit()
+                await api_key_cache.invalidate("user", key_id)
                 
             return new_result
             
@@ -442,6 +475,7 @@ class APIKeyManager:
                 }
             
             await db.commit()
+            await api_key_cache.invalidate("user", key_id)
             
             # Clear rate limit cache if Redis is available
             if redis_manager.redis_client:
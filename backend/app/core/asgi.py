@@ -0,0 +1,121 @@
+"""
+Base class for pure-ASGI HTTP middleware.
+
+Starlette's ``BaseHTTPMiddleware`` runs every downstream app in a separate
+task and re-streams its response through a memory channel, which adds
+overhead to each request for every middleware in the stack and breaks
+``StreamingResponse`` back-pressure. ``HTTPMiddleware`` gives the same
+request/response hooks without that: response messages go straight to the
+server, and headers are adjusted in place on ``http.response.start``.
+"""
+
+from typing import Optional
+import http.cookies
+
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class HTTPMiddleware:
+    """
+    Pure-ASGI middleware with ordered request/response hooks.
+
+    Subclasses override only the hooks they need:
+
+    - ``should_process``: cheap check on the raw scope; skipped requests
+      are passed through without building a ``Request``
+    - ``before_request``: may return a ``Response`` to short-circuit
+    - ``on_response_start``: status and mutable response headers, before
+      anything is sent to the client
+    - ``after_response``: once the response is finished or has failed
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    def should_process(self, scope: Scope) -> bool:
+        return True
+
+    async def before_request(self, request: Request) -> Optional[Response]:
+        return None
+
+    async def on_response_start(self, request: Request, status_code: int, headers: MutableHeaders):
+        pass
+
+    async def after_response(self, request: Request, status_code: int, error: Optional[BaseException]):
+        pass
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not self.should_process(scope):
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope, receive)
+        response = await self.before_request(request)
+        if response is not None:
+            await response(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message.setdefault("headers", [])
+                await self.on_response_start(request, status_code, MutableHeaders(scope=message))
+            await send(message)
+
+        error = None
+        try:
+            # before_request may have replaced receive (see replay_body)
+            await self.app(scope, request.receive, send_wrapper)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            await self.after_response(request, status_code, error)
+
+
+def replay_body(request: Request, body: bytes):
+    """Let downstream apps read a request body this middleware already consumed."""
+    original = request.receive
+    sent = False
+
+    async def receive() -> Message:
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        # Later calls wait for the client disconnect as usual
+        return await original()
+
+    request._receive = receive
+
+
+def set_cookie(
+    headers: MutableHeaders,
+    key: str,
+    value: str,
+    max_age: Optional[int] = None,
+    path: str = "/",
+    secure: bool = False,
+    httponly: bool = False,
+    samesite: Optional[str] = "lax"
+):
+    """Append a ``Set-Cookie`` header, formatted like ``Response.set_cookie``."""
+    cookie = http.cookies.SimpleCookie()
+    cookie[key] = value
+    if max_age is not None:
+        cookie[key]["max-age"] = max_age
+    if path is not None:
+        cookie[key]["path"] = path
+    if secure:
+        cookie[key]["secure"] = True
+    if httponly:
+        cookie[key]["httponly"] = True
+    if samesite is not None:
+        cookie[key]["samesite"] = samesite
+    headers.append("set-cookie", cookie.output(header="").strip())
@@ -6,16 +6,20 @@ Tracks all security-relevant activities and system events for compliance and for
 import json
 import logging
 import asyncio
+import os
+from collections import deque
 from datetime import datetime, timezone
 from typing import Dict, Any, Optional, List
 from enum import Enum
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import Column, String, DateTime, JSON, Text, Integer, Index
+from sqlalchemy import Column, String, DateTime, JSON, Text, Integer, Index, insert
+from sqlalchemy import exc as sa_exc
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.ext.declarative import declarative_base
 import uuid
 
-from .database import Base, get_db
+from .config import settings
+from .database import Base, get_db, AsyncSessionFactory
 from .redis import redis_manager, CacheService
 
 
@@ -102,6 +106,37 @@ class AuditLog(Base):
     )
 
 
+# Maximum lengths of the bounded string columns, so oversized values are truncated
+# instead of failing the whole batch INSERT
+_COLUMN_LENGTHS = {
+    column.name: column.type.length
+    for column in AuditLog.__table__.columns
+    if isinstance(column.type, String) and column.type.length
+}
+
+# Errors that say nothing about the rows themselves; the batch is retried as-is
+_TRANSIENT_ERRORS = (
+    sa_exc.OperationalError,
+    sa_exc.InterfaceError,
+    sa_exc.DisconnectionError,
+    sa_exc.TimeoutError,
+    ConnectionError,
+    OSError,
+    asyncio.TimeoutError,
+)
+
+_LOG_LEVELS = {
+    AuditSeverity.CRITICAL.value: logging.CRITICAL,
+    AuditSeverity.HIGH.value: logging.ERROR,
+    AuditSeverity.MEDIUM.value: logging.WARNING,
+    AuditSeverity.LOW.value: logging.INFO,
+}
+
+# Alert thresholds: (counter key prefix, threshold, window seconds)
+FAILED_LOGIN_ALERT = ("audit:failed_logins:", 5, 900)  # 5 failed attempts in 15 minutes
+SUSPICIOUS_ALERT = ("audit:suspicious:", 3, 3600)  # 3 high/critical events in 1 hour
+
+
 class AuditLogger:
     """Comprehensive audit logging service."""
     
@@ -139,168 +174,176 @@ class AuditLogger:
         duration_ms: Optional[int] = None,
         db: Optional[AsyncSession] = None
     ):
-        """Log an audit event to database and structured logs."""
-        
-        # Generate correlation ID if not provided
-        if not correlation_id:
-            correlation_id = str(uuid.uuid4())
+        """
+        Record an audit event.
         
-        # Create audit log entry
-        audit_entry = AuditLog(
-            event_type=event_type.value,
-            severity=severity.value,
-            user_id=uuid.UUID(user_id) if user_id else None,
-            session_id=session_id,
-            ip_address=ip_address,
-            user_agent=user_agent,
-            resource_type=resource_type,
-            resource_id=resource_id,
-            action=action,
-            outcome=outcome,
-            message=message,
-            details=details,
-            correlation_id=correlation_id,
-            request_path=request_path,
-            request_method=request_method,
-            response_status=response_status,
-            duration_ms=duration_ms
-        )
-        
-        # Store in database
-        if db:
-            try:
-                db.add(audit_entry)
-                await db.commit()
-            except Exception as e:
-                await db.rollback()
-                self.logger.error(f"Failed to store audit log in database: {e}")
-        
-        # Store in Redis for real-time monitoring
-        await self._store_in_redis(audit_entry)
-        
-        # Log to structured logger
-        log_data = {
+        The event is queued for ``audit_writer``, which persists it to the
+        database, Redis and the structured log in batches. ``db`` is accepted
+        for compatibility; the writer uses its own sessions so the caller's
+        transaction is never committed on its behalf.
+        """
+        row = {
+            "id": uuid.uuid4(),
+            "timestamp": datetime.now(timezone.utc),
             "event_type": event_type.value,
             "severity": severity.value,
-            "user_id": user_id,
+            "user_id": uuid.UUID(user_id) if user_id else None,
             "session_id": session_id,
             "ip_address": ip_address,
+            "user_agent": user_agent,
             "resource_type": resource_type,
             "resource_id": resource_id,
             "action": action,
             "outcome": outcome,
             "message": message,
-            "correlation_id": correlation_id,
-            "timestamp": datetime.now(timezone.utc).isoformat()
+            "details": details,
+            "correlation_id": correlation_id or str(uuid.uuid4()),
+            "request_path": request_path,
+            "request_method": request_method,
+            "response_status": response_status,
+            "duration_ms": duration_ms,
         }
-        
-        if details:
-            log_data["details"] = details
-        
-        # Log with appropriate level based on severity
-        if severity == AuditSeverity.CRITICAL:
-            self.logger.critical(json.dumps(log_data))
-        elif severity == AuditSeverity.HIGH:
-            self.logger.error(json.dumps(log_data))
-        elif severity == AuditSeverity.MEDIUM:
-            self.logger.warning(json.dumps(log_data))
-        else:
-            self.logger.info(json.dumps(log_data))
-        
-        # Check for security alerts
-        await self._check_security_alerts(event_type, severity, user_id, ip_address)
+        for name, length in _COLUMN_LENGTHS.items():
+            value = row[name]
+            if isinstance(value, str) and len(value) > length:
+                row[name] = value[:length]
+        await audit_writer.put(row)
+    
+    def _write_structured_logs(self, rows: List[Dict[str, Any]]):
+        """Emit one structured log line per event."""
+        for row in rows:
+            log_data = {
+                "event_type": row["event_type"],
+                "severity": row["severity"],
+                "user_id": str(row["user_id"]) if row["user_id"] else None,
+                "session_id": row["session_id"],
+                "ip_address": row["ip_address"],
+                "resource_type": row["resource_type"],
+                "resource_id": row["resource_id"],
+                "action": row["action"],
+                "outcome": row["outcome"],
+                "message": row["message"],
+                "correlation_id": row["correlation_id"],
+                "timestamp": row["timestamp"].isoformat()
+            }
+            if row["details"]:
+                log_data["details"] = row["details"]
+            
+            # Log with appropriate level based on severity
+            self.logger.log(_LOG_LEVELS.get(row["severity"], logging.INFO), json.dumps(log_data, default=str))
     
     async def _get_redis(self):
         """Get Redis connection."""
         return await redis_manager.connect()
     
-    async def _store_in_redis(self, audit_entry: AuditLog):
-        """Store audit entry in Redis for real-time monitoring."""
+    async def _store_in_redis(self, rows: List[Dict[str, Any]]):
+        """
+        Store a batch of audit events in Redis for real-time monitoring and
+        update the security alert counters, all in one round trip.
+        """
+        recent, by_user, security = [], {}, []
+        type_counts: Dict[str, int] = {}
+        failed_logins: Dict[str, int] = {}
+        suspicious: Dict[str, int] = {}
+        
+        for row in rows:
+            event_data = json.dumps({
+                "id": str(row["id"]),
+                "timestamp": row["timestamp"].isoformat(),
+                "event_type": row["event_type"],
+                "severity": row["severity"],
+                "user_id": str(row["user_id"]) if row["user_id"] else None,
+                "message": row["message"],
+                "outcome": row["outcome"]
+            })
+            recent.append(event_data)
+            if row["user_id"]:
+                by_user.setdefault(str(row["user_id"]), []).append(event_data)
+            is_severe = row["severity"] in [AuditSeverity.CRITICAL.value, AuditSeverity.HIGH.value]
+            if is_severe:
+                security.append(event_data)
+            type_counts[row["event_type"]] = type_counts.get(row["event_type"], 0) + 1
+            
+            if row["event_type"] == AuditEventType.USER_LOGIN_FAILED.value and row["ip_address"]:
+                failed_logins[row["ip_address"]] = failed_logins.get(row["ip_address"], 0) + 1
+            if row["user_id"] and is_severe:
+                user_id = str(row["user_id"])
+                suspicious[user_id] = suspicious.get(user_id, 0) + 1
+        
         try:
             redis = await self._get_redis()
+            pipe = redis.pipeline(transaction=False)
             
-            # Store in multiple Redis structures for different query patterns
-            
-            # 1. Recent events list (last 1000 events)
-            event_data = {
-                "id": str(audit_entry.id),
-                "timestamp": audit_entry.timestamp.isoformat(),
-                "event_type": audit_entry.event_type,
-                "severity": audit_entry.severity,
-                "user_id": str(audit_entry.user_id) if audit_entry.user_id else None,
-                "message": audit_entry.message,
-                "outcome": audit_entry.outcome
-            }
-            
-            await redis.lpush("audit:recent_events", json.dumps(event_data))
-            await redis.ltrim("audit:recent_events", 0, 999)  # Keep last 1000
+            # 1. Recent events list (last 1000 events); LPUSH pushes left to right, newest ends first
+            pipe.lpush("audit:recent_events", *recent)
+            pipe.ltrim("audit:recent_events", 0, 999)  # Keep last 1000
             
             # 2. Events by user (last 100 per user)
-            if audit_entry.user_id:
-                user_key = f"audit:user:{audit_entry.user_id}"
-                await redis.lpush(user_key, json.dumps(event_data))
-                await redis.ltrim(user_key, 0, 99)  # Keep last 100
-                await redis.expire(user_key, 86400)  # 24 hours
+            for user_id, events in by_user.items():
+                user_key = f"audit:user:{user_id}"
+                pipe.lpush(user_key, *events)
+                pipe.ltrim(user_key, 0, 99)  # Keep last 100
+                pipe.expire(user_key, 86400)  # 24 hours
             
             # 3. Security events (critical and high severity)
-            if audit_entry.severity in [AuditSeverity.CRITICAL.value, AuditSeverity.HIGH.value]:
+            if security:
                 security_key = "audit:security_events"
-                await redis.lpush(security_key, json.dumps(event_data))
-                await redis.ltrim(security_key, 0, 499)  # Keep last 500
-                await redis.expire(security_key, 604800)  # 7 days
+                pipe.lpush(security_key, *security)
+                pipe.ltrim(security_key, 0, 499)  # Keep last 500
+                pipe.expire(security_key, 604800)  # 7 days
             
             # 4. Event counts by type (for dashboards)
-            count_key = f"audit:count:{audit_entry.event_type}"
-            await redis.incr(count_key)
-            await redis.expire(count_key, 86400)  # Reset daily
+            for event_type, count in type_counts.items():
+                count_key = f"audit:count:{event_type}"
+                pipe.incrby(count_key, count)
+                pipe.expire(count_key, 86400)  # Reset daily
+            
+            # 5. Alert counters; their results are read back below
+            counters = []
+            for (prefix, threshold, window), counts in (
+                (FAILED_LOGIN_ALERT, failed_logins), (SUSPICIOUS_ALERT, suspicious)
+            ):
+                for subject, count in counts.items():
+                    pipe.incrby(f"{prefix}{subject}", count)
+                    pipe.expire(f"{prefix}{subject}", window)
+                    counters.append((prefix, subject, threshold))
             
+            results = await pipe.execute()
         except Exception as e:
             self.logger.error(f"Failed to store audit log in Redis: {e}")
+            return
+        
+        counter_results = results[len(results) - 2 * len(counters):][::2] if counters else []
+        for (prefix, subject, threshold), total in zip(counters, counter_results):
+            if total < threshold:
+                continue
+            if prefix == FAILED_LOGIN_ALERT[0]:
+                await self._trigger_security_alert(
+                    f"Multiple failed login attempts from IP: {subject}",
+                    {"ip_address": subject, "failed_count": total}
+                )
+            else:
+                await self._trigger_security_alert(
+                    f"Suspicious activity detected for user: {subject}",
+                    {"user_id": subject, "suspicious_count": total}
+                )
     
-    async def _check_security_alerts(
-        self, 
-        event_type: AuditEventType, 
-        severity: AuditSeverity,
-        user_id: Optional[str],
-        ip_address: Optional[str]
-    ):
-        """Check for security alert conditions."""
-        try:
-            # Alert on critical events
-            if severity == AuditSeverity.CRITICAL:
+    async def _check_security_alerts(self, rows: List[Dict[str, Any]]):
+        """Alert on critical events; counter-based alerts are raised by ``_store_in_redis``."""
+        for row in rows:
+            if row["severity"] != AuditSeverity.CRITICAL.value:
+                continue
+            try:
                 await self._trigger_security_alert(
-                    f"Critical security event: {event_type.value}",
-                    {"event_type": event_type.value, "user_id": user_id, "ip_address": ip_address}
+                    f"Critical security event: {row['event_type']}",
+                    {
+                        "event_type": row["event_type"],
+                        "user_id": str(row["user_id"]) if row["user_id"] else None,
+                        "ip_address": row["ip_address"]
+                    }
                 )
-            
-            # Check for failed login attempts
-            if event_type == AuditEventType.USER_LOGIN_FAILED and ip_address:
-                failed_attempts_key = f"audit:failed_logins:{ip_address}"
-                redis = await self._get_redis()
-                failed_count = await redis.incr(failed_attempts_key)
-                await redis.expire(failed_attempts_key, 900)  # 15 minutes
-                
-                if failed_count >= 5:  # 5 failed attempts in 15 minutes
-                    await self._trigger_security_alert(
-                        f"Multiple failed login attempts from IP: {ip_address}",
-                        {"ip_address": ip_address, "failed_count": failed_count}
-                    )
-            
-            # Check for suspicious user activity
-            if user_id and severity in [AuditSeverity.HIGH, AuditSeverity.CRITICAL]:
-                suspicious_key = f"audit:suspicious:{user_id}"
-                redis = await self._get_redis()
-                suspicious_count = await redis.incr(suspicious_key)
-                await redis.expire(suspicious_key, 3600)  # 1 hour
-                
-                if suspicious_count >= 3:  # 3 high/critical events in 1 hour
-                    await self._trigger_security_alert(
-                        f"Suspicious activity detected for user: {user_id}",
-                        {"user_id": user_id, "suspicious_count": suspicious_count}
-                    )
-        
-        except Exception as e:
-            self.logger.error(f"Failed to check security alerts: {e}")
+            except Exception as e:
+                self.logger.error(f"Failed to check security alerts: {e}")
     
     async def _trigger_security_alert(self, message: str, details: Dict[str, Any]):
         """Trigger security alert notification."""
@@ -312,9 +355,14 @@ class AuditLogger:
         }
         
         # Store alert in Redis
-        redis = await self._get_redis()
-        await redis.lpush("audit:security_alerts", json.dumps(alert_data))
-        await redis.ltrim("audit:security_alerts", 0, 99)  # Keep last 100 alerts
+        try:
+            redis = await self._get_redis()
+            pipe = redis.pipeline(transaction=False)
+            pipe.lpush("audit:security_alerts", json.dumps(alert_data))
+            pipe.ltrim("audit:security_alerts", 0, 99)  # Keep last 100 alerts
+            await pipe.execute()
+        except Exception as e:
+            self.logger.error(f"Failed to store security alert in Redis: {e}")
         
         # Log critical alert
         self.logger.critical(f"SECURITY ALERT: {json.dumps(alert_data)}")
@@ -353,9 +401,287 @@ class AuditLogger:
             return []
 
 
+def _append_lines(path: str, lines: List[str]):
+    """Append JSON lines to a file, creating its directory on first use."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as target:
+        target.writelines(line + "\n" for line in lines)
+
+
+class AuditWriter:
+    """
+    Buffers audit events in process and persists them in batches.
+    
+    ``submit`` only appends to a bounded in-memory queue, so auditing adds
+    microseconds to a request. A background task drains the queue every
+    ``flush_interval_ms`` or as soon as ``batch_size`` events are waiting,
+    writing each batch with one multi-row INSERT, one Redis pipeline and the
+    structured log lines.
+    
+    When the queue is full, ``overflow`` decides what happens: ``drop_oldest``
+    (default) discards the oldest queued event, ``drop_newest`` discards the
+    new one and ``block`` makes the caller wait until the writer has made
+    room. Batches that fail with a connection or operational error are
+    retried, and on shutdown whatever is left is appended to a spill file
+    that is replayed on the next start. When the database rejects a batch's
+    data, the batch is bisected to isolate the offending rows, which are
+    dead-lettered to a separate file that is kept for inspection and never
+    replayed.
+    """
+    
+    OVERFLOW_POLICIES = ("drop_oldest", "drop_newest", "block")
+    
+    def __init__(
+        self,
+        max_events: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        flush_interval_ms: Optional[int] = None,
+        overflow: Optional[str] = None,
+        spill_path: Optional[str] = None,
+        dead_letter_path: Optional[str] = None,
+        session_factory=None
+    ):
+        self.max_events = max_events or settings.AUDIT_QUEUE_MAX_EVENTS
+        self.batch_size = batch_size or settings.AUDIT_BATCH_SIZE
+        self.flush_interval = (flush_interval_ms or settings.AUDIT_FLUSH_INTERVAL_MS) / 1000
+        self.overflow = overflow or settings.AUDIT_QUEUE_OVERFLOW
+        if self.overflow not in self.OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown audit overflow policy '{self.overflow}'")
+        self.spill_path = spill_path or settings.AUDIT_SPILL_PATH
+        self.dead_letter_path = dead_letter_path or settings.AUDIT_DEAD_LETTER_PATH
+        self.session_factory = session_factory
+        
+        self._queue: deque = deque()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._space: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+        self.written = 0
+        self.dropped = 0
+        self.failed_batches = 0
+        self.rejected = 0
+    
+    async def put(self, row: Dict[str, Any]) -> bool:
+        """Queue one event, waiting for room first under the ``block`` policy."""
+        if self.overflow == "block":
+            while len(self._queue) >= self.max_events and self._task is not None and not self._task.done():
+                self._space.clear()
+                self._wakeup.set()
+                await self._space.wait()
+        return self.submit(row)
+    
+    def submit(self, row: Dict[str, Any]) -> bool:
+        """Queue one event without waiting; returns False if the overflow policy dropped it."""
+        accepted = True
+        if len(self._queue) >= self.max_events and self.overflow != "block":
+            if self.overflow == "drop_newest":
+                accepted = False
+            else:
+                self._queue.popleft()
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 1000 == 0:
+                audit_logger.logger.warning(f"Audit queue full, {self.dropped} events dropped so far")
+        if accepted:
+            self._queue.append(row)
+        
+        if self._task is None or self._task.done():
+            self._ensure_started()
+        elif len(self._queue) >= self.batch_size and self._wakeup is not None:
+            self._wakeup.set()
+        return accepted
+    
+    def _ensure_started(self):
+        # Starts on first use so scripts and workers without the app lifespan still persist events
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if not self._closing:
+            self.start()
+    
+    def start(self) -> asyncio.Task:
+        """Start the background flush task, replaying events spilled by a previous shutdown."""
+        if self._task is not None and not self._task.done():
+            return self._task
+        self._closing = False
+        self._wakeup = asyncio.Event()
+        self._space = asyncio.Event()
+        self._load_spill()
+        self._task = asyncio.create_task(self._run())
+        return self._task
+    
+    async def _run(self):
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            while self._queue and not self._closing:
+                if not await self.flush():
+                    # Database unavailable; back off before retrying the batch
+                    await asyncio.sleep(min(30, self.flush_interval * 2 ** min(self.failed_batches, 8)))
+                    break
+    
+    def _take_batch(self) -> List[Dict[str, Any]]:
+        batch = []
+        while self._queue and len(batch) < self.batch_size:
+            batch.append(self._queue.popleft())
+        if self._space is not None:
+            self._space.set()
+        return batch
+    
+    async def flush(self) -> bool:
+        """
+        Write one batch.
+        
+        On a transient database failure the unwritten rows go back to the
+        front of the queue and False is returned so the caller backs off.
+        """
+        rows = self._take_batch()
+        if not rows:
+            return True
+        
+        written: List[Dict[str, Any]] = []
+        rejected: List[Dict[str, Any]] = []
+        succeeded = True
+        try:
+            await self._write_isolating(rows, written, rejected)
+            self.failed_batches = 0
+        except Exception as e:
+            self.failed_batches += 1
+            handled = {id(row) for row in written + rejected}
+            pending = [row for row in rows if id(row) not in handled]
+            self._queue.extendleft(reversed(pending))
+            audit_logger.logger.error(f"Failed to store {len(pending)} audit logs in database: {e}")
+            succeeded = False
+        self.written += len(written)
+        
+        if written:
+            try:
+                audit_logger._write_structured_logs(written)
+                await audit_logger._store_in_redis(written)
+                await audit_logger._check_security_alerts(written)
+            except Exception as e:
+                audit_logger.logger.error(f"Failed to publish audit events: {e}")
+        return succeeded
+    
+    async def _write_isolating(
+        self,
+        rows: List[Dict[str, Any]],
+        written: List[Dict[str, Any]],
+        rejected: List[Dict[str, Any]]
+    ):
+        """
+        Write ``rows``, bisecting on data errors until the bad rows are isolated.
+        
+        Transient errors are raised; rows already handled are in ``written``
+        or ``rejected``.
+        """
+        try:
+            await self._write_database(rows)
+        except Exception as e:
+            if isinstance(e, _TRANSIENT_ERRORS) or getattr(e, "connection_invalidated", False):
+                raise
+            if len(rows) == 1:
+                self._dead_letter(rows[0], e)
+                rejected.append(rows[0])
+                return
+            middle = len(rows) // 2
+            await self._write_isolating(rows[:middle], written, rejected)
+            await self._write_isolating(rows[middle:], written, rejected)
+            return
+        written.extend(rows)
+    
+    def _dead_letter(self, row: Dict[str, Any], error: Exception):
+        self.rejected += 1
+        record = {**row, "dead_letter": {"error": str(error)[:1000], "at": datetime.now(timezone.utc)}}
+        try:
+            _append_lines(self.dead_letter_path, [json.dumps(record, default=str)])
+            audit_logger.logger.error(f"Audit event {row.get('id')} rejected by the database, dead-lettered: {error}")
+        except OSError as e:
+            audit_logger.logger.critical(f"Lost audit event {row.get('id')}, dead-letter failed: {e}")
+    
+    async def _write_database(self, rows: List[Dict[str, Any]]):
+        session_factory = self.session_factory or AsyncSessionFactory
+        async with session_factory() as session:
+            # A list of parameter sets becomes a multi-row INSERT
+            await session.execute(insert(AuditLog), rows)
+            await session.commit()
+    
+    async def stop(self, timeout: float = 10.0):
+        """Drain the queue, then spill anything that could not be written."""
+        self._closing = True
+        if self._task is not None:
+            self._wakeup.set()
+            self._space.set()
+            try:
+                await asyncio.wait_for(self._task, timeout=timeout)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                pass
+        
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while self._queue and loop.time() < deadline:
+            if not await self.flush():
+                break
+        if self._queue:
+            self._spill()
+    
+    def _spill(self):
+        rows = list(self._queue)
+        self._queue.clear()
+        try:
+            _append_lines(self.spill_path, [json.dumps(row, default=str) for row in rows])
+            audit_logger.logger.warning(f"Spilled {len(rows)} unwritten audit events to {self.spill_path}")
+        except OSError as e:
+            audit_logger.logger.critical(f"Lost {len(rows)} audit events, spill failed: {e}")
+    
+    def _load_spill(self):
+        if not os.path.exists(self.spill_path):
+            return
+        try:
+            with open(self.spill_path, encoding="utf-8") as spill:
+                lines = spill.readlines()
+            os.remove(self.spill_path)
+        except OSError as e:
+            audit_logger.logger.error(f"Failed to read audit spill file: {e}")
+            return
+        
+        restored = []
+        for line in lines:
+            try:
+                row = json.loads(line)
+            except ValueError:
+                continue
+            row["id"] = uuid.UUID(row["id"])
+            row["timestamp"] = datetime.fromisoformat(row["timestamp"])
+            row["user_id"] = uuid.UUID(row["user_id"]) if row.get("user_id") else None
+            restored.append(row)
+        # Spilled events are older than anything queued since
+        self._queue.extendleft(reversed(restored))
+        if restored:
+            audit_logger.logger.info(f"Replaying {len(restored)} spilled audit events")
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": len(self._queue),
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed_batches": self.failed_batches,
+            "rejected": self.rejected,
+            "overflow": self.overflow
+        }
+
+
 # Global audit logger instance
 audit_logger = AuditLogger()
 
+# Background writer used by audit_logger.log_event
+audit_writer = AuditWriter()
+
 
 # Convenience functions for common audit events
 async def log_user_login(user_id: str, session_id: str, ip_address: str, user_agent: str, success: bool = True, db: AsyncSession = None):
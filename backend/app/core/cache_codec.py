@@ -0,0 +1,281 @@
+"""
+Binary serialization for values stored in Redis.
+
+Payloads are encoded as typed JSON and compressed with zlib once they pass a
+size threshold; this is the supported configuration and needs nothing beyond
+the standard library. msgpack, zstandard and lz4 are not declared
+dependencies: where they are installed they can be selected explicitly
+(``CACHE_SERIALIZER`` / ``CACHE_COMPRESSION``), which every process sharing
+the cache then needs too. Every payload starts with a
+small header so the format can change without flushing the cache:
+
+    byte 0   0x00 marker (never the first byte of a legacy JSON payload)
+    byte 1   format version
+    byte 2   serializer id (low nibble) | compression id (high nibble)
+
+Values written before the codec existed are plain JSON and still decode.
+"""
+
+from typing import Any, Callable, Dict, Optional, Tuple
+import base64
+import json
+import logging
+import uuid
+import zlib
+from datetime import date, datetime, time as dt_time
+from decimal import Decimal
+
+import numpy as np
+
+from .config import settings
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - msgpack is optional
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - zstandard is optional
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:  # pragma: no cover - lz4 is optional
+    lz4_frame = None
+
+logger = logging.getLogger(__name__)
+
+
+MARKER = 0x00
+FORMAT_VERSION = 1
+
+SERIALIZER_JSON = 0
+SERIALIZER_MSGPACK = 1
+
+COMPRESSION_NONE = 0
+COMPRESSION_ZLIB = 1
+COMPRESSION_ZSTD = 2
+COMPRESSION_LZ4 = 3
+
+# Extension type codes shared by the msgpack and JSON encodings
+EXT_DATETIME = 1
+EXT_DATE = 2
+EXT_TIME = 3
+EXT_UUID = 4
+EXT_DECIMAL = 5
+EXT_NDARRAY = 6
+EXT_SET = 7
+
+
+class CacheCodecError(ValueError):
+    """Raised when a cached payload cannot be decoded."""
+
+
+def _encode_ext(obj: Any) -> Optional[Tuple[int, Any]]:
+    """Map a non-native value to ``(ext code, JSON/msgpack-native payload)``."""
+    if isinstance(obj, datetime):
+        return EXT_DATETIME, obj.isoformat()
+    if isinstance(obj, date):
+        return EXT_DATE, obj.isoformat()
+    if isinstance(obj, dt_time):
+        return EXT_TIME, obj.isoformat()
+    if isinstance(obj, uuid.UUID):
+        return EXT_UUID, str(obj)
+    if isinstance(obj, Decimal):
+        return EXT_DECIMAL, str(obj)
+    if isinstance(obj, np.ndarray):
+        if obj.dtype.hasobject:
+            return None
+        return EXT_NDARRAY, [obj.dtype.str, list(obj.shape), base64.b64encode(obj.tobytes()).decode("ascii")]
+    if isinstance(obj, (set, frozenset)):
+        return EXT_SET, list(obj)
+    return None
+
+
+def _decode_ext(code: int, data: Any) -> Any:
+    if code == EXT_DATETIME:
+        return datetime.fromisoformat(data)
+    if code == EXT_DATE:
+        return date.fromisoformat(data)
+    if code == EXT_TIME:
+        return dt_time.fromisoformat(data)
+    if code == EXT_UUID:
+        return uuid.UUID(data)
+    if code == EXT_DECIMAL:
+        return Decimal(data)
+    if code == EXT_NDARRAY:
+        dtype, shape, raw = data
+        return np.frombuffer(base64.b64decode(raw), dtype=np.dtype(dtype)).reshape(shape).copy()
+    if code == EXT_SET:
+        return set(data)
+    raise CacheCodecError(f"Unknown cache extension type {code}")
+
+
+def _to_native(obj: Any) -> Any:
+    """Fallback for values neither encoding handles natively."""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump(mode="json")
+    # Matches the previous json.dumps(default=str) behaviour
+    return str(obj)
+
+
+class _JSONSerializer:
+    """Typed JSON: extension values become ``{"__ext__": code, "v": payload}`` objects."""
+
+    id = SERIALIZER_JSON
+
+    @staticmethod
+    def _default(obj: Any) -> Any:
+        ext = _encode_ext(obj)
+        if ext is not None:
+            return {"__ext__": ext[0], "v": ext[1]}
+        return _to_native(obj)
+
+    @staticmethod
+    def _object_hook(obj: Dict[str, Any]) -> Any:
+        if "__ext__" in obj and len(obj) == 2 and "v" in obj:
+            return _decode_ext(obj["__ext__"], obj["v"])
+        return obj
+
+    def dumps(self, value: Any) -> bytes:
+        return json.dumps(value, default=self._default, separators=(",", ":")).encode("utf-8")
+
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data, object_hook=self._object_hook)
+
+
+class _MsgpackSerializer:
+    """msgpack with extension types carrying msgpack-encoded payloads."""
+
+    id = SERIALIZER_MSGPACK
+
+    def _default(self, obj: Any) -> Any:
+        ext = _encode_ext(obj)
+        if ext is not None:
+            return msgpack.ExtType(ext[0], msgpack.packb(ext[1], use_bin_type=True))
+        return _to_native(obj)
+
+    @staticmethod
+    def _ext_hook(code: int, data: bytes) -> Any:
+        return _decode_ext(code, msgpack.unpackb(data, raw=False))
+
+    def dumps(self, value: Any) -> bytes:
+        return msgpack.packb(value, default=self._default, use_bin_type=True, datetime=False)
+
+    def loads(self, data: bytes) -> Any:
+        return msgpack.unpackb(data, ext_hook=self._ext_hook, raw=False, strict_map_key=False)
+
+
+def _compressors() -> Dict[int, Tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]]:
+    compressors = {
+        COMPRESSION_ZLIB: (lambda data: zlib.compress(data, 3), zlib.decompress),
+    }
+    if zstandard is not None:
+        compressors[COMPRESSION_ZSTD] = (
+            lambda data: zstandard.ZstdCompressor(level=3).compress(data),
+            lambda data: zstandard.ZstdDecompressor().decompress(data)
+        )
+    if lz4_frame is not None:
+        compressors[COMPRESSION_LZ4] = (lz4_frame.compress, lz4_frame.decompress)
+    return compressors
+
+
+_COMPRESSION_NAMES = {
+    "none": COMPRESSION_NONE,
+    "zlib": COMPRESSION_ZLIB,
+    "zstd": COMPRESSION_ZSTD,
+    "lz4": COMPRESSION_LZ4,
+}
+
+
+class CacheCodec:
+    """
+    Encodes cache values to versioned, optionally compressed bytes.
+
+    ``serializer`` is ``"json"`` (default), ``"msgpack"`` or ``"auto"``
+    (msgpack when installed); ``compression`` is ``"zlib"`` (default),
+    ``"zstd"``, ``"lz4"``, ``"none"`` or ``"auto"`` (the best installed).
+    Decoding accepts any serializer/compression combination that is
+    installed, so processes with different settings can share a cache
+    during a rollout.
+    """
+
+    def __init__(
+        self,
+        serializer: str = "json",
+        compression: str = "zlib",
+        compression_threshold: int = 1024
+    ):
+        self._serializers = {SERIALIZER_JSON: _JSONSerializer()}
+        if msgpack is not None:
+            self._serializers[SERIALIZER_MSGPACK] = _MsgpackSerializer()
+        self._compressors = _compressors()
+
+        if serializer == "auto":
+            serializer = "msgpack" if msgpack is not None else "json"
+        if serializer == "msgpack" and msgpack is None:
+            logger.warning("msgpack is not installed; cache values are serialized as JSON")
+            serializer = "json"
+        if serializer not in ("msgpack", "json"):
+            raise ValueError(f"Unknown cache serializer '{serializer}'")
+        self.serializer = self._serializers[SERIALIZER_MSGPACK if serializer == "msgpack" else SERIALIZER_JSON]
+
+        if compression == "auto":
+            compression = next(
+                name for name in ("zstd", "lz4", "zlib")
+                if _COMPRESSION_NAMES[name] in self._compressors
+            )
+        if compression not in _COMPRESSION_NAMES:
+            raise ValueError(f"Unknown cache compression '{compression}'")
+        self.compression = _COMPRESSION_NAMES[compression]
+        if self.compression != COMPRESSION_NONE and self.compression not in self._compressors:
+            logger.warning(f"{compression} is not installed; cache values are compressed with zlib")
+            self.compression = COMPRESSION_ZLIB
+        self.compression_threshold = compression_threshold
+
+    def encode(self, value: Any) -> bytes:
+        payload = self.serializer.dumps(value)
+        compression = COMPRESSION_NONE
+        if self.compression != COMPRESSION_NONE and len(payload) >= self.compression_threshold:
+            compressed = self._compressors[self.compression][0](payload)
+            # Incompressible payloads are stored as-is
+            if len(compressed) < len(payload):
+                payload, compression = compressed, self.compression
+        header = bytes((MARKER, FORMAT_VERSION, self.serializer.id | (compression << 4)))
+        return header + payload
+
+    def decode(self, data: Any) -> Any:
+        if data is None:
+            return None
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        if not data or data[0] != MARKER:
+            # Written before the codec existed
+            return json.loads(data)
+        if len(data) < 3:
+            raise CacheCodecError("Truncated cache payload")
+
+        version, flags = data[1], data[2]
+        if version != FORMAT_VERSION:
+            raise CacheCodecError(f"Unsupported cache format version {version}")
+
+        serializer_id, compression = flags & 0x0F, flags >> 4
+        payload = data[3:]
+        if compression != COMPRESSION_NONE:
+            if compression not in self._compressors:
+                raise CacheCodecError(f"Cache payload uses unavailable compression {compression}")
+            payload = self._compressors[compression][1](payload)
+        if serializer_id not in self._serializers:
+            raise CacheCodecError(f"Cache payload uses unavailable serializer {serializer_id}")
+        return self._serializers[serializer_id].loads(payload)
+
+
+# Shared codec configured from settings
+cache_codec = CacheCodec(
+    serializer=settings.CACHE_SERIALIZER,
+    compression=settings.CACHE_COMPRESSION,
+    compression_threshold=settings.CACHE_COMPRESSION_THRESHOLD_BYTES
+)
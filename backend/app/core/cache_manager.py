@@ -2,22 +2,156 @@
 Multi-layer caching system for API performance optimization.
 """
 import json
+import fnmatch
 import hashlib
+import heapq
 import asyncio
-from typing import Dict, Any, Optional, Union, List
-from datetime import datetime, timedelta
+import math
+import random
+import re
+import sys
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, Union, List, Tuple, Callable, Awaitable
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from enum import Enum
 from functools import wraps
 
 import redis.asyncio as redis
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.core.redis import redis_manager
+from app.core.redis import SCAN_BATCH_SIZE, redis_manager
+from app.core.cache_codec import CacheCodec, cache_codec
+from app.core.cache_warming import cache_warmer, start_cache_warmer
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+def cache_key_prefix(key: str) -> str:
+    """The prefix a key is reported under: everything before the first ``:``."""
+    return key.split(":", 1)[0] if ":" in key else key
+
+
+@dataclass
+class _PrefixStats:
+    l1_hits: int = 0
+    l2_hits: int = 0
+    misses: int = 0
+    sets: int = 0
+    get_seconds: float = 0.0
+    max_get_seconds: float = 0.0
+    set_seconds: float = 0.0
+    payload_bytes: int = 0
+    max_payload_bytes: int = 0
+
+
+class CacheMetrics:
+    """
+    Per-prefix cache counters for this process.
+    
+    Keeps hit/miss counts per layer, get/set latency and L2 payload sizes
+    for the stats endpoint, and forwards each event to registered listeners
+    (``metrics_service`` exports them to Prometheus).
+    """
+    
+    # Unbounded key prefixes would blow up memory and label cardinality
+    MAX_PREFIXES = 200
+    OVERFLOW_PREFIX = "_other"
+    
+    def __init__(self):
+        self.prefixes: Dict[str, _PrefixStats] = {}
+        self.evictions: Dict[str, int] = {}
+        self._listeners: List[Callable[..., None]] = []
+    
+    def add_listener(self, listener: Callable[..., None]):
+        """Register ``listener(event, prefix=..., layer=..., ...)`` for every cache event."""
+        self._listeners.append(listener)
+    
+    def _stats(self, key: str) -> Tuple[str, _PrefixStats]:
+        prefix = cache_key_prefix(key)
+        stats = self.prefixes.get(prefix)
+        if stats is None:
+            if len(self.prefixes) >= self.MAX_PREFIXES:
+                prefix = self.OVERFLOW_PREFIX
+                stats = self.prefixes.setdefault(prefix, _PrefixStats())
+            else:
+                stats = self.prefixes[prefix] = _PrefixStats()
+        return prefix, stats
+    
+    def _emit(self, event: str, **fields):
+        for listener in self._listeners:
+            try:
+                listener(event, **fields)
+            except Exception as e:
+                logger.debug(f"Cache metrics listener failed: {e}")
+    
+    def record_get(self, key: str, layer: str, seconds: float):
+        """Record a lookup served by ``layer`` (``l1``, ``l2`` or ``miss``)."""
+        prefix, stats = self._stats(key)
+        if layer == "l1":
+            stats.l1_hits += 1
+        elif layer == "l2":
+            stats.l2_hits += 1
+        else:
+            stats.misses += 1
+        stats.get_seconds += seconds
+        stats.max_get_seconds = max(stats.max_get_seconds, seconds)
+        self._emit("get", prefix=prefix, layer=layer, seconds=seconds)
+    
+    def record_set(self, key: str, seconds: float, payload_bytes: Optional[int] = None):
+        prefix, stats = self._stats(key)
+        stats.sets += 1
+        stats.set_seconds += seconds
+        if payload_bytes is not None:
+            stats.payload_bytes += payload_bytes
+            stats.max_payload_bytes = max(stats.max_payload_bytes, payload_bytes)
+        self._emit("set", prefix=prefix, layer="l2", seconds=seconds, payload_bytes=payload_bytes)
+    
+    def record_eviction(self, layer: str, reason: str, count: int = 1):
+        """Record entries dropped for capacity (``capacity``) or age (``expired``)."""
+        if count <= 0:
+            return
+        self.evictions[f"{layer}:{reason}"] = self.evictions.get(f"{layer}:{reason}", 0) + count
+        self._emit("eviction", layer=layer, reason=reason, count=count)
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Per-prefix hit ratios, latencies and sizes, busiest prefixes first."""
+        prefixes = {}
+        for prefix, stats in sorted(
+            self.prefixes.items(),
+            key=lambda item: item[1].l1_hits + item[1].l2_hits + item[1].misses,
+            reverse=True
+        ):
+            gets = stats.l1_hits + stats.l2_hits + stats.misses
+            prefixes[prefix] = {
+                "gets": gets,
+                "l1_hits": stats.l1_hits,
+                "l2_hits": stats.l2_hits,
+                "misses": stats.misses,
+                "hit_ratio": round((stats.l1_hits + stats.l2_hits) / gets, 3) if gets else 0.0,
+                "avg_get_ms": round(stats.get_seconds / gets * 1000, 3) if gets else 0.0,
+                "max_get_ms": round(stats.max_get_seconds * 1000, 3),
+                "sets": stats.sets,
+                "avg_set_ms": round(stats.set_seconds / stats.sets * 1000, 3) if stats.sets else 0.0,
+                "avg_payload_bytes": round(stats.payload_bytes / stats.sets) if stats.sets else 0,
+                "max_payload_bytes": stats.max_payload_bytes
+            }
+        return {"prefixes": prefixes, "evictions": dict(self.evictions)}
+    
+    def reset(self):
+        self.prefixes.clear()
+        self.evictions.clear()
+
+
+# Process-wide cache metrics shared by all layers
+cache_metrics = CacheMetrics()
+
+
 class CacheLayer:
     """Base cache layer interface."""
     
@@ -34,125 +168,202 @@ class CacheLayer:
         raise NotImplementedError
 
 
+@dataclass
+class _MemoryEntry:
+    """A single L1 entry; ``expires_at`` is on the ``time.monotonic`` clock."""
+    value: Any
+    expires_at: float
+    created_at: datetime
+    tags: Tuple[str, ...]
+    size: int
+
+
+def _estimate_size(value: Any, _depth: int = 0) -> int:
+    """Approximate the memory held by a cached value (containers walked a few levels deep)."""
+    size = sys.getsizeof(value)
+    if _depth >= 4:
+        return size
+    if isinstance(value, dict):
+        size += sum(
+            _estimate_size(k, _depth + 1) + _estimate_size(v, _depth + 1)
+            for k, v in value.items()
+        )
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(_estimate_size(item, _depth + 1) for item in value)
+    return size
+
+
 class MemoryCache(CacheLayer):
-    """In-memory cache layer (L1 cache) with tag-based invalidation."""
+    """
+    In-memory cache layer (L1 cache) with tag-based invalidation.
     
-    def __init__(self, max_size: int = 1000):
-        self.cache: Dict[str, Dict[str, Any]] = {}
+    Entries live in an ``OrderedDict`` kept in LRU order, so get, set and
+    delete are O(1). Each entry records its own tags, which makes removing it
+    from the tag index proportional to its tag count rather than the number
+    of tags in the cache. Expiry times go on a min-heap that is swept on every
+    operation, and the cache is bounded both by entry count and by estimated
+    memory size.
+    """
+    
+    def __init__(self, max_size: int = 1000, max_memory_bytes: Optional[int] = None):
+        self.cache: "OrderedDict[str, _MemoryEntry]" = OrderedDict()
         self.max_size = max_size
-        self.access_order: List[str] = []
+        self.max_memory_bytes = max_memory_bytes
+        self.memory_bytes = 0
         self.tag_index: Dict[str, set] = {}  # Tag-based invalidation support
-        self.pattern_index: Dict[str, set] = {}  # Pattern-based invalidation
+        self.evictions = 0
+        self.expirations = 0
+        self._expiry_heap: List[Tuple[float, str]] = []
     
     async def get(self, key: str) -> Optional[Any]:
-        if key in self.cache:
-            # Check expiration
-            entry = self.cache[key]
-            if datetime.utcnow() < entry['expires_at']:
-                # Update access order for LRU
-                if key in self.access_order:
-                    self.access_order.remove(key)
-                self.access_order.append(key)
-                return entry['value']
-            else:
-                # Remove expired entry
-                await self.delete(key)
-        return None
+        self._purge_expired()
+        entry = self.cache.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            cache_metrics.record_eviction("l1", "expired")
+            return None
+        # Update access order for LRU
+        self.cache.move_to_end(key)
+        return entry.value
     
     async def invalidate_by_tag(self, tag: str) -> int:
         """Invalidate all cache entries with a specific tag."""
         count = 0
-        if tag in self.tag_index:
-            keys = list(self.tag_index[tag])
-            for key in keys:
-                if await self.delete(key):
-                    count += 1
-            del self.tag_index[tag]
+        for key in list(self.tag_index.get(tag, ())):
+            if self._remove(key):
+                count += 1
+        self.tag_index.pop(tag, None)
         return count
     
     async def invalidate_by_pattern(self, pattern: str) -> int:
-        """Invalidate all cache entries matching a pattern."""
-        import re
+        """Invalidate all cache entries matching a Redis-style glob pattern."""
         count = 0
-        pattern_re = re.compile(pattern)
+        pattern_re = re.compile(fnmatch.translate(pattern))
         keys_to_delete = [k for k in self.cache.keys() if pattern_re.match(k)]
         for key in keys_to_delete:
-            if await self.delete(key):
+            if self._remove(key):
                 count += 1
         return count
     
-    def _add_tags(self, key: str, tags: List[str]):
+    def _add_tags(self, key: str, tags: Tuple[str, ...]):
         """Associate tags with a cache key."""
-        if tags:
-            for tag in tags:
-                if tag not in self.tag_index:
-                    self.tag_index[tag] = set()
-                self.tag_index[tag].add(key)
+        for tag in tags:
+            self.tag_index.setdefault(tag, set()).add(key)
     
-    def _remove_tags(self, key: str):
+    def _remove_tags(self, key: str, tags: Tuple[str, ...]):
         """Remove tag associations for a key."""
-        for tag_set in self.tag_index.values():
-            tag_set.discard(key)
+        for tag in tags:
+            tag_set = self.tag_index.get(tag)
+            if tag_set is not None:
+                tag_set.discard(key)
+                if not tag_set:
+                    del self.tag_index[tag]
     
     async def set(self, key: str, value: Any, ttl: int = 300, tags: List[str] = None) -> bool:
         try:
-            # Evict old entries if at capacity
-            if len(self.cache) >= self.max_size and key not in self.cache:
-                await self._evict_lru()
-            
-            expires_at = datetime.utcnow() + timedelta(seconds=ttl)
-            self.cache[key] = {
-                'value': value,
-                'expires_at': expires_at,
-                'created_at': datetime.utcnow(),
-                'tags': tags or []
-            }
+            self._purge_expired()
+            self._remove(key)
             
-            # Add tag associations
-            self._add_tags(key, tags or [])
+            now = time.monotonic()
+            entry = _MemoryEntry(
+                value=value,
+                expires_at=now + ttl,
+                created_at=datetime.utcnow(),
+                tags=tuple(tags or ()),
+                size=_estimate_size(value) + sys.getsizeof(key)
+            )
+            if self.max_memory_bytes is not None and entry.size > self.max_memory_bytes:
+                logger.debug(f"Memory cache skipping {key}: {entry.size} bytes exceeds the L1 budget")
+                return False
             
-            # Update access order
-            if key in self.access_order:
-                self.access_order.remove(key)
-            self.access_order.append(key)
+            self.cache[key] = entry
+            self.memory_bytes += entry.size
+            self._add_tags(key, entry.tags)
+            heapq.heappush(self._expiry_heap, (entry.expires_at, key))
             
+            # Evict old entries if over capacity
+            self._evict_lru()
+            self._compact_expiry_heap()
             return True
         except Exception as e:
             logger.error(f"Memory cache set error: {e}")
             return False
     
     async def delete(self, key: str) -> bool:
-        if key in self.cache:
-            # Remove tag associations
-            self._remove_tags(key)
-            del self.cache[key]
-            if key in self.access_order:
-                self.access_order.remove(key)
-            return True
-        return False
+        return self._remove(key)
     
     async def exists(self, key: str) -> bool:
-        return key in self.cache and datetime.utcnow() < self.cache[key]['expires_at']
+        entry = self.cache.get(key)
+        return entry is not None and time.monotonic() < entry.expires_at
     
-    async def _evict_lru(self):
-        """Evict least recently used item."""
-        if self.access_order:
-            lru_key = self.access_order.pop(0)
-            if lru_key in self.cache:
-                del self.cache[lru_key]
+    async def clear(self):
+        """Drop every entry."""
+        self.cache.clear()
+        self.tag_index.clear()
+        self._expiry_heap.clear()
+        self.memory_bytes = 0
+    
+    def purge_expired(self) -> int:
+        """Remove every expired entry and return how many were dropped."""
+        return self._purge_expired()
+    
+    def _remove(self, key: str) -> bool:
+        entry = self.cache.pop(key, None)
+        if entry is None:
+            return False
+        self.memory_bytes -= entry.size
+        self._remove_tags(key, entry.tags)
+        # The heap entry is left behind and skipped when it surfaces
+        return True
+    
+    def _purge_expired(self) -> int:
+        now = time.monotonic()
+        removed = 0
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            expires_at, key = heapq.heappop(heap)
+            entry = self.cache.get(key)
+            # Skip heap entries left behind by overwrites and deletes
+            if entry is not None and entry.expires_at == expires_at:
+                self._remove(key)
+                removed += 1
+        self.expirations += removed
+        cache_metrics.record_eviction("l1", "expired", removed)
+        return removed
+    
+    def _compact_expiry_heap(self):
+        """Rebuild the heap once stale entries outnumber live ones."""
+        if len(self._expiry_heap) > 2 * len(self.cache) + 64:
+            self._expiry_heap = [(entry.expires_at, key) for key, entry in self.cache.items()]
+            heapq.heapify(self._expiry_heap)
+    
+    def _evict_lru(self):
+        """Evict least recently used items until within the entry and memory bounds."""
+        while self.cache and (
+            len(self.cache) > self.max_size
+            or (self.max_memory_bytes is not None and self.memory_bytes > self.max_memory_bytes)
+        ):
+            lru_key = next(iter(self.cache))
+            self._remove(lru_key)
+            self.evictions += 1
+            cache_metrics.record_eviction("l1", "capacity")
 
 
 class RedisCache(CacheLayer):
-    """Redis cache layer (L2 cache)."""
+    """Redis cache layer (L2 cache); values are encoded with ``cache_codec``."""
     
-    def __init__(self):
+    def __init__(self, codec: CacheCodec = None):
         self.redis = redis_manager
+        self.codec = codec or cache_codec
     
     async def get(self, key: str) -> Optional[Any]:
         try:
-            cached = await self.redis.get(key)
+            cached = await self.redis.get_binary(key)
             if cached:
-                return json.loads(cached)
+                return self.codec.decode(cached)
             return None
         except Exception as e:
             logger.error(f"Redis cache get error: {e}")
@@ -160,8 +371,10 @@ class RedisCache(CacheLayer):
     
     async def set(self, key: str, value: Any, ttl: int = 300) -> bool:
         try:
-            serialized = json.dumps(value, default=str)
-            await self.redis.setex(key, ttl, serialized)
+            started = time.perf_counter()
+            serialized = self.codec.encode(value)
+            await self.redis.setex_binary(key, ttl, serialized)
+            cache_metrics.record_set(key, time.perf_counter() - started, len(serialized))
             return True
         except Exception as e:
             logger.error(f"Redis cache set error: {e}")
@@ -184,11 +397,33 @@ class RedisCache(CacheLayer):
             return False
 
 
+# Pub/sub channel every process's L1 listens on for invalidations
+INVALIDATION_CHANNEL = "cache:invalidation"
+TAG_KEY_PREFIX = "tag:"
+# Tag sets are swept of expired members after this many writes to the tag
+TAG_PRUNE_INTERVAL = 1000
+
+
+def prefix_registry_tag(prefix: str) -> str:
+    """Tag under which ``cache_result`` registers every key it stores for a prefix."""
+    return f"prefix:{prefix}"
+
+
 class MultiLayerCache:
-    """Multi-layer cache system with L1 (memory) and L2 (Redis) cache."""
+    """
+    Multi-layer cache system with L1 (memory) and L2 (Redis) cache.
+    
+    Tags are tracked as Redis sets next to the L2 entries, and deletes and
+    invalidations are published on ``INVALIDATION_CHANNEL`` so every
+    process evicts the same keys from its own L1.
+    """
     
     def __init__(self):
-        self.l1_cache = MemoryCache(max_size=500)  # Smaller for API servers
+        self.instance_id = uuid.uuid4().hex
+        self.l1_cache = MemoryCache(
+            max_size=settings.CACHE_L1_MAX_ENTRIES,  # Smaller for API servers
+            max_memory_bytes=settings.CACHE_L1_MAX_MEMORY_MB * 1024 * 1024
+        )
         self.l2_cache = RedisCache()
         self.hit_stats = {
             'l1_hits': 0,
@@ -196,31 +431,36 @@ class MultiLayerCache:
             'misses': 0,
             'total_requests': 0
         }
+        self._tag_writes: Dict[str, int] = {}
     
     def _generate_key(self, prefix: str, **kwargs) -> str:
-        """Generate cache key from parameters."""
-        key_data = f"{prefix}:{json.dumps(kwargs, sort_keys=True)}"
-        return hashlib.md5(key_data.encode()).hexdigest()
+        """Generate cache key from parameters; the readable prefix keeps keys attributable."""
+        key_data = f"{prefix}:{json.dumps(kwargs, sort_keys=True, default=str)}"
+        return f"{prefix}:{hashlib.md5(key_data.encode()).hexdigest()}"
     
     async def get(self, key: str) -> Optional[Any]:
         """Get value from cache, checking L1 then L2."""
         self.hit_stats['total_requests'] += 1
+        started = time.perf_counter()
         
         # Check L1 cache first
         value = await self.l1_cache.get(key)
         if value is not None:
             self.hit_stats['l1_hits'] += 1
+            cache_metrics.record_get(key, "l1", time.perf_counter() - started)
             return value
         
         # Check L2 cache
         value = await self.l2_cache.get(key)
         if value is not None:
             self.hit_stats['l2_hits'] += 1
+            cache_metrics.record_get(key, "l2", time.perf_counter() - started)
             # Promote to L1 cache
             await self.l1_cache.set(key, value, ttl=300)
             return value
         
         self.hit_stats['misses'] += 1
+        cache_metrics.record_get(key, "miss", time.perf_counter() - started)
         return None
     
     async def set(self, key: str, value: Any, l1_ttl: int = 300, l2_ttl: int = 1800, tags: List[str] = None) -> bool:
@@ -229,18 +469,112 @@ class MultiLayerCache:
         l2_success = await self.l2_cache.set(key, value, l2_ttl)
         
         # Store tags in Redis for distributed invalidation
-        # Note: RedisManager doesn't have sadd, we'll skip distributed tag tracking for now
-        # This could be implemented with proper Redis commands if needed
+        if tags and l2_success:
+            await self._index_tags(key, tags, l2_ttl)
         
         return l1_success or l2_success
     
+    async def _index_tags(self, key: str, tags: List[str], ttl: int):
+        """Add a key to its Redis tag sets, keeping each set alive as long as its longest member."""
+        try:
+            pipe = await self.l2_cache.redis.pipeline()
+            for tag in tags:
+                tag_key = f"{TAG_KEY_PREFIX}{tag}"
+                pipe.sadd(tag_key, key)
+                # NX gives a new set a TTL; GT only ever extends an existing one
+                pipe.expire(tag_key, ttl, nx=True)
+                pipe.expire(tag_key, ttl, gt=True)
+            await pipe.execute()
+        except Exception as e:
+            logger.error(f"Cache tag indexing error: {e}")
+            return
+        
+        # Members are never removed when their entry expires and the set's
+        # own TTL keeps being extended, so sweep busy tags now and then
+        for tag in tags:
+            writes = self._tag_writes.get(tag, 0) + 1
+            if writes >= TAG_PRUNE_INTERVAL:
+                writes = 0
+                await self.prune_tag(tag)
+            self._tag_writes[tag] = writes
+    
+    async def prune_tag(self, tag: str) -> int:
+        """Drop members of a tag set whose cache entries have expired."""
+        tag_key = f"{TAG_KEY_PREFIX}{tag}"
+        removed = 0
+        try:
+            batch = []
+            async for member in self.l2_cache.redis.sscan_iter(tag_key):
+                batch.append(member)
+                if len(batch) >= SCAN_BATCH_SIZE:
+                    removed += await self._remove_expired_members(tag_key, batch)
+                    batch = []
+            if batch:
+                removed += await self._remove_expired_members(tag_key, batch)
+        except Exception as e:
+            logger.error(f"Cache tag pruning error: {e}")
+        return removed
+    
+    async def _remove_expired_members(self, tag_key: str, members: List[str]) -> int:
+        pipe = await self.l2_cache.redis.pipeline()
+        for member in members:
+            pipe.exists(member)
+        present = await pipe.execute()
+        expired = [member for member, found in zip(members, present) if not found]
+        if not expired:
+            return 0
+        await self.l2_cache.redis.srem(tag_key, *expired)
+        return len(expired)
+    
     async def delete(self, key: str) -> bool:
         """Delete value from both cache layers."""
         l1_deleted = await self.l1_cache.delete(key)
         l2_deleted = await self.l2_cache.delete(key)
+        await self.publish_invalidation("keys", [key])
         
         return l1_deleted or l2_deleted
     
+    async def publish_invalidation(self, kind: str, value: Any, keys: List[str] = None):
+        """Tell other processes to evict entries from their L1 caches."""
+        message = json.dumps({
+            "origin": self.instance_id,
+            "kind": kind,
+            "value": value,
+            "keys": keys or []
+        })
+        try:
+            await self.l2_cache.redis.publish(INVALIDATION_CHANNEL, message)
+        except Exception as e:
+            logger.error(f"Cache invalidation publish error: {e}")
+    
+    async def apply_invalidation(self, message: Union[str, bytes]) -> int:
+        """Evict L1 entries named in an invalidation published by another process."""
+        try:
+            payload = json.loads(message)
+        except (TypeError, ValueError):
+            logger.warning(f"Ignoring malformed cache invalidation message: {message!r}")
+            return 0
+        if payload.get("origin") == self.instance_id:
+            return 0
+        
+        kind = payload.get("kind")
+        value = payload.get("value")
+        count = 0
+        if kind == "tag":
+            count += await self.l1_cache.invalidate_by_tag(value)
+        elif kind == "pattern":
+            count += await self.l1_cache.invalidate_by_pattern(value)
+        elif kind == "keys":
+            for key in value or []:
+                if await self.l1_cache.delete(key):
+                    count += 1
+        
+        # Entries promoted from L2 carry no local tags, so tag messages list the keys too
+        for key in payload.get("keys") or []:
+            if await self.l1_cache.delete(key):
+                count += 1
+        return count
+    
     async def exists(self, key: str) -> bool:
         """Check if key exists in any cache layer."""
         return await self.l1_cache.exists(key) or await self.l2_cache.exists(key)
@@ -253,14 +587,15 @@ class MultiLayerCache:
             if hasattr(self.l1_cache, 'invalidate_by_pattern'):
                 count += await self.l1_cache.invalidate_by_pattern(pattern)
             
-            # Get all keys matching pattern from Redis
-            keys = await self.l2_cache.redis.keys(pattern)
-            if keys:
-                await self.l2_cache.redis.delete(*keys)
-                count += len(keys)
-                logger.info(f"Invalidated {len(keys)} cache entries matching pattern: {pattern}")
+            # Walk matching keys with SCAN and UNLINK them in batches
+            removed = await self.l2_cache.redis.unlink_matching(pattern)
+            if removed:
+                count += removed
+                logger.info(f"Invalidated {removed} cache entries matching pattern: {pattern}")
         except Exception as e:
             logger.error(f"Cache pattern invalidation error: {e}")
+        await self.publish_invalidation("pattern", pattern)
+        cache_warmer.note_invalidation(count)
         return count
     
     async def invalidate_by_tag(self, tag: str) -> int:
@@ -272,22 +607,31 @@ class MultiLayerCache:
                 count += await self.l1_cache.invalidate_by_tag(tag)
             
             # Get keys with tag from Redis
-            keys = await self.l2_cache.redis.smembers(f"tag:{tag}")
+            keys = await self.l2_cache.redis.smembers(f"{TAG_KEY_PREFIX}{tag}")
+            # Convert bytes to strings if necessary
+            keys = [k.decode() if isinstance(k, bytes) else k for k in keys or []]
+            await self.l2_cache.redis.delete(*keys, f"{TAG_KEY_PREFIX}{tag}")
             if keys:
-                # Convert bytes to strings if necessary
-                keys = [k.decode() if isinstance(k, bytes) else k for k in keys]
-                await self.l2_cache.redis.delete(*keys)
-                await self.l2_cache.redis.delete(f"tag:{tag}")
                 count += len(keys)
                 logger.info(f"Invalidated {len(keys)} cache entries with tag: {tag}")
         except Exception as e:
             logger.error(f"Cache tag invalidation error: {e}")
+            keys = []
+        await self.publish_invalidation("tag", tag, keys=keys)
+        cache_warmer.note_invalidation(count)
         return count
     
     async def invalidate_by_prefix(self, prefix: str) -> int:
-        """Invalidate all cache entries with a specific prefix."""
+        """
+        Invalidate all cache entries with a specific prefix.
+        
+        ``cache_result`` keys are hashed, so they are found through the
+        prefix registry (a tag set) rather than by pattern; literal keys
+        starting with the prefix are still removed by SCAN.
+        """
+        count = await self.invalidate_by_tag(prefix_registry_tag(prefix))
         pattern = f"{prefix}*"
-        return await self.invalidate_pattern(pattern)
+        return count + await self.invalidate_pattern(pattern)
     
     def get_hit_ratio(self) -> Dict[str, float]:
         """Get cache hit ratio statistics."""
@@ -326,6 +670,9 @@ class MultiLayerCache:
         stats = {
             'hit_ratios': self.get_hit_ratio(),
             'memory_cache_size': len(self.l1_cache.cache) if hasattr(self.l1_cache, 'cache') else 0,
+            'memory_cache_bytes': getattr(self.l1_cache, 'memory_bytes', 0),
+            'memory_cache_evictions': getattr(self.l1_cache, 'evictions', 0),
+            'by_prefix': cache_metrics.snapshot(),
             'tag_count': len(self.l1_cache.tag_index) if hasattr(self.l1_cache, 'tag_index') else 0,
         }
         
@@ -348,79 +695,375 @@ class MultiLayerCache:
 cache_manager = MultiLayerCache()
 
 
+async def start_cache_invalidation_listener():
+    """Subscribe this process's L1 cache to invalidations published by other processes."""
+    async def listen_loop():
+        while True:
+            pubsub = None
+            try:
+                redis_client = await redis_manager.connect()
+                pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        await cache_manager.apply_invalidation(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Cache invalidation listener error: {e}")
+                # L1 may have missed invalidations while disconnected
+                await cache_manager.l1_cache.clear()
+                await asyncio.sleep(5)
+            finally:
+                if pubsub is not None:
+                    try:
+                        await pubsub.aclose()
+                    except Exception:
+                        pass
+    
+    task = asyncio.create_task(listen_loop())
+    logger.info("Cache invalidation listener started")
+    return task
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key into a single execution.
+    
+    The first caller for a key runs the work; callers arriving while it is in
+    flight await the same result. Calls are tracked per event loop, since a
+    future cannot be awaited from another loop.
+    """
+    
+    def __init__(self):
+        self._calls: Dict[Tuple[int, str], asyncio.Future] = {}
+    
+    def in_flight(self, key: str) -> bool:
+        return (id(asyncio.get_running_loop()), key) in self._calls
+    
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        loop = asyncio.get_running_loop()
+        call_key = (id(loop), key)
+        
+        future = self._calls.get(call_key)
+        if future is not None:
+            return await asyncio.shield(future)
+        
+        future = loop.create_future()
+        self._calls[call_key] = future
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so a leader without followers does not log a warning
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._calls.pop(call_key, None)
+
+
+single_flight = SingleFlight()
+
+# Strong references to background refreshes so they are not garbage collected
+_background_refreshes: set = set()
+
+_ENVELOPE_MARKER = "__cache_envelope__"
+_LOCK_PREFIX = "lock:cache:"
+_LOCK_POLL_SECONDS = 0.05
+
+# Deletes the lock only if it still holds our token
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def _wrap_cached(value: Any, fresh_seconds: int, compute_seconds: float) -> Dict[str, Any]:
+    """Wrap a result with the metadata needed for stale-while-revalidate."""
+    return {
+        _ENVELOPE_MARKER: 1,
+        "value": value,
+        "fresh_until": time.time() + fresh_seconds,
+        "delta": compute_seconds
+    }
+
+
+def _unwrap_cached(cached: Any) -> Tuple[Any, Optional[float], float]:
+    """Return ``(value, fresh_until, delta)``; plain values from older entries count as fresh."""
+    if isinstance(cached, dict) and cached.get(_ENVELOPE_MARKER):
+        return cached.get("value"), cached.get("fresh_until"), cached.get("delta") or 0.0
+    return cached, None, 0.0
+
+
+def _needs_refresh(fresh_until: Optional[float], delta: float, beta: float) -> bool:
+    """
+    Probabilistic early expiration (XFetch).
+    
+    Each reader recomputes ahead of expiry with a probability that grows as
+    the deadline approaches and with how long the value took to compute, so
+    refreshes are spread out instead of all landing on the TTL boundary.
+    """
+    if fresh_until is None:
+        return False
+    now = time.time()
+    if now >= fresh_until:
+        return True
+    if beta <= 0 or delta <= 0:
+        return False
+    return now - delta * beta * math.log(max(random.random(), 1e-12)) >= fresh_until
+
+
+async def _acquire_cache_lock(cache_key: str, timeout_seconds: float) -> Optional[str]:
+    """Take the cross-process recompute lock for a key; returns the token or None."""
+    token = uuid.uuid4().hex
+    try:
+        acquired = await redis_manager.set(
+            f"{_LOCK_PREFIX}{cache_key}", token, px=int(timeout_seconds * 1000), nx=True
+        )
+    except Exception as e:
+        # Without Redis fall back to in-process coalescing only
+        logger.warning(f"Cache lock unavailable for {cache_key}: {e}")
+        return token
+    return token if acquired else None
+
+
+async def _release_cache_lock(cache_key: str, token: str):
+    try:
+        await redis_manager.eval(_RELEASE_LOCK_SCRIPT, 1, f"{_LOCK_PREFIX}{cache_key}", token)
+    except Exception as e:
+        logger.warning(f"Failed to release cache lock for {cache_key}: {e}")
+
+
+async def _wait_for_peer_fill(cache_key: str, timeout_seconds: float, previous_fresh_until: Optional[float]):
+    """Poll L2 while another process recomputes; returns the new envelope or None on timeout."""
+    deadline = time.monotonic() + timeout_seconds
+    while time.monotonic() < deadline:
+        await asyncio.sleep(_LOCK_POLL_SECONDS)
+        cached = await cache_manager.l2_cache.get(cache_key)
+        if cached is None:
+            continue
+        _, fresh_until, _ = _unwrap_cached(cached)
+        if previous_fresh_until is None or (fresh_until or 0) > previous_fresh_until:
+            return cached
+    return None
+
+
+async def _call_with_own_session(func, args: tuple, kwargs: dict):
+    """
+    Run ``func`` with any ``AsyncSession`` argument swapped for a new session.
+    
+    Background refreshes outlive the request that triggered them, so they
+    cannot use the request's session.
+    """
+    if not any(isinstance(v, AsyncSession) for v in (*args, *kwargs.values())):
+        return await func(*args, **kwargs)
+    
+    # Imported lazily so importing the cache does not create the engine
+    from app.core.database import AsyncSessionFactory
+    async with AsyncSessionFactory() as session:
+        args = tuple(session if isinstance(v, AsyncSession) else v for v in args)
+        kwargs = {k: session if isinstance(v, AsyncSession) else v for k, v in kwargs.items()}
+        return await func(*args, **kwargs)
+
+
+_KEY_SCALARS = (str, int, float, bool, type(None), datetime, date, uuid.UUID, Decimal, Enum)
+
+
+def _is_key_param(value: Any) -> bool:
+    """Whether a value can identify a cached result (drops ``self``, db sessions and the like)."""
+    if isinstance(value, _KEY_SCALARS):
+        return True
+    if isinstance(value, (list, tuple)):
+        return all(_is_key_param(item) for item in value)
+    if isinstance(value, dict):
+        return all(isinstance(k, str) and _is_key_param(v) for k, v in value.items())
+    return False
+
+
 def cache_result(
     key_prefix: str = None,
     ttl: int = 300,
     l2_ttl: int = None,
-    skip_cache: bool = False
+    skip_cache: bool = False,
+    stale_ttl: int = 0,
+    early_expiration_beta: float = 1.0,
+    distributed_lock: bool = False,
+    lock_timeout: float = 30.0,
+    key_builder: Callable[..., Dict[str, Any]] = None,
+    warm: bool = False,
+    warm_with: Callable[[Dict[str, Any]], Awaitable[Any]] = None
 ):
     """
     Decorator for caching function results.
     
+    Concurrent misses for the same key in a process share one call to the
+    wrapped function. With ``distributed_lock`` a Redis lock extends that
+    across processes: the lock holder recomputes and the others wait for its
+    result (or serve the stale value when one is available).
+    
+    A result is fresh for ``l2_ttl`` seconds and is recomputed slightly early
+    with probability controlled by ``early_expiration_beta``. With
+    ``stale_ttl`` set, an expired value is still served for that long while
+    a single background task refreshes it.
+    
     Args:
         key_prefix: Cache key prefix (defaults to function name)
         ttl: L1 cache TTL in seconds
         l2_ttl: L2 cache TTL in seconds (defaults to ttl * 6)
         skip_cache: Skip caching (useful for debugging)
+        stale_ttl: Seconds an expired value may be served while it is refreshed
+        early_expiration_beta: XFetch beta; 0 disables early recomputation
+        distributed_lock: Coalesce recomputation across processes via Redis
+        lock_timeout: Seconds the Redis lock is held / waited for
+        key_builder: Callable taking the wrapped function's arguments and
+            returning the parameters that identify the result
+        warm: Record calls so the hottest keys are replayed by the cache warmer
+        warm_with: Coroutine taking the recorded key parameters and
+            recomputing the value; needed when the call has arguments that
+            cannot be recorded (``self``, db sessions) and whenever
+            ``key_builder`` is used
     """
+    if warm and key_builder and not warm_with:
+        # key_builder output is not the wrapped function's arguments, so
+        # there is nothing to replay the call with
+        raise ValueError("cache_result(warm=True) with key_builder requires warm_with")
+    
     def decorator(func):
+        prefix = key_prefix or f"{func.__module__}.{func.__name__}"
+        l2_ttl_final = l2_ttl or (ttl * 6)
+        
+        async def compute_and_store(cache_key, args, kwargs, previous_fresh_until, background):
+            token = None
+            if distributed_lock:
+                token = await _acquire_cache_lock(cache_key, lock_timeout)
+                if token is None:
+                    if background:
+                        # Another process is already refreshing this key
+                        return None
+                    filled = await _wait_for_peer_fill(cache_key, lock_timeout, previous_fresh_until)
+                    if filled is not None:
+                        await cache_manager.l1_cache.set(cache_key, filled, ttl)
+                        return _unwrap_cached(filled)[0]
+            
+            try:
+                started = time.perf_counter()
+                if background:
+                    result = await _call_with_own_session(func, args, kwargs)
+                else:
+                    result = await func(*args, **kwargs)
+                compute_seconds = time.perf_counter() - started
+                
+                if result is not None:
+                    await cache_manager.set(
+                        cache_key,
+                        _wrap_cached(result, l2_ttl_final, compute_seconds),
+                        ttl,
+                        l2_ttl_final + stale_ttl,
+                        tags=[prefix_registry_tag(prefix)]
+                    )
+                return result
+            finally:
+                if token is not None and distributed_lock:
+                    await _release_cache_lock(cache_key, token)
+        
+        def schedule_refresh(cache_key, args, kwargs, previous_fresh_until):
+            if single_flight.in_flight(cache_key):
+                return
+            
+            task = asyncio.create_task(single_flight.do(
+                cache_key,
+                lambda: compute_and_store(cache_key, args, kwargs, previous_fresh_until, True)
+            ))
+            _background_refreshes.add(task)
+            
+            def _done(finished):
+                _background_refreshes.discard(finished)
+                if not finished.cancelled() and finished.exception():
+                    logger.warning(f"Background refresh of {cache_key} failed: {finished.exception()}")
+            
+            task.add_done_callback(_done)
+        
+        async def replay(params):
+            if warm_with:
+                return await warm_with(params)
+            return await wrapper(*params["args"], **params["kwargs"])
+        
         @wraps(func)
         async def wrapper(*args, **kwargs):
             if skip_cache:
                 return await func(*args, **kwargs)
             
             # Generate cache key
-            prefix = key_prefix or f"{func.__module__}.{func.__name__}"
-            
-            # Filter out non-serializable objects (like db sessions)
-            cache_kwargs = {}
-            for k, v in kwargs.items():
-                if not isinstance(v, (AsyncSession,)):
-                    try:
-                        json.dumps(v, default=str)
-                        cache_kwargs[k] = v
-                    except (TypeError, ValueError):
-                        # Skip non-serializable values
-                        continue
+            if key_builder:
+                key_params = key_builder(*args, **kwargs)
+                cache_key = cache_manager._generate_key(prefix, **key_params)
+                replayable = False
+            else:
+                # Filter out non-serializable objects (like db sessions and self)
+                key_args = [v for v in args if _is_key_param(v)]
+                key_kwargs = {k: v for k, v in kwargs.items() if _is_key_param(v)}
+                key_params = {"args": key_args, "kwargs": key_kwargs}
+                cache_key = cache_manager._generate_key(prefix, args=key_args, kwargs=key_kwargs)
+                replayable = len(key_args) == len(args) and len(key_kwargs) == len(kwargs)
             
-            cache_key = cache_manager._generate_key(prefix, args=args, kwargs=cache_kwargs)
+            if warm and (warm_with or replayable):
+                cache_warmer.record(prefix, cache_key, key_params)
             
             # Try to get from cache
-            cached_result = await cache_manager.get(cache_key)
-            if cached_result is not None:
-                return cached_result
+            previous_fresh_until = None
+            cached = await cache_manager.get(cache_key)
+            if cached is not None:
+                value, fresh_until, delta = _unwrap_cached(cached)
+                if not _needs_refresh(fresh_until, delta, early_expiration_beta):
+                    return value
+                
+                if stale_ttl and time.time() < fresh_until + stale_ttl:
+                    # Serve the current value; one task refreshes it
+                    schedule_refresh(cache_key, args, kwargs, fresh_until)
+                    return value
+                previous_fresh_until = fresh_until
             
-            # Execute function and cache result
-            result = await func(*args, **kwargs)
-            
-            if result is not None:
-                l2_ttl_final = l2_ttl or (ttl * 6)
-                await cache_manager.set(cache_key, result, ttl, l2_ttl_final)
-            
-            return result
+            # Execute function once per key and cache result
+            return await single_flight.do(
+                cache_key,
+                lambda: compute_and_store(cache_key, args, kwargs, previous_fresh_until, False)
+            )
+        
+        if warm:
+            cache_warmer.register(prefix, replay)
         
         return wrapper
     return decorator
 
 
 async def warm_cache_on_startup():
-    """Warm up cache with frequently accessed data on application startup."""
+    """
+    Warm up cache on application startup.
+    
+    Sets the health indicator and starts the cache warmer, which replays the
+    most requested ``cache_result`` keys in the background so startup is not
+    delayed. Returns the warmer task.
+    """
     try:
         logger.info("Starting cache warm-up process...")
         
-        # This would typically involve pre-loading:
-        # - Common configuration data
-        # - Frequently accessed user settings
-        # - Popular dashboard metrics
-        # - System health data
-        
-        # For now, we'll set a basic health indicator
         await cache_manager.set("system:health", {"status": "healthy", "timestamp": datetime.utcnow()}, 60)
+        task = await start_cache_warmer(warm_on_start=settings.CACHE_WARM_ON_STARTUP)
         
-        logger.info("Cache warm-up completed successfully")
+        logger.info("Cache warm-up started")
+        return task
         
     except Exception as e:
         logger.error(f"Cache warm-up failed: {e}")
+        return None
 
 
 async def get_cache_stats() -> Dict[str, Any]:
@@ -432,12 +1075,21 @@ async def get_cache_stats() -> Dict[str, Any]:
         redis_info = await cache_manager.l2_cache.redis.info('memory')
         stats.update({
             'redis_memory_used': redis_info.get('used_memory_human', 'N/A'),
-            'redis_peak_memory': redis_info.get('used_memory_peak_human', 'N/A'),
-            'l1_cache_size': len(cache_manager.l1_cache.cache),
-            'l1_cache_capacity': cache_manager.l1_cache.max_size
+            'redis_peak_memory': redis_info.get('used_memory_peak_human', 'N/A')
         })
     except Exception as e:
         logger.error(f"Failed to get Redis stats: {e}")
         stats['redis_error'] = str(e)
     
+    # Process-local figures, available even when Redis is down
+    stats.update({
+        'l1_cache_size': len(cache_manager.l1_cache.cache),
+        'l1_cache_capacity': cache_manager.l1_cache.max_size,
+        'l1_memory_bytes': cache_manager.l1_cache.memory_bytes,
+        'l1_memory_limit_bytes': cache_manager.l1_cache.max_memory_bytes,
+        'l1_evictions': cache_manager.l1_cache.evictions,
+        'l1_expirations': cache_manager.l1_cache.expirations,
+        **cache_metrics.snapshot()
+    })
+    
     return stats
\ No newline at end of file
@@ -0,0 +1,223 @@
+"""
+Data-driven cache warming.
+
+``cache_result`` functions declared with ``warm=True`` report every call to
+the ``CacheWarmer``. It counts calls in memory and periodically flushes the
+counts to a Redis sorted set, along with the arguments needed to replay each
+key. After a deploy, or after an invalidation storm, the most requested keys
+are recomputed with bounded concurrency so users do not land on a cold cache.
+"""
+
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import asyncio
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from .config import settings
+from .redis import redis_manager
+from .cache_codec import cache_codec
+
+logger = logging.getLogger(__name__)
+
+
+WARM_KEYS_ZSET = "cache:warm:keys"
+WARM_PARAMS_PREFIX = "cache:warm:params:"
+# Recorded keys that go unrequested for this long are forgotten
+WARM_RECORD_TTL = 7 * 24 * 60 * 60
+# Upper bound on recorded keys kept in Redis
+WARM_MAX_TRACKED_KEYS = 5000
+
+# Set while replaying so warm-up calls do not count as user demand
+_replaying: ContextVar[bool] = ContextVar("cache_warm_replaying", default=False)
+
+
+@dataclass
+class WarmTarget:
+    """How to recompute the keys recorded under one ``cache_result`` prefix."""
+    prefix: str
+    replay: Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+class CacheWarmer:
+    """Records hot ``cache_result`` keys and replays them to refill the cache."""
+
+    def __init__(
+        self,
+        top_n: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        storm_threshold: Optional[int] = None,
+        storm_window_seconds: float = 10.0,
+        storm_debounce_seconds: float = 5.0
+    ):
+        self.top_n = top_n or settings.CACHE_WARM_TOP_N
+        self.concurrency = concurrency or settings.CACHE_WARM_CONCURRENCY
+        self.storm_threshold = storm_threshold or settings.CACHE_WARM_STORM_THRESHOLD
+        self.storm_window_seconds = storm_window_seconds
+        self.storm_debounce_seconds = storm_debounce_seconds
+        self.targets: Dict[str, WarmTarget] = {}
+        self._counts: Counter = Counter()
+        self._params: Dict[str, Dict[str, Any]] = {}
+        self._invalidations: List[tuple] = []
+        self._storm_task: Optional[asyncio.Task] = None
+        self.last_run: Dict[str, Any] = {}
+
+    def register(self, prefix: str, replay: Callable[[Dict[str, Any]], Awaitable[Any]]):
+        """Declare how keys recorded under ``prefix`` are recomputed."""
+        self.targets[prefix] = WarmTarget(prefix=prefix, replay=replay)
+
+    def record(self, prefix: str, cache_key: str, params: Dict[str, Any]):
+        """Count one request for a key; cheap enough to call on every cache lookup."""
+        if _replaying.get():
+            return
+        self._counts[cache_key] += 1
+        if cache_key not in self._params:
+            self._params[cache_key] = {"prefix": prefix, "params": params}
+
+    async def flush(self) -> int:
+        """Push in-memory counts to Redis in a single pipeline."""
+        if not self._counts:
+            return 0
+        counts, self._counts = self._counts, Counter()
+        params, self._params = self._params, {}
+
+        try:
+            # Parameters are codec-encoded bytes, so use the binary connection
+            client = await redis_manager.connect_binary()
+            pipe = client.pipeline()
+            for cache_key, count in counts.items():
+                pipe.zincrby(WARM_KEYS_ZSET, count, cache_key)
+                if cache_key in params:
+                    pipe.set(
+                        f"{WARM_PARAMS_PREFIX}{cache_key}",
+                        cache_codec.encode(params[cache_key]),
+                        ex=WARM_RECORD_TTL
+                    )
+            pipe.expire(WARM_KEYS_ZSET, WARM_RECORD_TTL)
+            # Keep only the most requested keys
+            pipe.zremrangebyrank(WARM_KEYS_ZSET, 0, -(WARM_MAX_TRACKED_KEYS + 1))
+            await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to flush cache warming stats: {e}")
+            return 0
+        return len(counts)
+
+    async def top_keys(self, limit: int) -> List[Dict[str, Any]]:
+        """The most requested recorded keys with their replay parameters."""
+        client = await redis_manager.connect_binary()
+        keys = [
+            key.decode() if isinstance(key, bytes) else key
+            for key in await client.zrevrange(WARM_KEYS_ZSET, 0, limit - 1)
+        ]
+        if not keys:
+            return []
+        raw_params = await client.mget([f"{WARM_PARAMS_PREFIX}{key}" for key in keys])
+
+        entries = []
+        for key, raw in zip(keys, raw_params):
+            if raw is None:
+                continue
+            try:
+                entry = cache_codec.decode(raw)
+            except (ValueError, TypeError):
+                continue
+            entries.append({"key": key, **entry})
+        return entries
+
+    async def warm(self, limit: Optional[int] = None, concurrency: Optional[int] = None) -> Dict[str, Any]:
+        """Recompute the top recorded keys, at most ``concurrency`` at a time."""
+        started = time.perf_counter()
+        await self.flush()
+        entries = await self.top_keys(limit or self.top_n)
+        semaphore = asyncio.Semaphore(concurrency or self.concurrency)
+        results = {"warmed": 0, "failed": 0, "skipped": 0}
+
+        async def replay(entry):
+            target = self.targets.get(entry.get("prefix"))
+            if target is None:
+                results["skipped"] += 1
+                return
+            async with semaphore:
+                try:
+                    await target.replay(entry.get("params") or {})
+                    results["warmed"] += 1
+                except Exception as e:
+                    results["failed"] += 1
+                    logger.warning(f"Cache warming failed for {entry['key']}: {e}")
+
+        token = _replaying.set(True)
+        try:
+            await asyncio.gather(*(replay(entry) for entry in entries))
+        finally:
+            _replaying.reset(token)
+
+        self.last_run = {
+            **results,
+            "candidates": len(entries),
+            "duration_seconds": round(time.perf_counter() - started, 3),
+            "finished_at": time.time()
+        }
+        logger.info(
+            f"Cache warming replayed {results['warmed']}/{len(entries)} keys "
+            f"in {self.last_run['duration_seconds']}s"
+        )
+        return self.last_run
+
+    def note_invalidation(self, count: int):
+        """Track invalidated keys; a burst past the threshold schedules a warm-up."""
+        if count <= 0 or not self.targets:
+            return
+        now = time.monotonic()
+        self._invalidations.append((now, count))
+        cutoff = now - self.storm_window_seconds
+        self._invalidations = [(ts, n) for ts, n in self._invalidations if ts >= cutoff]
+
+        if sum(n for _, n in self._invalidations) < self.storm_threshold:
+            return
+        if self._storm_task is not None and not self._storm_task.done():
+            return
+        self._invalidations = []
+        try:
+            self._storm_task = asyncio.get_running_loop().create_task(self._warm_after_storm())
+        except RuntimeError:
+            # No running loop (sync context); the next startup warm covers it
+            pass
+
+    async def _warm_after_storm(self):
+        # Let the burst of writes settle before recomputing
+        await asyncio.sleep(self.storm_debounce_seconds)
+        logger.info("Cache invalidation storm detected, re-warming hot keys")
+        await self.warm()
+
+    async def run_flush_loop(self, interval_seconds: float = 30.0):
+        while True:
+            await asyncio.sleep(interval_seconds)
+            await self.flush()
+
+
+# Global cache warmer instance
+cache_warmer = CacheWarmer()
+
+
+async def start_cache_warmer(warm_on_start: bool = True):
+    """Start periodic flushing of key stats and, optionally, an initial warm-up."""
+    async def warmer_loop():
+        if warm_on_start:
+            try:
+                await cache_warmer.warm()
+            except Exception as e:
+                logger.error(f"Startup cache warming failed: {e}")
+        while True:
+            try:
+                await cache_warmer.run_flush_loop()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Cache warming flush error: {e}")
+                await asyncio.sleep(60)
+
+    task = asyncio.create_task(warmer_loop())
+    logger.info("Cache warmer started")
+    return task
@@ -1,7 +1,9 @@
 from pydantic_settings import BaseSettings
 from pydantic import Field
 from typing import Optional
+import os
 import secrets
+import tempfile
 
 
 class Settings(BaseSettings):
@@ -24,6 +26,15 @@ class Settings(BaseSettings):
         env="DATABASE_URL"
     )
     
+    # Prepared statements (see statement_cache_args in app/core/database.py)
+    DATABASE_STATEMENT_CACHE_MODE: str = Field(default="named", env="DATABASE_STATEMENT_CACHE_MODE")  # named, pgbouncer, disabled
+    DATABASE_STATEMENT_CACHE_SIZE: int = Field(default=256, env="DATABASE_STATEMENT_CACHE_SIZE")  # Per connection
+    
+    # Read replicas (see app/core/replicas.py)
+    DATABASE_REPLICA_URLS: list[str] = Field(default=[], env="DATABASE_REPLICA_URLS")
+    DATABASE_REPLICA_MAX_LAG_SECONDS: float = Field(default=10.0, env="DATABASE_REPLICA_MAX_LAG_SECONDS")
+    DATABASE_REPLICA_LAG_CHECK_SECONDS: float = Field(default=5.0, env="DATABASE_REPLICA_LAG_CHECK_SECONDS")
+    
     # Redis Settings
     REDIS_URL: str = Field(default="redis://localhost:6379/0", env="REDIS_URL")
     REDIS_PASSWORD: Optional[str] = Field(default=None, env="REDIS_PASSWORD")
@@ -32,6 +43,56 @@ class Settings(BaseSettings):
     # Cache Settings
     CACHE_TTL: int = Field(default=3600, env="CACHE_TTL")  # 1 hour default
     SESSION_TTL: int = Field(default=86400, env="SESSION_TTL")  # 24 hours default
+    CACHE_L1_MAX_ENTRIES: int = Field(default=500, env="CACHE_L1_MAX_ENTRIES")
+    CACHE_L1_MAX_MEMORY_MB: int = Field(default=64, env="CACHE_L1_MAX_MEMORY_MB")
+    CACHE_SERIALIZER: str = Field(default="json", env="CACHE_SERIALIZER")  # json, msgpack, auto
+    CACHE_COMPRESSION: str = Field(default="zlib", env="CACHE_COMPRESSION")  # zlib, zstd, lz4, none, auto
+    CACHE_COMPRESSION_THRESHOLD_BYTES: int = Field(default=1024, env="CACHE_COMPRESSION_THRESHOLD_BYTES")
+    CACHE_WARM_ON_STARTUP: bool = Field(default=True, env="CACHE_WARM_ON_STARTUP")
+    CACHE_WARM_TOP_N: int = Field(default=200, env="CACHE_WARM_TOP_N")
+    CACHE_WARM_CONCURRENCY: int = Field(default=8, env="CACHE_WARM_CONCURRENCY")
+    CACHE_WARM_STORM_THRESHOLD: int = Field(default=100, env="CACHE_WARM_STORM_THRESHOLD")
+    
+    # Tenant resolution cache (see app/core/tenant_cache.py)
+    TENANT_CACHE_TTL_SECONDS: int = Field(default=300, env="TENANT_CACHE_TTL_SECONDS")
+    TENANT_CACHE_L2_TTL_SECONDS: int = Field(default=3600, env="TENANT_CACHE_L2_TTL_SECONDS")
+    TENANT_CACHE_NEGATIVE_TTL_SECONDS: int = Field(default=60, env="TENANT_CACHE_NEGATIVE_TTL_SECONDS")
+    
+    # Authenticated principal cache (see app/core/principal_cache.py)
+    PRINCIPAL_CACHE_ENABLED: bool = Field(default=True, env="PRINCIPAL_CACHE_ENABLED")
+    PRINCIPAL_CACHE_TTL_SECONDS: int = Field(default=60, env="PRINCIPAL_CACHE_TTL_SECONDS")
+    
+    # API key authentication (see app/core/api_key_auth.py)
+    # Required in production: stored key hashes are HMACs under this secret, so
+    # it must be stable across restarts and shared by every process. Outside
+    # production it falls back to SECRET_KEY.
+    API_KEY_HASH_SECRET: Optional[str] = Field(default=None, env="API_KEY_HASH_SECRET")
+    # Accept keys stored with pre-HMAC hashes (re-hashed on first use); turn off once migrated
+    API_KEY_LEGACY_VERIFICATION: bool = Field(default=True, env="API_KEY_LEGACY_VERIFICATION")
+    API_KEY_CACHE_TTL_SECONDS: int = Field(default=300, env="API_KEY_CACHE_TTL_SECONDS")
+    API_KEY_CACHE_NEGATIVE_TTL_SECONDS: int = Field(default=30, env="API_KEY_CACHE_NEGATIVE_TTL_SECONDS")
+    API_KEY_LAST_USED_INTERVAL_SECONDS: int = Field(default=60, env="API_KEY_LAST_USED_INTERVAL_SECONDS")
+    
+    # Rate limiting (tokens leased per process; see app/core/token_lease.py)
+    RATE_LIMIT_LEASE_ENABLED: bool = Field(default=True, env="RATE_LIMIT_LEASE_ENABLED")
+    RATE_LIMIT_LEASE_MAX_TOKENS: int = Field(default=50, env="RATE_LIMIT_LEASE_MAX_TOKENS")
+    RATE_LIMIT_LEASE_TTL_SECONDS: float = Field(default=5.0, env="RATE_LIMIT_LEASE_TTL_SECONDS")
+    RATE_LIMIT_LOAD_SAMPLE_SECONDS: float = Field(default=5.0, env="RATE_LIMIT_LOAD_SAMPLE_SECONDS")
+    
+    # HTTP metrics (see app/core/prometheus_middleware.py)
+    PROMETHEUS_EXEMPLARS_ENABLED: bool = Field(default=False, env="PROMETHEUS_EXEMPLARS_ENABLED")  # Correlation ID exemplars, OpenMetrics scrapes only
+    
+    # Audit log writer (events are buffered in process and written in batches)
+    AUDIT_QUEUE_MAX_EVENTS: int = Field(default=10000, env="AUDIT_QUEUE_MAX_EVENTS")
+    AUDIT_QUEUE_OVERFLOW: str = Field(default="drop_oldest", env="AUDIT_QUEUE_OVERFLOW")  # drop_oldest, drop_newest, block
+    AUDIT_BATCH_SIZE: int = Field(default=500, env="AUDIT_BATCH_SIZE")
+    AUDIT_FLUSH_INTERVAL_MS: int = Field(default=200, env="AUDIT_FLUSH_INTERVAL_MS")
+    # Kept out of the temp dirs that maintenance_tasks sweeps (and that may be tmpfs)
+    AUDIT_SPILL_PATH: str = Field(default=os.path.join("audit", "audit_spill.jsonl"), env="AUDIT_SPILL_PATH")
+    AUDIT_DEAD_LETTER_PATH: str = Field(
+        default=os.path.join("audit", "audit_dead_letter.jsonl"),
+        env="AUDIT_DEAD_LETTER_PATH"
+    )
     
     # File Storage
     UPLOAD_FOLDER: str = Field(default="uploads", env="UPLOAD_FOLDER")
@@ -41,6 +102,13 @@ class Settings(BaseSettings):
         env="ALLOWED_EXTENSIONS"
     )
     
+    # ETL intermediate storage (spill-to-disk between pipeline stages)
+    ETL_SCRATCH_DIR: str = Field(
+        default=os.path.join(tempfile.gettempdir(), "dreflowpro_etl"),
+        env="ETL_SCRATCH_DIR"
+    )
+    ETL_INTERMEDIATE_MEMORY_BUDGET_MB: int = Field(default=512, env="ETL_INTERMEDIATE_MEMORY_BUDGET_MB")
+    
     # Environment
     ENVIRONMENT: str = Field(default="development", env="ENVIRONMENT")
     
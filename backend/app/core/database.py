@@ -1,11 +1,13 @@
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
-from sqlalchemy.pool import NullPool, QueuePool
-from sqlalchemy import event, text
-from typing import AsyncGenerator, Optional
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
+from sqlalchemy import event, exc, text
+from starlette.requests import Request
+from typing import Any, AsyncGenerator, Callable, Dict, List, Optional, Tuple
 import asyncio
 import logging
 import time
+import uuid
 from contextlib import asynccontextmanager
 from .config import settings
 
@@ -27,22 +29,190 @@ POOL_CONFIG = {
     "echo_pool": settings.DEBUG,  # Log pool checkouts/checkins
 }
 
+
+class PoolMetrics:
+    """
+    Connection pool checkout counters for this process.
+    
+    Records how long each checkout waited for a connection, checkout
+    timeouts, and each pool's occupancy after every checkout and checkin,
+    and forwards each event to registered listeners (``metrics_service``
+    exports them to Prometheus). Pools are told apart by name (``primary``,
+    ``replica0``, ...).
+    """
+    
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.status: Dict[str, Dict[str, int]] = {}
+        self._listeners: List[Callable[..., None]] = []
+    
+    def add_listener(self, listener: Callable[..., None]):
+        """Register ``listener(event, pool=..., seconds=..., status=...)`` for every pool event."""
+        self._listeners.append(listener)
+    
+    def _emit(self, event_name: str, **fields):
+        for listener in self._listeners:
+            try:
+                listener(event_name, **fields)
+            except Exception as e:
+                logger.debug(f"Pool metrics listener failed: {e}")
+    
+    @staticmethod
+    def pool_status(pool) -> Dict[str, int]:
+        """Occupancy of a queue pool: connections in use, idle, overflow and the hard limit."""
+        return {
+            "checked_out": pool.checkedout(),
+            "idle": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "limit": pool.size() + max(pool._max_overflow, 0),
+        }
+    
+    def _update(self, pool) -> Tuple[str, Dict[str, int]]:
+        name = pool.pool_name
+        status = self.status[name] = self.pool_status(pool)
+        return name, status
+    
+    def record_checkout(self, pool, seconds: float):
+        self.checkouts += 1
+        self.wait_seconds += seconds
+        self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+        name, status = self._update(pool)
+        self._emit("checkout", pool=name, seconds=seconds, status=status)
+    
+    def record_timeout(self, pool, seconds: float):
+        """Record a checkout that gave up after ``pool_timeout`` (the pool is saturated)."""
+        self.timeouts += 1
+        name, status = self._update(pool)
+        self._emit("timeout", pool=name, seconds=seconds, status=status)
+    
+    def record_checkin(self, pool):
+        name, status = self._update(pool)
+        self._emit("checkin", pool=name, status=status)
+    
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "avg_wait_ms": round(self.wait_seconds / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+            "max_wait_ms": round(self.max_wait_seconds * 1000, 3),
+            "pools": {name: dict(status) for name, status in self.status.items()}
+        }
+    
+    def reset(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.status = {}
+
+
+# Process-wide pool metrics
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Async queue pool that reports checkout waits to ``pool_metrics``.
+    
+    The wait covers queueing for a free connection and opening a new one
+    when the pool may still grow; a checkout that hits ``pool_timeout`` is
+    recorded as a timeout. Use ``instrumented_pool`` for pools other than
+    the primary.
+    """
+    
+    pool_name = "primary"
+    
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            pool_metrics.record_timeout(self, time.perf_counter() - started)
+            raise
+        pool_metrics.record_checkout(self, time.perf_counter() - started)
+        return connection
+    
+    def _do_return_conn(self, record):
+        super()._do_return_conn(record)
+        pool_metrics.record_checkin(self)
+
+
+def instrumented_pool(name: str) -> type:
+    """An ``InstrumentedQueuePool`` reporting as ``name`` (kept when the engine recreates its pool)."""
+    return type("InstrumentedQueuePool", (InstrumentedQueuePool,), {"pool_name": name})
+
+
+STATEMENT_CACHE_MODES = ("named", "pgbouncer", "disabled")
+
+
+def _unique_statement_name() -> str:
+    return f"__asyncpg_{uuid.uuid4().hex}__"
+
+
+def _unnamed_statement() -> str:
+    return ""
+
+
+def statement_cache_args(mode: str, size: int) -> dict:
+    """
+    asyncpg connect arguments for a prepared statement caching mode.
+    
+    SQLAlchemy's asyncpg dialect prepares every statement and keeps the
+    prepared statements of each pooled connection in an LRU of ``size``
+    entries, so a hot query is parsed and planned once per connection:
+    
+    - ``named``: for direct PostgreSQL connections. Statements get asyncpg's
+      per-connection names (``__asyncpg_stmt_N__``); asyncpg's own statement
+      cache is enabled as well.
+    - ``pgbouncer``: for PgBouncer 1.21+ in transaction pooling mode with
+      ``max_prepared_statements`` set, which tracks protocol-level prepared
+      statements per client and prepares them on whichever server
+      connection runs the transaction. Names are UUIDs so statements of
+      different clients never collide; asyncpg's own cache is disabled.
+    - ``disabled``: unnamed statements, planned on every execution; works
+      behind any connection pooler.
+    """
+    if mode not in STATEMENT_CACHE_MODES:
+        raise ValueError(f"Unknown statement cache mode '{mode}'")
+    if mode == "named":
+        return {"statement_cache_size": size, "prepared_statement_cache_size": size}
+    if mode == "pgbouncer":
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": size,
+            "prepared_statement_name_func": _unique_statement_name,
+        }
+    return {
+        "statement_cache_size": 0,
+        "prepared_statement_cache_size": 0,
+        "prepared_statement_name_func": _unnamed_statement,
+    }
+
+
+def engine_options(url: str, pool_name: str = "primary") -> dict:
+    """Engine settings shared by the primary and read replica engines."""
+    options = {
+        "echo": settings.DEBUG,
+        "poolclass": instrumented_pool(pool_name) if not settings.DEBUG else NullPool,
+        **(POOL_CONFIG if not settings.DEBUG else {}),
+    }
+    if "postgresql" in url:
+        options["connect_args"] = {
+            "server_settings": {
+                "application_name": "dreflowpro",
+                "jit": "on",
+            },
+            "command_timeout": 60,
+            **statement_cache_args(settings.DATABASE_STATEMENT_CACHE_MODE, settings.DATABASE_STATEMENT_CACHE_SIZE),
+        }
+    return options
+
+
 # Create async engine with optimized pooling
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    poolclass=QueuePool if not settings.DEBUG else NullPool,
-    **POOL_CONFIG if not settings.DEBUG else {},
-    # Additional performance settings - simplified to avoid prepared statement issues
-    connect_args={
-        "server_settings": {
-            "application_name": "dreflowpro",
-            "jit": "on",
-        },
-        "command_timeout": 60,
-        "statement_cache_size": 0,  # Disable prepared statements to avoid conflicts
-    } if "postgresql" in settings.DATABASE_URL else {}
-)
+engine = create_async_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL))
 
 # Create session factory
 AsyncSessionFactory = async_sessionmaker(
@@ -57,8 +227,66 @@ class Base(DeclarativeBase):
     pass
 
 
-async def get_session() -> AsyncGenerator[AsyncSession, None]:
-    """Dependency to get database session."""
+# ``request.state`` attribute holding the request's ``RequestSession``
+REQUEST_SESSION_STATE = "db_session"
+
+
+class RequestSession:
+    """
+    The one database session of a request, opened on first use.
+    
+    ``RequestSessionMiddleware`` puts an unopened holder on
+    ``request.state``; middleware, dependencies and the route handler then
+    share the same ``AsyncSession`` (see ``get_session``), so a request holds
+    at most one pooled connection at a time. The middleware closes the
+    session once the response has been sent, rolling back anything that was
+    not committed.
+    """
+    
+    def __init__(self, factory: Optional[Callable[[], AsyncSession]] = None):
+        self._factory = factory
+        self._session: Optional[AsyncSession] = None
+    
+    @property
+    def opened(self) -> bool:
+        return self._session is not None
+    
+    def get(self) -> AsyncSession:
+        if self._session is None:
+            self._session = (self._factory or AsyncSessionFactory)()
+        return self._session
+    
+    async def close(self):
+        session, self._session = self._session, None
+        if session is not None:
+            await session.close()
+
+
+def request_session(request: Optional[Request]) -> Optional[AsyncSession]:
+    """The shared session of ``request``, or None outside ``RequestSessionMiddleware``."""
+    if request is None:
+        return None
+    holder = request.scope.get("state", {}).get(REQUEST_SESSION_STATE)
+    return holder.get() if holder is not None else None
+
+
+async def get_session(request: Request = None) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency to get database session.
+    
+    Within a request this is the request's shared session (closed by
+    ``RequestSessionMiddleware``); workers and scripts calling it without a
+    request get a session of their own.
+    """
+    shared = request_session(request)
+    if shared is not None:
+        try:
+            yield shared
+        except Exception:
+            await shared.rollback()
+            raise
+        return
+    
     async with AsyncSessionFactory() as session:
         try:
             yield session
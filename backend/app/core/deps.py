@@ -3,7 +3,9 @@ from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from .config import settings
 from .database import get_db
+from .principal_cache import principal_cache
 from .security import JWTManager, AuthService, AuthenticationError, AuthorizationError
 from ..models.user import User, UserRole
 
@@ -44,10 +46,16 @@ async def get_current_user(
     if not user_id:
         raise AuthenticationError("Invalid token payload")
     
-    # Get user from database
-    user = await AuthService.get_user_by_id(db, user_id)
-    if not user:
-        raise AuthenticationError("User not found")
+    # Get user from the principal cache, falling back to the database
+    token_id = payload.get("jti")
+    use_cache = settings.PRINCIPAL_CACHE_ENABLED and token_id
+    user = await principal_cache.get(db, user_id, token_id) if use_cache else None
+    if user is None:
+        user = await AuthService.get_user_by_id(db, user_id)
+        if not user:
+            raise AuthenticationError("User not found")
+        if use_cache:
+            await principal_cache.set(user, token_id)
     
     if not user.is_active:
         raise AuthenticationError("User account is disabled")
@@ -122,29 +130,27 @@ async def get_api_key_user(
     if not credentials:
         raise AuthenticationError("API key required")
     
-    # For API key auth, the token should be the API key
-    from sqlalchemy import select
-    from ..models.user import APIKey
-    
-    result = await db.execute(
-        select(APIKey).where(
-            APIKey.key_hash == credentials.credentials,
-            APIKey.is_active == True
-        )
-    )
-    api_key = result.scalar_one_or_none()
+    # Verified by key ID and HMAC; repeat requests are served from cache
+    from .api_key_manager import api_key_manager
     
+    api_key = await api_key_manager.authenticate(credentials.credentials, db)
     if not api_key:
         raise AuthenticationError("Invalid API key")
     
-    # Get the user associated with this API key
-    user = await AuthService.get_user_by_id(db, str(api_key.user_id))
+    from datetime import datetime
+    if api_key["expires_at"] and api_key["expires_at"] < datetime.utcnow():
+        raise AuthenticationError("API key has expired")
+    
+    # Get the user associated with this API key, cached per key like a token
+    token_id = f"api_key:{api_key['key_id']}"
+    user = None
+    if settings.PRINCIPAL_CACHE_ENABLED:
+        user = await principal_cache.get(db, api_key["user_id"], token_id)
+    if user is None:
+        user = await AuthService.get_user_by_id(db, api_key["user_id"])
+        if user and settings.PRINCIPAL_CACHE_ENABLED:
+            await principal_cache.set(user, token_id)
     if not user or not user.is_active:
         raise AuthenticationError("API key user not found or disabled")
     
-    # Update last used timestamp
-    from datetime import datetime
-    api_key.last_used = datetime.utcnow()
-    await db.commit()
-    
     return user
\ No newline at end of file
@@ -0,0 +1,147 @@
+"""
+Compiled injection scanner used by ``InputValidator``.
+
+Each category's patterns are compiled once into a single alternation, and
+the categories requested by a check are combined into one regex with a
+named group per category. A string is therefore scanned once no matter how
+many patterns or categories apply, and ``match.lastgroup`` says which
+category fired. ``find_in`` walks a whole request body (dicts, lists and
+tuples) iteratively and stops at the first finding.
+
+Combined patterns are built lazily and cached per set of categories.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Pattern, Tuple
+import re
+
+
+SQL_INJECTION_PATTERNS = [
+    r"(\b(SELECT|INSERT|UPDATE|DELETE|DROP|UNION|CREATE|ALTER|EXEC|EXECUTE|SCRIPT|JAVASCRIPT)\b)",
+    r"(--)|(;)|(/\*)|(\*/)",
+    r"(\bOR\b\s*\d+\s*=\s*\d+)",
+    r"(\bAND\b\s*\d+\s*=\s*\d+)",
+    r"(\'|\"|`)",
+    r"(\bEXEC\b|\bEXECUTE\b)",
+    r"(\bxp_\w+)",
+    r"(\bsp_\w+)",
+]
+
+XSS_PATTERNS = [
+    r"<script[^>]*>.*?</script>",
+    r"javascript:",
+    r"on\w+\s*=",
+    r"<iframe[^>]*>.*?</iframe>",
+    r"<object[^>]*>.*?</object>",
+    r"<embed[^>]*>.*?</embed>",
+    r"<img[^>]*onerror\s*=",
+    r"<svg[^>]*onload\s*=",
+]
+
+COMMAND_INJECTION_PATTERNS = [
+    r"[;&|`$]",
+    r"\$\(.*\)",
+    r"`.*`",
+    r"\b(wget|curl|nc|netcat|bash|sh|cmd|powershell)\b",
+]
+
+PATH_TRAVERSAL_PATTERNS = [
+    r"\.\./",
+    r"\.\.",
+    r"%2e%2e",
+    r"%252e%252e",
+    r"\.\.\\",
+]
+
+# Category -> (patterns, case-insensitive), matching the original checks
+DEFAULT_CATEGORIES = {
+    "sql": (SQL_INJECTION_PATTERNS, True),
+    "xss": (XSS_PATTERNS, True),
+    "command": (COMMAND_INJECTION_PATTERNS, False),
+    "path": (PATH_TRAVERSAL_PATTERNS, True),
+}
+
+CATEGORY_LABELS = {
+    "sql": "SQL injection",
+    "xss": "XSS",
+    "command": "command injection",
+    "path": "path traversal",
+}
+
+
+class InjectionScanner:
+    """Scans strings and nested payloads against precompiled pattern categories."""
+
+    def __init__(self, categories: Optional[Dict[str, Tuple[List[str], bool]]] = None):
+        self.categories = dict(categories or DEFAULT_CATEGORIES)
+        # Per-pattern regexes, for callers that rewrite matches (XSS stripping)
+        self.patterns: Dict[str, List[Pattern]] = {
+            name: [re.compile(p, re.IGNORECASE if ignore_case else 0) for p in patterns]
+            for name, (patterns, ignore_case) in self.categories.items()
+        }
+        self._combined: Dict[Tuple[str, ...], Pattern] = {}
+
+    def _alternation(self, name: str) -> str:
+        patterns, ignore_case = self.categories[name]
+        body = "|".join(f"(?:{pattern})" for pattern in patterns)
+        # Scoped flags keep case-sensitive categories case-sensitive
+        return f"(?i:{body})" if ignore_case else f"(?:{body})"
+
+    def compiled(self, categories: Iterable[str]) -> Pattern:
+        """One regex matching any pattern of ``categories``; group names are the categories."""
+        key = tuple(sorted(categories))
+        regex = self._combined.get(key)
+        if regex is None:
+            unknown = set(key) - set(self.categories)
+            if unknown:
+                raise KeyError(f"Unknown scan categories: {', '.join(sorted(unknown))}")
+            regex = re.compile("|".join(f"(?P<{name}>{self._alternation(name)})" for name in key))
+            self._combined[key] = regex
+        return regex
+
+    def find(self, value: str, categories: Iterable[str]) -> Optional[str]:
+        """Return the category of the first match in ``value``, or None."""
+        if not value:
+            return None
+        match = self.compiled(categories).search(value)
+        return match.lastgroup if match else None
+
+    def find_in(
+        self,
+        data: Any,
+        categories: Iterable[str],
+        path: str = "",
+        include_keys: bool = True
+    ) -> Optional[Tuple[str, str, str]]:
+        """
+        Scan every string in a nested payload and stop at the first match.
+
+        Returns ``(category, field path, string)`` for the first offending
+        string, e.g. ``("sql", "items[2].name", "x' OR 1=1")``, or None if
+        the payload is clean.
+        """
+        regex = self.compiled(categories)
+        stack = [(path, data)]
+        while stack:
+            where, item = stack.pop()
+            if isinstance(item, str):
+                match = regex.search(item) if item else None
+                if match:
+                    return match.lastgroup, where or "input", item
+            elif isinstance(item, dict):
+                children = []
+                for key, value in item.items():
+                    name = f"{where}.{key}" if where else str(key)
+                    if include_keys and isinstance(key, str):
+                        match = regex.search(key) if key else None
+                        if match:
+                            return match.lastgroup, name, key
+                    children.append((name, value))
+                # Reversed so fields are visited in document order
+                stack.extend(reversed(children))
+            elif isinstance(item, (list, tuple)):
+                stack.extend(reversed([(f"{where}[{i}]", value) for i, value in enumerate(item)]))
+        return None
+
+
+# Global scanner instance
+injection_scanner = InjectionScanner()
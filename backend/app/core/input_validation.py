@@ -16,6 +16,8 @@ import magic
 from datetime import datetime, date
 import ipaddress
 
+from .injection_scanner import CATEGORY_LABELS, injection_scanner
+
 
 class ValidationError(Exception):
     """Custom validation error with details"""
@@ -39,46 +41,9 @@ class InputValidator:
     """
     
     def __init__(self):
-        # SQL injection patterns
-        self.sql_injection_patterns = [
-            r"(\b(SELECT|INSERT|UPDATE|DELETE|DROP|UNION|CREATE|ALTER|EXEC|EXECUTE|SCRIPT|JAVASCRIPT)\b)",
-            r"(--)|(;)|(/\*)|(\*/)",
-            r"(\bOR\b\s*\d+\s*=\s*\d+)",
-            r"(\bAND\b\s*\d+\s*=\s*\d+)",
-            r"(\'|\"|`)",
-            r"(\bEXEC\b|\bEXECUTE\b)",
-            r"(\bxp_\w+)",
-            r"(\bsp_\w+)",
-        ]
-        
-        # XSS patterns
-        self.xss_patterns = [
-            r"<script[^>]*>.*?</script>",
-            r"javascript:",
-            r"on\w+\s*=",
-            r"<iframe[^>]*>.*?</iframe>",
-            r"<object[^>]*>.*?</object>",
-            r"<embed[^>]*>.*?</embed>",
-            r"<img[^>]*onerror\s*=",
-            r"<svg[^>]*onload\s*=",
-        ]
-        
-        # Command injection patterns
-        self.command_injection_patterns = [
-            r"[;&|`$]",
-            r"\$\(.*\)",
-            r"`.*`",
-            r"\b(wget|curl|nc|netcat|bash|sh|cmd|powershell)\b",
-        ]
-        
-        # Path traversal patterns
-        self.path_traversal_patterns = [
-            r"\.\./",
-            r"\.\.",
-            r"%2e%2e",
-            r"%252e%252e",
-            r"\.\.\\",
-        ]
+        # Injection patterns live precompiled, combined per category, in
+        # app/core/injection_scanner.py
+        self.scanner = injection_scanner
         
         # Allowed file extensions for uploads
         self.allowed_file_extensions = {
@@ -127,15 +92,12 @@ class InputValidator:
         if not value:
             return value
         
-        value_lower = value.lower()
-        
-        for pattern in self.sql_injection_patterns:
-            if re.search(pattern, value_lower, re.IGNORECASE):
-                raise ValidationError(
-                    f"Potential SQL injection detected in {field_name}",
-                    field_name,
-                    value
-                )
+        if self.scanner.find(value, ("sql",)):
+            raise ValidationError(
+                f"Potential SQL injection detected in {field_name}",
+                field_name,
+                value
+            )
         
         return value
     
@@ -153,11 +115,11 @@ class InputValidator:
         if not value:
             return value
         
-        # Check for XSS patterns
-        for pattern in self.xss_patterns:
-            if re.search(pattern, value, re.IGNORECASE):
+        # Check for XSS patterns in one pass; strip them only if any matched
+        if self.scanner.find(value, ("xss",)):
+            for pattern in self.scanner.patterns["xss"]:
                 # Remove dangerous content instead of rejecting
-                value = re.sub(pattern, '', value, flags=re.IGNORECASE)
+                value = pattern.sub('', value)
         
         # HTML escape special characters
         value = html.escape(value)
@@ -205,13 +167,12 @@ class InputValidator:
         if not value:
             return value
         
-        for pattern in self.command_injection_patterns:
-            if re.search(pattern, value):
-                raise ValidationError(
-                    f"Potential command injection detected in {field_name}",
-                    field_name,
-                    value
-                )
+        if self.scanner.find(value, ("command",)):
+            raise ValidationError(
+                f"Potential command injection detected in {field_name}",
+                field_name,
+                value
+            )
         
         return value
     
@@ -233,13 +194,12 @@ class InputValidator:
             return path
         
         # Check for path traversal patterns
-        for pattern in self.path_traversal_patterns:
-            if re.search(pattern, path, re.IGNORECASE):
-                raise ValidationError(
-                    f"Path traversal attempt detected",
-                    "path",
-                    path
-                )
+        if self.scanner.find(path, ("path",)):
+            raise ValidationError(
+                f"Path traversal attempt detected",
+                "path",
+                path
+            )
         
         # Resolve path and check if it's within base path
         if base_path:
@@ -262,6 +222,39 @@ class InputValidator:
         
         return path
     
+    def validate_payload(
+        self,
+        data: Any,
+        checks: tuple = ("sql", "xss", "command", "path"),
+        field_name: str = ""
+    ) -> Any:
+        """
+        Validate every string in a request body in a single pass
+        
+        Keys and values of nested dicts and lists are each scanned once
+        against all requested checks, stopping at the first finding.
+        
+        Args:
+            data: Parsed request body (dict, list or scalar)
+            checks: Categories to check: sql, xss, command, path
+            field_name: Name of the field holding ``data``
+            
+        Returns:
+            The unchanged payload
+            
+        Raises:
+            ValidationError: On the first string matching any check
+        """
+        finding = self.scanner.find_in(data, checks, path=field_name)
+        if finding:
+            category, field, value = finding
+            raise ValidationError(
+                f"Potential {CATEGORY_LABELS[category]} detected in {field}",
+                field,
+                value
+            )
+        return data
+    
     def validate_email_address(self, email: str) -> str:
         """
         Validate email address format
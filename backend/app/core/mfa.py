@@ -234,6 +234,7 @@ class MFAManager:
             # Store MFA settings in user record or separate table
             # This is a simplified example - adjust based on your model
             from ..models.user import User
+            from .principal_cache import principal_cache
             
             stmt = (
                 update(User)
@@ -248,6 +249,7 @@ class MFAManager:
             
             await db.execute(stmt)
             await db.commit()
+            await principal_cache.invalidate(user_id)
             
             return {
                 "success": True,
@@ -279,6 +281,7 @@ class MFAManager:
         """
         try:
             from ..models.user import User
+            from .principal_cache import principal_cache
             
             stmt = (
                 update(User)
@@ -293,6 +296,7 @@ class MFAManager:
             
             await db.execute(stmt)
             await db.commit()
+            await principal_cache.invalidate(user_id)
             
             return {
                 "success": True,
@@ -0,0 +1,137 @@
+"""
+Authenticated principal cache for ``get_current_user``.
+
+After the JWT is verified, the user row is looked up in a short-lived cache
+keyed by user ID and token ``jti`` instead of being queried on every
+request. Entries hold the user's columns except credentials (password hash
+and MFA secrets), which are never cached. On a hit the snapshot is attached
+to the request's session with ``merge(load=False)``, which emits no SQL, so
+handlers can still modify and commit ``current_user``. Handlers that need a
+credential column load it explicitly with ``db.refresh(user, [...])``.
+
+Entries are tagged with the user ID. Profile, password and role changes,
+token family revocation and session revocation call ``invalidate``, and the
+cache manager evicts the L1 copies in other processes.
+"""
+
+from typing import Any, Dict, Optional
+import copy
+import logging
+
+from sqlalchemy import Enum as SQLEnum
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+
+from .config import settings
+from .cache_manager import cache_manager
+
+logger = logging.getLogger(__name__)
+
+
+PRINCIPAL_CACHE_PREFIX = "auth:principal"
+# Never leave the database through the cache
+PRINCIPAL_SECRET_FIELDS = frozenset({"hashed_password", "mfa_secret", "mfa_backup_codes"})
+
+
+def principal_tag(user_id: Any) -> str:
+    """Cache tag carried by every cached principal of ``user_id``."""
+    return f"principal:{user_id}"
+
+
+class PrincipalCache:
+    """Caches authenticated users per access token; ``model`` defaults to ``User``."""
+
+    def __init__(self, model: Optional[type] = None, ttl: Optional[int] = None):
+        self.ttl = ttl or settings.PRINCIPAL_CACHE_TTL_SECONDS
+        self._model = model
+        self._columns = None
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def model(self) -> type:
+        if self._model is None:
+            from ..models.user import User
+            self._model = User
+        return self._model
+
+    @property
+    def columns(self) -> list:
+        if self._columns is None:
+            self._columns = [
+                column for column in self.model.__table__.columns
+                if column.name not in PRINCIPAL_SECRET_FIELDS
+            ]
+        return self._columns
+
+    @staticmethod
+    def cache_key(user_id: Any, token_id: str) -> str:
+        return f"{PRINCIPAL_CACHE_PREFIX}:{user_id}:{token_id}"
+
+    def _snapshot(self, user: Any) -> Dict[str, Any]:
+        return {column.name: getattr(user, column.name) for column in self.columns}
+
+    def _restore(self, snapshot: Dict[str, Any]) -> Any:
+        values = {}
+        for column in self.columns:
+            value = snapshot.get(column.name)
+            enum_class = getattr(column.type, "enum_class", None)
+            if value is not None and isinstance(column.type, SQLEnum) and enum_class is not None:
+                # Enums come back from the cache as their plain values
+                value = enum_class(value)
+            elif isinstance(value, (dict, list)):
+                # Never share JSON columns with the cached entry
+                value = copy.deepcopy(value)
+            values[column.name] = value
+        user = self.model(**values)
+        # Present the snapshot as a clean, already-persisted row
+        make_transient_to_detached(user)
+        return user
+
+    async def get(self, db: AsyncSession, user_id: str, token_id: str) -> Optional[Any]:
+        """Return the cached user attached to ``db``, or ``None`` on a miss."""
+        key = self.cache_key(user_id, token_id)
+        try:
+            snapshot = await cache_manager.get(key)
+        except Exception as e:
+            logger.warning(f"Principal cache lookup failed for user {user_id}: {e}")
+            snapshot = None
+
+        if snapshot is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return await db.merge(self._restore(snapshot), load=False)
+
+    async def set(self, user: Any, token_id: str):
+        try:
+            await cache_manager.set(
+                self.cache_key(user.id, token_id),
+                self._snapshot(user),
+                l1_ttl=self.ttl,
+                l2_ttl=self.ttl,
+                tags=[principal_tag(user.id)]
+            )
+        except Exception as e:
+            logger.warning(f"Principal cache store failed for user {user.id}: {e}")
+
+    async def invalidate(self, user_id: Any) -> int:
+        """Drop every cached principal of a user, for all of their tokens."""
+        try:
+            return await cache_manager.invalidate_by_tag(principal_tag(user_id))
+        except Exception as e:
+            logger.warning(f"Principal cache invalidation failed for user {user_id}: {e}")
+            return 0
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0
+        }
+
+
+# Global principal cache instance
+principal_cache = PrincipalCache()
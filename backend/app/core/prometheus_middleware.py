@@ -1,103 +1,136 @@
 """
 Prometheus metrics collection middleware.
+
+Requests are labelled by the matched route template (``/pipelines/{pipeline_id}``),
+read from ``scope["route"]`` once the router has run, so the number of
+label sets is bounded by the number of routes however many IDs are
+requested. Requests that match no route share the ``<unmatched>`` label.
+Label children are bound once per route and reused (see
+``PrometheusMetrics.record_http_request``).
+
+The middleware is plain ASGI: it builds no ``Request`` object, reads the
+request size from ``Content-Length`` (counting body chunks only for chunked
+uploads), and counts response bytes as they are sent.
 """
 import time
 import logging
-from typing import Callable
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+import secrets
+from typing import Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from app.core.config import settings
 from app.services.metrics_service import metrics
 
 logger = logging.getLogger(__name__)
 
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def route_template(scope: Scope) -> str:
+    """The template of the route that handled ``scope``, never the raw path."""
+    route = scope.get("route")
+    if route is None:
+        return UNMATCHED_ROUTE
+    return getattr(route, "path_format", None) or getattr(route, "path", None) or UNMATCHED_ROUTE
 
-class PrometheusMiddleware(BaseHTTPMiddleware):
+
+class PrometheusMiddleware:
     """Middleware to collect Prometheus metrics for HTTP requests."""
-    
-    def __init__(self, app, exclude_paths: list = None):
-        super().__init__(app)
-        self.exclude_paths = exclude_paths or [
+
+    def __init__(self, app: ASGIApp, exclude_paths: list = None, exemplars: Optional[bool] = None):
+        self.app = app
+        self.exclude_paths = tuple(exclude_paths or [
             '/metrics',
             '/health',
             '/favicon.ico',
             '/docs',
             '/openapi.json'
-        ]
-    
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        """Process request and collect metrics."""
-        start_time = time.time()
-        
+        ])
+        self.exemplars = settings.PROMETHEUS_EXEMPLARS_ENABLED if exemplars is None else exemplars
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
         # Skip metrics collection for excluded paths
-        if any(request.url.path.startswith(path) for path in self.exclude_paths):
-            return await call_next(request)
-        
-        # Extract request information
-        method = request.method
-        endpoint = self._get_endpoint_name(request)
-        
+        if scope["type"] != "http" or scope["path"].startswith(self.exclude_paths):
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        started = time.perf_counter()
+        status_code = 500
+        response_size = 0
+        request_size = None
+        headers = dict(scope["headers"])
+        content_length = headers.get(b"content-length")
+        if content_length is not None and content_length.isdigit():
+            request_size = int(content_length)
+        else:
+            request_size = 0
+            original_receive = receive
+
+            async def receive() -> Message:
+                nonlocal request_size
+                message = await original_receive()
+                if message["type"] == "http.request":
+                    request_size += len(message.get("body", b""))
+                return message
+
+        exemplar = self._exemplar(scope, headers) if self.exemplars else None
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code, response_size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                response_size += len(message.get("body", b""))
+            await send(message)
+
+        in_progress = metrics.http_in_progress(method)
+        in_progress.inc()
         try:
-            # Process request
-            response = await call_next(request)
-            status_code = response.status_code
-            
+            await self.app(scope, receive, send_wrapper)
         except Exception as e:
-            # Handle exceptions and still record metrics
             status_code = 500
             logger.error(f"Request failed with exception: {e}")
             raise
-        
         finally:
-            # Calculate duration and record metrics
-            duration = time.time() - start_time
-            
+            in_progress.dec()
+            self._record(scope, method, status_code, time.perf_counter() - started,
+                         request_size, response_size, exemplar)
+
+    def _record(self, scope, method, status_code, duration, request_size, response_size, exemplar):
+        try:
+            endpoint = route_template(scope)
+
             # Record HTTP request metrics
             metrics.record_http_request(
                 method=method,
                 endpoint=endpoint,
                 status_code=status_code,
-                duration=duration
+                duration=duration,
+                request_size=request_size,
+                response_size=response_size,
+                exemplar=exemplar
             )
-            
+
             # Record rate limiting if applicable
-            if hasattr(request.state, 'rate_limited'):
-                if request.state.rate_limited:
-                    metrics.record_rate_limit_hit('ip', endpoint)
-                    if hasattr(request.state, 'rate_limit_blocked'):
-                        if request.state.rate_limit_blocked:
-                            metrics.record_rate_limit_block('ip', endpoint, 'exceeded')
-        
-        return response
-    
-    def _get_endpoint_name(self, request: Request) -> str:
-        """Extract endpoint name from request."""
-        try:
-            # Try to get route path pattern
-            if hasattr(request, 'scope') and 'route' in request.scope:
-                route = request.scope['route']
-                if hasattr(route, 'path'):
-                    return route.path
-            
-            # Fallback to URL path
-            path = request.url.path
-            
-            # Clean up path for better grouping
-            path_parts = path.split('/')
-            
-            # Handle API versioning
-            if len(path_parts) > 2 and path_parts[1] == 'api' and path_parts[2].startswith('v'):
-                if len(path_parts) > 3:
-                    return f"/api/{path_parts[2]}/{path_parts[3]}"
-                else:
-                    return f"/api/{path_parts[2]}"
-            
-            # Handle common patterns
-            if len(path_parts) > 1:
-                return f"/{path_parts[1]}"
-            
-            return path if path != '/' else '/root'
-            
+            state = scope.get("state") or {}
+            if state.get("rate_limited"):
+                metrics.record_rate_limit_hit('ip', endpoint)
+                if state.get("rate_limit_blocked"):
+                    metrics.record_rate_limit_block('ip', endpoint, 'exceeded')
         except Exception as e:
-            logger.warning(f"Failed to extract endpoint name: {e}")
-            return '/unknown'
\ No newline at end of file
+            logger.warning(f"Failed to record request metrics: {e}")
+
+    @staticmethod
+    def _exemplar(scope: Scope, headers: dict) -> dict:
+        """Correlation ID exemplar; reuses the client's request ID when given."""
+        request_id = headers.get(b"x-request-id") or headers.get(b"x-correlation-id")
+        if request_id:
+            request_id = request_id.decode("latin-1")[:64]
+        else:
+            state = scope.setdefault("state", {})
+            request_id = state.get("request_id") or secrets.token_urlsafe(16)
+            # Echoed as X-Request-ID by SecurityHeadersMiddleware
+            state["request_id"] = request_id
+        return {"request_id": request_id}
@@ -12,7 +12,9 @@ from fastapi import HTTPException, Request, status
 from functools import wraps
 import asyncio
 
+from .config import settings
 from .redis import redis_manager
+from .token_lease import token_lease_limiter
 
 logger = logging.getLogger(__name__)
 
@@ -55,56 +57,84 @@ class RateLimitConfig:
 class AdaptiveRateLimiter:
     """Enhanced adaptive rate limiter with intelligent burst handling and performance optimization."""
     
+    # Local reputation entries are re-read from Redis after this many seconds
+    REPUTATION_CACHE_SECONDS = 30
+    MAX_CACHED_REPUTATIONS = 10000
+    
     def __init__(self):
         self.redis = redis_manager
         self.burst_multiplier = 1.5  # Allow 50% burst above normal limit
-        self.reputation_scores = {}  # In-memory reputation tracking
+        self.reputation_scores: Dict[str, Tuple[float, float]] = {}  # identifier -> (score, loaded at)
+        self._dirty_reputations = set()  # Changed locally, not yet written to Redis
         self.circuit_breaker_threshold = 0.8  # Trip breaker at 80% error rate
+        # Sampled on a timer by run_load_sampler, not per request
+        self.system_load = 0.1
         
     async def get_reputation_score(self, identifier: str) -> float:
         """Get reputation score for identifier (0.0 = bad, 1.0 = excellent)."""
+        cached = self.reputation_scores.get(identifier)
+        if cached is not None and (
+            identifier in self._dirty_reputations
+            or time.monotonic() - cached[1] < self.REPUTATION_CACHE_SECONDS
+        ):
+            return cached[0]
         try:
             # Check Redis for persistent reputation data
             reputation_key = f"reputation:{identifier}"
             cached_score = await self.redis.get(reputation_key)
             
-            if cached_score:
-                return float(cached_score)
-            
             # Default reputation for new identifiers
-            return 0.5
+            score = float(cached_score) if cached_score else 0.5
+            self.reputation_scores[identifier] = (score, time.monotonic())
+            return score
             
         except Exception as e:
             logger.error(f"Error getting reputation score: {e}")
             return 0.5
     
+    def _set_reputation(self, identifier: str, score: float):
+        """Record a new score locally; flush_reputations writes it to Redis."""
+        cached = self.reputation_scores.get(identifier)
+        loaded_at = cached[1] if cached else time.monotonic()
+        self.reputation_scores[identifier] = (score, loaded_at)
+        self._dirty_reputations.add(identifier)
+    
+    async def flush_reputations(self) -> int:
+        """Write locally changed reputation scores to Redis in one round trip."""
+        dirty, self._dirty_reputations = self._dirty_reputations, set()
+        if dirty:
+            try:
+                async with self.redis.batch() as batch:
+                    for identifier in dirty:
+                        score = self.reputation_scores[identifier][0]
+                        batch.setex(f"reputation:{identifier}", 86400, str(score))  # 24 hour TTL
+            except Exception as e:
+                self._dirty_reputations |= dirty
+                logger.error(f"Error flushing reputation scores: {e}")
+                return 0
+        
+        if len(self.reputation_scores) > self.MAX_CACHED_REPUTATIONS:
+            # Forget clean entries; they are re-read from Redis on demand
+            for identifier in [i for i in self.reputation_scores if i not in self._dirty_reputations]:
+                del self.reputation_scores[identifier]
+        return len(dirty)
+    
+    @staticmethod
+    def _next_reputation(current_score: float, success: bool) -> float:
+        if success:
+            # Gradually improve reputation on success
+            return min(1.0, current_score + 0.01)
+        # Quickly degrade reputation on failure
+        return max(0.0, current_score - 0.05)
+    
     async def update_reputation(self, identifier: str, success: bool):
         """Update reputation based on request success/failure."""
-        try:
-            current_score = await self.get_reputation_score(identifier)
-            
-            if success:
-                # Gradually improve reputation on success
-                new_score = min(1.0, current_score + 0.01)
-            else:
-                # Quickly degrade reputation on failure
-                new_score = max(0.0, current_score - 0.05)
-            
-            reputation_key = f"reputation:{identifier}"
-            await self.redis.setex(reputation_key, 86400, str(new_score))  # 24 hour TTL
-            
-        except Exception as e:
-            logger.error(f"Error updating reputation: {e}")
+        current_score = await self.get_reputation_score(identifier)
+        self._set_reputation(identifier, self._next_reputation(current_score, success))
     
-    async def get_adaptive_limits(self, identifier: str, base_max: int, window_seconds: int) -> tuple:
-        """Calculate adaptive limits based on reputation and system load."""
-        reputation = await self.get_reputation_score(identifier)
-        
+    def _compute_limits(self, base_max: int, reputation: float, system_load: float) -> tuple:
         # Good reputation gets higher limits
         reputation_multiplier = 0.5 + (reputation * 1.5)  # Range: 0.5x to 2.0x
-        
-        # Check system load (simplified version)
-        system_load = await self._get_system_load()
         load_multiplier = max(0.2, 1.0 - system_load)  # Reduce limits under high load
         
         # Calculate final limits
@@ -115,22 +145,36 @@ class AdaptiveRateLimiter:
         
         return adaptive_max, burst_max
     
+    async def get_adaptive_limits(self, identifier: str, base_max: int, window_seconds: int) -> tuple:
+        """Calculate adaptive limits based on reputation and system load."""
+        reputation = await self.get_reputation_score(identifier)
+        return self._compute_limits(base_max, reputation, self.system_load)
+    
+    @staticmethod
+    def _load_from_info(info: Dict) -> float:
+        # Simple load estimation based on Redis memory usage
+        used_memory = info.get('used_memory', 0)
+        max_memory = info.get('maxmemory', 0)
+        
+        if max_memory > 0:
+            return min(1.0, used_memory / max_memory)
+        
+        return 0.1  # Low load if we can't determine
+    
     async def _get_system_load(self) -> float:
-        """Get system load metric (0.0 = idle, 1.0 = overloaded)."""
+        """Sample system load (0.0 = idle, 1.0 = overloaded) into ``system_load``."""
         try:
-            # Simple load estimation based on Redis memory usage
-            info = await self.redis.info('memory')
-            used_memory = info.get('used_memory', 0)
-            max_memory = info.get('maxmemory', 0)
-            
-            if max_memory > 0:
-                memory_ratio = used_memory / max_memory
-                return min(1.0, memory_ratio)
-            
-            return 0.1  # Low load if we can't determine
-            
+            self.system_load = self._load_from_info(await self.redis.info('memory'))
         except Exception:
-            return 0.1  # Assume low load on error
+            self.system_load = 0.1  # Assume low load on error
+        return self.system_load
+    
+    async def run_load_sampler(self, interval_seconds: float):
+        """Refresh system load and persist reputation changes on a timer."""
+        while True:
+            await self._get_system_load()
+            await self.flush_reputations()
+            await asyncio.sleep(interval_seconds)
     
     async def check_rate_limit(
         self, 
@@ -143,6 +187,12 @@ class AdaptiveRateLimiter:
         """
         Enhanced rate limit check with adaptive limits and intelligent burst handling.
         
+        Limits large enough to split are served from tokens leased by this
+        process (see ``token_lease``). Smaller limits, such as login attempts,
+        are checked exactly: the block state and window update go out in one
+        pipelined round trip. Reputation and system load are kept in process
+        and synced with Redis by ``run_load_sampler``.
+        
         Args:
             identifier: Unique identifier (IP, user_id, etc.)
             max_attempts: Base maximum attempts allowed in window
@@ -153,56 +203,73 @@ class AdaptiveRateLimiter:
         Returns:
             Tuple of (is_allowed, info_dict)
         """
+        current_time = time.time()
         try:
-            current_time = time.time()
             window_start = current_time - window_seconds
             
+            # Redis keys for this identifier
+            key = f"rate_limit:{identifier}"
+            block_key = f"rate_limit_block:{identifier}"
+            burst_key = f"rate_limit_burst:{identifier}"
+            member = str(current_time)
+            
+            reputation = await self.get_reputation_score(identifier)
+            
             # Get adaptive limits if enabled
             if adaptive:
-                adaptive_max, burst_max = await self.get_adaptive_limits(identifier, max_attempts, window_seconds)
+                adaptive_max, burst_max = self._compute_limits(max_attempts, reputation, self.system_load)
             else:
                 adaptive_max = burst_max = max_attempts
             
-            # Redis keys for this identifier
-            key = f"rate_limit:{identifier}"
-            block_key = f"rate_limit_block:{identifier}"
-            burst_key = f"rate_limit_burst:{identifier}"
+            windows = [("window", window_seconds, max(adaptive_max, 1))]
+            if adaptive:
+                # Same burst window as the exact check below: the main window plus a minute
+                windows.append(("burst", window_seconds + 60, max(burst_max, 1)))
+            if settings.RATE_LIMIT_LEASE_ENABLED and token_lease_limiter.lease_size(windows) > 1:
+                return await self._check_leased(
+                    identifier, windows, block_key, block_duration, adaptive_max, burst_max,
+                    max_attempts, reputation
+                )
             
-            # Check if identifier is currently blocked
-            is_blocked = await self.redis.exists(block_key)
-            if is_blocked:
-                block_ttl = await self.redis.ttl(block_key)
+            async with self.redis.batch() as batch:
+                block_ttl_reply = batch.ttl(block_key)
+                
+                # Remove old entries outside the window
+                batch.zremrangebyscore(key, 0, window_start)
+                batch.zremrangebyscore(burst_key, 0, window_start - 60)  # Burst window is shorter
+                
+                # Count current attempts in window
+                attempts_reply = batch.zcard(key)
+                burst_reply = batch.zcard(burst_key)
+                
+                # Add current request
+                batch.zadd(key, {member: current_time})
+                batch.zadd(burst_key, {member: current_time})
+                
+                # Set expiration on the keys
+                batch.expire(key, window_seconds + 1)
+                batch.expire(burst_key, 120)  # 2-minute burst tracking
+                
+                oldest_reply = batch.zrange(key, 0, 0, withscores=True)
+            
+            # Check if identifier is currently blocked (TTL is -2 when the key is missing)
+            block_ttl = block_ttl_reply.result()
+            if block_ttl is not None and block_ttl != -2:
+                # Blocked requests do not count towards the window
+                async with self.redis.batch() as batch:
+                    batch.zrem(key, member)
+                    batch.zrem(burst_key, member)
                 return False, {
                     'blocked': True,
-                    'reset_time': current_time + block_ttl,
+                    'reset_time': current_time + max(block_ttl, 0),
                     'remaining_attempts': 0,
                     'window_seconds': window_seconds,
                     'adaptive_max': adaptive_max,
-                    'reputation': await self.get_reputation_score(identifier)
+                    'reputation': reputation
                 }
             
-            # Use Redis pipeline for atomic operations
-            pipe = await self.redis.pipeline()
-
-            # Remove old entries outside the window
-            pipe.zremrangebyscore(key, 0, window_start)
-            pipe.zremrangebyscore(burst_key, 0, window_start - 60)  # Burst window is shorter
-
-            # Count current attempts in window
-            pipe.zcard(key)
-            pipe.zcard(burst_key)
-
-            # Add current request
-            pipe.zadd(key, {str(current_time): current_time})
-            pipe.zadd(burst_key, {str(current_time): current_time})
-
-            # Set expiration on the keys
-            pipe.expire(key, window_seconds + 1)
-            pipe.expire(burst_key, 120)  # 2-minute burst tracking
-
-            results = await pipe.execute()
-            current_attempts = results[2] + 1  # +1 for the current request
-            burst_attempts = results[3] + 1
+            current_attempts = attempts_reply.result() + 1  # +1 for the current request
+            burst_attempts = burst_reply.result() + 1
             
             # Check burst limits first (for short-term protection)
             if burst_attempts > burst_max and adaptive:
@@ -210,7 +277,8 @@ class AdaptiveRateLimiter:
                 # Temporary burst block (shorter duration)
                 temp_block_duration = min(60, block_duration or 60)  # Max 1 minute burst block
                 await self.redis.setex(f"{block_key}_burst", temp_block_duration, "burst_blocked")
-                await self.update_reputation(identifier, False)
+                reputation = self._next_reputation(reputation, False)
+                self._set_reputation(identifier, reputation)
                 
                 return False, {
                     'blocked': True,
@@ -219,23 +287,25 @@ class AdaptiveRateLimiter:
                     'remaining_attempts': 0,
                     'window_seconds': window_seconds,
                     'adaptive_max': adaptive_max,
-                    'reputation': await self.get_reputation_score(identifier)
+                    'reputation': reputation
                 }
             
             remaining_attempts = max(0, adaptive_max - current_attempts)
             
             # Check main rate limit
             if current_attempts > adaptive_max:
-                # Rate limit exceeded - block if block_duration is set
-                if block_duration:
-                    await self.redis.setex(block_key, block_duration, "blocked")
-                
-                # Remove the current request since it's blocked
-                await self.redis.zrem(key, str(current_time))
-                await self.redis.zrem(burst_key, str(current_time))
+                async with self.redis.batch() as batch:
+                    # Rate limit exceeded - block if block_duration is set
+                    if block_duration:
+                        batch.setex(block_key, block_duration, "blocked")
+                    
+                    # Remove the current request since it's blocked
+                    batch.zrem(key, member)
+                    batch.zrem(burst_key, member)
                 
                 # Update reputation negatively
-                await self.update_reputation(identifier, False)
+                reputation = self._next_reputation(reputation, False)
+                self._set_reputation(identifier, reputation)
                 
                 logger.warning(
                     f"Rate limit exceeded for {identifier}",
@@ -246,7 +316,7 @@ class AdaptiveRateLimiter:
                         'base_max': max_attempts,
                         'window_seconds': window_seconds,
                         'blocked_duration': block_duration,
-                        'reputation': await self.get_reputation_score(identifier)
+                        'reputation': reputation
                     }
                 )
                 
@@ -256,14 +326,15 @@ class AdaptiveRateLimiter:
                     'remaining_attempts': 0,
                     'window_seconds': window_seconds,
                     'adaptive_max': adaptive_max,
-                    'reputation': await self.get_reputation_score(identifier)
+                    'reputation': reputation
                 }
             
             # Request allowed - update reputation positively
-            await self.update_reputation(identifier, True)
+            reputation = self._next_reputation(reputation, True)
+            self._set_reputation(identifier, reputation)
             
             # Calculate when the window resets
-            oldest_entries = await self.redis.zrange(key, 0, 0, withscores=True)
+            oldest_entries = oldest_reply.result()
             if oldest_entries:
                 oldest_time = oldest_entries[0][1]
                 reset_time = oldest_time + window_seconds
@@ -277,7 +348,7 @@ class AdaptiveRateLimiter:
                 'window_seconds': window_seconds,
                 'adaptive_max': adaptive_max,
                 'base_max': max_attempts,
-                'reputation': await self.get_reputation_score(identifier),
+                'reputation': reputation,
                 'current_attempts': current_attempts,
                 'burst_attempts': burst_attempts,
                 'burst_max': burst_max
@@ -294,6 +365,73 @@ class AdaptiveRateLimiter:
                 'error': 'Rate limiter unavailable'
             }
     
+    async def _check_leased(
+        self,
+        identifier: str,
+        windows: list,
+        block_key: str,
+        block_duration: Optional[int],
+        adaptive_max: int,
+        burst_max: int,
+        max_attempts: int,
+        reputation: float
+    ) -> Tuple[bool, Dict]:
+        """
+        Rate limit check served from locally leased tokens.
+        
+        The burst limit is leased as a second window, so tokens are only
+        granted while both the main and the burst window have room.
+        """
+        window_seconds = windows[0][1]
+        # The block key guards lease refills, so blocks set by any process apply
+        allowed, lease_info = await token_lease_limiter.acquire(
+            f"adaptive:{identifier}:{window_seconds}", windows, guard_key=block_key
+        )
+        current_time = time.time()
+        reputation = self._next_reputation(reputation, allowed)
+        self._set_reputation(identifier, reputation)
+        
+        if allowed:
+            return True, {
+                'blocked': False,
+                'reset_time': current_time + window_seconds,
+                'remaining_attempts': max(0, adaptive_max - lease_info['requests']),
+                'window_seconds': window_seconds,
+                'adaptive_max': adaptive_max,
+                'base_max': max_attempts,
+                'reputation': reputation,
+                'current_attempts': lease_info['requests']
+            }
+        
+        # A window ran out (a guard block reports window 0)
+        retry_after = lease_info['retry_after']
+        if lease_info['window_index'] == 2:
+            logger.warning(f"Burst limit exceeded for {identifier}: {lease_info['requests']} > {burst_max}")
+            # Temporary burst block (shorter duration)
+            temp_block_duration = min(60, block_duration or 60)
+            await self.redis.setex(f"{block_key}_burst", temp_block_duration, "burst_blocked")
+            return False, {
+                'blocked': True,
+                'burst_blocked': True,
+                'reset_time': current_time + temp_block_duration,
+                'remaining_attempts': 0,
+                'window_seconds': window_seconds,
+                'adaptive_max': adaptive_max,
+                'reputation': reputation
+            }
+        if block_duration and lease_info['window_index']:
+            await self.redis.setex(block_key, block_duration, "blocked")
+            retry_after = block_duration
+            logger.warning(f"Rate limit exceeded for {identifier}: {lease_info['requests']} > {adaptive_max}")
+        return False, {
+            'blocked': True,
+            'reset_time': current_time + retry_after,
+            'remaining_attempts': 0,
+            'window_seconds': window_seconds,
+            'adaptive_max': adaptive_max,
+            'reputation': reputation
+        }
+    
     async def reset_rate_limit(self, identifier: str):
         """Reset rate limit for an identifier (for testing or admin override)."""
         try:
@@ -301,6 +439,9 @@ class AdaptiveRateLimiter:
             block_key = f"rate_limit_block:{identifier}"
             
             await self.redis.delete(key, block_key)
+            # Leased counters and this process's unspent leases
+            await self.redis.unlink_matching(f"rate_limit:lease:adaptive:{identifier}:*")
+            token_lease_limiter.forget_prefix(f"adaptive:{identifier}:")
             logger.info(f"Rate limit reset for {identifier}")
             
         except Exception as e:
@@ -338,6 +479,25 @@ RateLimiter = AdaptiveRateLimiter
 # Global rate limiter instance
 rate_limiter = AdaptiveRateLimiter()
 
+
+async def start_rate_limit_sampler():
+    """Start sampling system load and syncing reputation scores in the background."""
+    async def sampler_loop():
+        while True:
+            try:
+                await rate_limiter.run_load_sampler(settings.RATE_LIMIT_LOAD_SAMPLE_SECONDS)
+            except asyncio.CancelledError:
+                # Keep reputation changes made since the last flush
+                await rate_limiter.flush_reputations()
+                raise
+            except Exception as e:
+                logger.error(f"Rate limit sampler error: {e}")
+                await asyncio.sleep(60)
+    
+    task = asyncio.create_task(sampler_loop())
+    logger.info("Rate limit sampler started")
+    return task
+
 def get_client_identifier(request: Request) -> str:
     """Get unique identifier for rate limiting (IP + User-Agent hash)."""
     # Primary: Use IP address
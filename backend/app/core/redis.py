@@ -1,19 +1,186 @@
 import redis.asyncio as redis
-from typing import Optional
-import json
+from typing import Any, Dict, List, Optional
 import asyncio
 from datetime import timedelta, datetime
 
 from .config import settings
+from .cache_codec import cache_codec
 
 # Global Redis connection pool
 redis_pool: Optional[redis.Redis] = None
 
+# Keys fetched per SCAN cursor step and removed per UNLINK call
+SCAN_BATCH_SIZE = 500
+
+# Upper bound on keys coalesced into one MGET by the GET micro-batcher
+GET_BATCH_MAX_KEYS = 256
+
+
+async def unlink_matching(client: redis.Redis, pattern: str, batch_size: int = SCAN_BATCH_SIZE) -> int:
+    """
+    Delete keys matching a glob pattern without blocking Redis.
+    
+    Walks the keyspace with cursor-based SCAN and frees memory with UNLINK in
+    batches, unlike KEYS + DEL which stall the server on large keyspaces.
+    """
+    removed = 0
+    batch = []
+    async for key in client.scan_iter(match=pattern, count=batch_size):
+        batch.append(key)
+        if len(batch) >= batch_size:
+            removed += await client.unlink(*batch)
+            batch = []
+    if batch:
+        removed += await client.unlink(*batch)
+    return removed
+
+
+class RedisBatch:
+    """
+    Queues Redis commands and sends them in a single pipeline round trip.
+    
+        async with redis_manager.batch() as batch:
+            session = batch.get(session_key)
+            batch.incr(counter_key)
+            batch.expire(counter_key, 60)
+        session.result()
+    
+    Each queued command returns a future that is resolved when the block
+    exits. A failing command only fails its own future; the rest of the
+    batch still applies. Pass ``transaction=True`` to wrap the commands in
+    MULTI/EXEC.
+    """
+    
+    def __init__(self, manager: "RedisManager", binary: bool = False, transaction: bool = False):
+        self._manager = manager
+        self._binary = binary
+        self._transaction = transaction
+        self._pipe = None
+        self._futures: List[asyncio.Future] = []
+    
+    async def __aenter__(self) -> "RedisBatch":
+        client = await (self._manager.connect_binary() if self._binary else self._manager.connect())
+        self._pipe = client.pipeline(transaction=self._transaction)
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            # Nothing is sent if the block fails
+            for future in self._futures:
+                future.cancel()
+            await self._pipe.reset()
+            return False
+        await self.execute()
+        return False
+    
+    def __getattr__(self, name: str):
+        if self._pipe is None:
+            raise RuntimeError("RedisBatch must be used as 'async with redis_manager.batch()'")
+        command = getattr(self._pipe, name)
+        
+        def queue(*args, **kwargs) -> asyncio.Future:
+            command(*args, **kwargs)
+            future = asyncio.get_running_loop().create_future()
+            self._futures.append(future)
+            return future
+        return queue
+    
+    def __len__(self) -> int:
+        return len(self._futures)
+    
+    async def execute(self) -> List[Any]:
+        """Send the queued commands now; called automatically on exit."""
+        futures, self._futures = self._futures, []
+        if not futures:
+            return []
+        try:
+            results = await self._pipe.execute(raise_on_error=False)
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+            raise
+        for future, result in zip(futures, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+        return results
+
+
+class GetBatcher:
+    """
+    Coalesces concurrent single-key GETs into one MGET.
+    
+    GETs issued in the same event loop tick (for example by ``asyncio.gather``
+    or concurrent requests hitting the cache) are queued and flushed together
+    on the next tick, so N lookups cost one round trip instead of N.
+    """
+    
+    def __init__(self, manager: "RedisManager", binary: bool = False, max_keys: int = GET_BATCH_MAX_KEYS):
+        self._manager = manager
+        self._binary = binary
+        self.max_keys = max_keys
+        self._pending: Dict[str, List[asyncio.Future]] = {}
+        self._scheduled = False
+        self._tasks = set()
+        self.round_trips = 0
+    
+    async def get(self, key: str):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.setdefault(key, []).append(future)
+        
+        if len(self._pending) >= self.max_keys:
+            self._flush()
+        elif not self._scheduled:
+            self._scheduled = True
+            # Runs after every callback already queued for this tick
+            loop.call_soon(self._flush)
+        return await future
+    
+    def _flush(self):
+        self._scheduled = False
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        task = asyncio.ensure_future(self._fetch(pending))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+    
+    async def _fetch(self, pending: Dict[str, List[asyncio.Future]]):
+        keys = list(pending)
+        try:
+            client = await (self._manager.connect_binary() if self._binary else self._manager.connect())
+            self.round_trips += 1
+            if len(keys) == 1:
+                values = [await client.get(keys[0])]
+            else:
+                values = await client.mget(keys)
+        except Exception as e:
+            for futures in pending.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+        
+        for key, value in zip(keys, values):
+            for future in pending[key]:
+                if not future.done():
+                    future.set_result(value)
+
+
 class RedisManager:
     """Redis connection and operations manager."""
     
     def __init__(self):
         self.redis: Optional[redis.Redis] = None
+        # Codec-encoded cache payloads are bytes, so they need a non-decoding client
+        self.binary_redis: Optional[redis.Redis] = None
+        self._get_batcher = GetBatcher(self)
+        self._binary_get_batcher = GetBatcher(self, binary=True)
     
     async def connect(self) -> redis.Redis:
         """Create Redis connection pool."""
@@ -27,11 +194,25 @@ class RedisManager:
             )
         return self.redis
     
+    async def connect_binary(self) -> redis.Redis:
+        """Create the Redis connection pool used for binary payloads."""
+        if self.binary_redis is None:
+            self.binary_redis = redis.from_url(
+                settings.REDIS_URL,
+                decode_responses=False,
+                max_connections=20,
+                retry_on_timeout=True
+            )
+        return self.binary_redis
+    
     async def disconnect(self):
         """Close Redis connection."""
         if self.redis:
             await self.redis.close()
             self.redis = None
+        if self.binary_redis:
+            await self.binary_redis.close()
+            self.binary_redis = None
     
     async def ping(self) -> bool:
         """Check Redis connection."""
@@ -43,18 +224,26 @@ class RedisManager:
             pass
         return False
     
+    def batch(self, binary: bool = False, transaction: bool = False) -> RedisBatch:
+        """Queue commands and send them in one round trip (see ``RedisBatch``)."""
+        return RedisBatch(self, binary=binary, transaction=transaction)
+    
     # Proxy methods for direct Redis operations
     async def get(self, key: str):
-        """Get a value from Redis."""
+        """Get a value from Redis; concurrent gets share one MGET."""
+        return await self._get_batcher.get(key)
+    
+    async def mget(self, keys: List[str]) -> List[Any]:
+        """Get several values in one round trip."""
         if not self.redis:
             await self.connect()
-        return await self.redis.get(key)
+        return await self.redis.mget(keys)
     
-    async def set(self, key: str, value, ex=None):
+    async def set(self, key: str, value, ex=None, px=None, nx: bool = False):
         """Set a value in Redis."""
         if not self.redis:
             await self.connect()
-        return await self.redis.set(key, value, ex=ex)
+        return await self.redis.set(key, value, ex=ex, px=px, nx=nx)
     
     async def setex(self, name: str, time: int, value):
         """Set a value with expiration."""
@@ -62,6 +251,22 @@ class RedisManager:
             await self.connect()
         return await self.redis.setex(name, time, value)
     
+    async def get_binary(self, key: str) -> Optional[bytes]:
+        """Get a value as raw bytes; concurrent gets share one MGET."""
+        return await self._binary_get_batcher.get(key)
+    
+    async def mget_binary(self, keys: List[str]) -> List[Optional[bytes]]:
+        """Get several raw bytes values in one round trip."""
+        if not self.binary_redis:
+            await self.connect_binary()
+        return await self.binary_redis.mget(keys)
+    
+    async def setex_binary(self, name: str, time: int, value: bytes):
+        """Set a raw bytes value with expiration."""
+        if not self.binary_redis:
+            await self.connect_binary()
+        return await self.binary_redis.setex(name, time, value)
+    
     async def delete(self, *keys):
         """Delete one or more keys."""
         if not self.redis:
@@ -87,17 +292,80 @@ class RedisManager:
         return await self.redis.expire(key, time)
     
     async def keys(self, pattern: str):
-        """Get keys matching pattern."""
+        """Get keys matching pattern (blocks Redis; prefer ``scan_iter``)."""
         if not self.redis:
             await self.connect()
         return await self.redis.keys(pattern)
     
+    async def scan_iter(self, pattern: str, count: int = SCAN_BATCH_SIZE):
+        """Iterate keys matching pattern with cursor-based SCAN."""
+        if not self.redis:
+            await self.connect()
+        async for key in self.redis.scan_iter(match=pattern, count=count):
+            yield key
+    
+    async def count_matching(self, pattern: str) -> int:
+        """Count keys matching pattern with SCAN."""
+        count = 0
+        async for _ in self.scan_iter(pattern):
+            count += 1
+        return count
+    
+    async def unlink(self, *keys):
+        """Delete keys, reclaiming memory in the background."""
+        if not self.redis:
+            await self.connect()
+        return await self.redis.unlink(*keys)
+    
+    async def unlink_matching(self, pattern: str) -> int:
+        """Delete keys matching pattern with SCAN and batched UNLINK."""
+        if not self.redis:
+            await self.connect()
+        return await unlink_matching(self.redis, pattern)
+    
     async def info(self, section: str = None):
         """Get Redis info."""
         if not self.redis:
             await self.connect()
         return await self.redis.info(section)
     
+    async def eval(self, script: str, numkeys: int, *keys_and_args):
+        """Run a Lua script."""
+        if not self.redis:
+            await self.connect()
+        return await self.redis.eval(script, numkeys, *keys_and_args)
+    
+    async def sadd(self, name: str, *values):
+        """Add members to a set."""
+        if not self.redis:
+            await self.connect()
+        return await self.redis.sadd(name, *values)
+    
+    async def srem(self, name: str, *values):
+        """Remove members from a set."""
+        if not self.redis:
+            await self.connect()
+        return await self.redis.srem(name, *values)
+    
+    async def smembers(self, name: str):
+        """Get all members of a set."""
+        if not self.redis:
+            await self.connect()
+        return await self.redis.smembers(name)
+    
+    async def sscan_iter(self, name: str, count: int = SCAN_BATCH_SIZE):
+        """Iterate set members with cursor-based SSCAN."""
+        if not self.redis:
+            await self.connect()
+        async for member in self.redis.sscan_iter(name, count=count):
+            yield member
+    
+    async def publish(self, channel: str, message: str):
+        """Publish a message on a pub/sub channel."""
+        if not self.redis:
+            await self.connect()
+        return await self.redis.publish(channel, message)
+    
     async def pipeline(self):
         """Get Redis pipeline."""
         if not self.redis:
@@ -145,6 +413,11 @@ class CacheService:
         """Get Redis connection."""
         return await redis_manager.connect()
     
+    @staticmethod
+    async def get_binary_redis() -> redis.Redis:
+        """Get the Redis connection used for codec-encoded values."""
+        return await redis_manager.connect_binary()
+    
     @staticmethod
     async def set(
         key: str, 
@@ -154,14 +427,12 @@ class CacheService:
     ) -> bool:
         """Set a cache value."""
         try:
-            redis = await CacheService.get_redis()
-            
             # Serialize value if needed
             if serialize:
-                if isinstance(value, (dict, list)):
-                    value = json.dumps(value)
-                elif not isinstance(value, str):
-                    value = str(value)
+                redis = await CacheService.get_binary_redis()
+                value = cache_codec.encode(value)
+            else:
+                redis = await CacheService.get_redis()
             
             # Set with optional expiration
             if expire:
@@ -178,24 +449,80 @@ class CacheService:
     async def get(key: str, deserialize: bool = True) -> any:
         """Get a cache value."""
         try:
-            redis = await CacheService.get_redis()
-            value = await redis.get(key)
+            if not deserialize:
+                redis = await CacheService.get_redis()
+                return await redis.get(key)
+            
+            value = await redis_manager.get_binary(key)
             
             if value is None:
                 return None
             
-            # Deserialize if requested
-            if deserialize:
-                try:
-                    return json.loads(value)
-                except (json.JSONDecodeError, TypeError):
-                    return value
-            
-            return value
+            try:
+                return cache_codec.decode(value)
+            except (ValueError, TypeError):
+                # Values stored with serialize=False are plain strings
+                return value.decode("utf-8", errors="replace") if isinstance(value, bytes) else value
         except Exception as e:
             print(f"Cache get error: {e}")
             return None
     
+    @staticmethod
+    async def mget(keys: List[str], deserialize: bool = True) -> List[Any]:
+        """Get several cache values in one round trip; missing keys come back as None."""
+        if not keys:
+            return []
+        try:
+            if not deserialize:
+                redis = await CacheService.get_redis()
+                return await redis.mget(keys)
+            
+            redis = await CacheService.get_binary_redis()
+            values = await redis.mget(keys)
+        except Exception as e:
+            print(f"Cache mget error: {e}")
+            return [None] * len(keys)
+        
+        decoded = []
+        for value in values:
+            if value is None:
+                decoded.append(None)
+                continue
+            try:
+                decoded.append(cache_codec.decode(value))
+            except (ValueError, TypeError):
+                decoded.append(value.decode("utf-8", errors="replace") if isinstance(value, bytes) else value)
+        return decoded
+    
+    @staticmethod
+    async def mset(
+        mapping: Dict[str, Any],
+        expire: Optional[int] = None,
+        serialize: bool = True
+    ) -> bool:
+        """Set several cache values in one round trip."""
+        if not mapping:
+            return True
+        try:
+            if serialize:
+                redis = await CacheService.get_binary_redis()
+                mapping = {key: cache_codec.encode(value) for key, value in mapping.items()}
+            else:
+                redis = await CacheService.get_redis()
+            
+            if expire:
+                # MSET cannot carry a TTL, so pipeline one SETEX per key
+                pipe = redis.pipeline(transaction=False)
+                for key, value in mapping.items():
+                    pipe.setex(key, expire, value)
+                await pipe.execute()
+            else:
+                await redis.mset(mapping)
+            return True
+        except Exception as e:
+            print(f"Cache mset error: {e}")
+            return False
+    
     @staticmethod
     async def delete(key: str) -> bool:
         """Delete a cache key."""
@@ -244,7 +571,7 @@ class CacheService:
         """Get keys matching pattern."""
         try:
             redis = await CacheService.get_redis()
-            return await redis.keys(pattern)
+            return [key async for key in redis.scan_iter(match=pattern, count=SCAN_BATCH_SIZE)]
         except Exception as e:
             print(f"Cache keys error: {e}")
             return []
@@ -254,10 +581,7 @@ class CacheService:
         """Clear all keys matching pattern."""
         try:
             redis = await CacheService.get_redis()
-            keys = await redis.keys(pattern)
-            if keys:
-                return await redis.delete(*keys)
-            return 0
+            return await unlink_matching(redis, pattern)
         except Exception as e:
             print(f"Cache clear pattern error: {e}")
             return 0
@@ -266,8 +590,35 @@ class SessionManager:
     """Session management using Redis."""
     
     SESSION_PREFIX = "session:"
+    USER_SESSIONS_PREFIX = "user_sessions:"  # Set of session ids per user
     DEFAULT_EXPIRE = 24 * 60 * 60  # 24 hours
     
+    @staticmethod
+    def _user_index_key(user_id) -> str:
+        return f"{SessionManager.USER_SESSIONS_PREFIX}{user_id}"
+    
+    @staticmethod
+    def _queue_index_session(pipe, user_id, session_id: str, expire: int):
+        """Queue recording a session in its user's index, keeping the index alive as long as the session."""
+        index_key = SessionManager._user_index_key(user_id)
+        pipe.sadd(index_key, session_id)
+        pipe.expire(index_key, expire, nx=True)
+        pipe.expire(index_key, expire, gt=True)
+    
+    @staticmethod
+    async def _index_session(user_id, session_id: str, expire: int):
+        """Record a session in its user's index."""
+        redis = await CacheService.get_redis()
+        pipe = redis.pipeline()
+        SessionManager._queue_index_session(pipe, user_id, session_id, expire)
+        await pipe.execute()
+    
+    @staticmethod
+    async def _touch_session(session_key: str, session_data: dict) -> bool:
+        """Rewrite a session in place, keeping its remaining TTL."""
+        redis = await CacheService.get_binary_redis()
+        return bool(await redis.set(session_key, cache_codec.encode(session_data), keepttl=True))
+    
     @staticmethod
     async def create_session(
         user_id: str, 
@@ -288,9 +639,18 @@ class SessionManager:
         })
         
         expire = expire_seconds or SessionManager.DEFAULT_EXPIRE
-        success = await CacheService.set(session_key, session_data, expire)
+        try:
+            # Session and index writes share one round trip
+            redis = await CacheService.get_binary_redis()
+            pipe = redis.pipeline()
+            pipe.setex(session_key, expire, cache_codec.encode(session_data))
+            SessionManager._queue_index_session(pipe, user_id, session_id, expire)
+            await pipe.execute()
+        except Exception as e:
+            print(f"Session create error: {e}")
+            return None
         
-        return session_id if success else None
+        return session_id
     
     @staticmethod
     async def get_session(session_id: str) -> Optional[dict]:
@@ -301,11 +661,10 @@ class SessionManager:
         if session_data:
             # Update last accessed time
             session_data["last_accessed"] = datetime.utcnow().isoformat()
-            await CacheService.set(
-                session_key, 
-                session_data, 
-                await CacheService.ttl(session_key)
-            )
+            try:
+                await SessionManager._touch_session(session_key, session_data)
+            except Exception as e:
+                print(f"Session touch error: {e}")
         
         return session_data
     
@@ -319,8 +678,10 @@ class SessionManager:
             session_data.update(data)
             session_data["last_accessed"] = datetime.utcnow().isoformat()
             
-            ttl = await CacheService.ttl(session_key)
-            return await CacheService.set(session_key, session_data, ttl)
+            try:
+                return await SessionManager._touch_session(session_key, session_data)
+            except Exception as e:
+                print(f"Session update error: {e}")
         
         return False
     
@@ -328,43 +689,110 @@ class SessionManager:
     async def delete_session(session_id: str) -> bool:
         """Delete a session."""
         session_key = f"{SessionManager.SESSION_PREFIX}{session_id}"
-        return await CacheService.delete(session_key)
+        try:
+            # Read the owner and delete in one round trip
+            redis = await CacheService.get_binary_redis()
+            pipe = redis.pipeline()
+            pipe.get(session_key)
+            pipe.delete(session_key)
+            value, deleted = await pipe.execute()
+        except Exception as e:
+            print(f"Session delete error: {e}")
+            return False
+        
+        try:
+            session_data = cache_codec.decode(value)
+        except (ValueError, TypeError):
+            session_data = None
+        if isinstance(session_data, dict) and session_data.get("user_id") is not None:
+            try:
+                await redis.srem(SessionManager._user_index_key(session_data["user_id"]), session_id)
+            except Exception as e:
+                print(f"Session index error: {e}")
+        
+        return deleted > 0
     
     @staticmethod
     async def extend_session(session_id: str, expire_seconds: int) -> bool:
         """Extend session expiration."""
         session_key = f"{SessionManager.SESSION_PREFIX}{session_id}"
-        return await CacheService.expire(session_key, expire_seconds)
+        try:
+            redis = await CacheService.get_binary_redis()
+            pipe = redis.pipeline()
+            pipe.expire(session_key, expire_seconds)
+            pipe.get(session_key)
+            extended, value = await pipe.execute()
+        except Exception as e:
+            print(f"Session extend error: {e}")
+            return False
+        
+        if extended:
+            try:
+                session_data = cache_codec.decode(value)
+            except (ValueError, TypeError):
+                session_data = None
+            if isinstance(session_data, dict) and session_data.get("user_id") is not None:
+                try:
+                    await SessionManager._index_session(session_data["user_id"], session_id, expire_seconds)
+                except Exception as e:
+                    print(f"Session index error: {e}")
+        
+        return bool(extended)
     
     @staticmethod
     async def get_user_sessions(user_id: str) -> list[dict]:
-        """Get all sessions for a user."""
-        pattern = f"{SessionManager.SESSION_PREFIX}*"
-        session_keys = await CacheService.keys(pattern)
+        """Get all sessions for a user from the per-user session index."""
+        try:
+            redis = await CacheService.get_redis()
+            index_key = SessionManager._user_index_key(user_id)
+            session_ids = sorted(await redis.smembers(index_key))
+            if not session_ids:
+                return []
+            
+            binary_redis = await CacheService.get_binary_redis()
+            values = await binary_redis.mget([f"{SessionManager.SESSION_PREFIX}{sid}" for sid in session_ids])
+        except Exception as e:
+            print(f"Session lookup error: {e}")
+            return []
         
         user_sessions = []
-        for key in session_keys:
-            session_data = await CacheService.get(key, deserialize=True)
-            if session_data and session_data.get("user_id") == user_id:
-                session_data["session_id"] = key.replace(SessionManager.SESSION_PREFIX, "")
+        expired_ids = []
+        for session_id, value in zip(session_ids, values):
+            if value is None:
+                expired_ids.append(session_id)
+                continue
+            try:
+                session_data = cache_codec.decode(value)
+            except (ValueError, TypeError):
+                continue
+            if str(session_data.get("user_id")) == str(user_id):
+                session_data["session_id"] = session_id
                 user_sessions.append(session_data)
         
+        # Sessions expire on their own; drop them from the index lazily
+        if expired_ids:
+            await redis.srem(index_key, *expired_ids)
+        
         return user_sessions
     
     @staticmethod
     async def clear_user_sessions(user_id: str) -> int:
         """Clear all sessions for a user."""
-        pattern = f"{SessionManager.SESSION_PREFIX}*"
-        session_keys = await CacheService.keys(pattern)
-        
-        cleared = 0
-        for key in session_keys:
-            session_data = await CacheService.get(key, deserialize=True)
-            if session_data and session_data.get("user_id") == user_id:
-                if await CacheService.delete(key):
-                    cleared += 1
-        
-        return cleared
+        try:
+            redis = await CacheService.get_redis()
+            index_key = SessionManager._user_index_key(user_id)
+            session_ids = await redis.smembers(index_key)
+            
+            cleared = 0
+            if session_ids:
+                cleared = await redis.unlink(
+                    *[f"{SessionManager.SESSION_PREFIX}{sid}" for sid in session_ids]
+                )
+            await redis.unlink(index_key)
+            return cleared
+        except Exception as e:
+            print(f"Session clear error: {e}")
+            return 0
 
 # Initialization and cleanup functions
 async def init_redis():
@@ -0,0 +1,231 @@
+"""
+Read replica routing.
+
+Heavy read-only work goes to PostgreSQL read replicas so that it does not
+compete with OLTP writes on the primary. This covers analytics, dashboard
+statistics, data exports, anomaly scans and Celery report generation.
+Endpoints opt in with the ``get_read_db`` dependency. Workers use
+``read_session()``.
+
+Replicas from ``DATABASE_REPLICA_URLS`` are used round-robin. Each
+replica's replay lag is sampled at most every
+``DATABASE_REPLICA_LAG_CHECK_SECONDS`` by the request that finds the sample
+stale. A replica that lags more than ``DATABASE_REPLICA_MAX_LAG_SECONDS``
+or fails its check is skipped until a later check passes. When no replica
+qualifies, or none is configured, reads fall back to the primary. Inside a
+request, that fallback reuses the request's shared session.
+"""
+
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncGenerator, Callable, Dict, List, Optional
+import asyncio
+import logging
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from starlette.requests import Request
+
+from .config import settings
+from . import database
+
+logger = logging.getLogger(__name__)
+
+
+# Seconds the replica is behind; zero when it has replayed everything it received
+REPLICA_LAG_QUERY = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+@dataclass
+class Replica:
+    """A replica engine and its last lag sample."""
+    name: str
+    engine: AsyncEngine
+    session_factory: Callable[[], AsyncSession]
+    lag: Optional[float] = None
+    healthy: bool = False
+    usable: Optional[bool] = None
+    checked_at: float = float("-inf")
+    checking: bool = False
+    routed: int = 0
+
+
+def _create_replica_engine(url: str, name: str) -> AsyncEngine:
+    return create_async_engine(url, **database.engine_options(url, pool_name=name))
+
+
+class ReplicaRouter:
+    """Chooses a read replica within the lag budget, or None for the primary."""
+
+    def __init__(
+        self,
+        urls: Optional[List[str]] = None,
+        max_lag: Optional[float] = None,
+        check_interval: Optional[float] = None,
+        check_timeout: float = 2.0,
+        engine_factory: Optional[Callable[[str, str], AsyncEngine]] = None
+    ):
+        self.urls = list(settings.DATABASE_REPLICA_URLS if urls is None else urls)
+        self.max_lag = settings.DATABASE_REPLICA_MAX_LAG_SECONDS if max_lag is None else max_lag
+        self.check_interval = (
+            settings.DATABASE_REPLICA_LAG_CHECK_SECONDS if check_interval is None else check_interval
+        )
+        self.check_timeout = check_timeout
+        self._engine_factory = engine_factory or _create_replica_engine
+        self._replicas: Optional[List[Replica]] = None
+        self._next = 0
+        self.fallbacks = 0
+
+    @property
+    def replicas(self) -> List[Replica]:
+        # Engines are created on first use so primary-only deployments open nothing
+        if self._replicas is None:
+            self._replicas = []
+            for index, url in enumerate(self.urls):
+                name = f"replica{index}"
+                engine = self._engine_factory(url, name)
+                self._replicas.append(Replica(
+                    name=name,
+                    engine=engine,
+                    session_factory=async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+                ))
+        return self._replicas
+
+    async def replica_lag(self, conn: AsyncConnection) -> float:
+        """Replication lag in seconds as reported by the replica."""
+        return float((await conn.execute(REPLICA_LAG_QUERY)).scalar() or 0)
+
+    async def _sample_lag(self, replica: Replica) -> float:
+        async with replica.engine.connect() as conn:
+            return await self.replica_lag(conn)
+
+    async def _check(self, replica: Replica):
+        replica.checking = True
+        error = None
+        try:
+            # The timeout covers the connection checkout and connect, not just the query
+            replica.lag = await asyncio.wait_for(self._sample_lag(replica), self.check_timeout)
+            replica.healthy = True
+        except Exception as e:
+            replica.healthy = False
+            error = str(e) or type(e).__name__
+        finally:
+            replica.checked_at = time.monotonic()
+            replica.checking = False
+
+        # Log state changes only, not every check
+        usable = self._within_budget(replica)
+        if usable != replica.usable:
+            replica.usable = usable
+            if usable:
+                logger.info(f"Routing reads to replica {replica.name} ({replica.lag:.1f}s behind)")
+            elif error is not None:
+                logger.warning(f"Read replica {replica.name} failed its lag check, reading from the primary: {error}")
+            else:
+                logger.warning(
+                    f"Read replica {replica.name} is {replica.lag:.1f}s behind "
+                    f"(limit {self.max_lag}s), reading from the primary"
+                )
+
+    def _within_budget(self, replica: Replica) -> bool:
+        return replica.healthy and replica.lag is not None and replica.lag <= self.max_lag
+
+    async def _usable(self, replica: Replica) -> bool:
+        # One caller refreshes a stale sample; others use the last one meanwhile
+        if not replica.checking and time.monotonic() - replica.checked_at >= self.check_interval:
+            await self._check(replica)
+        return self._within_budget(replica)
+
+    async def choose(self) -> Optional[Replica]:
+        """The next usable replica in round-robin order, or None to read from the primary."""
+        replicas = self.replicas
+        for offset in range(len(replicas)):
+            index = (self._next + offset) % len(replicas)
+            replica = replicas[index]
+            if await self._usable(replica):
+                self._next = (index + 1) % len(replicas)
+                replica.routed += 1
+                return replica
+        if replicas:
+            self.fallbacks += 1
+        return None
+
+    @asynccontextmanager
+    async def session(self) -> AsyncGenerator[AsyncSession, None]:
+        """A session on a replica, or on the primary when none is usable."""
+        replica = await self.choose()
+        factory = replica.session_factory if replica else database.AsyncSessionFactory
+        async with factory() as session:
+            yield session
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "replicas": {
+                replica.name: {
+                    "healthy": replica.healthy,
+                    "lag_seconds": replica.lag,
+                    "routed": replica.routed
+                }
+                for replica in (self._replicas or [])
+            },
+            "max_lag_seconds": self.max_lag,
+            "fallbacks": self.fallbacks
+        }
+
+    async def dispose(self):
+        for replica in self._replicas or []:
+            await replica.engine.dispose()
+        self._replicas = None
+
+
+# Global replica router
+replica_router = ReplicaRouter()
+
+
+def read_session():
+    """
+    Session for read-only work outside a request (Celery report tasks, cache warming).
+
+    Usage::
+
+        async with read_session() as session:
+            ...
+    """
+    return replica_router.session()
+
+
+async def get_read_db(request: Request = None) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency for read-only endpoints.
+
+    Yields a replica session when a replica is within the lag budget.
+    Otherwise it yields the primary session that ``get_db`` would, which is
+    the request's shared session when there is one. Writes made through it
+    may land on a read-only replica, so use ``get_db`` alongside it for
+    those.
+    """
+    replica = await replica_router.choose()
+    if replica is None:
+        shared = database.request_session(request)
+        if shared is not None:
+            try:
+                yield shared
+            except Exception:
+                await shared.rollback()
+                raise
+            return
+
+    factory = replica.session_factory if replica else database.AsyncSessionFactory
+    async with factory() as session:
+        try:
+            yield session
+        except Exception:
+            await session.rollback()
+            raise
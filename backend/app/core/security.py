@@ -9,6 +9,7 @@ import secrets
 import uuid
 
 from .config import settings
+from . import api_key_auth
 from ..models.user import User
 
 # Password hashing context
@@ -28,18 +29,23 @@ class SecurityUtils:
     
     @staticmethod
     def generate_api_key() -> str:
-        """Generate a secure API key."""
-        return secrets.token_urlsafe(32)
+        """Generate a secure API key of the form ``dk_<key id>_<secret>``."""
+        return api_key_auth.generate_api_key()
+    
+    @staticmethod
+    def get_api_key_id(api_key: str) -> Optional[str]:
+        """Return the key ID embedded in an API key, or None if it is malformed."""
+        return api_key_auth.get_api_key_id(api_key)
     
     @staticmethod
     def hash_api_key(api_key: str) -> str:
-        """Hash an API key for secure storage."""
-        return pwd_context.hash(api_key)
+        """Hash an API key for secure storage (keyed HMAC-SHA256)."""
+        return api_key_auth.hash_api_key(api_key)
     
     @staticmethod
     def verify_api_key(plain_key: str, hashed_key: str) -> bool:
-        """Verify an API key against its hash."""
-        return pwd_context.verify(plain_key, hashed_key)
+        """Verify an API key against its hash in constant time."""
+        return api_key_auth.verify_api_key(plain_key, hashed_key)
     
     @staticmethod
     def generate_verification_token(user_id: Union[str, uuid.UUID]) -> str:
@@ -341,6 +347,10 @@ def hash_api_key(api_key: str) -> str:
     """Hash an API key for secure storage."""
     return SecurityUtils.hash_api_key(api_key)
 
+def get_api_key_id(api_key: str) -> Optional[str]:
+    """Return the key ID embedded in an API key."""
+    return SecurityUtils.get_api_key_id(api_key)
+
 def verify_api_key(plain_key: str, hashed_key: str) -> bool:
     """Verify an API key against its hash."""
     return SecurityUtils.verify_api_key(plain_key, hashed_key)
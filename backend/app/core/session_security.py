@@ -19,6 +19,7 @@ from sqlalchemy import select, update, delete, and_, or_, func
 
 from ..core.config import settings
 from ..core.redis import redis_manager
+from ..core.principal_cache import principal_cache
 from ..models.user import User
 
 
@@ -447,6 +448,8 @@ class SessionSecurityManager:
                     if user_id:
                         user_sessions_key = f"user_sessions:{user_id}"
                         await redis_manager.redis_client.srem(user_sessions_key, session_id)
+                        # Cached principals are per token, not per session
+                        await principal_cache.invalidate(user_id)
             
             # Update database
             # Implementation depends on your session model
@@ -0,0 +1,150 @@
+"""
+Tenant resolution cache.
+
+``TenantMiddleware`` resolves a tenant for every request that carries a
+tenant header, subdomain or API key. Resolved tenants are cached as column
+snapshots in the multi-layer cache. The in-process L1 answers nearly every
+request without I/O, Redis (L2) shares results between processes, and a
+database session is only opened on a miss. Lookups that find no tenant are
+cached briefly as well, so requests for unknown slugs do not each cost a
+query.
+
+Entries are tagged with their tenant ID. ``TenantService._clear_tenant_cache``
+drops them, and the cache manager tells the other processes to evict
+their L1 copies.
+"""
+
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import copy
+import hashlib
+import logging
+
+from .config import settings
+from .cache_manager import cache_manager, single_flight
+from app.models.tenant import Tenant
+
+logger = logging.getLogger(__name__)
+
+
+TENANT_CACHE_PREFIX = "tenant:resolve"
+# Stored for lookups that found no tenant
+_MISSING = {"__tenant_missing__": True}
+
+
+def tenant_tag(tenant_id: str) -> str:
+    """Cache tag carried by every entry that resolves to ``tenant_id``."""
+    return f"tenant:{tenant_id}"
+
+
+class TenantCache:
+    """Caches tenant lookups by ID, slug and API key."""
+
+    def __init__(
+        self,
+        ttl: Optional[int] = None,
+        l2_ttl: Optional[int] = None,
+        negative_ttl: Optional[int] = None
+    ):
+        self.ttl = ttl or settings.TENANT_CACHE_TTL_SECONDS
+        self.l2_ttl = l2_ttl or settings.TENANT_CACHE_L2_TTL_SECONDS
+        self.negative_ttl = negative_ttl or settings.TENANT_CACHE_NEGATIVE_TTL_SECONDS
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def cache_key(kind: str, value: str) -> str:
+        if kind == "api_key":
+            # Raw API keys never appear in cache keys
+            value = hashlib.sha256(value.encode()).hexdigest()
+        return f"{TENANT_CACHE_PREFIX}:{kind}:{value}"
+
+    @staticmethod
+    def _snapshot(tenant: Tenant) -> Dict[str, Any]:
+        return {column.name: getattr(tenant, column.name) for column in Tenant.__table__.columns}
+
+    @staticmethod
+    def _restore(snapshot: Dict[str, Any]) -> Tenant:
+        # A new detached instance per caller; JSON columns are copied so
+        # nobody can mutate the cached entry
+        return Tenant(**{
+            name: copy.deepcopy(value) if isinstance(value, (dict, list)) else value
+            for name, value in snapshot.items()
+        })
+
+    async def resolve(
+        self,
+        kind: str,
+        value: str,
+        load: Callable[[], Awaitable[Optional[Tenant]]],
+        ttl: Optional[int] = None,
+        cache_missing: bool = True
+    ) -> Optional[Tenant]:
+        """
+        Return the tenant for ``kind``/``value``, calling ``load`` only on a miss.
+
+        Concurrent misses for the same key share one ``load`` call. Errors
+        from ``load`` propagate and nothing is cached.
+        """
+        key = self.cache_key(kind, value)
+        try:
+            cached = await cache_manager.get(key)
+        except Exception as e:
+            logger.warning(f"Tenant cache lookup failed for {key}: {e}")
+            cached = None
+
+        if cached is not None:
+            self.hits += 1
+            return None if cached == _MISSING else self._restore(cached)
+
+        self.misses += 1
+        snapshot = await single_flight.do(key, lambda: self._fill(key, load, ttl, cache_missing))
+        return self._restore(snapshot) if snapshot is not None else None
+
+    async def _fill(
+        self,
+        key: str,
+        load: Callable[[], Awaitable[Optional[Tenant]]],
+        ttl: Optional[int],
+        cache_missing: bool
+    ) -> Optional[Dict[str, Any]]:
+        tenant = await load()
+        if tenant is None:
+            if cache_missing:
+                await self._store(key, _MISSING, self.negative_ttl, self.negative_ttl)
+            return None
+
+        snapshot = self._snapshot(tenant)
+        await self._store(
+            key, snapshot, ttl or self.ttl, ttl or self.l2_ttl, tags=[tenant_tag(tenant.id)]
+        )
+        return snapshot
+
+    async def _store(self, key: str, value: Any, l1_ttl: int, l2_ttl: int, tags: List[str] = None):
+        try:
+            await cache_manager.set(key, value, l1_ttl=l1_ttl, l2_ttl=l2_ttl, tags=tags)
+        except Exception as e:
+            logger.warning(f"Tenant cache store failed for {key}: {e}")
+
+    async def invalidate(self, tenant_id: str, slug: Optional[str] = None) -> int:
+        """Drop every cached lookup for a tenant, plus a negative entry for its slug."""
+        count = await cache_manager.invalidate_by_tag(tenant_tag(tenant_id))
+        # Negative entries carry no tenant tag
+        keys = [self.cache_key("id", tenant_id)]
+        if slug:
+            keys.append(self.cache_key("slug", slug))
+        for key in keys:
+            if await cache_manager.delete(key):
+                count += 1
+        return count
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0
+        }
+
+
+# Global tenant cache instance
+tenant_cache = TenantCache()
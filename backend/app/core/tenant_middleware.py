@@ -4,42 +4,45 @@ Tenant-aware middleware for multi-tenant request processing.
 
 import logging
 from fastapi import HTTPException, status, Request
-from fastapi.responses import Response
+from fastapi.responses import JSONResponse, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import MutableHeaders
+from starlette.types import Scope
 from typing import Optional
 
+from app.core.asgi import HTTPMiddleware
 from app.core.database import get_session
+from app.core.tenant_cache import tenant_cache
 from app.services.tenant_service import TenantService
 from app.models.tenant import Tenant
 
 logger = logging.getLogger(__name__)
 
 
-class TenantMiddleware(BaseHTTPMiddleware):
+class TenantMiddleware(HTTPMiddleware):
     """
     Middleware to handle tenant context and multi-tenant data isolation.
     """
     
     def __init__(self, app):
         super().__init__(app)
-        self.exempt_paths = [
+        self.exempt_paths = (
             "/docs",
             "/redoc", 
             "/openapi.json",
             "/api/v1/auth",
             "/api/v1/monitoring/health",
             "/favicon.ico",
-        ]
+        )
     
-    async def dispatch(self, request: Request, call_next):
+    def should_process(self, scope: Scope) -> bool:
+        # Skip tenant processing for exempt paths
+        return not scope["path"].startswith(self.exempt_paths)
+    
+    async def before_request(self, request: Request) -> Optional[Response]:
         """
         Process request with tenant context injection.
         """
-        # Skip tenant processing for exempt paths
-        if any(request.url.path.startswith(path) for path in self.exempt_paths):
-            return await call_next(request)
-        
         try:
             # Extract tenant information from request
             tenant = await self._extract_tenant(request)
@@ -50,30 +53,27 @@ class TenantMiddleware(BaseHTTPMiddleware):
             
             # Validate tenant permissions for the request
             if tenant and not await self._validate_tenant_access(tenant, request):
-                raise HTTPException(
+                return JSONResponse(
                     status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Tenant access denied for this resource"
+                    content={"detail": "Tenant access denied for this resource"}
                 )
             
-            # Process request
-            response = await call_next(request)
-            
-            # Add tenant headers to response
-            if tenant:
-                response.headers["X-Tenant-ID"] = tenant.id
-                response.headers["X-Tenant-Plan"] = tenant.plan_type
-            
-            return response
+            return None
             
-        except HTTPException:
-            raise
         except Exception as e:
             logger.error(f"Tenant middleware error: {e}")
-            raise HTTPException(
+            return JSONResponse(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Tenant processing error"
+                content={"detail": "Tenant processing error"}
             )
     
+    async def on_response_start(self, request: Request, status_code: int, headers: MutableHeaders):
+        # Add tenant headers to response
+        tenant = request.state.tenant
+        if tenant:
+            headers["X-Tenant-ID"] = str(tenant.id)
+            headers["X-Tenant-Plan"] = str(tenant.plan_type)
+    
     async def _extract_tenant(self, request: Request) -> Optional[Tenant]:
         """
         Extract tenant from request headers or API key.
@@ -81,56 +81,69 @@ class TenantMiddleware(BaseHTTPMiddleware):
         # Try X-Tenant-ID header first
         tenant_id = request.headers.get("X-Tenant-ID")
         if tenant_id:
-            return await self._get_tenant_by_id(tenant_id)
+            return await self._get_tenant_by_id(tenant_id, request)
         
         # Try tenant slug from subdomain
         host = request.headers.get("host", "")
         if "." in host:
             subdomain = host.split(".")[0]
             if subdomain and subdomain != "www" and subdomain != "api":
-                return await self._get_tenant_by_slug(subdomain)
+                return await self._get_tenant_by_slug(subdomain, request)
         
         # Try API key for tenant-scoped requests
         api_key = request.headers.get("X-API-Key")
         if api_key:
-            return await self._get_tenant_by_api_key(api_key)
+            return await self._get_tenant_by_api_key(api_key, request)
         
         # For authenticated users, get tenant from user context
         # This will be handled in the dependency injection layer
         return None
     
-    async def _get_tenant_by_id(self, tenant_id: str) -> Optional[Tenant]:
-        """Get tenant by ID."""
+    async def _get_tenant_by_id(self, tenant_id: str, request: Optional[Request] = None) -> Optional[Tenant]:
+        """Get tenant by ID; misses are loaded on the request's shared session."""
+        async def load():
+            async for db in get_session(request):
+                return await TenantService.load_tenant_by_id(tenant_id, db)
+        
         try:
-            async for db in get_session():
-                tenant = await TenantService.get_tenant_by_id(tenant_id, db)
-                if tenant and tenant.is_active and not tenant.is_suspended:
-                    return tenant
-                return None
+            tenant = await tenant_cache.resolve("id", tenant_id, load)
+            if tenant and tenant.is_active and not tenant.is_suspended:
+                return tenant
+            return None
         except Exception as e:
             logger.warning(f"Failed to get tenant by ID {tenant_id}: {e}")
             return None
     
-    async def _get_tenant_by_slug(self, slug: str) -> Optional[Tenant]:
-        """Get tenant by slug."""
+    async def _get_tenant_by_slug(self, slug: str, request: Optional[Request] = None) -> Optional[Tenant]:
+        """Get tenant by slug; unknown slugs are cached briefly too."""
+        async def load():
+            async for db in get_session(request):
+                return await TenantService.load_tenant_by_slug(slug, db)
+        
         try:
-            async for db in get_session():
-                tenant = await TenantService.get_tenant_by_slug(slug, db)
-                if tenant and tenant.is_active and not tenant.is_suspended:
-                    return tenant
-                return None
+            tenant = await tenant_cache.resolve("slug", slug, load)
+            if tenant and tenant.is_active and not tenant.is_suspended:
+                return tenant
+            return None
         except Exception as e:
             logger.warning(f"Failed to get tenant by slug {slug}: {e}")
             return None
     
-    async def _get_tenant_by_api_key(self, api_key: str) -> Optional[Tenant]:
+    async def _get_tenant_by_api_key(self, api_key: str, request: Optional[Request] = None) -> Optional[Tenant]:
         """Get tenant by API key."""
-        try:
-            async for db in get_session():
+        async def load():
+            async for db in get_session(request):
                 tenant_key = await TenantService.validate_tenant_api_key(api_key, db)
-                if tenant_key and tenant_key.tenant:
-                    return tenant_key.tenant
+                if tenant_key:
+                    return await TenantService.load_tenant_by_id(tenant_key.tenant_id, db)
                 return None
+        
+        try:
+            # Keys are re-validated (and their usage recorded) once the short
+            # TTL runs out; invalid keys are not cached
+            return await tenant_cache.resolve(
+                "api_key", api_key, load, ttl=tenant_cache.negative_ttl, cache_missing=False
+            )
         except Exception as e:
             logger.warning(f"Failed to get tenant by API key: {e}")
             return None
@@ -0,0 +1,258 @@
+"""
+Process-local token leasing in front of Redis rate limits.
+
+Instead of asking Redis about every request, each process reserves a block
+of tokens for an identifier with one script call and spends them locally.
+When a lease runs low it is topped up in the background, so hot identifiers
+cost one Redis call per lease rather than one per request. Denials are
+remembered locally until their retry time, so rejected clients do not reach
+Redis either.
+
+Tokens are counted in Redis when they are leased, not when they are spent,
+so the limit is never exceeded. The cost is that tokens leased but not spent
+before a lease expires are lost, which can reject up to one lease per process
+early. Limits too small to split into leases are checked one request at a
+time, exactly as before.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+
+from .config import settings
+from .redis import redis_manager
+
+logger = logging.getLogger(__name__)
+
+
+# Reserve up to ARGV[2] tokens across several sliding-window counters.
+# Windows use the same two-bucket estimate as the middleware limiter.
+#
+# KEYS: guard key (a block that denies everything while it exists), then the
+#       current and previous bucket key for each window, in pairs
+# ARGV: now, requested, use guard (1/0), then window size and limit per window
+# Returns {granted, estimate for first window, retry after, exhausted window index}
+LEASE_SCRIPT = """
+local now = tonumber(ARGV[1])
+local requested = tonumber(ARGV[2])
+
+if ARGV[3] == '1' then
+    local blocked = redis.call('TTL', KEYS[1])
+    if blocked > 0 then
+        return {0, 0, blocked, 0}
+    end
+end
+
+local windows = (#ARGV - 3) / 2
+local granted = requested
+local retry_after = 0
+local first = 0
+
+for i = 1, windows do
+    local size = tonumber(ARGV[2 + 2 * i])
+    local limit = tonumber(ARGV[3 + 2 * i])
+    local current = tonumber(redis.call('GET', KEYS[2 * i]) or '0')
+    local previous = tonumber(redis.call('GET', KEYS[2 * i + 1]) or '0')
+    local elapsed = (now % size) / size
+    local estimate = previous * (1 - elapsed) + current
+    local available = math.floor(limit - estimate)
+
+    if i == 1 then
+        first = estimate
+    end
+    if available < granted then
+        granted = math.max(available, 0)
+    end
+    if granted == 0 then
+        if previous > 0 and current + 1 <= limit then
+            local needed = 1 - (limit - current - 1) / previous
+            retry_after = math.ceil((needed - elapsed) * size)
+        else
+            retry_after = math.ceil(size - (now % size))
+        end
+        return {0, math.floor(estimate), math.max(retry_after, 1), i}
+    end
+end
+
+for i = 1, windows do
+    local size = tonumber(ARGV[2 + 2 * i])
+    redis.call('INCRBY', KEYS[2 * i], granted)
+    redis.call('EXPIRE', KEYS[2 * i], size * 2)
+end
+return {granted, math.floor(first + granted), 0, 0}
+"""
+
+
+class _Lease:
+    """Tokens reserved in Redis for one identifier and not yet spent."""
+
+    __slots__ = ("tokens", "expires_at", "denied_until", "retry_after", "denied_window", "requests", "refresh")
+
+    def __init__(self):
+        self.tokens = 0
+        self.expires_at = 0.0
+        self.denied_until = 0.0
+        self.retry_after = 0
+        # 1-based index of the window that ran out; 0 when a guard key blocked
+        self.denied_window = 0
+        # Estimated requests in the first window, for rate limit headers
+        self.requests = 0
+        self.refresh: Optional[asyncio.Task] = None
+
+
+class TokenLeaseLimiter:
+    """Rate limits checked against locally leased tokens."""
+
+    def __init__(
+        self,
+        max_lease: Optional[int] = None,
+        lease_ttl: Optional[float] = None,
+        lease_fraction: int = 20,
+        low_water: float = 0.25,
+        max_identifiers: int = 10000
+    ):
+        self.max_lease = max_lease or settings.RATE_LIMIT_LEASE_MAX_TOKENS
+        self.lease_ttl = lease_ttl or settings.RATE_LIMIT_LEASE_TTL_SECONDS
+        # A lease never takes more than 1/lease_fraction of the tightest limit
+        self.lease_fraction = lease_fraction
+        self.low_water = low_water
+        self.max_identifiers = max_identifiers
+        self._leases: "OrderedDict[str, _Lease]" = OrderedDict()
+        self._script = None
+        self.local_hits = 0
+        self.redis_calls = 0
+
+    def lease_size(self, windows: List[Tuple[str, int, int]]) -> int:
+        """Tokens to reserve per Redis call; 1 means every request is checked in Redis."""
+        tightest = min(limit for _, _, limit in windows)
+        return max(1, min(self.max_lease, tightest // self.lease_fraction))
+
+    async def acquire(
+        self,
+        identifier: str,
+        windows: List[Tuple[str, int, int]],
+        guard_key: Optional[str] = None
+    ) -> Tuple[bool, Dict[str, Any]]:
+        """
+        Spend one token for ``identifier``.
+
+        ``windows`` is a list of ``(name, size_seconds, limit)``; all of them
+        must have room. Returns ``(allowed, metadata)`` like the limiters.
+        """
+        now = time.monotonic()
+        lease = self._leases.get(identifier)
+        if lease is None:
+            lease = self._leases[identifier] = _Lease()
+            if len(self._leases) > self.max_identifiers:
+                self._evict()
+        else:
+            self._leases.move_to_end(identifier)
+
+        if lease.denied_until > now:
+            self.local_hits += 1
+            return False, self._denial(lease, max(1, int(lease.denied_until - now)))
+
+        if lease.tokens > 0 and lease.expires_at > now:
+            self.local_hits += 1
+        else:
+            # Concurrent requests share one refill; retry if others took its tokens
+            for _ in range(3):
+                if lease.refresh is None or lease.refresh.done():
+                    lease.refresh = asyncio.create_task(self._refill(identifier, lease, windows, guard_key))
+                if not await asyncio.shield(lease.refresh):
+                    # Redis is unreachable; leave the decision to the caller
+                    raise ConnectionError("Rate limit lease unavailable")
+                now = time.monotonic()
+                if lease.tokens > 0 and lease.expires_at > now:
+                    break
+                if lease.denied_until > now:
+                    return False, self._denial(lease, lease.retry_after)
+            else:
+                raise ConnectionError("Rate limit lease contended")
+
+        lease.tokens -= 1
+        lease.requests += 1
+        size = self.lease_size(windows)
+        if size > 1 and lease.tokens <= size * self.low_water and (lease.refresh is None or lease.refresh.done()):
+            # Top up before the lease runs out so requests never wait on Redis
+            lease.refresh = asyncio.create_task(self._refill(identifier, lease, windows, guard_key))
+        return True, {"requests": lease.requests}
+
+    async def _refill(
+        self,
+        identifier: str,
+        lease: _Lease,
+        windows: List[Tuple[str, int, int]],
+        guard_key: Optional[str]
+    ) -> bool:
+        timestamp = time.time()
+        requested = self.lease_size(windows)
+        keys = [guard_key or f"rate_limit:lease:{identifier}:guard"]
+        args = [timestamp, requested, 1 if guard_key else 0]
+        for window_name, window_size, limit in windows:
+            bucket = int(timestamp // window_size)
+            keys.append(f"rate_limit:lease:{identifier}:{window_name}:{bucket}")
+            keys.append(f"rate_limit:lease:{identifier}:{window_name}:{bucket - 1}")
+            args.extend([window_size, limit])
+
+        try:
+            client = await redis_manager.connect()
+            if self._script is None or self._script.registered_client is not client:
+                self._script = client.register_script(LEASE_SCRIPT)
+            self.redis_calls += 1
+            granted, requests, retry_after, denied_window = await self._script(keys=keys, args=args)
+        except Exception as e:
+            logger.error(f"Rate limit lease refill failed for {identifier}: {e}")
+            return False
+
+        now = time.monotonic()
+        granted = int(granted)
+        if lease.expires_at <= now:
+            # Unspent tokens of an expired lease are not carried over
+            lease.tokens = 0
+        lease.tokens += granted
+        lease.requests = int(requests) - lease.tokens
+        if granted > 0:
+            lease.expires_at = now + self.lease_ttl
+            lease.denied_until = 0.0
+        elif lease.tokens <= 0:
+            lease.retry_after = int(retry_after)
+            lease.denied_window = int(denied_window)
+            lease.denied_until = now + int(retry_after)
+        return True
+
+    @staticmethod
+    def _denial(lease: _Lease, retry_after: int) -> Dict[str, Any]:
+        return {"retry_after": retry_after, "requests": lease.requests, "window_index": lease.denied_window}
+
+    def _evict(self):
+        # Drop the least recently used identifiers that have no refill in flight
+        while len(self._leases) > self.max_identifiers:
+            identifier, lease = self._leases.popitem(last=False)
+            if lease.refresh is not None and not lease.refresh.done():
+                self._leases[identifier] = lease
+                break
+
+    def forget(self, identifier: str):
+        """Drop the local lease so the next request goes to Redis."""
+        self._leases.pop(identifier, None)
+
+    def forget_prefix(self, prefix: str):
+        """Drop every local lease whose identifier starts with ``prefix``."""
+        for identifier in [i for i in self._leases if i.startswith(prefix)]:
+            del self._leases[identifier]
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.local_hits + self.redis_calls
+        return {
+            "identifiers": len(self._leases),
+            "local_hits": self.local_hits,
+            "redis_calls": self.redis_calls,
+            "local_hit_ratio": round(self.local_hits / total, 4) if total else 0.0
+        }
+
+
+# Shared by both rate limiter implementations
+token_lease_limiter = TokenLeaseLimiter()
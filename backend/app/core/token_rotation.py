@@ -20,6 +20,7 @@ from sqlalchemy.orm import selectinload
 from .database import get_session
 from .security import JWTManager, SecurityUtils
 from .redis import CacheService
+from .principal_cache import principal_cache
 from ..models.user import User
 from ..models.token_family import RefreshToken, TokenFamily, TokenStatus
 
@@ -381,6 +382,9 @@ class TokenRotationManager:
             for family in families:
                 await self._revoke_token_family(str(family.id), db, reason)
             
+            # Also covers users whose families had already expired
+            await principal_cache.invalidate(user_id)
+            
             logger.warning(
                 f"All user tokens revoked",
                 extra={
@@ -467,16 +471,20 @@ class TokenRotationManager:
             )
             
             # Deactivate family
-            await db.execute(
+            result = await db.execute(
                 update(TokenFamily)
                 .where(TokenFamily.id == uuid.UUID(family_id))
                 .values(is_active=False, revoked_at=datetime.utcnow())
+                .returning(TokenFamily.user_id)
             )
+            user_id = result.scalar_one_or_none()
             
             await db.commit()
             
             # Remove from cache
             await self._remove_family_from_cache(family_id)
+            if user_id is not None:
+                await principal_cache.invalidate(user_id)
             
             logger.warning(
                 f"Token family revoked",
@@ -5,17 +5,16 @@ Automatically captures and logs all HTTP requests and responses for compliance a
 
 import time
 import json
-from typing import Callable
+from typing import Optional
 from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Scope
 
+from ..core.asgi import HTTPMiddleware, replay_body
 from ..core.audit_logger import audit_logger, AuditEventType, AuditSeverity
-from ..core.deps import get_current_user_optional
-from ..core.database import get_db
 
 
-class AuditLoggingMiddleware(BaseHTTPMiddleware):
+class AuditLoggingMiddleware(HTTPMiddleware):
     """Middleware to automatically log all HTTP requests and responses."""
     
     def __init__(
@@ -29,17 +28,17 @@ class AuditLoggingMiddleware(BaseHTTPMiddleware):
         super().__init__(app)
         self.log_request_body = log_request_body
         self.log_response_body = log_response_body
-        self.excluded_paths = excluded_paths or {
+        self.excluded_paths = tuple(excluded_paths or {
             "/health", "/docs", "/redoc", "/openapi.json",
             "/favicon.ico", "/static"
-        }
+        })
         self.sensitive_headers = sensitive_headers or {
             "authorization", "cookie", "x-api-key", "x-auth-token"
         }
     
     def should_log_request(self, path: str) -> bool:
         """Determine if request should be logged."""
-        return not any(path.startswith(excluded) for excluded in self.excluded_paths)
+        return not path.startswith(self.excluded_paths)
     
     def sanitize_headers(self, headers: dict) -> dict:
         """Remove sensitive information from headers."""
@@ -99,43 +98,23 @@ class AuditLoggingMiddleware(BaseHTTPMiddleware):
         
         return None, None
     
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        """Process request and log audit information."""
-        
+    def should_process(self, scope: Scope) -> bool:
         # Skip logging for excluded paths
-        if not self.should_log_request(request.url.path):
-            return await call_next(request)
+        return self.should_log_request(scope["path"])
+    
+    async def before_request(self, request: Request) -> Optional[Response]:
+        """Capture request information before it is processed."""
         
         # Start timing
-        start_time = time.time()
+        request.state.audit_start_time = time.time()
         
         # Extract request information
         method = request.method
-        path = request.url.path
-        ip_address = request.client.host if request.client else "unknown"
-        user_agent = request.headers.get("user-agent", "unknown")
-        
-        # Get user information if available
-        user_id = None
-        session_id = None
-        try:
-            # Try to extract user from token
-            auth_header = request.headers.get("authorization")
-            if auth_header:
-                # This is a simplified extraction - in practice, you'd decode the JWT
-                # For now, we'll set these during actual user authentication
-                pass
-                
-            # Extract session ID from cookies
-            session_id = request.cookies.get("session_id")
-            
-        except Exception:
-            pass  # Continue without user info
         
         # Prepare request details
         request_details = {
             "method": method,
-            "path": path,
+            "path": request.url.path,
             "query_params": dict(request.query_params),
             "headers": self.sanitize_headers(dict(request.headers)),
             "content_type": request.headers.get("content-type")
@@ -144,8 +123,9 @@ class AuditLoggingMiddleware(BaseHTTPMiddleware):
         # Add request body if configured and not too large
         if self.log_request_body and method in ["POST", "PUT", "PATCH"]:
             try:
-                # Read body without consuming it
                 body = await request.body()
+                # The body has been consumed; hand it on to the application
+                replay_body(request, body)
                 if len(body) < 10240:  # Only log bodies smaller than 10KB
                     content_type = request.headers.get("content-type", "")
                     if "application/json" in content_type:
@@ -158,115 +138,99 @@ class AuditLoggingMiddleware(BaseHTTPMiddleware):
                 else:
                     request_details["body"] = f"[Large body: {len(body)} bytes]"
                 
-                # Recreate request with body for downstream processing
-                # This is a bit complex with ASGI, so we'll skip it for now
-                
             except Exception as e:
                 request_details["body_error"] = str(e)
         
-        # Process the request
-        try:
-            response = await call_next(request)
-            status_code = response.status_code
-            outcome = "SUCCESS" if status_code < 400 else "FAILURE"
-            
-        except Exception as e:
+        request.state.audit_details = request_details
+        return None
+    
+    async def on_response_start(self, request: Request, status_code: int, headers: MutableHeaders):
+        request.state.audit_response_headers = self.sanitize_headers(dict(headers))
+    
+    async def after_response(self, request: Request, status_code: int, error: Optional[BaseException]):
+        """Log audit information once the response is finished."""
+        method = request.method
+        path = request.url.path
+        
+        if error is not None:
             status_code = 500
             outcome = "ERROR"
-            # Re-raise the exception
-            raise
+        else:
+            outcome = "SUCCESS" if status_code < 400 else "FAILURE"
         
-        finally:
-            # Calculate duration
-            duration_ms = int((time.time() - start_time) * 1000)
-            
-            # Determine event details
-            event_type = self.determine_event_type(method, path)
-            severity = self.determine_severity(method, status_code)
-            resource_type, resource_id = self.extract_resource_info(path)
-            
-            # Prepare response details
-            response_details = request_details.copy()
-            response_details.update({
-                "status_code": status_code,
-                "duration_ms": duration_ms,
-                "outcome": outcome
-            })
-            
-            # Add response headers (safely handle if not available)
-            if 'response' in locals():
-                try:
-                    # Response headers might not be available in ASGI middleware
-                    if hasattr(response, 'headers'):
-                        response_details["response_headers"] = self.sanitize_headers(dict(response.headers))
-                except (AttributeError, TypeError, KeyError):
-                    # Headers not available in this context
-                    pass
-            
-            # Create audit message
-            if outcome == "SUCCESS":
-                message = f"{method} {path} - {status_code}"
-            else:
-                message = f"{method} {path} - FAILED ({status_code})"
-            
-            # Log the audit event
-            try:
-                # Get database session for logging
-                async for db in get_db():
-                    await audit_logger.log_event(
-                        event_type=event_type,
-                        message=message,
-                        severity=severity,
-                        user_id=user_id,
-                        session_id=session_id,
-                        ip_address=ip_address,
-                        user_agent=user_agent,
-                        resource_type=resource_type,
-                        resource_id=resource_id,
-                        action=method.lower(),
-                        outcome=outcome,
-                        details=response_details,
-                        request_path=path,
-                        request_method=method,
-                        response_status=status_code,
-                        duration_ms=duration_ms,
-                        db=db
-                    )
-                    break  # Exit after first iteration
-                    
-            except Exception as e:
-                # Log error but don't fail the request
-                audit_logger.logger.error(f"Failed to log audit event: {e}")
+        # Calculate duration
+        duration_ms = int((time.time() - request.state.audit_start_time) * 1000)
+        
+        # Determine event details
+        event_type = self.determine_event_type(method, path)
+        severity = self.determine_severity(method, status_code)
+        resource_type, resource_id = self.extract_resource_info(path)
+        
+        # Prepare response details
+        response_details = request.state.audit_details.copy()
+        response_details.update({
+            "status_code": status_code,
+            "duration_ms": duration_ms,
+            "outcome": outcome
+        })
+        response_headers = getattr(request.state, "audit_response_headers", None)
+        if response_headers is not None:
+            response_details["response_headers"] = response_headers
+        
+        # Create audit message
+        if outcome == "SUCCESS":
+            message = f"{method} {path} - {status_code}"
+        else:
+            message = f"{method} {path} - FAILED ({status_code})"
         
-        return response
+        # Log the audit event (queued; persisted in batches by the audit writer)
+        try:
+            await audit_logger.log_event(
+                event_type=event_type,
+                message=message,
+                severity=severity,
+                user_id=None,
+                session_id=request.cookies.get("session_id"),
+                ip_address=request.client.host if request.client else "unknown",
+                user_agent=request.headers.get("user-agent", "unknown"),
+                resource_type=resource_type,
+                resource_id=resource_id,
+                action=method.lower(),
+                outcome=outcome,
+                details=response_details,
+                request_path=path,
+                request_method=method,
+                response_status=status_code,
+                duration_ms=duration_ms
+            )
+                
+        except Exception as e:
+            # Log error but don't fail the request
+            audit_logger.logger.error(f"Failed to log audit event: {e}")
 
 
-class SecurityAuditMiddleware(BaseHTTPMiddleware):
+class SecurityAuditMiddleware(HTTPMiddleware):
     """Specialized middleware for security event logging."""
     
     def __init__(self, app: ASGIApp):
         super().__init__(app)
     
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    async def before_request(self, request: Request) -> Optional[Response]:
         """Monitor for security events."""
         
         # Check for suspicious patterns
         await self._check_suspicious_requests(request)
-        
-        # Process request
-        try:
-            response = await call_next(request)
-            
-            # Check for security-related response codes
-            if response.status_code in [401, 403]:
-                await self._log_access_denied(request, response.status_code)
-            
-            return response
-            
-        except Exception as e:
-            # Log any unhandled exceptions as security events
-            await self._log_security_exception(request, str(e))
-            raise
+        return None
+    
+    async def on_response_start(self, request: Request, status_code: int, headers: MutableHeaders):
+        # Check for security-related response codes
+        if status_code in [401, 403]:
+            await self._log_access_denied(request, status_code)
+    
+    async def after_response(self, request: Request, status_code: int, error: Optional[BaseException]):
+        # Log any unhandled exceptions as security events
+        if error is not None:
+            await self._log_security_exception(request, str(error))
     
     async def _check_suspicious_requests(self, request: Request):
         """Check for suspicious request patterns."""
@@ -299,59 +263,50 @@ class SecurityAuditMiddleware(BaseHTTPMiddleware):
         if suspicious_indicators:
             ip_address = request.client.host if request.client else "unknown"
             
-            async for db in get_db():
-                await audit_logger.log_event(
-                    event_type=AuditEventType.SUSPICIOUS_ACTIVITY,
-                    message=f"Suspicious request detected: {', '.join(suspicious_indicators)}",
-                    severity=AuditSeverity.HIGH,
-                    ip_address=ip_address,
-                    user_agent=request.headers.get("user-agent"),
-                    request_path=str(request.url.path),
-                    request_method=request.method,
-                    outcome="FAILURE",
-                    details={
-                        "indicators": suspicious_indicators,
-                        "query_string": query_string,
-                        "full_url": str(request.url)
-                    },
-                    db=db
-                )
-                break
-    
-    async def _log_access_denied(self, request: Request, status_code: int):
-        """Log access denied events."""
-        ip_address = request.client.host if request.client else "unknown"
-        
-        async for db in get_db():
             await audit_logger.log_event(
-                event_type=AuditEventType.ACCESS_DENIED,
-                message=f"Access denied: {status_code}",
-                severity=AuditSeverity.MEDIUM,
+                event_type=AuditEventType.SUSPICIOUS_ACTIVITY,
+                message=f"Suspicious request detected: {', '.join(suspicious_indicators)}",
+                severity=AuditSeverity.HIGH,
                 ip_address=ip_address,
                 user_agent=request.headers.get("user-agent"),
                 request_path=str(request.url.path),
                 request_method=request.method,
-                response_status=status_code,
                 outcome="FAILURE",
-                db=db
+                details={
+                    "indicators": suspicious_indicators,
+                    "query_string": query_string,
+                    "full_url": str(request.url)
+                }
             )
-            break
+    
+    async def _log_access_denied(self, request: Request, status_code: int):
+        """Log access denied events."""
+        ip_address = request.client.host if request.client else "unknown"
+        
+        await audit_logger.log_event(
+            event_type=AuditEventType.ACCESS_DENIED,
+            message=f"Access denied: {status_code}",
+            severity=AuditSeverity.MEDIUM,
+            ip_address=ip_address,
+            user_agent=request.headers.get("user-agent"),
+            request_path=str(request.url.path),
+            request_method=request.method,
+            response_status=status_code,
+            outcome="FAILURE"
+        )
     
     async def _log_security_exception(self, request: Request, error: str):
         """Log security exceptions."""
         ip_address = request.client.host if request.client else "unknown"
         
-        async for db in get_db():
-            await audit_logger.log_event(
-                event_type=AuditEventType.SUSPICIOUS_ACTIVITY,
-                message=f"Security exception: {error}",
-                severity=AuditSeverity.CRITICAL,
-                ip_address=ip_address,
-                user_agent=request.headers.get("user-agent"),
-                request_path=str(request.url.path),
-                request_method=request.method,
-                outcome="ERROR",
-                details={"exception": error},
-                db=db
-            )
-            break
\ No newline at end of file
+        await audit_logger.log_event(
+            event_type=AuditEventType.SUSPICIOUS_ACTIVITY,
+            message=f"Security exception: {error}",
+            severity=AuditSeverity.CRITICAL,
+            ip_address=ip_address,
+            user_agent=request.headers.get("user-agent"),
+            request_path=str(request.url.path),
+            request_method=request.method,
+            outcome="ERROR",
+            details={"exception": error}
+        )
\ No newline at end of file
@@ -10,14 +10,15 @@ import time
 from typing import Optional, Set, Callable
 from fastapi import Request, Response, HTTPException
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Scope
 
+from ..core.asgi import HTTPMiddleware, set_cookie
 from ..core.config import settings
 from ..core.redis import redis_manager, CacheService
 
 
-class CSRFProtectionMiddleware(BaseHTTPMiddleware):
+class CSRFProtectionMiddleware(HTTPMiddleware):
     """
     CSRF protection middleware implementing double-submit cookie pattern.
     
@@ -131,36 +132,16 @@ class CSRFProtectionMiddleware(BaseHTTPMiddleware):
         """Check if the request path is exempt from CSRF protection."""
         return any(path.startswith(exempt_path) for exempt_path in self.exempt_paths)
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        """Process request and apply CSRF protection."""
-        
+    def should_process(self, scope: Scope) -> bool:
         # Skip CSRF protection for exempt paths
-        if self.is_path_exempt(request.url.path):
-            return await call_next(request)
+        return not self.is_path_exempt(scope["path"])
+
+    async def before_request(self, request: Request) -> Optional[Response]:
+        """Verify the CSRF token on protected methods."""
         
         # Skip CSRF protection for safe methods
         if request.method not in self.protected_methods:
-            response = await call_next(request)
-            
-            # Generate and set CSRF token for GET requests
-            if request.method == "GET":
-                csrf_token = self.generate_csrf_token()
-                
-                # Store in Redis
-                session_id = request.cookies.get("session_id")
-                await self.store_token_in_redis(csrf_token, session_id)
-                
-                # Set cookie with token
-                response.set_cookie(
-                    key=self.cookie_name,
-                    value=csrf_token,
-                    max_age=self.token_expiry,
-                    secure=self.cookie_secure,
-                    httponly=True,
-                    samesite=self.cookie_samesite
-                )
-            
-            return response
+            return None
         
         # For protected methods, verify CSRF token
         cookie_token = request.cookies.get(self.cookie_name)
@@ -210,28 +191,32 @@ class CSRFProtectionMiddleware(BaseHTTPMiddleware):
                 }
             )
         
-        # Process the request
-        response = await call_next(request)
+        return None
+
+    async def on_response_start(self, request: Request, status_code: int, headers: MutableHeaders):
+        """Issue a token on GET and rotate it after a verified protected request."""
+        protected = request.method in self.protected_methods
+        if not protected and request.method != "GET":
+            return
         
-        # Generate new token after successful request (token rotation)
-        new_csrf_token = self.generate_csrf_token()
+        csrf_token = self.generate_csrf_token()
         session_id = request.cookies.get("session_id")
-        await self.store_token_in_redis(new_csrf_token, session_id)
+        await self.store_token_in_redis(csrf_token, session_id)
         
-        # Update cookie with new token
-        response.set_cookie(
+        # Set cookie with token
+        set_cookie(
+            headers,
             key=self.cookie_name,
-            value=new_csrf_token,
+            value=csrf_token,
             max_age=self.token_expiry,
             secure=self.cookie_secure,
             httponly=True,
             samesite=self.cookie_samesite
         )
         
-        # Add CSRF token to response headers for client-side access
-        response.headers[f"X-New-{self.header_name}"] = new_csrf_token
-        
-        return response
+        if protected:
+            # Add CSRF token to response headers for client-side access
+            headers[f"X-New-{self.header_name}"] = csrf_token
 
 
 # Convenience function to get CSRF token from request
@@ -13,14 +13,97 @@ from dataclasses import dataclass
 
 from fastapi import Request, Response, HTTPException, status
 from fastapi.responses import JSONResponse
+from starlette.datastructures import MutableHeaders
+from starlette.types import Scope
 import redis.asyncio as redis
 
+from ..core.asgi import HTTPMiddleware
 from ..core.config import settings
 from ..core.redis import redis_manager
+from ..core.token_lease import token_lease_limiter
 
 logger = logging.getLogger(__name__)
 
 
+# Sliding-window counter checked across several windows atomically.
+# Each window keeps two fixed buckets (current and previous); the request
+# count is estimated as previous * (unelapsed share of the window) + current,
+# so memory is two integers per window instead of one ZSET member per request.
+#
+# KEYS: current and previous bucket key for each window, in pairs
+# ARGV: now, cost, then window size and limit for each window
+# Returns {1, estimate for first window} or {0, window index, estimate, retry after}
+SLIDING_WINDOW_SCRIPT = """
+local now = tonumber(ARGV[1])
+local cost = tonumber(ARGV[2])
+local windows = (#ARGV - 2) / 2
+local first = 0
+
+for i = 1, windows do
+    local size = tonumber(ARGV[1 + 2 * i])
+    local limit = tonumber(ARGV[2 + 2 * i])
+    local current = tonumber(redis.call('GET', KEYS[2 * i - 1]) or '0')
+    local previous = tonumber(redis.call('GET', KEYS[2 * i]) or '0')
+    local elapsed = (now % size) / size
+    local estimate = previous * (1 - elapsed) + current
+
+    if estimate + cost > limit then
+        local retry_after
+        if previous > 0 and current + cost <= limit then
+            -- Wait until enough of the previous bucket has slid out
+            local needed = 1 - (limit - current - cost) / previous
+            retry_after = math.ceil((needed - elapsed) * size)
+        else
+            retry_after = math.ceil(size - (now % size))
+        end
+        return {0, i, math.floor(estimate), math.max(retry_after, 1)}
+    end
+    if i == 1 then
+        first = estimate
+    end
+end
+
+for i = 1, windows do
+    local size = tonumber(ARGV[1 + 2 * i])
+    redis.call('INCRBY', KEYS[2 * i - 1], cost)
+    redis.call('EXPIRE', KEYS[2 * i - 1], size * 2)
+end
+return {1, math.floor(first + cost)}
+"""
+
+# Token bucket refilled continuously at ``rate`` tokens per second.
+#
+# KEYS: bucket hash
+# ARGV: capacity, rate, now, cost, ttl
+# Returns {allowed, tokens remaining, retry after}
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local last = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - last) * rate)
+
+local allowed = 0
+local retry_after = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+elseif rate > 0 then
+    retry_after = math.ceil((cost - tokens) / rate)
+else
+    retry_after = tonumber(ARGV[5])
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[5]))
+return {allowed, math.floor(tokens), retry_after}
+"""
+
+
 class RateLimitStrategy(Enum):
     """Rate limiting strategies."""
     FIXED_WINDOW = "fixed_window"
@@ -115,6 +198,15 @@ class RateLimiter:
         self.enabled = getattr(settings, "RATE_LIMITING_ENABLED", True)
         self.global_limit = self.GLOBAL_LIMITS
         self.default_limit = RateLimitConfig()
+        self._scripts: Dict[str, Any] = {}
+    
+    def _script(self, name: str, source: str):
+        """Script handle that runs via EVALSHA, loading the script on first use."""
+        script = self._scripts.get(name)
+        if script is None or script.registered_client is not self.redis_client:
+            script = self.redis_client.register_script(source)
+            self._scripts[name] = script
+        return script
         
     async def initialize(self):
         """Initialize Redis connection."""
@@ -189,7 +281,7 @@ class RateLimiter:
         if client_ip in config.whitelist_ips:
             return True, {"whitelisted": True}
         
-        current_timestamp = int(time.time())
+        current_timestamp = time.time()
         
         # Apply selected strategy
         if config.strategy == RateLimitStrategy.SLIDING_WINDOW:
@@ -214,44 +306,56 @@ class RateLimiter:
     async def _sliding_window_check(
         self,
         identifier: str,
-        timestamp: int,
+        timestamp: float,
         config: RateLimitConfig
     ) -> Tuple[bool, Dict[str, Any]]:
-        """Sliding window rate limiting algorithm."""
+        """Sliding window counters for all windows, checked and updated in one script call."""
         try:
-            # Check multiple time windows
             windows = [
-                ("minute", 60, config.requests_per_minute),
-                ("hour", 3600, config.requests_per_hour),
-                ("day", 86400, config.requests_per_day),
+                (window_name, window_size, limit)
+                for window_name, window_size, limit in (
+                    ("minute", 60, config.requests_per_minute),
+                    ("hour", 3600, config.requests_per_hour),
+                    ("day", 86400, config.requests_per_day),
+                )
+                if limit > 0
             ]
+            if not windows:
+                return True, {"requests": 0}
+            
+            if settings.RATE_LIMIT_LEASE_ENABLED and token_lease_limiter.lease_size(windows) > 1:
+                # Spend tokens leased by this process; Redis is only asked per lease
+                allowed, lease_info = await token_lease_limiter.acquire(identifier, windows)
+                if allowed:
+                    return True, {"requests": lease_info["requests"]}
+                window_name, window_size, limit = windows[max(lease_info["window_index"], 1) - 1]
+                return False, {
+                    "limit": limit,
+                    "window": window_name,
+                    "requests": lease_info["requests"],
+                    "retry_after": lease_info["retry_after"]
+                }
             
+            keys = []
+            args = [timestamp, 1]
             for window_name, window_size, limit in windows:
-                if limit <= 0:
-                    continue
-                
-                key = f"rate_limit:{identifier}:{window_name}"
-                window_start = timestamp - window_size
-                
-                # Remove old entries and count current
-                pipe = self.redis_client.pipeline()
-                pipe.zremrangebyscore(key, 0, window_start)
-                pipe.zcard(key)
-                pipe.zadd(key, {str(timestamp): timestamp})
-                pipe.expire(key, window_size + 60)
-                
-                results = await pipe.execute()
-                request_count = results[1]
-                
-                if request_count >= limit:
-                    return False, {
-                        "limit": limit,
-                        "window": window_name,
-                        "requests": request_count,
-                        "retry_after": window_size
-                    }
+                bucket = int(timestamp // window_size)
+                keys.append(f"rate_limit:{identifier}:{window_name}:{bucket}")
+                keys.append(f"rate_limit:{identifier}:{window_name}:{bucket - 1}")
+                args.extend([window_size, limit])
+            
+            result = await self._script("sliding_window", SLIDING_WINDOW_SCRIPT)(keys=keys, args=args)
             
-            return True, {"requests": request_count if 'request_count' in locals() else 0}
+            if int(result[0]) == 1:
+                return True, {"requests": int(result[1])}
+            
+            window_name, window_size, limit = windows[int(result[1]) - 1]
+            return False, {
+                "limit": limit,
+                "window": window_name,
+                "requests": int(result[2]),
+                "retry_after": int(result[3])
+            }
             
         except Exception as e:
             logger.error(f"Rate limit check failed: {e}")
@@ -261,48 +365,25 @@ class RateLimiter:
     async def _token_bucket_check(
         self,
         identifier: str,
-        timestamp: int,
+        timestamp: float,
         config: RateLimitConfig
     ) -> Tuple[bool, Dict[str, Any]]:
-        """Token bucket rate limiting algorithm."""
+        """Token bucket rate limiting, refilled and spent atomically in one script call."""
         try:
-            key = f"token_bucket:{identifier}"
-            
-            # Get current bucket state
-            bucket_data = await self.redis_client.get(key)
-            
-            if bucket_data:
-                tokens, last_refill = bucket_data.split(":")
-                tokens = float(tokens)
-                last_refill = float(last_refill)
-            else:
-                tokens = float(config.burst_size)
-                last_refill = timestamp
-            
-            # Calculate tokens to add based on time elapsed
-            time_elapsed = timestamp - last_refill
+            key = f"rate_limit:bucket:{identifier}"
             refill_rate = config.requests_per_minute / 60.0
-            tokens_to_add = time_elapsed * refill_rate
             
-            # Update token count (cap at burst size)
-            tokens = min(tokens + tokens_to_add, config.burst_size)
+            allowed, tokens, retry_after = await self._script("token_bucket", TOKEN_BUCKET_SCRIPT)(
+                keys=[key],
+                args=[config.burst_size, refill_rate, timestamp, 1, 300]  # 5 minute expiry
+            )
             
-            if tokens >= 1:
-                # Consume a token
-                tokens -= 1
-                await self.redis_client.setex(
-                    key,
-                    300,  # 5 minute expiry
-                    f"{tokens}:{timestamp}"
-                )
+            if int(allowed) == 1:
                 return True, {"tokens_remaining": int(tokens)}
-            else:
-                # No tokens available
-                retry_after = int((1 - tokens) / refill_rate)
-                return False, {
-                    "tokens_remaining": 0,
-                    "retry_after": retry_after
-                }
+            return False, {
+                "tokens_remaining": 0,
+                "retry_after": int(retry_after)
+            }
                 
         except Exception as e:
             logger.error(f"Token bucket check failed: {e}")
@@ -317,15 +398,15 @@ class RateLimiter:
         """Fixed window rate limiting algorithm."""
         try:
             # Round timestamp to minute
+            timestamp = int(timestamp)
             window = timestamp // 60
             key = f"fixed_window:{identifier}:{window}"
             
-            # Increment counter
-            count = await self.redis_client.incr(key)
-            
-            # Set expiry on first request in window
-            if count == 1:
-                await self.redis_client.expire(key, 70)  # Slightly longer than window
+            # Increment counter and set expiry on first request in window, atomically
+            pipe = self.redis_client.pipeline(transaction=True)
+            pipe.incr(key)
+            pipe.expire(key, 70, nx=True)  # Slightly longer than window
+            count, _ = await pipe.execute()
             
             if count > config.requests_per_minute:
                 return False, {
@@ -475,26 +556,28 @@ class RateLimiter:
         return result is not None
 
 
-class RateLimitMiddleware:
+class RateLimitMiddleware(HTTPMiddleware):
     """
     FastAPI middleware for rate limiting and DDoS protection.
     """
     
-    def __init__(self):
+    excluded_paths = ("/docs", "/redoc", "/openapi.json", "/favicon.ico")
+    
+    def __init__(self, app):
+        super().__init__(app)
         self.rate_limiter = RateLimiter()
+    
+    def should_process(self, scope: Scope) -> bool:
+        # Skip rate limiting for excluded paths
+        return not scope["path"].startswith(self.excluded_paths)
         
-    async def __call__(self, request: Request, call_next: Callable) -> Response:
+    async def before_request(self, request: Request) -> Optional[Response]:
         """Process request through rate limiting."""
         
         # Initialize rate limiter on first request
         if not self.rate_limiter.redis_client:
             await self.rate_limiter.initialize()
         
-        # Skip rate limiting for excluded paths
-        excluded_paths = ["/docs", "/redoc", "/openapi.json", "/favicon.ico"]
-        if any(request.url.path.startswith(path) for path in excluded_paths):
-            return await call_next(request)
-        
         # Get client identifier
         identifier = self.rate_limiter.get_client_identifier(request)
         client_ip = identifier.split(":")[0]
@@ -553,18 +636,16 @@ class RateLimitMiddleware:
                 }
             )
         
-        # Process request
-        response = await call_next(request)
-        
+        request.state.rate_limit_config = config
+        request.state.rate_limit_metadata = metadata
+        return None
+    
+    async def on_response_start(self, request: Request, status_code: int, headers: MutableHeaders):
         # Add rate limit headers
-        response.headers["X-Rate-Limit-Limit"] = str(config.requests_per_minute)
-        response.headers["X-Rate-Limit-Remaining"] = str(
+        config = request.state.rate_limit_config
+        metadata = request.state.rate_limit_metadata
+        headers["X-Rate-Limit-Limit"] = str(config.requests_per_minute)
+        headers["X-Rate-Limit-Remaining"] = str(
             max(0, config.requests_per_minute - metadata.get("requests", 0))
         )
-        response.headers["X-Rate-Limit-Reset"] = str(int(time.time()) + 60)
-        
-        return response
-
-
-# Export middleware instance
-rate_limit_middleware = RateLimitMiddleware()
\ No newline at end of file
+        headers["X-Rate-Limit-Reset"] = str(int(time.time()) + 60)
@@ -7,14 +7,16 @@ import time
 import logging
 from fastapi import Request, HTTPException, status
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import MutableHeaders
+from starlette.types import Scope
 from datetime import datetime
 
+from ..core.asgi import HTTPMiddleware
 from ..core.rate_limiter import rate_limiter, get_client_identifier
 
 logger = logging.getLogger(__name__)
 
-class GlobalRateLimitMiddleware(BaseHTTPMiddleware):
+class GlobalRateLimitMiddleware(HTTPMiddleware):
     """
     Global rate limiting middleware that applies to all endpoints.
     Uses a more lenient limit than endpoint-specific rate limits.
@@ -25,11 +27,11 @@ class GlobalRateLimitMiddleware(BaseHTTPMiddleware):
         self.max_requests = max_requests
         self.window_seconds = window_seconds
     
-    async def dispatch(self, request: Request, call_next):
+    def should_process(self, scope: Scope) -> bool:
         # Skip rate limiting for certain paths
-        if self._should_skip_rate_limit(request.url.path):
-            return await call_next(request)
-        
+        return not self._should_skip_rate_limit(scope["path"])
+    
+    async def before_request(self, request: Request):
         # Get client identifier
         identifier = get_client_identifier(request)
         
@@ -74,15 +76,15 @@ class GlobalRateLimitMiddleware(BaseHTTPMiddleware):
                 }
             )
         
+        request.state.global_rate_limit_info = rate_info
+        return None
+    
+    async def on_response_start(self, request: Request, status_code: int, headers: MutableHeaders):
         # Add rate limit headers to successful responses
-        response = await call_next(request)
-        
-        if hasattr(response, 'headers'):
-            response.headers["X-RateLimit-Limit"] = str(self.max_requests)
-            response.headers["X-RateLimit-Remaining"] = str(rate_info.get('remaining_attempts', self.max_requests))
-            response.headers["X-RateLimit-Scope"] = "global"
-        
-        return response
+        rate_info = request.state.global_rate_limit_info
+        headers["X-RateLimit-Limit"] = str(self.max_requests)
+        headers["X-RateLimit-Remaining"] = str(rate_info.get('remaining_attempts', self.max_requests))
+        headers["X-RateLimit-Scope"] = "global"
     
     def _should_skip_rate_limit(self, path: str) -> bool:
         """Determine if rate limiting should be skipped for this path."""
@@ -98,7 +100,7 @@ class GlobalRateLimitMiddleware(BaseHTTPMiddleware):
         
         return any(path.startswith(skip_path) for skip_path in skip_paths)
 
-class APIRateLimitMiddleware(BaseHTTPMiddleware):
+class APIRateLimitMiddleware(HTTPMiddleware):
     """
     API-specific rate limiting middleware for API endpoints.
     More restrictive than global rate limiting.
@@ -109,15 +111,12 @@ class APIRateLimitMiddleware(BaseHTTPMiddleware):
         self.max_requests = max_requests
         self.window_seconds = window_seconds
     
-    async def dispatch(self, request: Request, call_next):
-        # Only apply to API endpoints
-        if not request.url.path.startswith("/api/"):
-            return await call_next(request)
-        
-        # Skip for health checks and documentation
-        if self._should_skip_rate_limit(request.url.path):
-            return await call_next(request)
-        
+    def should_process(self, scope: Scope) -> bool:
+        # Only apply to API endpoints, skipping health checks and documentation
+        path = scope["path"]
+        return path.startswith("/api/") and not self._should_skip_rate_limit(path)
+    
+    async def before_request(self, request: Request):
         # Get identifier (prefer user-based for authenticated requests)
         identifier = await self._get_api_identifier(request)
         
@@ -163,16 +162,16 @@ class APIRateLimitMiddleware(BaseHTTPMiddleware):
                 }
             )
         
+        request.state.api_rate_limit_info = rate_info
+        return None
+    
+    async def on_response_start(self, request: Request, status_code: int, headers: MutableHeaders):
         # Add API rate limit headers
-        response = await call_next(request)
-        
-        if hasattr(response, 'headers'):
-            response.headers["X-RateLimit-Limit"] = str(self.max_requests)
-            response.headers["X-RateLimit-Remaining"] = str(rate_info.get('remaining_attempts', self.max_requests))
-            response.headers["X-RateLimit-Scope"] = "api"
-            response.headers["X-RateLimit-Window"] = str(self.window_seconds)
-        
-        return response
+        rate_info = request.state.api_rate_limit_info
+        headers["X-RateLimit-Limit"] = str(self.max_requests)
+        headers["X-RateLimit-Remaining"] = str(rate_info.get('remaining_attempts', self.max_requests))
+        headers["X-RateLimit-Scope"] = "api"
+        headers["X-RateLimit-Window"] = str(self.window_seconds)
     
     async def _get_api_identifier(self, request: Request) -> str:
         """Get identifier for API rate limiting (user-based if authenticated)."""
@@ -0,0 +1,41 @@
+"""
+Request-scoped database session middleware.
+
+Puts an unopened ``RequestSession`` on ``request.state.db_session`` for every
+HTTP request. Middleware (``TenantMiddleware``), dependencies (``get_db`` /
+``get_session``) and the route handler all use the session it opens on first
+use, so a request checks out at most one pooled connection instead of one
+per component. The session is closed once the response, including streamed
+bodies and background tasks, has been sent.
+"""
+
+import logging
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from ..core.database import REQUEST_SESSION_STATE, RequestSession
+
+logger = logging.getLogger(__name__)
+
+
+class RequestSessionMiddleware:
+    """Middleware that owns the lifetime of each request's database session."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        holder = RequestSession()
+        scope.setdefault("state", {})[REQUEST_SESSION_STATE] = holder
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            if holder.opened:
+                try:
+                    await holder.close()
+                except Exception as e:
+                    logger.warning(f"Failed to close request database session: {e}")
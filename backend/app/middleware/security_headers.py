@@ -11,13 +11,15 @@ from urllib.parse import urlparse
 
 from fastapi import Request, Response
 from fastapi.responses import JSONResponse
+from starlette.datastructures import MutableHeaders
 
+from ..core.asgi import HTTPMiddleware
 from ..core.config import settings
 
 logger = logging.getLogger(__name__)
 
 
-class SecurityHeadersMiddleware:
+class SecurityHeadersMiddleware(HTTPMiddleware):
     """
     Comprehensive security headers middleware implementing:
     - Content Security Policy (CSP)
@@ -44,7 +46,7 @@ class SecurityHeadersMiddleware:
             enable_hsts: Enable HTTP Strict Transport Security
             enable_csp: Enable Content Security Policy
         """
-        self.app = app
+        super().__init__(app)
         self.strict_mode = strict_mode
         self.report_uri = report_uri or getattr(settings, "CSP_REPORT_URI", None)
         self.enable_hsts = enable_hsts and getattr(settings, "ENABLE_HSTS", True)
@@ -199,17 +201,8 @@ class SecurityHeadersMiddleware:
         
         return headers
     
-    async def __call__(self, scope, receive, send):
-        """Process request and add security headers to response."""
-        if scope["type"] != "http":
-            await self.app(scope, receive, send)
-            return
-            
-        # For HTTP requests, we need to intercept and add headers
-        from starlette.requests import Request
-        
-        request = Request(scope, receive=receive)
-        
+    async def before_request(self, request: Request) -> Optional[Response]:
+        """Store the CSP nonce and answer CORS preflight requests."""
         # Generate CSP nonce for this request
         nonce = self._generate_csp_nonce() if self.enable_csp else None
         if nonce:
@@ -219,66 +212,35 @@ class SecurityHeadersMiddleware:
         # Handle preflight CORS requests
         if request.method == "OPTIONS":
             origin = request.headers.get("Origin", "")
-            cors_headers = self._get_cors_headers(request, origin)
-            
-            async def send_response(message):
-                if message["type"] == "http.response.start":
-                    message["status"] = 204
-                    message["headers"] = [
-                        (k.encode(), v.encode()) 
-                        for k, v in cors_headers.items()
-                    ]
-                await send(message)
-            
-            await send_response({
-                "type": "http.response.start",
-                "status": 204,
-                "headers": []
-            })
-            await send_response({
-                "type": "http.response.body",
-                "body": b"",
-            })
-            return
+            return Response(status_code=204, headers=self._get_cors_headers(request, origin))
         
-        # Store original send to intercept headers
-        async def send_wrapper(message):
-            if message["type"] == "http.response.start":
-                # Convert headers to dict for easier manipulation
-                headers_dict = dict(message.get("headers", []))
-                
-                # Add security headers
-                security_headers = self._get_security_headers(request, nonce)
-                for header, value in security_headers.items():
-                    if value:
-                        headers_dict[header.encode()] = value.encode()
-                
-                # Add CORS headers if origin is present
-                origin = request.headers.get("Origin")
-                if origin:
-                    cors_headers = self._get_cors_headers(request, origin)
-                    for header, value in cors_headers.items():
-                        headers_dict[header.encode()] = value.encode()
-                
-                # Remove server identification headers
-                headers_dict.pop(b"server", None)
-                headers_dict.pop(b"x-powered-by", None)
-                
-                # Add custom security headers
-                request_id = getattr(
-                    request.state,
-                    "request_id",
-                    secrets.token_urlsafe(16)
-                )
-                headers_dict[b"x-request-id"] = request_id.encode()
-                
-                # Convert back to list of tuples
-                message["headers"] = list(headers_dict.items())
-            
-            await send(message)
+        return None
+    
+    async def on_response_start(self, request: Request, status_code: int, headers: MutableHeaders):
+        """Add security headers to the response."""
+        nonce = getattr(request.state, "csp_nonce", None)
+        
+        # Add security headers
+        for header, value in self._get_security_headers(request, nonce).items():
+            if value:
+                headers[header] = value
         
-        # Process the request with our wrapped send
-        await self.app(scope, receive, send_wrapper)
+        # Add CORS headers if origin is present
+        origin = request.headers.get("Origin")
+        if origin:
+            for header, value in self._get_cors_headers(request, origin).items():
+                headers[header] = value
+        
+        # Remove server identification headers
+        del headers["server"]
+        del headers["x-powered-by"]
+        
+        # Add custom security headers
+        headers["x-request-id"] = getattr(
+            request.state,
+            "request_id",
+            secrets.token_urlsafe(16)
+        )
 
 
 class CSPViolationReporter:
@@ -142,14 +142,23 @@ class AIInsightsService:
         org_id: str,
         start_date: datetime,
         end_date: datetime,
-        db: AsyncSession
+        db: AsyncSession,
+        read_db: Optional[AsyncSession] = None
     ) -> List[AnomalyResult]:
-        """Detect anomalies in pipeline performance and data quality using enhanced telemetry."""
+        """
+        Detect anomalies in pipeline performance and data quality using enhanced telemetry.
+        
+        The execution and telemetry scans run on ``read_db`` when given (a
+        read replica session, see ``get_read_db``); detected anomalies are
+        stored through ``db``.
+        """
         
         await self._ensure_telemetry_service(db)
+        reads = read_db if read_db is not None else db
+        telemetry_service = TelemetryService(read_db) if read_db is not None else self.telemetry_service
         
         # Get pipeline executions
-        result = await db.execute(
+        result = await reads.execute(
             select(PipelineExecution)
             .join(ETLPipeline)
             .where(
@@ -164,7 +173,7 @@ class AIInsightsService:
         executions = result.scalars().all()
         
         # Get telemetry metrics for the same period
-        telemetry_metrics = await self.telemetry_service.get_metrics(
+        telemetry_metrics = await telemetry_service.get_metrics(
             organization_id=org_id,
             start_time=start_date,
             end_time=end_date,
@@ -172,7 +181,7 @@ class AIInsightsService:
         )
         
         # Get performance snapshots
-        performance_snapshots = await self.telemetry_service.get_performance_snapshots(
+        performance_snapshots = await telemetry_service.get_performance_snapshots(
             organization_id=org_id,
             start_time=start_date,
             end_time=end_date,
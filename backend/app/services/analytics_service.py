@@ -63,6 +63,32 @@ class ChartData:
             self.options = {}
 
 
+def _metrics_cache_params(self, org_id, start_date, end_date, db=None) -> Dict[str, Any]:
+    """
+    Cache metrics by organization and range length.
+    
+    Callers pass ``utcnow()``-based ranges, so keying on the exact timestamps
+    would never hit; rolling windows of the same length share an entry.
+    """
+    return {
+        "org_id": str(org_id),
+        "range_hours": round((end_date - start_date).total_seconds() / 3600)
+    }
+
+
+def _metrics_warmer(method_name: str):
+    """Replay a recorded metrics key for the cache warmer with a fresh session and window."""
+    async def warm(params: Dict[str, Any]) -> Dict[str, Any]:
+        from app.core.replicas import read_session
+        
+        end_date = datetime.utcnow()
+        start_date = end_date - timedelta(hours=params["range_hours"])
+        async with read_session() as db:
+            method = getattr(analytics_service, method_name)
+            return await method(params["org_id"], start_date, end_date, db)
+    return warm
+
+
 class AnalyticsService:
     """Advanced analytics service with real-time capabilities."""
     
@@ -113,7 +139,16 @@ class AnalyticsService:
         
         return result
     
-    @cache_result(key_prefix="analytics.performance", ttl=300, l2_ttl=1800)
+    @cache_result(
+        key_prefix="analytics.performance",
+        ttl=300,
+        l2_ttl=1800,
+        stale_ttl=300,
+        distributed_lock=True,
+        key_builder=_metrics_cache_params,
+        warm=True,
+        warm_with=_metrics_warmer("_get_performance_metrics")
+    )
     async def _get_performance_metrics(
         self, 
         org_id: str, 
@@ -189,7 +224,16 @@ class AnalyticsService:
             "performance_trend": await self._calculate_trend(executions, "success_rate")
         }
     
-    @cache_result(key_prefix="analytics.usage", ttl=600, l2_ttl=3600)
+    @cache_result(
+        key_prefix="analytics.usage",
+        ttl=600,
+        l2_ttl=3600,
+        stale_ttl=600,
+        distributed_lock=True,
+        key_builder=_metrics_cache_params,
+        warm=True,
+        warm_with=_metrics_warmer("_get_usage_metrics")
+    )
     async def _get_usage_metrics(
         self, 
         org_id: str, 
@@ -231,7 +275,16 @@ class AnalyticsService:
             "resource_utilization": await self._get_resource_utilization(org_id)
         }
     
-    @cache_result(key_prefix="analytics.quality", ttl=300, l2_ttl=1800)
+    @cache_result(
+        key_prefix="analytics.quality",
+        ttl=300,
+        l2_ttl=1800,
+        stale_ttl=300,
+        distributed_lock=True,
+        key_builder=_metrics_cache_params,
+        warm=True,
+        warm_with=_metrics_warmer("_get_quality_metrics")
+    )
     async def _get_quality_metrics(
         self, 
         org_id: str, 
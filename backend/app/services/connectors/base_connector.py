@@ -41,9 +41,15 @@ class BaseConnector(ABC):
         self, 
         query_config: Dict[str, Any],
         batch_size: int = 1000,
-        limit: Optional[int] = None
+        limit: Optional[int] = None,
+        batch_sizer=None
     ) -> AsyncGenerator[pd.DataFrame, None]:
-        """Extract data in batches."""
+        """
+        Extract data in batches.
+        
+        ``batch_sizer`` is an optional ``AdaptiveBatchSizer``; connectors that
+        cannot resize their batches accept and ignore it.
+        """
         pass
     
     @abstractmethod
@@ -51,9 +57,15 @@ class BaseConnector(ABC):
         self,
         data: pd.DataFrame,
         destination_config: Dict[str, Any],
-        mode: str = "append"  # "append", "replace", "upsert"
+        mode: str = "append",  # "append", "replace", "upsert"
+        batch_sizer=None
     ) -> Dict[str, Any]:
-        """Load data to destination."""
+        """
+        Load data to destination.
+        
+        ``batch_sizer`` is an optional ``AdaptiveBatchSizer`` used to chunk
+        the write; connectors that load in one go accept and ignore it.
+        """
         pass
     
     @abstractmethod
@@ -153,9 +153,10 @@ class FileBaseConnector(BaseConnector):
         self, 
         query_config: Dict[str, Any], 
         batch_size: int = 1000,
-        limit: Optional[int] = None
+        limit: Optional[int] = None,
+        batch_sizer=None
     ) -> AsyncGenerator[pd.DataFrame, None]:
-        """Extract data from file in batches."""
+        """Extract data from file in batches (``batch_sizer`` is ignored; files are read at once)."""
         try:
             # Read the entire file (for files, we typically read all at once)
             if self.file_id:
@@ -191,8 +192,9 @@ class FileBaseConnector(BaseConnector):
     async def load_data(
         self, 
         data: pd.DataFrame, 
-        load_config: Dict[str, Any], 
-        mode: str = "append"
+        destination_config: Dict[str, Any], 
+        mode: str = "append",
+        batch_sizer=None
     ) -> Dict[str, Any]:
         """File connectors typically don't support loading - this is for export connectors."""
         return {
@@ -5,6 +5,7 @@ import pandas as pd
 import logging
 from typing import Dict, Any, List, AsyncGenerator, Optional
 import asyncio
+import time
 from datetime import datetime
 import json
 
@@ -61,6 +62,12 @@ class MySQLConnector(BaseConnector):
         except Exception as e:
             logger.error(f"Error closing MySQL connection: {str(e)}")
     
+    def acquire_connection(self):
+        """Acquire a dedicated pooled connection for multi-statement work."""
+        if not self._connection_pool:
+            raise RuntimeError("MySQL connector is not connected")
+        return self._connection_pool.acquire()
+    
     async def test_connection(self) -> Dict[str, Any]:
         """Test connection and return status."""
         try:
@@ -177,9 +184,15 @@ class MySQLConnector(BaseConnector):
         self,
         query_config: Dict[str, Any],
         batch_size: int = 1000,
-        limit: Optional[int] = None
+        limit: Optional[int] = None,
+        batch_sizer=None
     ) -> AsyncGenerator[pd.DataFrame, None]:
-        """Extract data in batches using efficient streaming."""
+        """
+        Extract data in batches using efficient streaming.
+        
+        When a ``batch_sizer`` is given, its current ``batch_size`` is used for
+        every fetch and each batch is reported back so the size can adapt.
+        """
         
         try:
             # Build query
@@ -212,7 +225,9 @@ class MySQLConnector(BaseConnector):
                     
                     rows_processed = 0
                     while True:
-                        batch_records = await cursor.fetchmany(batch_size)
+                        current_batch_size = batch_sizer.batch_size if batch_sizer else batch_size
+                        fetch_start = time.perf_counter()
+                        batch_records = await cursor.fetchmany(current_batch_size)
                         
                         if not batch_records:
                             break
@@ -221,6 +236,9 @@ class MySQLConnector(BaseConnector):
                         df = pd.DataFrame(batch_records)
                         rows_processed += len(df)
                         
+                        if batch_sizer:
+                            batch_sizer.observe(df, time.perf_counter() - fetch_start)
+                        
                         logger.info(f"Extracted batch: {len(df)} rows (total: {rows_processed})")
                         yield df
                         
@@ -235,9 +253,15 @@ class MySQLConnector(BaseConnector):
         self,
         data: pd.DataFrame,
         destination_config: Dict[str, Any],
-        mode: str = "append"
+        mode: str = "append",
+        batch_sizer=None
     ) -> Dict[str, Any]:
-        """Load data to MySQL table using efficient bulk operations."""
+        """
+        Load data to MySQL table using efficient bulk operations.
+        
+        Without a ``batch_sizer`` the frame is inserted in one go; with one, it
+        is inserted in adaptively sized chunks before a single commit.
+        """
         
         try:
             table_name = destination_config["table"]
@@ -255,24 +279,36 @@ class MySQLConnector(BaseConnector):
                     column_str = ", ".join([f"`{col}`" for col in columns])
                     placeholders = ", ".join(["%s"] * len(columns))
                     
-                    # Convert DataFrame to records
-                    records = []
-                    for _, row in data.iterrows():
-                        # Handle None/NaN values
-                        record = []
-                        for col in columns:
-                            value = row[col]
-                            if pd.isna(value):
-                                record.append(None)
-                            elif isinstance(value, (dict, list)):
-                                record.append(json.dumps(value))
-                            else:
-                                record.append(value)
-                        records.append(tuple(record))
-                    
-                    # Use executemany for bulk insert
                     insert_query = f"INSERT INTO `{table_name}` ({column_str}) VALUES ({placeholders})"
-                    await cursor.executemany(insert_query, records)
+                    
+                    offset = 0
+                    while offset < len(data):
+                        chunk_size = batch_sizer.batch_size if batch_sizer else len(data)
+                        chunk = data.iloc[offset:offset + chunk_size]
+                        chunk_start = time.perf_counter()
+                        
+                        # Convert DataFrame to records
+                        records = []
+                        for _, row in chunk.iterrows():
+                            # Handle None/NaN values
+                            record = []
+                            for col in columns:
+                                value = row[col]
+                                if isinstance(value, (dict, list)):
+                                    record.append(json.dumps(value))
+                                elif pd.isna(value):
+                                    record.append(None)
+                                else:
+                                    record.append(value)
+                            records.append(tuple(record))
+                        
+                        # Use executemany for bulk insert
+                        await cursor.executemany(insert_query, records)
+                        
+                        if batch_sizer:
+                            batch_sizer.observe(chunk, time.perf_counter() - chunk_start)
+                        offset += len(chunk)
+                    
                     await conn.commit()
                     
                     rows_loaded = len(data)
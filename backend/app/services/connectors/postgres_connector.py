@@ -5,6 +5,7 @@ import pandas as pd
 import logging
 from typing import Dict, Any, List, AsyncGenerator, Optional
 import asyncio
+import time
 from datetime import datetime
 import json
 
@@ -60,6 +61,12 @@ class PostgreSQLConnector(BaseConnector):
         except Exception as e:
             logger.error(f"Error closing PostgreSQL connection: {str(e)}")
     
+    def acquire_connection(self):
+        """Acquire a dedicated pooled connection for multi-statement work."""
+        if not self._connection_pool:
+            raise RuntimeError("PostgreSQL connector is not connected")
+        return self._connection_pool.acquire()
+    
     async def test_connection(self) -> Dict[str, Any]:
         """Test connection and return status."""
         try:
@@ -162,9 +169,15 @@ class PostgreSQLConnector(BaseConnector):
         self,
         query_config: Dict[str, Any],
         batch_size: int = 1000,
-        limit: Optional[int] = None
+        limit: Optional[int] = None,
+        batch_sizer=None
     ) -> AsyncGenerator[pd.DataFrame, None]:
-        """Extract data in batches using efficient streaming."""
+        """
+        Extract data in batches using efficient streaming.
+        
+        When a ``batch_sizer`` is given, its current ``batch_size`` is used for
+        every fetch and each batch is reported back so the size can adapt.
+        """
         
         try:
             # Build query
@@ -195,33 +208,28 @@ class PostgreSQLConnector(BaseConnector):
                 # Use AsyncPG's cursor for streaming results
                 async with conn.transaction():
                     rows_processed = 0
-                    batch_records = []
                     
-                    # Create cursor once and iterate through all records
-                    cursor = conn.cursor(query)
-                    async for record in cursor:
-                        # Add record to current batch
-                        batch_records.append(dict(record))
+                    # Create server-side cursor once and fetch a whole batch per round trip
+                    cursor = await conn.cursor(query)
+                    while True:
+                        current_batch_size = batch_sizer.batch_size if batch_sizer else batch_size
+                        fetch_start = time.perf_counter()
+                        records = await cursor.fetch(current_batch_size)
                         
-                        # When batch is full, yield it
-                        if len(batch_records) >= batch_size:
-                            df = pd.DataFrame(batch_records)
-                            rows_processed += len(df)
-                            
-                            logger.info(f"Extracted batch: {len(df)} rows (total: {rows_processed})")
-                            yield df
-                            
-                            # Reset batch and check limits
-                            batch_records = []
-                            if limit and rows_processed >= limit:
-                                break
-                    
-                    # Yield remaining records if any
-                    if batch_records:
-                        df = pd.DataFrame(batch_records)
+                        if not records:
+                            break
+                        
+                        df = pd.DataFrame([dict(record) for record in records])
                         rows_processed += len(df)
-                        logger.info(f"Extracted final batch: {len(df)} rows (total: {rows_processed})")
+                        
+                        if batch_sizer:
+                            batch_sizer.observe(df, time.perf_counter() - fetch_start)
+                        
+                        logger.info(f"Extracted batch: {len(df)} rows (total: {rows_processed})")
                         yield df
+                        
+                        if limit and rows_processed >= limit:
+                            break
                             
         except Exception as e:
             logger.error(f"Error extracting data from PostgreSQL: {str(e)}")
@@ -231,9 +239,15 @@ class PostgreSQLConnector(BaseConnector):
         self,
         data: pd.DataFrame,
         destination_config: Dict[str, Any],
-        mode: str = "append"
+        mode: str = "append",
+        batch_sizer=None
     ) -> Dict[str, Any]:
-        """Load data to PostgreSQL table using efficient bulk operations."""
+        """
+        Load data to PostgreSQL table using efficient bulk operations.
+        
+        Without a ``batch_sizer`` the frame is copied in one go; with one, it is
+        copied in adaptively sized chunks inside the same transaction.
+        """
         
         try:
             table_name = destination_config["table"]
@@ -250,31 +264,39 @@ class PostgreSQLConnector(BaseConnector):
                     
                     # Prepare data for COPY
                     columns = list(data.columns)
-                    column_str = ", ".join([f'"{col}"' for col in columns])
-                    
-                    # Convert DataFrame to records
-                    records = []
-                    for _, row in data.iterrows():
-                        # Handle None/NaN values
-                        record = []
-                        for col in columns:
-                            value = row[col]
-                            if pd.isna(value):
-                                record.append(None)
-                            elif isinstance(value, (dict, list)):
-                                record.append(json.dumps(value))
-                            else:
-                                record.append(value)
-                        records.append(tuple(record))
                     
-                    # Use COPY for bulk insert (most efficient)
-                    copy_query = f"COPY {full_table_name} ({column_str}) FROM STDIN"
-                    await conn.copy_records_to_table(
-                        table_name, 
-                        records=records,
-                        columns=columns,
-                        schema_name=schema
-                    )
+                    offset = 0
+                    while offset < len(data):
+                        chunk_size = batch_sizer.batch_size if batch_sizer else len(data)
+                        chunk = data.iloc[offset:offset + chunk_size]
+                        chunk_start = time.perf_counter()
+                        
+                        # Convert DataFrame to records
+                        records = []
+                        for _, row in chunk.iterrows():
+                            # Handle None/NaN values
+                            record = []
+                            for col in columns:
+                                value = row[col]
+                                if isinstance(value, (dict, list)):
+                                    record.append(json.dumps(value))
+                                elif pd.isna(value):
+                                    record.append(None)
+                                else:
+                                    record.append(value)
+                            records.append(tuple(record))
+                        
+                        # Use COPY for bulk insert (most efficient)
+                        await conn.copy_records_to_table(
+                            table_name, 
+                            records=records,
+                            columns=columns,
+                            schema_name=schema
+                        )
+                        
+                        if batch_sizer:
+                            batch_sizer.observe(chunk, time.perf_counter() - chunk_start)
+                        offset += len(chunk)
                     
                     rows_loaded = len(data)
                     load_time = (datetime.now() - start_time).total_seconds()
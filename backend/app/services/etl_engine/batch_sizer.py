@@ -0,0 +1,161 @@
+"""
+Adaptive batch sizing for extraction and loading.
+
+Measures bytes per row and per-batch latency while data flows and steers the
+batch size toward a target memory footprint and round-trip latency, within
+per-connector floors and ceilings.
+"""
+
+from typing import Dict, Any, List, Optional
+import logging
+import math
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+# (floor, ceiling) rows per batch for each connector type
+CONNECTOR_BATCH_LIMITS = {
+    "postgresql": (500, 100_000),
+    "postgres": (500, 100_000),
+    "mysql": (500, 50_000),
+}
+
+DEFAULT_BATCH_LIMITS = (100, 10_000)
+
+# Rows inspected when estimating the in-memory size of a batch
+_SIZE_SAMPLE_ROWS = 256
+
+
+def estimate_frame_bytes(df: pd.DataFrame) -> int:
+    """
+    Estimate the in-memory size of a DataFrame.
+
+    Deep memory accounting walks every Python object in object columns, so it
+    is done on a bounded sample of rows and scaled to the full frame.
+    """
+    rows = len(df)
+    if rows == 0:
+        return 0
+    if rows <= _SIZE_SAMPLE_ROWS:
+        return int(df.memory_usage(deep=True, index=False).sum())
+    step = rows // _SIZE_SAMPLE_ROWS
+    sample = df.iloc[::step][:_SIZE_SAMPLE_ROWS]
+    return int(sample.memory_usage(deep=True, index=False).sum() * rows / len(sample))
+
+
+class AdaptiveBatchSizer:
+    """
+    Tunes rows-per-batch from observed bytes/row and batch latency.
+
+    After each batch the sizer computes the row count that would hit the
+    memory target and the row count that would hit the latency target, takes
+    the smaller of the two, and moves toward it by at most a factor of two per
+    batch so a single outlier cannot swing the size wildly.
+    """
+
+    SMOOTHING = 0.3
+    MAX_STEP_FACTOR = 2.0
+
+    def __init__(
+        self,
+        initial_size: int = 1000,
+        floor: int = DEFAULT_BATCH_LIMITS[0],
+        ceiling: int = DEFAULT_BATCH_LIMITS[1],
+        target_batch_bytes: int = 32 * 1024 * 1024,
+        target_batch_seconds: float = 1.0,
+        name: str = "batch"
+    ):
+        if floor <= 0 or ceiling < floor:
+            raise ValueError(f"Invalid batch size limits: floor={floor}, ceiling={ceiling}")
+        self.floor = floor
+        self.ceiling = ceiling
+        self.target_batch_bytes = target_batch_bytes
+        self.target_batch_seconds = target_batch_seconds
+        self.name = name
+        self.initial_size = self._clamp(initial_size)
+        self.batch_size = self.initial_size
+        self.bytes_per_row: Optional[float] = None
+        self.seconds_per_row: Optional[float] = None
+        self.batches = 0
+        self.total_rows = 0
+        self.total_bytes = 0
+        self.total_seconds = 0.0
+        self.sizes_used: List[int] = []
+
+    @classmethod
+    def for_connector(
+        cls,
+        connector_type: str,
+        config: Optional[Dict[str, Any]] = None,
+        name: str = "batch"
+    ) -> "AdaptiveBatchSizer":
+        """Create a sizer with the connector's limits, overridable via ``batch_sizing`` config."""
+        config = config or {}
+        floor, ceiling = CONNECTOR_BATCH_LIMITS.get(connector_type.lower(), DEFAULT_BATCH_LIMITS)
+        return cls(
+            initial_size=int(config.get("initial_size", 1000)),
+            floor=int(config.get("min_batch_size", floor)),
+            ceiling=int(config.get("max_batch_size", ceiling)),
+            target_batch_bytes=int(config.get("target_batch_bytes", 32 * 1024 * 1024)),
+            target_batch_seconds=float(config.get("target_batch_seconds", 1.0)),
+            name=name
+        )
+
+    def record(self, rows: int, batch_bytes: int, seconds: float) -> int:
+        """Record one batch and return the size to use for the next one."""
+        if rows <= 0:
+            return self.batch_size
+
+        self.batches += 1
+        self.total_rows += rows
+        self.total_bytes += batch_bytes
+        self.total_seconds += seconds
+        self.sizes_used.append(self.batch_size)
+
+        self.bytes_per_row = self._smooth(self.bytes_per_row, batch_bytes / rows)
+        self.seconds_per_row = self._smooth(self.seconds_per_row, max(seconds, 1e-9) / rows)
+
+        memory_rows = self.target_batch_bytes / max(self.bytes_per_row, 1.0)
+        latency_rows = self.target_batch_seconds / self.seconds_per_row
+        desired = min(memory_rows, latency_rows)
+
+        lower = self.batch_size / self.MAX_STEP_FACTOR
+        upper = self.batch_size * self.MAX_STEP_FACTOR
+        next_size = self._clamp(int(min(max(desired, lower), upper)))
+
+        if next_size != self.batch_size:
+            logger.debug(
+                f"{self.name}: batch size {self.batch_size} -> {next_size} "
+                f"({self.bytes_per_row:.0f} B/row, {self.seconds_per_row * 1000:.3f} ms/row)"
+            )
+        self.batch_size = next_size
+        return next_size
+
+    def observe(self, df: pd.DataFrame, seconds: float) -> int:
+        """Record a batch given as a DataFrame and return the next batch size."""
+        return self.record(len(df), estimate_frame_bytes(df), seconds)
+
+    def summary(self) -> Dict[str, Any]:
+        """Batch sizing metrics for execution reporting."""
+        return {
+            "initial_batch_size": self.initial_size,
+            "final_batch_size": self.batch_size,
+            "min_batch_size_used": min(self.sizes_used, default=self.batch_size),
+            "max_batch_size_used": max(self.sizes_used, default=self.batch_size),
+            "floor": self.floor,
+            "ceiling": self.ceiling,
+            "batches": self.batches,
+            "rows": self.total_rows,
+            "avg_bytes_per_row": round(self.total_bytes / self.total_rows, 2) if self.total_rows else 0.0,
+            "rows_per_second": round(self.total_rows / self.total_seconds, 2) if self.total_seconds else 0.0
+        }
+
+    def _smooth(self, current: Optional[float], observed: float) -> float:
+        if current is None or math.isnan(current):
+            return observed
+        return current + self.SMOOTHING * (observed - current)
+
+    def _clamp(self, size: int) -> int:
+        return max(self.floor, min(self.ceiling, size))
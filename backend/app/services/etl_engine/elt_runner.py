@@ -0,0 +1,431 @@
+"""
+Set-based ELT transformation runner.
+
+Executes a whole chain of SQL transformations inside the destination database
+on a single connection, with optional transactional batching, intermediate
+materialisation and plan capture for slow steps.
+"""
+
+from typing import Dict, Any, List, Optional
+import logging
+from datetime import datetime
+from dataclasses import dataclass, field
+from enum import Enum
+
+logger = logging.getLogger(__name__)
+
+
+class TransactionMode(str, Enum):
+    """How the transformation chain is wrapped in transactions."""
+    AUTOCOMMIT = "autocommit"  # Every statement commits on its own
+    SINGLE = "single"          # Whole chain commits or rolls back together
+    SAVEPOINT = "savepoint"    # One transaction, each step isolated by a savepoint
+
+
+class MaterializationMode(str, Enum):
+    """How a step's result set is materialised."""
+    NONE = "none"          # Statement is executed as-is
+    TEMP = "temp"          # CREATE TEMP TABLE ... AS <sql>
+    UNLOGGED = "unlogged"  # CREATE UNLOGGED TABLE ... AS <sql> (PostgreSQL)
+
+
+@dataclass
+class ELTStep:
+    """A single SQL transformation in the chain."""
+    id: str
+    name: str
+    sql: str
+    type: str = "custom"
+    materialize: MaterializationMode = MaterializationMode.NONE
+    target_table: Optional[str] = None
+    depends_on: List[str] = field(default_factory=list)
+    required: bool = True
+
+    @classmethod
+    def from_transformation(cls, transformation: Dict[str, Any]) -> "ELTStep":
+        """Build a step from a pipeline transformation config."""
+        target_config = transformation.get("target_config") or {}
+        materialize = MaterializationMode(
+            (transformation.get("materialize") or MaterializationMode.NONE.value).lower()
+        )
+        return cls(
+            id=str(transformation.get("id") or transformation.get("name")),
+            name=transformation.get("name") or str(transformation.get("id")),
+            sql=(transformation.get("sql") or "").strip().rstrip(";"),
+            type=transformation.get("type", "custom"),
+            materialize=materialize,
+            target_table=transformation.get("target_table") or target_config.get("target_table") or None,
+            depends_on=[str(dep) for dep in transformation.get("depends_on", [])],
+            required=transformation.get("required", True)
+        )
+
+
+@dataclass
+class ELTRunnerOptions:
+    """Execution options for the ELT runner."""
+    transaction_mode: TransactionMode = TransactionMode.SAVEPOINT
+    slow_step_threshold_ms: float = 5000.0
+    capture_explain: bool = True
+    explain_analyze: bool = True
+    drop_temp_tables: bool = True
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> "ELTRunnerOptions":
+        """Build options from a pipeline/execution ``elt_options`` dict."""
+        config = config or {}
+        defaults = cls()
+        return cls(
+            transaction_mode=TransactionMode(config.get("transaction_mode", defaults.transaction_mode.value)),
+            slow_step_threshold_ms=float(config.get("slow_step_threshold_ms", defaults.slow_step_threshold_ms)),
+            capture_explain=config.get("capture_explain", defaults.capture_explain),
+            explain_analyze=config.get("explain_analyze", defaults.explain_analyze),
+            drop_temp_tables=config.get("drop_temp_tables", defaults.drop_temp_tables)
+        )
+
+
+class _PostgreSQLSession:
+    """Thin statement/transaction wrapper around an asyncpg connection."""
+
+    dialect = "postgresql"
+
+    def __init__(self, connection):
+        self.connection = connection
+        self._transaction = None
+
+    @staticmethod
+    def quote(identifier: str) -> str:
+        return ".".join(f'"{part}"' for part in identifier.split("."))
+
+    async def begin(self):
+        self._transaction = self.connection.transaction()
+        await self._transaction.start()
+
+    async def commit(self):
+        await self._transaction.commit()
+        self._transaction = None
+
+    async def rollback(self):
+        await self._transaction.rollback()
+        self._transaction = None
+
+    @property
+    def in_transaction(self) -> bool:
+        return self._transaction is not None
+
+    async def execute(self, statement: str) -> int:
+        status = await self.connection.execute(statement)
+        # asyncpg returns a command tag such as "INSERT 0 42" or "SELECT 42"
+        last = status.split()[-1] if status else ""
+        return int(last) if last.isdigit() else 0
+
+    async def fetch_plan(self, query: str, analyze: bool) -> Any:
+        options = "ANALYZE, BUFFERS, FORMAT JSON" if analyze else "FORMAT JSON"
+        plan = await self.connection.fetchval(f"EXPLAIN ({options}) {query}")
+        return plan
+
+    def commits_implicitly(self, step: ELTStep) -> bool:
+        return False
+
+    def _table_name(self, step: ELTStep) -> str:
+        if step.materialize == MaterializationMode.TEMP:
+            # Temp tables live in the session's pg_temp schema and cannot be
+            # created in any other, so drop a schema given in target_table
+            return self.quote(step.target_table.split(".")[-1])
+        return self.quote(step.target_table)
+
+    def materialize_statement(self, step: ELTStep) -> str:
+        kind = "TEMP TABLE" if step.materialize == MaterializationMode.TEMP else "UNLOGGED TABLE"
+        return f"CREATE {kind} {self._table_name(step)} AS {step.sql}"
+
+    def drop_statement(self, step: ELTStep) -> str:
+        table = self._table_name(step)
+        if step.materialize == MaterializationMode.TEMP:
+            # Never fall through to a permanent table with the same name
+            table = f"pg_temp.{table}"
+        return f"DROP TABLE IF EXISTS {table}"
+
+
+class _MySQLSession:
+    """
+    Thin statement/transaction wrapper around an aiomysql connection.
+
+    MySQL DDL (other than CREATE/DROP TEMPORARY TABLE) commits implicitly, so
+    materialised regular tables are not covered by the surrounding transaction:
+    the commit also ends any open savepoint and makes the work of earlier
+    steps permanent.
+    """
+
+    dialect = "mysql"
+
+    def __init__(self, connection):
+        self.connection = connection
+        self._in_transaction = False
+
+    @staticmethod
+    def quote(identifier: str) -> str:
+        return ".".join(f"`{part}`" for part in identifier.split("."))
+
+    async def begin(self):
+        await self.connection.begin()
+        self._in_transaction = True
+
+    async def commit(self):
+        await self.connection.commit()
+        self._in_transaction = False
+
+    async def rollback(self):
+        await self.connection.rollback()
+        self._in_transaction = False
+
+    @property
+    def in_transaction(self) -> bool:
+        return self._in_transaction
+
+    async def execute(self, statement: str) -> int:
+        async with self.connection.cursor() as cursor:
+            await cursor.execute(statement)
+            rows_affected = max(cursor.rowcount, 0)
+        if not self._in_transaction:
+            await self.connection.commit()
+        return rows_affected
+
+    async def fetch_plan(self, query: str, analyze: bool) -> Any:
+        prefix = "EXPLAIN ANALYZE" if analyze else "EXPLAIN FORMAT=JSON"
+        async with self.connection.cursor() as cursor:
+            await cursor.execute(f"{prefix} {query}")
+            rows = await cursor.fetchall()
+        return "\n".join(str(row[0]) for row in rows)
+
+    def commits_implicitly(self, step: ELTStep) -> bool:
+        return step.materialize not in (MaterializationMode.NONE, MaterializationMode.TEMP)
+
+    def materialize_statement(self, step: ELTStep) -> str:
+        table = self.quote(step.target_table)
+        if step.materialize == MaterializationMode.TEMP:
+            return f"CREATE TEMPORARY TABLE {table} AS {step.sql}"
+        # MySQL has no unlogged tables; fall back to a regular table
+        return f"CREATE TABLE {table} AS {step.sql}"
+
+    def drop_statement(self, step: ELTStep) -> str:
+        temporary = "TEMPORARY " if step.materialize == MaterializationMode.TEMP else ""
+        return f"DROP {temporary}TABLE IF EXISTS {self.quote(step.target_table)}"
+
+
+class ELTRunner:
+    """
+    Runs an ordered chain of SQL transformations on one destination connection.
+
+    Features:
+    - Single connection for the whole chain (temp tables stay visible)
+    - Autocommit, single-transaction or savepoint-per-step semantics
+    - Dependency-aware failure handling (dependents of failed steps are skipped)
+    - Temp/UNLOGGED materialisation of intermediate results
+    - EXPLAIN (ANALYZE) capture for steps slower than a threshold
+    """
+
+    def __init__(self, connector, dialect: str, options: Optional[ELTRunnerOptions] = None):
+        self.connector = connector
+        self.dialect = "mysql" if dialect.lower() == "mysql" else "postgresql"
+        self.options = options or ELTRunnerOptions()
+
+    async def run(self, steps: List[ELTStep]) -> Dict[str, Any]:
+        """Execute the chain and return per-step results and aggregate metrics."""
+
+        start_time = datetime.now()
+        mode = self.options.transaction_mode
+        step_results: List[Dict[str, Any]] = []
+        failed_steps = set()
+        temp_tables: List[ELTStep] = []
+        aborted_by: Optional[str] = None
+        committed = mode == TransactionMode.AUTOCOMMIT
+
+        async with self.connector.acquire_connection() as connection:
+            session = self._create_session(connection)
+
+            if mode != TransactionMode.AUTOCOMMIT:
+                await session.begin()
+
+            try:
+                for index, step in enumerate(steps):
+                    blocked_by = [dep for dep in step.depends_on if dep in failed_steps]
+                    if aborted_by or blocked_by:
+                        failed_steps.add(step.id)
+                        step_results.append(self._skipped_result(
+                            step, f"Upstream step failed: {aborted_by or ', '.join(blocked_by)}"
+                        ))
+                        continue
+
+                    if not step.sql:
+                        step_results.append(self._skipped_result(step, "No SQL query provided"))
+                        continue
+
+                    result = await self._run_step(session, step, index)
+                    step_results.append(result)
+
+                    if result["status"] == "failed":
+                        failed_steps.add(step.id)
+                        # A failed statement poisons a single transaction; stop the chain
+                        if step.required or mode == TransactionMode.SINGLE:
+                            aborted_by = step.id
+                    elif step.materialize == MaterializationMode.TEMP:
+                        temp_tables.append(step)
+
+                if session.in_transaction:
+                    if aborted_by and mode == TransactionMode.SINGLE:
+                        await session.rollback()
+                    else:
+                        await session.commit()
+                        committed = True
+
+            except Exception:
+                if session.in_transaction:
+                    await session.rollback()
+                raise
+
+            finally:
+                if self.options.drop_temp_tables and temp_tables:
+                    await self._drop_temp_tables(session, temp_tables)
+
+        duration = (datetime.now() - start_time).total_seconds()
+        succeeded = [r for r in step_results if r["status"] == "success"]
+
+        logger.info(
+            f"ELT chain finished: {len(succeeded)}/{len(steps)} steps succeeded "
+            f"in {duration:.2f}s (mode={mode.value}, committed={committed})"
+        )
+
+        return {
+            "status": "failed" if aborted_by else ("partial" if failed_steps else "success"),
+            "transaction_mode": mode.value,
+            "committed": committed,
+            "aborted_by": aborted_by,
+            "steps": step_results,
+            "records_affected": sum(r["records_affected"] for r in succeeded) if committed else 0,
+            "sql_queries_executed": sum(1 for r in step_results if r["status"] != "skipped"),
+            "slow_steps": [r["step_id"] for r in step_results if r.get("slow")],
+            "duration_seconds": duration
+        }
+
+    def _create_session(self, connection):
+        if self.dialect == "mysql":
+            return _MySQLSession(connection)
+        return _PostgreSQLSession(connection)
+
+    async def _run_step(self, session, step: ELTStep, index: int) -> Dict[str, Any]:
+        """
+        Execute one step, isolated by a savepoint when configured.
+
+        Steps whose DDL commits implicitly (regular tables materialised on
+        MySQL) run without a savepoint: the commit would destroy it before
+        RELEASE. Such a step commits the chain so far and cannot be rolled back.
+        """
+
+        use_savepoint = (
+            self.options.transaction_mode == TransactionMode.SAVEPOINT
+            and not session.commits_implicitly(step)
+        )
+        savepoint = f"elt_step_{index}"
+        statement = step.sql
+        if step.materialize != MaterializationMode.NONE:
+            if not step.target_table:
+                return self._failed_result(step, 0.0, "Materialised step requires a target_table")
+            statement = session.materialize_statement(step)
+
+        start_time = datetime.now()
+        try:
+            if use_savepoint:
+                await session.execute(f"SAVEPOINT {savepoint}")
+            if step.materialize != MaterializationMode.NONE:
+                await session.execute(session.drop_statement(step))
+            records_affected = await session.execute(statement)
+            if use_savepoint:
+                await session.execute(f"RELEASE SAVEPOINT {savepoint}")
+        except Exception as e:
+            execution_time_ms = (datetime.now() - start_time).total_seconds() * 1000
+            logger.error(f"ELT step '{step.name}' failed: {str(e)}")
+            if use_savepoint:
+                try:
+                    await session.execute(f"ROLLBACK TO SAVEPOINT {savepoint}")
+                except Exception as rollback_error:
+                    logger.error(f"Rollback to savepoint {savepoint} failed: {rollback_error}")
+            return self._failed_result(step, execution_time_ms, str(e))
+
+        execution_time_ms = (datetime.now() - start_time).total_seconds() * 1000
+        slow = execution_time_ms >= self.options.slow_step_threshold_ms
+
+        logger.info(f"ELT step '{step.name}' completed: {records_affected} rows in {execution_time_ms:.0f}ms")
+
+        result = {
+            "step_id": step.id,
+            "name": step.name,
+            "type": step.type,
+            "status": "success",
+            "records_affected": records_affected,
+            "execution_time_ms": execution_time_ms,
+            "materialized_as": step.target_table if step.materialize != MaterializationMode.NONE else None,
+            "slow": slow
+        }
+
+        if slow and self.options.capture_explain:
+            result["explain_plan"] = await self._capture_plan(session, step, index)
+
+        return result
+
+    async def _capture_plan(self, session, step: ELTStep, index: int) -> Dict[str, Any]:
+        """
+        Capture the plan of a slow step.
+
+        EXPLAIN ANALYZE re-executes the statement, so it always runs inside a
+        savepoint (or throwaway transaction) that is rolled back afterwards.
+        """
+        analyze = self.options.explain_analyze
+        savepoint = f"elt_explain_{index}"
+        owns_transaction = not session.in_transaction
+
+        try:
+            if owns_transaction:
+                await session.begin()
+            await session.execute(f"SAVEPOINT {savepoint}")
+            try:
+                plan = await session.fetch_plan(step.sql, analyze)
+            finally:
+                await session.execute(f"ROLLBACK TO SAVEPOINT {savepoint}")
+            return {"analyze": analyze, "plan": plan}
+        except Exception as e:
+            logger.warning(f"Could not capture plan for ELT step '{step.name}': {str(e)}")
+            return {"analyze": analyze, "error": str(e)}
+        finally:
+            if owns_transaction and session.in_transaction:
+                await session.rollback()
+
+    async def _drop_temp_tables(self, session, steps: List[ELTStep]):
+        """Drop temp tables created by this run; they only live as long as the chain."""
+        for step in steps:
+            try:
+                await session.execute(session.drop_statement(step))
+            except Exception as e:
+                logger.warning(f"Failed to drop temp table {step.target_table}: {str(e)}")
+
+    @staticmethod
+    def _failed_result(step: ELTStep, execution_time_ms: float, error: str) -> Dict[str, Any]:
+        return {
+            "step_id": step.id,
+            "name": step.name,
+            "type": step.type,
+            "status": "failed",
+            "records_affected": 0,
+            "execution_time_ms": execution_time_ms,
+            "error": error
+        }
+
+    @staticmethod
+    def _skipped_result(step: ELTStep, reason: str) -> Dict[str, Any]:
+        return {
+            "step_id": step.id,
+            "name": step.name,
+            "type": step.type,
+            "status": "skipped",
+            "records_affected": 0,
+            "execution_time_ms": 0.0,
+            "reason": reason
+        }
@@ -0,0 +1,231 @@
+"""
+Spillable intermediate storage for pipeline stages.
+
+Data handed between extraction, transformation and loading is kept in memory
+up to a per-execution budget; anything beyond that is spilled as pickled
+segments to a worker scratch directory. pyarrow is not a declared dependency:
+where it is installed, segments are written as uncompressed Arrow IPC
+(Feather) instead and memory-mapped back on read. Stale scratch directories
+are removed by ``maintenance_tasks._cleanup_temp_files``.
+"""
+
+from typing import Dict, Any, List, Optional, Iterator
+import logging
+import os
+import shutil
+import uuid
+from dataclasses import dataclass
+
+import pandas as pd
+
+from ...core.config import settings
+from .batch_sizer import estimate_frame_bytes
+
+try:
+    import pyarrow.feather as feather
+except ImportError:  # pragma: no cover - pyarrow is optional and undeclared; spill as pickle
+    feather = None
+
+logger = logging.getLogger(__name__)
+
+# Scratch directories carry this prefix so the maintenance cleanup recognises them
+SCRATCH_DIR_PREFIX = "temp_etl_"
+
+
+@dataclass
+class _Segment:
+    """One chunk of a dataset, either resident in memory or spilled to disk."""
+    rows: int
+    bytes: int
+    frame: Optional[pd.DataFrame] = None
+    path: Optional[str] = None
+    format: Optional[str] = None
+
+    @property
+    def spilled(self) -> bool:
+        return self.path is not None
+
+
+class SpillableDataset:
+    """
+    Append-only tabular dataset backed by an ``IntermediateStore``.
+
+    Behaves like a read-only sequence of record dicts (``len``, indexing,
+    iteration) so stage code that expects a list keeps working, while
+    ``iter_frames`` lets callers stream one segment at a time.
+    """
+
+    def __init__(self, store: "IntermediateStore", name: str, dataset_id: int):
+        self.store = store
+        self.name = name
+        # Unique within the store; names repeat (e.g. two transformations with one name)
+        self.id = dataset_id
+        self._segments: List[_Segment] = []
+
+    def append_frame(self, df: pd.DataFrame):
+        """Append a DataFrame, spilling it to disk if the memory budget is exhausted."""
+        if df.empty:
+            return
+        frame_bytes = estimate_frame_bytes(df)
+        if self.store.reserve(frame_bytes):
+            self._segments.append(_Segment(rows=len(df), bytes=frame_bytes, frame=df))
+        else:
+            path, file_format = self.store.spill(df, self.name, self.id, len(self._segments))
+            self._segments.append(_Segment(rows=len(df), bytes=frame_bytes, path=path, format=file_format))
+
+    def extend(self, records: List[Dict[str, Any]]):
+        """Append a list of record dicts."""
+        if records:
+            self.append_frame(pd.DataFrame(records))
+
+    def iter_frames(self) -> Iterator[pd.DataFrame]:
+        """Yield the dataset one segment at a time."""
+        for segment in self._segments:
+            yield segment.frame if not segment.spilled else self.store.read_spilled(segment.path, segment.format)
+
+    def to_frame(self) -> pd.DataFrame:
+        frames = list(self.iter_frames())
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        records = []
+        for frame in self.iter_frames():
+            records.extend(frame.to_dict("records"))
+        return records
+
+    def release(self):
+        """Free memory and delete spilled segments."""
+        for segment in self._segments:
+            if segment.spilled:
+                try:
+                    os.remove(segment.path)
+                except OSError:
+                    pass
+            else:
+                self.store.release(segment.bytes)
+        self._segments = []
+
+    @property
+    def spilled_segments(self) -> int:
+        return sum(1 for segment in self._segments if segment.spilled)
+
+    def __len__(self) -> int:
+        return sum(segment.rows for segment in self._segments)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for frame in self.iter_frames():
+            yield from frame.to_dict("records")
+
+    def __getitem__(self, index: int) -> Dict[str, Any]:
+        if index < 0:
+            index += len(self)
+        for segment in self._segments:
+            if index < segment.rows:
+                frame = segment.frame if not segment.spilled else self.store.read_spilled(segment.path, segment.format)
+                return frame.iloc[index].to_dict()
+            index -= segment.rows
+        raise IndexError("SpillableDataset index out of range")
+
+
+class IntermediateStore:
+    """Per-execution memory budget and scratch directory shared by all datasets."""
+
+    def __init__(
+        self,
+        execution_id: Any,
+        memory_budget_bytes: Optional[int] = None,
+        scratch_root: Optional[str] = None
+    ):
+        self.execution_id = execution_id
+        self.memory_budget_bytes = (
+            memory_budget_bytes if memory_budget_bytes is not None
+            else settings.ETL_INTERMEDIATE_MEMORY_BUDGET_MB * 1024 * 1024
+        )
+        self.scratch_root = scratch_root or settings.ETL_SCRATCH_DIR
+        self.memory_used_bytes = 0
+        self.spilled_bytes = 0
+        self.spilled_segments = 0
+        self._scratch_dir: Optional[str] = None
+        self._datasets_created = 0
+
+    def create_dataset(self, name: str) -> SpillableDataset:
+        self._datasets_created += 1
+        return SpillableDataset(self, name, self._datasets_created)
+
+    def dataset_from_records(self, name: str, records: List[Dict[str, Any]]) -> SpillableDataset:
+        dataset = self.create_dataset(name)
+        dataset.extend(records)
+        return dataset
+
+    def reserve(self, size_bytes: int) -> bool:
+        """Claim memory for an in-memory segment; False means the caller must spill."""
+        if self.memory_used_bytes + size_bytes > self.memory_budget_bytes:
+            return False
+        self.memory_used_bytes += size_bytes
+        return True
+
+    def release(self, size_bytes: int):
+        self.memory_used_bytes = max(self.memory_used_bytes - size_bytes, 0)
+
+    @property
+    def scratch_dir(self) -> str:
+        if self._scratch_dir is None:
+            self._scratch_dir = os.path.join(
+                self.scratch_root, f"{SCRATCH_DIR_PREFIX}{self.execution_id}_{uuid.uuid4().hex[:8]}"
+            )
+            os.makedirs(self._scratch_dir, exist_ok=True)
+        return self._scratch_dir
+
+    def spill(self, df: pd.DataFrame, dataset_name: str, dataset_id: int, index: int) -> tuple:
+        """Write a segment to the scratch directory and return ``(path, format)``."""
+        base = os.path.join(self.scratch_dir, f"{_safe_name(dataset_name)}_{dataset_id:04d}_{index:06d}")
+        frame = df.reset_index(drop=True)
+        file_format = "pickle"
+        path = f"{base}.pkl"
+
+        if feather is not None:
+            try:
+                # Uncompressed Arrow IPC can be memory-mapped on read
+                feather.write_feather(frame, f"{base}.arrow", compression="uncompressed")
+                path, file_format = f"{base}.arrow", "arrow"
+            except Exception as e:
+                # Mixed-type object columns cannot always be expressed in Arrow
+                logger.debug(f"Arrow spill failed for {dataset_name}, using pickle: {str(e)}")
+
+        if file_format == "pickle":
+            frame.to_pickle(path)
+
+        size = os.path.getsize(path)
+        self.spilled_bytes += size
+        self.spilled_segments += 1
+        logger.info(f"Spilled {len(frame)} rows ({size / 1024 / 1024:.1f} MB) of '{dataset_name}' to {path}")
+        return path, file_format
+
+    @staticmethod
+    def read_spilled(path: str, file_format: str) -> pd.DataFrame:
+        if file_format == "arrow":
+            return feather.read_table(path, memory_map=True).to_pandas()
+        return pd.read_pickle(path)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "memory_budget_bytes": self.memory_budget_bytes,
+            "memory_used_bytes": self.memory_used_bytes,
+            "spilled_segments": self.spilled_segments,
+            "spilled_bytes": self.spilled_bytes,
+            "scratch_dir": self._scratch_dir
+        }
+
+    def cleanup(self):
+        """Remove this execution's scratch directory."""
+        if self._scratch_dir and os.path.isdir(self._scratch_dir):
+            shutil.rmtree(self._scratch_dir, ignore_errors=True)
+            logger.info(f"Removed ETL scratch directory {self._scratch_dir}")
+        self._scratch_dir = None
+        self.memory_used_bytes = 0
+
+
+def _safe_name(name: str) -> str:
+    return "".join(ch if ch.isalnum() or ch in "-_" else "_" for ch in name)[:64]
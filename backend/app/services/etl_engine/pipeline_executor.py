@@ -8,6 +8,11 @@ import pandas as pd
 
 from ..connectors import PostgreSQLConnector, MySQLConnector
 from ..transformations import DataTransformations
+from .elt_runner import ELTRunner, ELTRunnerOptions, ELTStep
+from .warehouse_validator import WarehouseValidator, ValidationConfig, ValidationScope
+from .profiler import ExecutionProfiler
+from .batch_sizer import AdaptiveBatchSizer, estimate_frame_bytes
+from .intermediate_store import IntermediateStore, SpillableDataset
 
 logger = logging.getLogger(__name__)
 
@@ -61,6 +66,8 @@ class PipelineExecutor:
         self.data_sources = []
         self.transformations = []
         self.destinations = []
+        self.profiler = ExecutionProfiler()
+        self.intermediate_store = IntermediateStore(execution_id)
         
     async def execute(self, execution_params: Dict[str, Any]) -> Dict[str, Any]:
         """Execute the complete pipeline."""
@@ -68,8 +75,13 @@ class PipelineExecutor:
         try:
             logger.info(f"Starting pipeline execution {self.context.execution_id}")
             
+            # Profiling is always on at stage level; a full profiler is opt-in
+            self.profiler = ExecutionProfiler(mode=self._get_profiler_mode(execution_params))
+            self.profiler.start()
+            
             # Initialize pipeline
-            await self._initialize_pipeline(execution_params)
+            with self.profiler.stage("initialization"):
+                await self._initialize_pipeline(execution_params)
             
             # Determine execution pattern (ETL or ELT)
             execution_pattern = self.pipeline_config.get("execution_pattern", "ETL")
@@ -81,6 +93,7 @@ class PipelineExecutor:
             
             # Finalize execution
             await self._finalize_execution(result)
+            self.profiler.stop()
             
             return {
                 "status": "completed",
@@ -91,13 +104,19 @@ class PipelineExecutor:
                 "stages_completed": result.get("stages_completed", []),
                 "performance_metrics": result.get("performance_metrics", {}),
                 "data_quality_score": result.get("data_quality_score", 0),
-                "ai_insights": result.get("ai_insights", [])
+                "ai_insights": result.get("ai_insights", []),
+                "profile": self.profiler.to_dict()
             }
             
         except Exception as e:
+            self.profiler.stop()
             logger.error(f"Pipeline execution failed: {str(e)}")
             await self._handle_execution_failure(e)
             raise
+        
+        finally:
+            # Spilled intermediate segments only live as long as the run
+            self.intermediate_store.cleanup()
     
     async def execute_test(self) -> Dict[str, Any]:
         """Execute pipeline in test mode with limited data."""
@@ -130,25 +149,29 @@ class PipelineExecutor:
         
         # Stage 1: Extract
         await self._update_progress(ExecutionStage.EXTRACTION, 20)
-        extraction_result = await self._execute_extraction()
+        with self.profiler.stage("extraction"):
+            extraction_result = await self._execute_extraction()
         stages_completed.append("extraction")
         performance_metrics["extraction"] = extraction_result.get("metrics", {})
         
         # Stage 2: Transform
         await self._update_progress(ExecutionStage.TRANSFORMATION, 60)
-        transformation_result = await self._execute_transformations(extraction_result["data"])
+        with self.profiler.stage("transformation"):
+            transformation_result = await self._execute_transformations(extraction_result["data"])
         stages_completed.append("transformation")
         performance_metrics["transformation"] = transformation_result.get("metrics", {})
         
         # Stage 3: Load
         await self._update_progress(ExecutionStage.LOADING, 85)
-        loading_result = await self._execute_loading(transformation_result["data"])
+        with self.profiler.stage("loading"):
+            loading_result = await self._execute_loading(transformation_result["data"])
         stages_completed.append("loading")
         performance_metrics["loading"] = loading_result.get("metrics", {})
         
         # Stage 4: Validate
         await self._update_progress(ExecutionStage.VALIDATION, 95)
-        validation_result = await self._execute_validation()
+        with self.profiler.stage("validation"):
+            validation_result = await self._execute_validation()
         stages_completed.append("validation")
         
         return {
@@ -168,25 +191,29 @@ class PipelineExecutor:
         
         # Stage 1: Extract
         await self._update_progress(ExecutionStage.EXTRACTION, 25)
-        extraction_result = await self._execute_extraction()
+        with self.profiler.stage("extraction"):
+            extraction_result = await self._execute_extraction()
         stages_completed.append("extraction")
         performance_metrics["extraction"] = extraction_result.get("metrics", {})
         
         # Stage 2: Load (raw data)
         await self._update_progress(ExecutionStage.LOADING, 50)
-        raw_loading_result = await self._execute_raw_loading(extraction_result["data"])
+        with self.profiler.stage("raw_loading"):
+            raw_loading_result = await self._execute_raw_loading(extraction_result["data"])
         stages_completed.append("raw_loading")
         performance_metrics["raw_loading"] = raw_loading_result.get("metrics", {})
         
         # Stage 3: Transform (in destination)
         await self._update_progress(ExecutionStage.TRANSFORMATION, 80)
-        transformation_result = await self._execute_in_place_transformations()
+        with self.profiler.stage("transformation"):
+            transformation_result = await self._execute_in_place_transformations()
         stages_completed.append("transformation")
         performance_metrics["transformation"] = transformation_result.get("metrics", {})
         
         # Stage 4: Validate
         await self._update_progress(ExecutionStage.VALIDATION, 95)
-        validation_result = await self._execute_validation()
+        with self.profiler.stage("validation"):
+            validation_result = await self._execute_validation()
         stages_completed.append("validation")
         
         return {
@@ -237,13 +264,15 @@ class PipelineExecutor:
         
         for source in self.data_sources:
             try:
-                source_data = await self._extract_from_source(source)
+                with self.profiler.step(f"source:{source.get('id')}") as step_profile:
+                    source_data = await self._extract_from_source(source)
+                    step_profile.rows_out = len(source_data)
                 extracted_data.append({
                     "source_id": source.get("id"),
                     "data": source_data,
-                    "record_count": len(source_data) if isinstance(source_data, list) else 1
+                    "record_count": len(source_data)
                 })
-                total_records += len(source_data) if isinstance(source_data, list) else 1
+                total_records += len(source_data)
                 
             except Exception as e:
                 error_msg = f"Failed to extract from source {source.get('id')}: {str(e)}"
@@ -255,6 +284,13 @@ class PipelineExecutor:
         
         extraction_metrics["end_time"] = datetime.now()
         extraction_metrics["total_records"] = total_records
+        extraction_metrics["batch_sizing"] = {
+            name: summary for name, summary in self.context.metadata.get("batch_sizing", {}).items()
+            if name.startswith("extract:")
+        }
+        extraction_metrics["intermediate_store"] = self.intermediate_store.stats()
+        if self.profiler.current_stage:
+            self.profiler.current_stage.rows_out = total_records
         extraction_metrics["duration_seconds"] = (
             extraction_metrics["end_time"] - extraction_metrics["start_time"]
         ).total_seconds()
@@ -281,12 +317,24 @@ class PipelineExecutor:
         
         for transformation in self.transformations:
             try:
-                transformation_result = await self._apply_transformation(transformation, transformed_data)
-                transformed_data = transformation_result["data"]
-                
-                # Collect AI insights if available
-                if transformation_result.get("ai_insights"):
-                    ai_insights.extend(transformation_result["ai_insights"])
+                with self.profiler.step(f"transform:{transformation.get('name')}") as step_profile:
+                    step_profile.rows_in = self._count_records(transformed_data)
+                    next_data = []
+                    
+                    # Transform each source's records; results go back into the spillable store
+                    for item in transformed_data:
+                        dataset, insights = await self._transform_dataset(transformation, item)
+                        next_data.append({**item, "data": dataset, "record_count": len(dataset)})
+                        
+                        # Collect AI insights if available
+                        ai_insights.extend(insights)
+                    
+                    # Only drop the previous stage's data once every source transformed
+                    for item in transformed_data:
+                        if isinstance(item["data"], SpillableDataset):
+                            item["data"].release()
+                    transformed_data = next_data
+                    step_profile.rows_out = self._count_records(transformed_data)
                     
             except Exception as e:
                 error_msg = f"Transformation {transformation.get('name')} failed: {str(e)}"
@@ -323,8 +371,16 @@ class PipelineExecutor:
         
         for destination in self.destinations:
             try:
-                load_result = await self._load_to_destination(destination, transformed_data)
-                total_records_loaded += load_result.get("records_loaded", 0)
+                with self.profiler.step(f"destination:{destination.get('id')}") as step_profile:
+                    records_loaded = 0
+                    for index, item in enumerate(transformed_data):
+                        # Later sources append to what the first one loaded
+                        load_result = await self._load_to_destination(
+                            destination, item["data"], mode=None if index == 0 else "append"
+                        )
+                        records_loaded += load_result.get("records_loaded", 0)
+                    step_profile.rows_out = records_loaded
+                total_records_loaded += records_loaded
                 
             except Exception as e:
                 error_msg = f"Loading to destination {destination.get('id')} failed: {str(e)}"
@@ -336,6 +392,11 @@ class PipelineExecutor:
         
         loading_metrics["end_time"] = datetime.now()
         loading_metrics["records_loaded"] = total_records_loaded
+        loading_metrics["batch_sizing"] = {
+            name: summary for name, summary in self.context.metadata.get("batch_sizing", {}).items()
+            if name.startswith("load:")
+        }
+        loading_metrics["intermediate_store"] = self.intermediate_store.stats()
         loading_metrics["duration_seconds"] = (
             loading_metrics["end_time"] - loading_metrics["start_time"]
         ).total_seconds()
@@ -370,22 +431,61 @@ class PipelineExecutor:
         records_transformed = 0
         ai_insights = []
         
-        for transformation in self.transformations:
-            try:
-                # Execute transformation as SQL in destination database
-                result = await self._execute_sql_transformation(transformation)
-                records_transformed += result.get("records_affected", 0)
-                transformation_metrics["sql_queries_executed"] += 1
+        if self.transformations:
+            if not self.destinations:
+                raise Exception("No destinations configured for in-place transformations")
+            
+            # Use the first destination for ELT transformations
+            destination = self.destinations[0]
+            destination_type = destination.get("type", "unknown").lower()
+            connection_config = destination.get("connection_config", {})
+            
+            if destination_type in ["postgresql", "postgres"]:
+                connector = PostgreSQLConnector(connection_config)
+            elif destination_type in ["mysql"]:
+                connector = MySQLConnector(connection_config)
+            else:
+                raise ValueError(f"Unsupported destination type for SQL transformation: {destination_type}")
+            
+            options = ELTRunnerOptions.from_config({
+                **self.pipeline_config.get("elt_options", {}),
+                **self.context.metadata.get("elt_options", {})
+            })
+            steps = [ELTStep.from_transformation(t) for t in self.transformations]
+            
+            with self.profiler.measure("io"):
+                if not await connector.connect():
+                    raise Exception(f"Could not connect to {destination_type} destination for in-place transformations")
                 
-                # Generate AI insights for transformation results
-                if transformation.get("ai_enabled", False):
-                    insights = await self._generate_transformation_insights(transformation, result)
-                    ai_insights.extend(insights)
-                    
-            except Exception as e:
-                error_msg = f"In-place transformation failed: {str(e)}"
-                logger.error(error_msg)
-                transformation_metrics["errors"].append(error_msg)
+                try:
+                    # Run the whole chain on one connection
+                    chain_result = await ELTRunner(connector, destination_type, options).run(steps)
+                finally:
+                    await connector.disconnect()
+            
+            transformations_by_id = {step.id: t for step, t in zip(steps, self.transformations)}
+            for step_result in chain_result["steps"]:
+                if step_result["status"] == "failed":
+                    transformation_metrics["errors"].append(
+                        f"In-place transformation {step_result['name']} failed: {step_result['error']}"
+                    )
+                elif step_result["status"] == "success":
+                    # Generate AI insights for transformation results
+                    transformation = transformations_by_id[step_result["step_id"]]
+                    if transformation.get("ai_enabled", False):
+                        insights = await self._generate_transformation_insights(transformation, step_result)
+                        ai_insights.extend(insights)
+            
+            records_transformed = chain_result["records_affected"]
+            transformation_metrics["sql_queries_executed"] = chain_result["sql_queries_executed"]
+            transformation_metrics["transaction_mode"] = chain_result["transaction_mode"]
+            transformation_metrics["slow_steps"] = chain_result["slow_steps"]
+            transformation_metrics["steps"] = chain_result["steps"]
+            
+            if chain_result["aborted_by"]:
+                raise Exception(
+                    f"Required transformation failed: {'; '.join(transformation_metrics['errors'])}"
+                )
         
         transformation_metrics["end_time"] = datetime.now()
         transformation_metrics["duration_seconds"] = (
@@ -454,95 +554,28 @@ class PipelineExecutor:
                     logger.error("No destination table specified for validation")
                     return None
                 
-                # Perform real validation checks
-                validation_results = {
-                    "checks_passed": 0,
-                    "checks_failed": 0,
-                    "data_completeness": 0.0,
-                    "data_accuracy": 0.0,
-                    "schema_compliance": 0.0
-                }
-                
-                # Check 1: Row count validation
-                count_query = f"SELECT COUNT(*) as total FROM {table_name}"
-                count_result = await connector.execute_query(count_query)
-                total_rows = count_result.iloc[0]["total"] if not count_result.empty else 0
-                
-                if total_rows > 0:
-                    validation_results["checks_passed"] += 1
-                    validation_results["data_completeness"] += 25.0
-                else:
-                    validation_results["checks_failed"] += 1
+                validation_config = load_config.get("validation", {})
                 
-                # Check 2: Null value analysis
-                if destination_type in ["postgresql", "postgres"]:
-                    null_check_query = f"""
-                        SELECT 
-                            COUNT(*) as total_rows,
-                            SUM(CASE WHEN id IS NULL THEN 1 ELSE 0 END) as null_ids
-                        FROM {table_name}
-                    """
-                else:  # MySQL
-                    null_check_query = f"""
-                        SELECT 
-                            COUNT(*) as total_rows,
-                            SUM(CASE WHEN id IS NULL THEN 1 ELSE 0 END) as null_ids
-                        FROM `{table_name}`
-                    """
-                
-                try:
-                    null_result = await connector.execute_query(null_check_query)
-                    if not null_result.empty:
-                        null_percentage = (null_result.iloc[0]["null_ids"] / null_result.iloc[0]["total_rows"]) * 100
-                        if null_percentage <= 5:  # Less than 5% null values
-                            validation_results["checks_passed"] += 1
-                            validation_results["data_completeness"] += 25.0
-                        else:
-                            validation_results["checks_failed"] += 1
-                except Exception as e:
-                    logger.warning(f"Null check failed: {e}")
-                    validation_results["checks_failed"] += 1
-                
-                # Check 3: Schema compliance (basic)
-                try:
-                    schema_info = await connector.get_schema_info(table_name)
-                    if schema_info and "columns" in schema_info:
-                        validation_results["checks_passed"] += 1
-                        validation_results["schema_compliance"] = 95.0  # Basic schema exists
-                    else:
-                        validation_results["checks_failed"] += 1
-                except Exception as e:
-                    logger.warning(f"Schema check failed: {e}")
-                    validation_results["checks_failed"] += 1
-                
-                # Check 4: Data accuracy (sample data types)
-                try:
-                    if destination_type in ["postgresql", "postgres"]:
-                        sample_query = f"SELECT * FROM {table_name} LIMIT 100"
-                    else:  # MySQL
-                        sample_query = f"SELECT * FROM `{table_name}` LIMIT 100"
-                    
-                    sample_data = await connector.execute_query(sample_query)
-                    if not sample_data.empty:
-                        validation_results["checks_passed"] += 1
-                        validation_results["data_accuracy"] = 90.0  # Basic accuracy if data exists
-                    else:
-                        validation_results["checks_failed"] += 1
-                except Exception as e:
-                    logger.warning(f"Data accuracy check failed: {e}")
-                    validation_results["checks_failed"] += 1
-                
-                # Calculate overall quality score
-                total_checks = validation_results["checks_passed"] + validation_results["checks_failed"]
-                if total_checks > 0:
-                    quality_score = (validation_results["checks_passed"] / total_checks) * 100
-                else:
-                    quality_score = 0.0
+                # Scope checks to the rows written by this execution where possible
+                scope = ValidationScope(
+                    batch_column=load_config.get("batch_column"),
+                    batch_id=str(self.context.execution_id),
+                    watermark_column=validation_config.get("watermark_column"),
+                    watermark=self.context.start_time
+                )
                 
-                validation_results["quality_score"] = quality_score
+                validator = WarehouseValidator(
+                    connector,
+                    destination_type,
+                    ValidationConfig.from_config(validation_config)
+                )
                 
-                logger.info(f"Validation completed: {validation_results['checks_passed']}/{total_checks} checks passed")
-                return validation_results
+                # All column checks run in a single aggregate scan
+                return await validator.validate(
+                    table_name,
+                    schema=load_config.get("schema"),
+                    scope=scope
+                )
                 
             finally:
                 await connector.disconnect()
@@ -630,6 +663,10 @@ class PipelineExecutor:
                             "type": step.transformation_type.value if step.transformation_type else "custom",
                             "config": step.transformation_config or {},
                             "sql": step.step_config.get("sql", ""),
+                            "target_config": step.step_config.get("target_config", {}),
+                            "materialize": step.step_config.get("materialize"),
+                            "depends_on": step.step_config.get("depends_on", []),
+                            "required": step.step_config.get("required", True),
                             "ai_enabled": step.step_config.get("ai_enabled", False)
                         }
                         transformations.append(transform_config)
@@ -657,7 +694,8 @@ class PipelineExecutor:
                     "schedule_cron": pipeline.schedule_cron,
                     "is_scheduled": pipeline.is_scheduled,
                     "tags": pipeline.tags or [],
-                    "version": pipeline.version
+                    "version": pipeline.version,
+                    "elt_options": (pipeline.pipeline_config or {}).get("elt_options", {})
                 }
                 
                 logger.info(
@@ -702,9 +740,87 @@ class PipelineExecutor:
         
         if params.get("skip_validation"):
             self.context.metadata["skip_validation"] = True
+        
+        if params.get("elt_options"):
+            self.context.metadata["elt_options"] = params["elt_options"]
+    
+    @staticmethod
+    def _get_profiler_mode(params: Dict[str, Any]) -> Optional[str]:
+        """Resolve the opt-in profiler mode from execution parameters."""
+        profile = params.get("profile")
+        if not profile:
+            return None
+        return profile if isinstance(profile, str) else "sampling"
+    
+    def _record_batch_sizing(self, batch_sizer: AdaptiveBatchSizer):
+        """Keep the batch sizes chosen for a source/destination for stage metrics."""
+        self.context.metadata.setdefault("batch_sizing", {})[batch_sizer.name] = batch_sizer.summary()
+    
+    @staticmethod
+    def _count_records(data: List[Dict[str, Any]]) -> int:
+        """Count records across the per-source payloads passed between stages."""
+        return sum(len(item["data"]) for item in data)
+    
+    @staticmethod
+    def _as_records(data) -> List[Dict[str, Any]]:
+        """Materialise stage data as a list of records for row-oriented transformations."""
+        if isinstance(data, SpillableDataset):
+            return data.to_records()
+        return data
+    
+    @staticmethod
+    def _is_row_local(transformation: Dict[str, Any]) -> bool:
+        """
+        Whether a transformation maps each row independently of the others.
+        
+        Row-local transformations can run segment by segment; deduplication,
+        aggregation, uniqueness validation and right/outer/cross joins need
+        the whole dataset at once.
+        """
+        transform_type = transformation.get("type", "unknown")
+        config = transformation.get("config", {})
+        if transform_type in ("deduplicate", "aggregate"):
+            return False
+        if transform_type == "validate":
+            return not any(rule.get("type") == "unique" for rule in config.get("rules", []))
+        if transform_type == "join":
+            return bool(config.get("left_on")) and config.get("how", "inner") in ("inner", "left")
+        return True
+    
+    async def _transform_dataset(self, transformation: Dict[str, Any], item: Dict[str, Any]) -> tuple:
+        """
+        Apply a transformation to one source's data and store the result.
+        
+        Row-local transformations stream a ``SpillableDataset`` one segment at
+        a time, so at most one segment's records are held in memory; others
+        materialise the whole dataset. Returns ``(dataset, ai_insights)``.
+        """
+        data = item["data"]
+        output = self.intermediate_store.create_dataset(f"{transformation.get('name')}_{item.get('source_id')}")
+        
+        if isinstance(data, SpillableDataset) and self._is_row_local(transformation):
+            chunks = (frame.to_dict("records") for frame in data.iter_frames())
+        else:
+            chunks = iter([self._as_records(data)])
+        
+        ai_insights = []
+        for records in chunks:
+            with self.profiler.measure("pandas"):
+                transformation_result = await self._apply_transformation(transformation, records)
+                output.extend(transformation_result["data"])
+            # Row-local insights repeat per segment; keep the first set
+            if transformation_result.get("ai_insights") and not ai_insights:
+                ai_insights = transformation_result["ai_insights"]
+        
+        return output, ai_insights
     
-    async def _extract_from_source(self, source: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Extract data from a specific source using real database connectors."""
+    async def _extract_from_source(self, source: Dict[str, Any]) -> SpillableDataset:
+        """
+        Extract data from a specific source using real database connectors.
+        
+        Batches are kept as DataFrames in the execution's intermediate store,
+        which spills to disk once its memory budget is used up.
+        """
         source_type = source.get("type", "unknown")
         connection_config = source.get("connection_config", {})
         query_config = source.get("query_config", {})
@@ -726,7 +842,8 @@ class PipelineExecutor:
                 raise ValueError(error_msg)
             
             # Connect and extract data
-            await connector.connect()
+            with self.profiler.measure("io"):
+                await connector.connect()
             
             # Apply sample size if in test mode
             limit = None
@@ -735,21 +852,40 @@ class PipelineExecutor:
                 query_config["limit"] = limit
             
             # Extract data in batches and combine
-            all_data = []
+            all_data = self.intermediate_store.create_dataset(f"extract_{source.get('id')}")
             batch_count = 0
             
-            async for batch_df in connector.extract_data(query_config, limit=limit):
-                # Convert DataFrame to list of dictionaries
-                batch_records = batch_df.to_dict('records')
-                all_data.extend(batch_records)
+            # Batch size adapts to observed row width and fetch latency
+            batch_sizer = AdaptiveBatchSizer.for_connector(
+                source_type,
+                query_config.get("batch_sizing"),
+                name=f"extract:{source.get('id')}"
+            )
+            
+            batches = connector.extract_data(query_config, limit=limit, batch_sizer=batch_sizer)
+            while True:
+                with self.profiler.measure("io"):
+                    batch_df = await anext(batches, None)
+                if batch_df is None:
+                    break
+                
+                with self.profiler.measure("pandas"):
+                    batch_bytes = estimate_frame_bytes(batch_df)
+                    all_data.append_frame(batch_df)
                 batch_count += 1
                 
-                logger.info(f"Extracted batch {batch_count}: {len(batch_records)} records")
+                if self.profiler.current_step:
+                    self.profiler.current_step.bytes_out += batch_bytes
+                
+                logger.info(f"Extracted batch {batch_count}: {len(batch_df)} records")
                 
                 # Update progress
-                self._update_progress(f"Extracted {len(all_data)} records from {source.get('name', 'source')}")
+                self._log_progress(f"Extracted {len(all_data)} records from {source.get('name', 'source')}")
+            
+            with self.profiler.measure("io"):
+                await connector.disconnect()
             
-            await connector.disconnect()
+            self._record_batch_sizing(batch_sizer)
             
             logger.info(f"Successfully extracted {len(all_data)} records from {source_type} source")
             return all_data
@@ -760,8 +896,8 @@ class PipelineExecutor:
                 await connector.disconnect()
             raise Exception(f"Data extraction failed: {str(e)}")
     
-    def _update_progress(self, message: str):
-        """Update execution progress with a message."""
+    def _log_progress(self, message: str):
+        """Log execution progress with a message."""
         logger.info(f"Progress: {message}")
         # This could be enhanced to update the database execution record
     
@@ -843,8 +979,19 @@ class PipelineExecutor:
             "transformation_result": result
         }
     
-    async def _load_to_destination(self, destination: Dict[str, Any], data: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Load data to a specific destination using real database connectors."""
+    async def _load_to_destination(
+        self,
+        destination: Dict[str, Any],
+        data,
+        mode: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Load data to a specific destination using real database connectors.
+        
+        ``data`` is either a list of records or a ``SpillableDataset``; the
+        latter is loaded one segment at a time so spilled data never has to be
+        fully resident in memory.
+        """
         destination_type = destination.get("type", "unknown")
         connection_config = destination.get("connection_config", {})
         load_config = destination.get("load_config", {})
@@ -866,31 +1013,70 @@ class PipelineExecutor:
                 raise ValueError(error_msg)
             
             # Connect and load data
-            await connector.connect()
-            
-            # Convert data to DataFrame for bulk loading
-            df = pd.DataFrame(data)
+            with self.profiler.measure("io"):
+                await connector.connect()
             
             # Determine load mode (append, replace, etc.)
-            load_mode = load_config.get("mode", "append")
+            load_mode = mode or load_config.get("mode", "append")
             
-            # Load data using connector
-            load_result = await connector.load_data(
-                data=df,
-                destination_config=load_config,
-                mode=load_mode
+            batch_sizer = AdaptiveBatchSizer.for_connector(
+                destination_type,
+                load_config.get("batch_sizing"),
+                name=f"load:{destination.get('id')}"
             )
             
-            await connector.disconnect()
+            if isinstance(data, SpillableDataset):
+                frames = data.iter_frames()
+            else:
+                frames = iter([pd.DataFrame(data)])
+            
+            rows_loaded = 0
+            load_time_seconds = 0.0
+            status = "completed"
+            
+            while True:
+                # Convert data to DataFrame for bulk loading
+                with self.profiler.measure("pandas"):
+                    df = next(frames, None)
+                    if df is None:
+                        break
+                    if self.profiler.current_step:
+                        self.profiler.current_step.rows_in += len(df)
+                        self.profiler.current_step.bytes_in += estimate_frame_bytes(df)
+                    
+                    # Stamp rows with the execution id so validation can scope to this batch
+                    if load_config.get("batch_column"):
+                        df = df.assign(**{load_config["batch_column"]: str(self.context.execution_id)})
+                
+                # Load data using connector
+                with self.profiler.measure("io"):
+                    load_result = await connector.load_data(
+                        data=df,
+                        destination_config=load_config,
+                        mode=load_mode,
+                        batch_sizer=batch_sizer
+                    )
+                
+                rows_loaded += load_result.get("rows_loaded", 0)
+                load_time_seconds += load_result.get("load_time_seconds", 0)
+                status = load_result.get("status", status)
+                
+                # Only the first segment may truncate the destination
+                load_mode = "append"
+            
+            with self.profiler.measure("io"):
+                await connector.disconnect()
+            
+            self._record_batch_sizing(batch_sizer)
             
-            logger.info(f"Successfully loaded {load_result.get('rows_loaded', 0)} records to {destination_type} destination")
+            logger.info(f"Successfully loaded {rows_loaded} records to {destination_type} destination")
             
             return {
-                "records_loaded": load_result.get("rows_loaded", 0),
+                "records_loaded": rows_loaded,
                 "destination_id": destination.get("id"),
-                "load_time_seconds": load_result.get("load_time_seconds", 0),
-                "rows_per_second": load_result.get("rows_per_second", 0),
-                "status": load_result.get("status", "completed")
+                "load_time_seconds": load_time_seconds,
+                "rows_per_second": rows_loaded / load_time_seconds if load_time_seconds > 0 else 0,
+                "status": status
             }
             
         except Exception as e:
@@ -899,91 +1085,6 @@ class PipelineExecutor:
                 await connector.disconnect()
             raise Exception(f"Data loading failed: {str(e)}")
     
-    async def _execute_sql_transformation(self, transformation: Dict[str, Any]) -> Dict[str, Any]:
-        """Execute SQL transformation in destination database for ELT pattern."""
-        
-        try:
-            # Get transformation SQL and target configuration
-            sql_query = transformation.get("sql")
-            target_config = transformation.get("target_config", {})
-            
-            if not sql_query:
-                logger.error("No SQL query provided for transformation")
-                return {
-                    "records_affected": 0,
-                    "execution_time_ms": 0,
-                    "error": "No SQL query provided"
-                }
-            
-            # Get destination connector from destinations list
-            if not self.destinations:
-                logger.error("No destinations configured for SQL transformation")
-                return {
-                    "records_affected": 0,
-                    "execution_time_ms": 0,
-                    "error": "No destinations configured"
-                }
-            
-            # Use the first destination for ELT transformations
-            destination = self.destinations[0]
-            destination_type = destination.get("type", "unknown").lower()
-            connection_config = destination.get("connection_config", {})
-            
-            start_time = datetime.now()
-            
-            # Create appropriate connector
-            connector = None
-            if destination_type in ["postgresql", "postgres"]:
-                connector = PostgreSQLConnector(connection_config)
-            elif destination_type in ["mysql"]:
-                connector = MySQLConnector(connection_config)
-            else:
-                logger.error(f"Unsupported destination type for SQL transformation: {destination_type}")
-                return {
-                    "records_affected": 0,
-                    "execution_time_ms": 0,
-                    "error": f"Unsupported destination type: {destination_type}"
-                }
-            
-            # Connect and execute transformation SQL
-            await connector.connect()
-            
-            try:
-                # Execute the SQL transformation using the connector's method
-                source_table = target_config.get("source_table", "")
-                target_table = target_config.get("target_table", "")
-                
-                result = await connector.execute_transformation_sql(
-                    transformation_sql=sql_query,
-                    source_table=source_table,
-                    target_table=target_table
-                )
-                
-                execution_time_ms = (datetime.now() - start_time).total_seconds() * 1000
-                
-                logger.info(f"SQL transformation completed: {result.get('rows_affected', 0)} rows affected in {execution_time_ms:.0f}ms")
-                
-                return {
-                    "records_affected": result.get("rows_affected", 0),
-                    "execution_time_ms": execution_time_ms,
-                    "source_table": source_table,
-                    "target_table": target_table,
-                    "status": "success"
-                }
-                
-            finally:
-                await connector.disconnect()
-        
-        except Exception as e:
-            execution_time_ms = (datetime.now() - start_time).total_seconds() * 1000 if 'start_time' in locals() else 0
-            logger.error(f"SQL transformation failed: {str(e)}")
-            return {
-                "records_affected": 0,
-                "execution_time_ms": execution_time_ms,
-                "error": str(e),
-                "status": "failed"
-            }
-    
     async def _generate_transformation_insights(self, transformation: Dict[str, Any], result: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Generate insights for transformation results."""
         
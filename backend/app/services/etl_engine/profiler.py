@@ -0,0 +1,325 @@
+"""
+Execution profiling for pipeline runs.
+
+Records per-stage and per-step wall/CPU time, row and byte counts, peak RSS
+(sampled on a timer while a span is open) and the split between connector
+I/O and pandas work. An opt-in profiler (stack sampling or cProfile) can be
+attached to the whole run; its output is JSON-serialisable so it can be
+stored with the ``PipelineExecution``.
+"""
+
+from typing import Dict, Any, List, Optional, Iterator
+import cProfile
+import io
+import logging
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ProfileSpan:
+    """Timing and volume counters for a stage or a step within a stage."""
+    name: str
+    wall_time_seconds: float = 0.0
+    cpu_time_seconds: float = 0.0
+    io_time_seconds: float = 0.0
+    pandas_time_seconds: float = 0.0
+    rows_in: int = 0
+    rows_out: int = 0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    peak_rss_bytes: int = 0
+    steps: List["ProfileSpan"] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {
+            "name": self.name,
+            "wall_time_seconds": round(self.wall_time_seconds, 6),
+            "cpu_time_seconds": round(self.cpu_time_seconds, 6),
+            "io_time_seconds": round(self.io_time_seconds, 6),
+            "pandas_time_seconds": round(self.pandas_time_seconds, 6),
+            "other_time_seconds": round(
+                max(self.wall_time_seconds - self.io_time_seconds - self.pandas_time_seconds, 0.0), 6
+            ),
+            "rows_in": self.rows_in,
+            "rows_out": self.rows_out,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "peak_rss_bytes": self.peak_rss_bytes
+        }
+        if self.steps:
+            data["steps"] = [step.to_dict() for step in self.steps]
+        return data
+
+
+class StackSampler:
+    """
+    Low-overhead sampling profiler for one thread.
+
+    A daemon thread snapshots the target thread's Python stack at a fixed
+    interval and aggregates the samples in folded-stack format
+    (``outer;inner;leaf count``), which flame-graph tools consume directly.
+    """
+
+    def __init__(self, interval_seconds: float = 0.005, max_depth: int = 64):
+        self.interval_seconds = interval_seconds
+        self.max_depth = max_depth
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+        self._target_thread_id: Optional[int] = None
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._target_thread_id = threading.get_ident()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="pipeline-stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval_seconds):
+            frame = sys._current_frames().get(self._target_thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None and len(stack) < self.max_depth:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{frame.f_lineno})")
+                frame = frame.f_back
+            self.samples[";".join(reversed(stack))] += 1
+            self.sample_count += 1
+
+    def to_dict(self, limit: int = 500) -> Dict[str, Any]:
+        return {
+            "type": "sampling",
+            "interval_seconds": self.interval_seconds,
+            "sample_count": self.sample_count,
+            "folded_stacks": [
+                f"{stack} {count}" for stack, count in self.samples.most_common(limit)
+            ]
+        }
+
+
+class _RSSSampler:
+    """
+    Samples process RSS on a timer into every open span.
+
+    Runs from the first open span until the last one closes, so memory that
+    is allocated and freed inside a step still shows up in its peak.
+    """
+
+    def __init__(self, profiler: "ExecutionProfiler", interval_seconds: float):
+        self.profiler = profiler
+        self.interval_seconds = interval_seconds
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="pipeline-rss-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval_seconds):
+            self.profiler._record_rss()
+
+
+class _CProfileCollector:
+    """Deterministic profiler summarised to the top functions by cumulative time."""
+
+    def __init__(self):
+        self.profile = cProfile.Profile()
+
+    def start(self):
+        self.profile.enable()
+
+    def stop(self):
+        self.profile.disable()
+
+    def to_dict(self, limit: int = 50) -> Dict[str, Any]:
+        stats = pstats.Stats(self.profile, stream=io.StringIO())
+        stats.sort_stats(pstats.SortKey.CUMULATIVE)
+        functions = []
+        for (filename, line, name), (_, ncalls, tottime, cumtime, _) in stats.stats.items():
+            functions.append({
+                "function": f"{name} ({filename.rsplit('/', 1)[-1]}:{line})",
+                "calls": ncalls,
+                "total_time_seconds": round(tottime, 6),
+                "cumulative_time_seconds": round(cumtime, 6)
+            })
+        functions.sort(key=lambda f: f["cumulative_time_seconds"], reverse=True)
+        return {"type": "cprofile", "top_functions": functions[:limit]}
+
+
+class ExecutionProfiler:
+    """
+    Profiling surface for ``PipelineExecutor``.
+
+    Usage::
+
+        with profiler.stage("extraction") as stage:
+            with profiler.step("orders_source"):
+                with profiler.measure("io"):
+                    ...
+    """
+
+    PROFILER_MODES = ("sampling", "cprofile")
+
+    def __init__(
+        self,
+        mode: Optional[str] = None,
+        sample_interval_seconds: float = 0.005,
+        rss_interval_seconds: float = 0.05
+    ):
+        if mode and mode not in self.PROFILER_MODES:
+            raise ValueError(f"Unknown profiler mode '{mode}'. Supported modes: {list(self.PROFILER_MODES)}")
+        self.mode = mode
+        self.sample_interval_seconds = sample_interval_seconds
+        self.stages: List[ProfileSpan] = []
+        self._process = psutil.Process()
+        self._open_spans: List[ProfileSpan] = []
+        self._spans_lock = threading.Lock()
+        self._rss_sampler = _RSSSampler(self, rss_interval_seconds)
+        self._current_stage: Optional[ProfileSpan] = None
+        self._current_step: Optional[ProfileSpan] = None
+        self._collector = None
+        self._start_wall: Optional[float] = None
+        self._start_cpu: Optional[float] = None
+        self._end_wall: Optional[float] = None
+        self._end_cpu: Optional[float] = None
+
+    def start(self):
+        """Start the run timer and, if enabled, the attached profiler."""
+        self._start_wall = time.perf_counter()
+        self._start_cpu = time.process_time()
+        if self.mode == "sampling":
+            self._collector = StackSampler(self.sample_interval_seconds)
+        elif self.mode == "cprofile":
+            self._collector = _CProfileCollector()
+        if self._collector:
+            self._collector.start()
+            logger.info(f"Pipeline profiler started in {self.mode} mode")
+
+    def stop(self):
+        """Stop the run timer and the attached profiler."""
+        self._end_wall = time.perf_counter()
+        self._end_cpu = time.process_time()
+        if self._collector:
+            self._collector.stop()
+
+    @property
+    def current_stage(self) -> Optional[ProfileSpan]:
+        return self._current_stage
+
+    @property
+    def current_step(self) -> Optional[ProfileSpan]:
+        return self._current_step
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[ProfileSpan]:
+        """Profile a pipeline stage."""
+        span = ProfileSpan(name=name)
+        self.stages.append(span)
+        previous_stage, previous_step = self._current_stage, self._current_step
+        self._current_stage, self._current_step = span, None
+        try:
+            with self._timed(span):
+                yield span
+        finally:
+            self._current_stage, self._current_step = previous_stage, previous_step
+
+    @contextmanager
+    def step(self, name: str) -> Iterator[ProfileSpan]:
+        """Profile a step (source, transformation, destination) of the current stage."""
+        span = ProfileSpan(name=name)
+        if self._current_stage:
+            self._current_stage.steps.append(span)
+        previous_step = self._current_step
+        self._current_step = span
+        try:
+            with self._timed(span):
+                yield span
+        finally:
+            self._current_step = previous_step
+
+    @contextmanager
+    def measure(self, category: str) -> Iterator[None]:
+        """Attribute the enclosed time to ``io`` or ``pandas`` on the current step and stage."""
+        attribute = f"{category}_time_seconds"
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            for span in (self._current_stage, self._current_step):
+                if span is not None:
+                    setattr(span, attribute, getattr(span, attribute) + elapsed)
+            self._record_rss()
+
+    @contextmanager
+    def _timed(self, span: ProfileSpan) -> Iterator[None]:
+        with self._spans_lock:
+            self._open_spans.append(span)
+            first_span = len(self._open_spans) == 1
+        if first_span:
+            self._rss_sampler.start()
+        self._record_rss()
+        start_wall = time.perf_counter()
+        start_cpu = time.process_time()
+        try:
+            yield
+        finally:
+            span.wall_time_seconds += time.perf_counter() - start_wall
+            span.cpu_time_seconds += time.process_time() - start_cpu
+            self._record_rss()
+            with self._spans_lock:
+                self._open_spans.remove(span)
+                last_span = not self._open_spans
+            if last_span:
+                self._rss_sampler.stop()
+
+    def _record_rss(self):
+        """Raise the peak RSS of every open span to the current RSS."""
+        try:
+            rss = self._process.memory_info().rss
+        except psutil.Error:
+            return
+        with self._spans_lock:
+            for span in self._open_spans:
+                if rss > span.peak_rss_bytes:
+                    span.peak_rss_bytes = rss
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serialisable profile for storage with the execution."""
+        end_wall = self._end_wall or time.perf_counter()
+        end_cpu = self._end_cpu or time.process_time()
+        data = {
+            "wall_time_seconds": round(end_wall - self._start_wall, 6) if self._start_wall else 0.0,
+            "cpu_time_seconds": round(end_cpu - self._start_cpu, 6) if self._start_cpu else 0.0,
+            "peak_rss_bytes": max((stage.peak_rss_bytes for stage in self.stages), default=0),
+            "stages": [stage.to_dict() for stage in self.stages]
+        }
+        if self._collector:
+            data["profiler"] = self._collector.to_dict()
+        return data
@@ -0,0 +1,353 @@
+"""
+Warehouse-side data validation.
+
+Computes completeness, per-column null ratios and range checks for every
+column of a destination table in a single aggregate scan, optionally scoped
+to the rows written by one execution or sampled on very large tables.
+Distinct counts are opt-in (``distinct_columns``): COUNT(DISTINCT) sorts or
+hashes the whole column, and types without an equality operator are skipped.
+"""
+
+from typing import Dict, Any, List, Optional
+import logging
+import math
+from datetime import datetime
+from dataclasses import dataclass, field
+
+logger = logging.getLogger(__name__)
+
+
+POSTGRES_RANGE_TYPES = {
+    "smallint", "integer", "bigint", "numeric", "real", "double precision",
+    "date", "timestamp without time zone", "timestamp with time zone"
+}
+
+MYSQL_RANGE_TYPES = {
+    "tinyint", "smallint", "mediumint", "int", "bigint", "decimal", "float", "double",
+    "date", "datetime", "timestamp"
+}
+
+# Types COUNT(DISTINCT) cannot compare
+POSTGRES_NO_EQUALITY_TYPES = {
+    "json", "xml", "point", "line", "lseg", "box", "path", "polygon", "circle"
+}
+
+MYSQL_NO_EQUALITY_TYPES = {
+    "json", "geometry", "point", "linestring", "polygon", "multipoint",
+    "multilinestring", "multipolygon", "geometrycollection", "geomcollection"
+}
+
+
+@dataclass
+class ValidationScope:
+    """Which rows of the destination table a validation run looks at."""
+    batch_column: Optional[str] = None
+    batch_id: Optional[str] = None
+    watermark_column: Optional[str] = None
+    watermark: Optional[datetime] = None
+
+    @property
+    def is_scoped(self) -> bool:
+        return bool(
+            (self.batch_column and self.batch_id is not None)
+            or (self.watermark_column and self.watermark is not None)
+        )
+
+
+@dataclass
+class ValidationConfig:
+    """Thresholds and rules for a validation run."""
+    max_null_ratio: float = 0.05
+    range_rules: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    sample_threshold_rows: int = 1_000_000
+    sample_percent: float = 1.0
+    # Columns to count distinct values for; ["*"] means every comparable column
+    distinct_columns: List[str] = field(default_factory=list)
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> "ValidationConfig":
+        """Build a config from a destination ``load_config['validation']`` dict."""
+        config = config or {}
+        defaults = cls()
+        return cls(
+            max_null_ratio=float(config.get("max_null_ratio", defaults.max_null_ratio)),
+            range_rules=config.get("range_rules", {}),
+            sample_threshold_rows=int(config.get("sample_threshold_rows", defaults.sample_threshold_rows)),
+            sample_percent=float(config.get("sample_percent", defaults.sample_percent)),
+            distinct_columns=config.get("distinct_columns") or []
+        )
+
+
+class WarehouseValidator:
+    """Runs single-scan validation against a PostgreSQL or MySQL table."""
+
+    def __init__(self, connector, dialect: str, config: Optional[ValidationConfig] = None):
+        self.connector = connector
+        self.dialect = "mysql" if dialect.lower() == "mysql" else "postgresql"
+        self.config = config or ValidationConfig()
+
+    async def validate(
+        self,
+        table_name: str,
+        schema: Optional[str] = None,
+        scope: Optional[ValidationScope] = None
+    ) -> Dict[str, Any]:
+        """
+        Validate a table and return check counts, per-column stats and a quality score.
+
+        ``table_name`` may be schema-qualified ("schema.table") when ``schema`` is not given.
+        """
+
+        start_time = datetime.now()
+        scope = scope or ValidationScope()
+        table_name, schema = self._split_table(table_name, schema)
+
+        columns = await self._get_columns(table_name, schema)
+        if not columns:
+            return self._build_result(
+                total_rows=0, columns=[], column_stats={}, range_failures={},
+                sampled=False, scope=scope, start_time=start_time
+            )
+
+        sample_fraction = None
+        if not scope.is_scoped:
+            estimated_rows = await self._estimate_row_count(table_name, schema)
+            if estimated_rows > self.config.sample_threshold_rows:
+                sample_fraction = min(max(self.config.sample_percent, 0.0001), 100.0) / 100
+
+        query = self.build_aggregate_query(table_name, schema, columns, scope, sample_fraction)
+        result = await self.connector.execute_query(query)
+        row = result.iloc[0].to_dict() if not result.empty else {}
+
+        total_rows = int(row.get("total_rows") or 0)
+        column_stats = {}
+        range_failures = {}
+
+        for index, column in enumerate(columns):
+            name = column["name"]
+            non_null = int(row.get(f"c{index}_non_null") or 0)
+            stats = {
+                "null_count": total_rows - non_null,
+                "null_ratio": (total_rows - non_null) / total_rows if total_rows else 0.0
+            }
+
+            if f"c{index}_distinct" in row:
+                distinct = int(row.get(f"c{index}_distinct") or 0)
+                if sample_fraction:
+                    # Scale the sampled distinct count; bounded by the estimated non-null rows
+                    distinct = min(int(distinct * math.sqrt(1 / sample_fraction)), int(non_null / sample_fraction))
+                stats["distinct_estimate"] = distinct
+
+            if f"c{index}_min" in row:
+                stats["min"] = row.get(f"c{index}_min")
+                stats["max"] = row.get(f"c{index}_max")
+
+            if f"c{index}_out_of_range" in row:
+                range_failures[name] = int(row.get(f"c{index}_out_of_range") or 0)
+
+            column_stats[name] = stats
+
+        return self._build_result(
+            total_rows=total_rows, columns=columns, column_stats=column_stats,
+            range_failures=range_failures, sampled=bool(sample_fraction),
+            scope=scope, start_time=start_time, sample_fraction=sample_fraction
+        )
+
+    def build_aggregate_query(
+        self,
+        table_name: str,
+        schema: Optional[str],
+        columns: List[Dict[str, Any]],
+        scope: ValidationScope,
+        sample_fraction: Optional[float] = None
+    ) -> str:
+        """Build the single aggregate query covering every column and rule."""
+
+        range_types = MYSQL_RANGE_TYPES if self.dialect == "mysql" else POSTGRES_RANGE_TYPES
+        no_equality_types = MYSQL_NO_EQUALITY_TYPES if self.dialect == "mysql" else POSTGRES_NO_EQUALITY_TYPES
+        distinct_columns = self.config.distinct_columns
+        all_distinct = "*" in distinct_columns
+        expressions = ["COUNT(*) AS total_rows"]
+
+        for index, column in enumerate(columns):
+            name = column["name"]
+            quoted = self._quote(name)
+            expressions.append(f"COUNT({quoted}) AS c{index}_non_null")
+
+            if (all_distinct or name in distinct_columns) and column["type"].lower() not in no_equality_types:
+                expressions.append(f"COUNT(DISTINCT {quoted}) AS c{index}_distinct")
+
+            if column["type"].lower() in range_types:
+                expressions.append(f"MIN({quoted}) AS c{index}_min")
+                expressions.append(f"MAX({quoted}) AS c{index}_max")
+
+            rule = self.config.range_rules.get(name)
+            if rule:
+                conditions = []
+                if rule.get("min") is not None:
+                    conditions.append(f"{quoted} < {self._literal(rule['min'])}")
+                if rule.get("max") is not None:
+                    conditions.append(f"{quoted} > {self._literal(rule['max'])}")
+                if rule.get("allowed_values"):
+                    allowed = ", ".join(self._literal(value) for value in rule["allowed_values"])
+                    conditions.append(f"{quoted} NOT IN ({allowed})")
+                if conditions:
+                    expressions.append(
+                        f"SUM(CASE WHEN {' OR '.join(conditions)} THEN 1 ELSE 0 END) AS c{index}_out_of_range"
+                    )
+
+        query = f"SELECT {', '.join(expressions)} FROM {self._qualified_table(table_name, schema)}"
+
+        where = []
+        if sample_fraction:
+            if self.dialect == "postgresql":
+                query += f" TABLESAMPLE SYSTEM ({sample_fraction * 100:g})"
+            else:
+                where.append(f"RAND() < {sample_fraction:g}")
+        if scope.batch_column and scope.batch_id is not None:
+            where.append(f"{self._quote(scope.batch_column)} = {self._literal(str(scope.batch_id))}")
+        if scope.watermark_column and scope.watermark is not None:
+            where.append(f"{self._quote(scope.watermark_column)} >= {self._literal(scope.watermark.isoformat(sep=' '))}")
+        if where:
+            query += f" WHERE {' AND '.join(where)}"
+
+        return query
+
+    async def _get_columns(self, table_name: str, schema: Optional[str]) -> List[Dict[str, Any]]:
+        """Read column names/types from the catalog without touching table data."""
+        if self.dialect == "postgresql":
+            query = (
+                "SELECT column_name, data_type FROM information_schema.columns "
+                f"WHERE table_schema = {self._literal(schema or 'public')} "
+                f"AND table_name = {self._literal(table_name)} ORDER BY ordinal_position"
+            )
+        else:
+            query = (
+                "SELECT COLUMN_NAME AS column_name, DATA_TYPE AS data_type FROM INFORMATION_SCHEMA.COLUMNS "
+                f"WHERE TABLE_SCHEMA = {self._schema_literal(schema)} "
+                f"AND TABLE_NAME = {self._literal(table_name)} ORDER BY ORDINAL_POSITION"
+            )
+        result = await self.connector.execute_query(query)
+        return [
+            {"name": record["column_name"], "type": str(record["data_type"])}
+            for record in result.to_dict("records")
+        ]
+
+    async def _estimate_row_count(self, table_name: str, schema: Optional[str]) -> int:
+        """Cheap row estimate from planner statistics (no table scan)."""
+        try:
+            if self.dialect == "postgresql":
+                table = self._literal(f'"{schema or "public"}"."{table_name}"')
+                query = f"SELECT reltuples::bigint AS estimate FROM pg_class WHERE oid = to_regclass({table})"
+            else:
+                query = (
+                    "SELECT TABLE_ROWS AS estimate FROM INFORMATION_SCHEMA.TABLES "
+                    f"WHERE TABLE_SCHEMA = {self._schema_literal(schema)} AND TABLE_NAME = {self._literal(table_name)}"
+                )
+            result = await self.connector.execute_query(query)
+            return max(int(result.iloc[0]["estimate"] or 0), 0) if not result.empty else 0
+        except Exception as e:
+            logger.warning(f"Row count estimate failed for {table_name}: {str(e)}")
+            return 0
+
+    def _build_result(
+        self,
+        total_rows: int,
+        columns: List[Dict[str, Any]],
+        column_stats: Dict[str, Dict[str, Any]],
+        range_failures: Dict[str, int],
+        sampled: bool,
+        scope: ValidationScope,
+        start_time: datetime,
+        sample_fraction: Optional[float] = None
+    ) -> Dict[str, Any]:
+        checks_passed = 0
+        checks_failed = 0
+        failed_checks = []
+
+        # Check 1: rows present in scope
+        if total_rows > 0:
+            checks_passed += 1
+        else:
+            checks_failed += 1
+            failed_checks.append("row_count")
+
+        # Check 2: schema exists
+        if columns:
+            checks_passed += 1
+        else:
+            checks_failed += 1
+            failed_checks.append("schema")
+
+        # Check 3: per-column null ratios
+        for name, stats in column_stats.items():
+            if stats["null_ratio"] <= self.config.max_null_ratio:
+                checks_passed += 1
+            else:
+                checks_failed += 1
+                failed_checks.append(f"null_ratio:{name}")
+
+        # Check 4: range rules
+        for name, failures in range_failures.items():
+            if failures == 0:
+                checks_passed += 1
+            else:
+                checks_failed += 1
+                failed_checks.append(f"range:{name}")
+
+        cells = total_rows * len(column_stats)
+        null_cells = sum(stats["null_count"] for stats in column_stats.values())
+        out_of_range = sum(range_failures.values())
+        range_checked = total_rows * len(range_failures)
+
+        total_checks = checks_passed + checks_failed
+        execution_time = (datetime.now() - start_time).total_seconds()
+
+        logger.info(
+            f"Warehouse validation completed: {checks_passed}/{total_checks} checks passed "
+            f"over {total_rows} rows in {execution_time:.2f}s (sampled={sampled}, scoped={scope.is_scoped})"
+        )
+
+        return {
+            "checks_passed": checks_passed,
+            "checks_failed": checks_failed,
+            "failed_checks": failed_checks,
+            "quality_score": (checks_passed / total_checks) * 100 if total_checks else 0.0,
+            "data_completeness": (1 - null_cells / cells) * 100 if cells else 0.0,
+            "data_accuracy": (1 - out_of_range / range_checked) * 100 if range_checked else (100.0 if total_rows else 0.0),
+            "schema_compliance": 100.0 if columns else 0.0,
+            "rows_validated": total_rows,
+            "sampled": sampled,
+            "sample_fraction": sample_fraction,
+            "scoped": scope.is_scoped,
+            "column_stats": column_stats,
+            "execution_time_seconds": execution_time
+        }
+
+    def _quote(self, identifier: str) -> str:
+        if self.dialect == "mysql":
+            return "`" + identifier.replace("`", "``") + "`"
+        return '"' + identifier.replace('"', '""') + '"'
+
+    @staticmethod
+    def _split_table(table_name: str, schema: Optional[str]) -> tuple:
+        if schema is None and "." in table_name:
+            schema, table_name = table_name.split(".", 1)
+        return table_name, schema
+
+    def _qualified_table(self, table_name: str, schema: Optional[str]) -> str:
+        table_name, schema = self._split_table(table_name, schema)
+        if schema:
+            return f"{self._quote(schema)}.{self._quote(table_name)}"
+        return self._quote(table_name)
+
+    def _schema_literal(self, schema: Optional[str]) -> str:
+        return self._literal(schema) if schema else "DATABASE()"
+
+    @staticmethod
+    def _literal(value: Any) -> str:
+        if isinstance(value, bool):
+            return "TRUE" if value else "FALSE"
+        if isinstance(value, (int, float)):
+            return repr(value)
+        return "'" + str(value).replace("'", "''") + "'"
@@ -12,20 +12,33 @@ from prometheus_client import (
     start_http_server, REGISTRY
 )
 from prometheus_client.multiprocess import MultiProcessCollector
+from prometheus_client.openmetrics.exposition import (
+    CONTENT_TYPE_LATEST as OPENMETRICS_CONTENT_TYPE,
+    generate_latest as generate_openmetrics
+)
 import psutil
 
 from app.core.redis import redis_manager
-from app.core.cache_manager import cache_manager
+from app.core.cache_manager import cache_manager, cache_metrics
+from app.core.database import pool_metrics
 from app.core.rate_limiter import rate_limiter
 
 logger = logging.getLogger(__name__)
 
+# Methods outside this set share one label value
+HTTP_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"})
+HTTP_SIZE_BUCKETS = (128, 512, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
 
 class PrometheusMetrics:
     """Prometheus metrics collector for the ETL platform."""
     
     def __init__(self, registry: Optional[CollectorRegistry] = None):
         self.registry = registry or REGISTRY
+        # Label children bound once per (method, route template[, status])
+        self._http_route_children: Dict[tuple, tuple] = {}
+        self._http_status_children: Dict[tuple, Any] = {}
+        self._http_in_progress_children: Dict[str, Any] = {}
         self.setup_metrics()
         self._last_collection_time = time.time()
         
@@ -48,6 +61,30 @@ class PrometheusMetrics:
             registry=self.registry
         )
         
+        self.http_request_size = Histogram(
+            'http_request_size_bytes',
+            'HTTP request body size in bytes',
+            ['method', 'endpoint'],
+            buckets=HTTP_SIZE_BUCKETS,
+            registry=self.registry
+        )
+        
+        self.http_response_size = Histogram(
+            'http_response_size_bytes',
+            'HTTP response body size in bytes',
+            ['method', 'endpoint'],
+            buckets=HTTP_SIZE_BUCKETS,
+            registry=self.registry
+        )
+        
+        self.http_requests_in_progress = Gauge(
+            'http_requests_in_progress',
+            'HTTP requests currently being served',
+            ['method'],
+            multiprocess_mode='livesum',
+            registry=self.registry
+        )
+        
         # Authentication Metrics
         self.auth_attempts_total = Counter(
             'auth_attempts_total',
@@ -92,6 +129,48 @@ class PrometheusMetrics:
             registry=self.registry
         )
         
+        self.cache_requests = Counter(
+            'cache_requests_total',
+            'Cache lookups by key prefix and the layer that served them',
+            ['prefix', 'result'],
+            registry=self.registry
+        )
+        
+        self.cache_operation_duration = Histogram(
+            'cache_operation_duration_seconds',
+            'Cache get/set latency',
+            ['prefix', 'operation'],
+            buckets=(0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0),
+            registry=self.registry
+        )
+        
+        self.cache_payload_size = Histogram(
+            'cache_payload_bytes',
+            'Encoded size of values written to the L2 cache',
+            ['prefix'],
+            buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304),
+            registry=self.registry
+        )
+        
+        self.cache_evictions = Counter(
+            'cache_evictions_total',
+            'Entries dropped from a cache layer',
+            ['layer', 'reason'],
+            registry=self.registry
+        )
+        
+        self.cache_l1_memory = Gauge(
+            'cache_l1_memory_bytes',
+            'Estimated memory held by the in-process L1 cache',
+            registry=self.registry
+        )
+        
+        self.cache_l1_entries = Gauge(
+            'cache_l1_entries',
+            'Entries in the in-process L1 cache',
+            registry=self.registry
+        )
+        
         # Pipeline Metrics
         self.pipeline_executions = Counter(
             'pipeline_executions_total',
@@ -163,6 +242,31 @@ class PrometheusMetrics:
             registry=self.registry
         )
         
+        self.database_pool_connections = Gauge(
+            'database_pool_connections',
+            'Database pool connections by state (checked_out, idle, overflow, limit)',
+            ['pool', 'state'],
+            registry=self.registry
+        )
+        
+        self.database_pool_checkout_wait = Histogram(
+            'database_pool_checkout_wait_seconds',
+            'Time spent waiting to check a connection out of the pool',
+            ['pool'],
+            buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0),
+            registry=self.registry
+        )
+        
+        self.database_pool_timeouts = Counter(
+            'database_pool_checkout_timeouts_total',
+            'Pool checkouts that timed out waiting for a connection',
+            ['pool'],
+            registry=self.registry
+        )
+        # Updated on every checkout and checkin, so bound once per pool
+        self._pool_children: Dict[str, tuple] = {}
+        self._pool_checked_out: Dict[str, int] = {}
+        
         self.database_query_duration = Histogram(
             'database_query_duration_seconds',
             'Database query duration',
@@ -221,18 +325,62 @@ class PrometheusMetrics:
             'framework': 'FastAPI'
         })
     
-    def record_http_request(self, method: str, endpoint: str, status_code: int, duration: float):
-        """Record HTTP request metrics."""
-        self.http_requests_total.labels(
-            method=method,
-            endpoint=endpoint,
-            status_code=str(status_code)
-        ).inc()
+    def record_http_request(
+        self,
+        method: str,
+        endpoint: str,
+        status_code: int,
+        duration: float,
+        request_size: Optional[int] = None,
+        response_size: Optional[int] = None,
+        exemplar: Optional[Dict[str, str]] = None
+    ):
+        """
+        Record HTTP request metrics.
         
-        self.http_request_duration.labels(
-            method=method,
-            endpoint=endpoint
-        ).observe(duration)
+        ``endpoint`` should be a route template (``/pipelines/{pipeline_id}``),
+        never a raw path, so label sets stay bounded by the number of routes.
+        """
+        method = method if method in HTTP_METHODS else "OTHER"
+        duration_child, request_size_child, response_size_child = self._http_route_labels(method, endpoint)
+        
+        key = (method, endpoint, status_code)
+        requests_child = self._http_status_children.get(key)
+        if requests_child is None:
+            requests_child = self.http_requests_total.labels(
+                method=method,
+                endpoint=endpoint,
+                status_code=str(status_code)
+            )
+            self._http_status_children[key] = requests_child
+        
+        requests_child.inc(exemplar=exemplar)
+        duration_child.observe(duration, exemplar=exemplar)
+        if request_size is not None:
+            request_size_child.observe(request_size)
+        if response_size is not None:
+            response_size_child.observe(response_size)
+    
+    def _http_route_labels(self, method: str, endpoint: str) -> tuple:
+        key = (method, endpoint)
+        children = self._http_route_children.get(key)
+        if children is None:
+            children = (
+                self.http_request_duration.labels(method=method, endpoint=endpoint),
+                self.http_request_size.labels(method=method, endpoint=endpoint),
+                self.http_response_size.labels(method=method, endpoint=endpoint)
+            )
+            self._http_route_children[key] = children
+        return children
+    
+    def http_in_progress(self, method: str):
+        """The in-progress gauge child for ``method``."""
+        method = method if method in HTTP_METHODS else "OTHER"
+        child = self._http_in_progress_children.get(method)
+        if child is None:
+            child = self.http_requests_in_progress.labels(method=method)
+            self._http_in_progress_children[method] = child
+        return child
     
     def record_auth_attempt(self, status: str, method: str):
         """Record authentication attempt."""
@@ -269,6 +417,43 @@ class PrometheusMetrics:
         """Update cache hit ratio."""
         self.cache_hit_ratio.labels(layer=layer).set(ratio)
     
+    def record_cache_event(self, event: str, prefix: str = None, layer: str = None, **fields):
+        """Export a cache layer event (see ``CacheMetrics.add_listener``)."""
+        if event == "get":
+            self.cache_requests.labels(prefix=prefix, result=layer).inc()
+            self.cache_operation_duration.labels(prefix=prefix, operation="get").observe(fields["seconds"])
+            self.record_cache_operation("get", layer if layer != "miss" else "all", "hit" if layer != "miss" else "miss")
+        elif event == "set":
+            self.cache_operation_duration.labels(prefix=prefix, operation="set").observe(fields["seconds"])
+            if fields.get("payload_bytes") is not None:
+                self.cache_payload_size.labels(prefix=prefix).observe(fields["payload_bytes"])
+            self.record_cache_operation("set", layer, "success")
+        elif event == "eviction":
+            self.cache_evictions.labels(layer=layer, reason=fields["reason"]).inc(fields.get("count", 1))
+    
+    def record_pool_event(self, event: str, pool: str, seconds: float = None, status: Dict[str, int] = None):
+        """Export a connection pool event (see ``PoolMetrics.add_listener``)."""
+        children = self._pool_children.get(pool)
+        if children is None:
+            children = self._pool_children[pool] = (
+                self.database_pool_checkout_wait.labels(pool=pool),
+                self.database_pool_timeouts.labels(pool=pool),
+                {
+                    state: self.database_pool_connections.labels(pool=pool, state=state)
+                    for state in ("checked_out", "idle", "overflow", "limit")
+                }
+            )
+        wait, timeouts, states = children
+        if event == "checkout":
+            wait.observe(seconds)
+        elif event == "timeout":
+            timeouts.inc()
+        if status:
+            for state, count in status.items():
+                states[state].set(count)
+            self._pool_checked_out[pool] = status["checked_out"]
+            self.database_connections.set(sum(self._pool_checked_out.values()))
+    
     def record_pipeline_execution(self, pipeline_id: str, status: str, duration: float):
         """Record pipeline execution."""
         self.pipeline_executions.labels(
@@ -338,6 +523,8 @@ class PrometheusMetrics:
                 self.update_cache_hit_ratio('l1', cache_stats['l1_ratio'])
             if 'l2_ratio' in cache_stats:
                 self.update_cache_hit_ratio('l2', cache_stats['l2_ratio'])
+            self.cache_l1_memory.set(cache_manager.l1_cache.memory_bytes)
+            self.cache_l1_entries.set(len(cache_manager.l1_cache.cache))
             
             # Redis metrics
             try:
@@ -368,11 +555,15 @@ class PrometheusMetrics:
 
 # Global metrics instance
 metrics = PrometheusMetrics()
+cache_metrics.add_listener(metrics.record_cache_event)
+pool_metrics.add_listener(metrics.record_pool_event)
 
 
-async def get_metrics_data() -> str:
-    """Get Prometheus metrics data."""
+async def get_metrics_data(openmetrics: bool = False) -> bytes:
+    """Get Prometheus metrics data; OpenMetrics format carries exemplars."""
     await metrics.collect_system_metrics()
+    if openmetrics:
+        return generate_openmetrics(metrics.registry)
     return generate_latest(metrics.registry)
 
 
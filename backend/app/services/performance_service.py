@@ -11,6 +11,7 @@ import logging
 from app.core.cache_manager import cache_manager, get_cache_stats
 from app.core.rate_limiter import rate_limiter
 from app.core.redis import redis_manager
+from app.core.cache_warming import cache_warmer
 
 logger = logging.getLogger(__name__)
 
@@ -116,17 +117,15 @@ class PerformanceMonitor:
     async def _get_rate_limit_metrics(self) -> Dict[str, Any]:
         """Get rate limiter performance metrics."""
         try:
-            # Get approximate count of active rate limits
-            pattern = "rate_limit:*"
-            keys = await redis_manager.keys(pattern)
+            # Get approximate count of active rate limits (SCAN, so Redis is never blocked)
+            active_count = await redis_manager.count_matching("rate_limit:*")
             
             # Get blocked identifiers
-            blocked_pattern = "rate_limit_block:*"
-            blocked_keys = await redis_manager.keys(blocked_pattern)
+            blocked_count = await redis_manager.count_matching("rate_limit_block:*")
             
             return {
-                'active_rate_limits': len(keys) if keys else 0,
-                'blocked_identifiers': len(blocked_keys) if blocked_keys else 0,
+                'active_rate_limits': active_count,
+                'blocked_identifiers': blocked_count,
                 'status': 'healthy'
             }
         except Exception as e:
@@ -329,7 +328,7 @@ class PerformanceMonitor:
             hit_ratio = cache.get('hit_ratio', 0)
             if hit_ratio < 0.5:
                 # Trigger cache warming for frequently accessed data
-                await cache_manager.warm_cache_on_startup()
+                await cache_warmer.warm()
                 optimizations_applied.append("Triggered cache warming for low hit ratio")
             
             # Memory optimization
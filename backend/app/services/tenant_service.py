@@ -6,6 +6,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update, delete, func
 from typing import Optional, Dict, Any, List
 from datetime import datetime, timedelta
+import asyncio
 import uuid
 import logging
 
@@ -13,8 +14,11 @@ from app.models.tenant import Tenant, TenantApiKey, TenantUsageLog, TenantInvita
 from app.models.user import User
 from app.models.pipeline import ETLPipeline
 from app.models.connector import DataConnector
-from app.core.security import generate_api_key, hash_api_key
+from app.core.config import settings
+from app.core.security import generate_api_key, get_api_key_id, hash_api_key, verify_api_key
+from app.core.api_key_auth import verify_legacy_api_key
 from app.core.cache_manager import cache_manager
+from app.core.tenant_cache import tenant_cache
 
 logger = logging.getLogger(__name__)
 
@@ -51,8 +55,8 @@ class TenantService:
             await db.commit()
             await db.refresh(tenant)
             
-            # Clear tenant cache
-            await TenantService._clear_tenant_cache(tenant.id)
+            # Clear tenant cache, including a cached miss for the new slug
+            await TenantService._clear_tenant_cache(tenant.id, tenant.slug)
             
             logger.info(f"Created tenant: {tenant.name} ({tenant.slug})")
             return tenant
@@ -65,51 +69,27 @@ class TenantService:
     @staticmethod
     async def get_tenant_by_id(tenant_id: str, db: AsyncSession) -> Optional[Tenant]:
         """Get tenant by ID with caching."""
-        cache_key = f"tenant:{tenant_id}"
-        
-        # Try cache first
-        try:
-            cached_tenant = await cache_manager.get(cache_key)
-            if cached_tenant:
-                return cached_tenant
-        except Exception:
-            pass  # Cache miss or error, continue to database
-        
-        # Get from database
-        tenant = await db.get(Tenant, tenant_id)
-        if tenant:
-            # Cache for 15 minutes
-            try:
-                await cache_manager.set(cache_key, tenant, l1_ttl=900, l2_ttl=3600)
-            except Exception:
-                pass  # Cache error, continue without caching
-        
-        return tenant
+        return await tenant_cache.resolve(
+            "id", tenant_id, lambda: TenantService.load_tenant_by_id(tenant_id, db)
+        )
 
     @staticmethod
     async def get_tenant_by_slug(slug: str, db: AsyncSession) -> Optional[Tenant]:
-        """Get tenant by slug with caching."""
-        cache_key = f"tenant:slug:{slug}"
-        
-        # Try cache first
-        try:
-            cached_tenant = await cache_manager.get(cache_key)
-            if cached_tenant:
-                return cached_tenant
-        except Exception:
-            pass
-        
-        # Get from database
+        """Get tenant by slug with caching; unknown slugs are cached briefly too."""
+        return await tenant_cache.resolve(
+            "slug", slug, lambda: TenantService.load_tenant_by_slug(slug, db)
+        )
+
+    @staticmethod
+    async def load_tenant_by_id(tenant_id: str, db: AsyncSession) -> Optional[Tenant]:
+        """Load tenant by ID from the database, bypassing the cache."""
+        return await db.get(Tenant, tenant_id)
+
+    @staticmethod
+    async def load_tenant_by_slug(slug: str, db: AsyncSession) -> Optional[Tenant]:
+        """Load tenant by slug from the database, bypassing the cache."""
         result = await db.execute(select(Tenant).where(Tenant.slug == slug))
-        tenant = result.scalar_one_or_none()
-        
-        if tenant:
-            try:
-                await cache_manager.set(cache_key, tenant, l1_ttl=900, l2_ttl=3600)
-            except Exception:
-                pass
-        
-        return tenant
+        return result.scalar_one_or_none()
 
     @staticmethod
     async def update_tenant_usage(
@@ -218,6 +198,7 @@ class TenantService:
             
             # Create API key record
             tenant_api_key = TenantApiKey(
+                id=get_api_key_id(api_key_plain),
                 tenant_id=tenant_id,
                 key_name=key_name,
                 api_key_hash=api_key_hash,
@@ -247,14 +228,19 @@ class TenantService:
     ) -> Optional[TenantApiKey]:
         """Validate tenant API key and return key info if valid."""
         try:
-            api_key_hash = hash_api_key(api_key)
-            
-            result = await db.execute(
-                select(TenantApiKey)
-                .where(TenantApiKey.api_key_hash == api_key_hash)
-                .where(TenantApiKey.is_active == True)
-            )
-            tenant_key = result.scalar_one_or_none()
+            key_id = get_api_key_id(api_key)
+            if key_id is not None:
+                # Indexed lookup by key ID, then a constant-time hash comparison
+                result = await db.execute(
+                    select(TenantApiKey)
+                    .where(TenantApiKey.id == key_id)
+                    .where(TenantApiKey.is_active == True)
+                )
+                tenant_key = result.scalar_one_or_none()
+                if tenant_key and not verify_api_key(api_key, tenant_key.api_key_hash):
+                    tenant_key = None
+            else:
+                tenant_key = await TenantService._find_legacy_tenant_key(api_key, db)
             
             if tenant_key:
                 # Check expiration
@@ -274,6 +260,38 @@ class TenantService:
             logger.error(f"Error validating tenant API key: {e}")
             return None
 
+    @staticmethod
+    async def _find_legacy_tenant_key(
+        api_key: str,
+        db: AsyncSession
+    ) -> Optional[TenantApiKey]:
+        """Find a tenant key issued before keys carried their ID."""
+        if not api_key:
+            return None
+        
+        # Already upgraded: the HMAC is deterministic, so look it up directly
+        result = await db.execute(
+            select(TenantApiKey)
+            .where(TenantApiKey.api_key_hash == hash_api_key(api_key))
+            .where(TenantApiKey.is_active == True)
+        )
+        tenant_key = result.scalar_one_or_none()
+        if tenant_key or not settings.API_KEY_LEGACY_VERIFICATION:
+            return tenant_key
+        
+        # Still bcrypt-hashed: salted, so every remaining one has to be tried
+        result = await db.execute(
+            select(TenantApiKey)
+            .where(TenantApiKey.api_key_hash.like("$2%"))
+            .where(TenantApiKey.is_active == True)
+        )
+        for candidate in result.scalars().all():
+            if await asyncio.to_thread(verify_legacy_api_key, api_key, candidate.api_key_hash):
+                candidate.api_key_hash = hash_api_key(api_key)
+                logger.info(f"Re-hashed legacy tenant API key {candidate.id} with HMAC")
+                return candidate
+        return None
+
     @staticmethod
     async def create_tenant_invitation(
         tenant_id: str,
@@ -416,15 +434,15 @@ class TenantService:
         return features.get(plan_type, features["starter"])
 
     @staticmethod
-    async def _clear_tenant_cache(tenant_id: str):
-        """Clear tenant-related cache entries."""
+    async def _clear_tenant_cache(tenant_id: str, slug: Optional[str] = None):
+        """Clear tenant-related cache entries, including resolved tenant lookups."""
         cache_keys = [
-            f"tenant:{tenant_id}",
             f"tenant:usage:{tenant_id}",
             f"tenant:features:{tenant_id}"
         ]
         
         try:
+            await tenant_cache.invalidate(tenant_id, slug)
             for key in cache_keys:
                 await cache_manager.delete(key)
         except Exception:
@@ -1,5 +1,6 @@
 from celery import current_task
 from app.workers.celery_app import celery_app
+from app.core.config import settings
 from typing import Dict, Any, List
 import logging
 import traceback
@@ -462,7 +463,7 @@ def _cleanup_expired_task_results() -> int:
             try:
                 # Get all Celery result keys
                 pattern = f"{celery_app.backend.key_prefix or 'celery-task-meta-'}*"
-                task_keys = redis_client.keys(pattern)
+                task_keys = redis_client.scan_iter(match=pattern, count=500)
                 
                 for key in task_keys:
                     try:
@@ -500,7 +501,7 @@ def _cleanup_expired_task_results() -> int:
                 logger.warning(f"Redis cleanup failed, using basic approach: {e}")
                 # Fallback: delete all task results older than the pattern suggests
                 try:
-                    task_keys = redis_client.keys(f"celery-task-meta-*")
+                    task_keys = redis_client.scan_iter(match="celery-task-meta-*", count=500)
                     for key in task_keys:
                         # Simple time-based cleanup without parsing JSON
                         ttl = redis_client.ttl(key)
@@ -528,7 +529,8 @@ def _cleanup_expired_task_results() -> int:
 def _cleanup_temp_files() -> int:
     """Clean up temporary files older than 24 hours."""
     
-    temp_dirs = ["/tmp", "/var/tmp", "/uploads/temp"]
+    # Pipeline scratch directories (temp_etl_*) are left behind by killed workers
+    temp_dirs = ["/tmp", "/var/tmp", "/uploads/temp", settings.ETL_SCRATCH_DIR]
     cleaned_count = 0
     cutoff_time = datetime.now() - timedelta(hours=24)
     
@@ -260,6 +260,11 @@ def _update_execution_status(execution_id: str, status: str, result: Dict[str, A
                         execution.rows_successful = result["rows_successful"]
                     if result.get("rows_failed"):
                         execution.rows_failed = result["rows_failed"]
+                    if result.get("profile"):
+                        execution.execution_metrics = {
+                            **(execution.execution_metrics or {}),
+                            "profile": result["profile"]
+                        }
                     
                     await session.commit()
                     logger.info(f"Execution {execution_id} status updated to {status}")
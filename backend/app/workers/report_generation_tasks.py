@@ -13,7 +13,7 @@ import pandas as pd
 import numpy as np
 from sqlalchemy import select, and_, func, desc
 from sqlalchemy.orm import selectinload
-from app.core.database import AsyncSessionFactory
+from app.core.replicas import read_session
 from app.models.pipeline import ETLPipeline, PipelineExecution, ExecutionStatus
 from app.models.connector import DataConnector
 from app.models.user import Organization
@@ -534,7 +534,7 @@ async def _perform_executive_analysis(dataset_id: str, config: Dict[str, Any]) -
     """Perform high-level analysis suitable for executives."""
     
     try:
-        async with AsyncSessionFactory() as session:
+        async with read_session() as session:
             # Get pipeline execution data for analysis
             result = await session.execute(
                 select(PipelineExecution)
@@ -1018,7 +1018,7 @@ async def _perform_detailed_analysis(dataset_id: str, config: Dict[str, Any]) ->
     """Perform comprehensive analysis for analysts."""
     
     try:
-        async with AsyncSessionFactory() as session:
+        async with read_session() as session:
             # Get detailed pipeline execution data
             result = await session.execute(
                 select(PipelineExecution)
@@ -1275,7 +1275,7 @@ async def _analyze_for_presentation(dataset_id: str, config: Dict[str, Any]) ->
     """Analyze data for presentation purposes."""
     
     try:
-        async with AsyncSessionFactory() as session:
+        async with read_session() as session:
             # Get recent pipeline data for presentation
             result = await session.execute(
                 select(PipelineExecution)
@@ -1467,7 +1467,7 @@ async def _render_dashboard_components(dashboard_id: str, config: Dict[str, Any]
     """Render dashboard components for export."""
     
     try:
-        async with AsyncSessionFactory() as session:
+        async with read_session() as session:
             # Get pipeline execution data for dashboard
             result = await session.execute(
                 select(PipelineExecution)
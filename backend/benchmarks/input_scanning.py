@@ -0,0 +1,106 @@
+"""
+Cost of injection checks: per-pattern ``re.search`` loops vs the compiled scanner.
+
+The baseline reproduces the previous ``InputValidator`` checks: one
+``re.search`` per pattern per category (the SQL check lowercasing the value
+first), applied field by field to every string in a JSON body. The compiled
+path validates the same body with ``InjectionScanner.find_in``, which scans
+each string once against a single regex covering all categories.
+
+Usage (from ``backend/``)::
+
+    python -m benchmarks.input_scanning --rows 2000 --repeat 5
+"""
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.injection_scanner import DEFAULT_CATEGORIES, InjectionScanner  # noqa: E402
+
+CATEGORIES = ("sql", "xss", "command", "path")
+
+
+def make_payload(rows: int) -> dict:
+    return {
+        "name": "Nightly customer sync",
+        "description": "Copies customer records from the CRM export into the warehouse",
+        "rows": [
+            {
+                "customer": f"Customer {i}",
+                "email": f"customer{i}@example.com",
+                "city": "Amsterdam",
+                "notes": "Prefers email contact, renewal due in the spring",
+                "tags": ["priority", "emea", f"segment {i % 7}"],
+            }
+            for i in range(rows)
+        ],
+    }
+
+
+def strings(data):
+    if isinstance(data, str):
+        yield data
+    elif isinstance(data, dict):
+        for key, value in data.items():
+            yield key
+            yield from strings(value)
+    elif isinstance(data, list):
+        for value in data:
+            yield from strings(value)
+
+
+def loop_validate(payload) -> bool:
+    """Field-by-field validation with the original pattern loops."""
+    for value in strings(payload):
+        for category in CATEGORIES:
+            patterns, ignore_case = DEFAULT_CATEGORIES[category]
+            subject = value.lower() if category == "sql" else value
+            flags = re.IGNORECASE if ignore_case else 0
+            for pattern in patterns:
+                if re.search(pattern, subject, flags):
+                    return False
+    return True
+
+
+def best_of(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main(rows: int, repeat: int):
+    payload = make_payload(rows)
+    field_count = sum(1 for _ in strings(payload))
+    scanner = InjectionScanner()
+    scanner.compiled(CATEGORIES)
+
+    assert loop_validate(payload) is True
+    assert scanner.find_in(payload, CATEGORIES) is None
+
+    results = {
+        "pattern loops": best_of(lambda: loop_validate(payload), repeat),
+        "compiled scanner": best_of(lambda: scanner.find_in(payload, CATEGORIES), repeat),
+    }
+
+    print(f"{field_count} strings, {len(CATEGORIES)} categories, best of {repeat}\n")
+    print(f"{'validator':<18} {'total ms':>10} {'us/string':>10}")
+    for name, seconds in results.items():
+        print(f"{name:<18} {seconds * 1000:>10.2f} {seconds * 1e6 / field_count:>10.2f}")
+    speedup = results["pattern loops"] / results["compiled scanner"]
+    print(f"\nspeedup: {speedup:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    main(args.rows, args.repeat)
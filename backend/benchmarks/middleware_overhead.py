@@ -0,0 +1,118 @@
+"""
+Per-request cost of the middleware stack: BaseHTTPMiddleware vs pure ASGI.
+
+Builds two copies of a trivial app wrapped in the same number of middleware
+layers as ``main.py`` (nine). Every layer does the same small amount of work
+(a pre-request check and one response header), once as a
+``BaseHTTPMiddleware.dispatch`` and once as ``HTTPMiddleware`` hooks, so the
+difference is the middleware machinery itself. Requests go through
+``httpx.ASGITransport``, so no network or server is involved.
+
+Usage (from ``backend/``)::
+
+    python -m benchmarks.middleware_overhead --requests 5000 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import httpx
+from starlette.applications import Starlette
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.asgi import HTTPMiddleware  # noqa: E402
+
+LAYERS = 9
+
+
+class DispatchLayer(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        if request.url.path.startswith("/skip"):
+            return await call_next(request)
+        response = await call_next(request)
+        response.headers["X-Layer"] = "1"
+        return response
+
+
+class HookLayer(HTTPMiddleware):
+    def should_process(self, scope):
+        return not scope["path"].startswith("/skip")
+
+    async def on_response_start(self, request, status_code, headers):
+        headers["X-Layer"] = "1"
+
+
+async def ping(request):
+    return PlainTextResponse("pong")
+
+
+async def download(request):
+    async def chunks():
+        for _ in range(256):
+            yield b"x" * 4096
+    return StreamingResponse(chunks(), media_type="application/octet-stream")
+
+
+def build_app(layer) -> Starlette:
+    app = Starlette(routes=[Route("/ping", ping), Route("/download", download)])
+    for _ in range(LAYERS):
+        app.add_middleware(layer)
+    return app
+
+
+async def run(app, path: str, requests: int, concurrency: int) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Warm up route matching and the middleware stack
+        for _ in range(20):
+            await client.get(path)
+
+        async def one():
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.get(path)
+                latencies.append(time.perf_counter() - started)
+                assert response.status_code == 200
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "rps": requests / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+async def main(requests: int, concurrency: int):
+    print(f"{LAYERS} middleware layers, {requests} requests, concurrency {concurrency}\n")
+    print(f"{'endpoint':<10} {'stack':<20} {'req/s':>10} {'p50 ms':>9} {'p99 ms':>9}")
+    for path, count in (("/ping", requests), ("/download", max(requests // 10, 50))):
+        results = {}
+        for name, layer in (("BaseHTTPMiddleware", DispatchLayer), ("pure ASGI", HookLayer)):
+            results[name] = await run(build_app(layer), path, count, concurrency)
+            r = results[name]
+            print(f"{path:<10} {name:<20} {r['rps']:>10.0f} {r['p50_ms']:>9.3f} {r['p99_ms']:>9.3f}")
+        speedup = results["pure ASGI"]["rps"] / results["BaseHTTPMiddleware"]["rps"]
+        print(f"{path:<10} {'throughput gain':<20} {speedup:>9.2f}x\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
@@ -0,0 +1,167 @@
+"""
+Query latency per prepared statement mode (``DATABASE_STATEMENT_CACHE_MODE``).
+
+Runs the shapes of the hot ORM queries (a user lookup by email, a filtered
+and sorted pipeline list joined to its owner, and an execution insert)
+against a PostgreSQL database once per mode, through an engine configured
+with ``statement_cache_args``. Each mode gets a fresh single-connection
+engine, so ``named`` and ``pgbouncer`` plan each query once while
+``disabled`` plans it on every execution. Point ``--url`` at PgBouncer
+(1.21+, ``max_prepared_statements`` set) to check the ``pgbouncer`` mode
+behind transaction pooling.
+
+The benchmark creates and drops its own ``bench_*`` tables.
+
+Usage (from ``backend/``)::
+
+    python -m benchmarks.statement_cache --url postgresql+asyncpg://... --iterations 2000
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import text  # noqa: E402
+from sqlalchemy.ext.asyncio import create_async_engine  # noqa: E402
+from sqlalchemy.pool import AsyncAdaptedQueuePool  # noqa: E402
+
+from app.core.database import STATEMENT_CACHE_MODES, statement_cache_args  # noqa: E402
+
+SETUP = [
+    "DROP TABLE IF EXISTS bench_executions, bench_pipelines, bench_users",
+    """CREATE TABLE bench_users (
+        id uuid PRIMARY KEY, email text UNIQUE NOT NULL, is_active boolean NOT NULL,
+        role text NOT NULL, created_at timestamptz NOT NULL DEFAULT now()
+    )""",
+    """CREATE TABLE bench_pipelines (
+        id uuid PRIMARY KEY, owner_id uuid NOT NULL REFERENCES bench_users(id),
+        name text NOT NULL, status text NOT NULL, updated_at timestamptz NOT NULL DEFAULT now()
+    )""",
+    "CREATE INDEX ON bench_pipelines (owner_id, status, updated_at DESC)",
+    """CREATE TABLE bench_executions (
+        id uuid PRIMARY KEY, pipeline_id uuid NOT NULL REFERENCES bench_pipelines(id),
+        status text NOT NULL, started_at timestamptz NOT NULL, records_processed integer NOT NULL
+    )""",
+]
+
+TEARDOWN = "DROP TABLE IF EXISTS bench_executions, bench_pipelines, bench_users"
+
+QUERIES = {
+    "user lookup": text(
+        "SELECT id, email, is_active, role, created_at FROM bench_users "
+        "WHERE email = :email AND is_active"
+    ),
+    "pipeline list": text(
+        "SELECT p.id, p.name, p.status, p.updated_at, u.email FROM bench_pipelines p "
+        "JOIN bench_users u ON u.id = p.owner_id "
+        "WHERE p.owner_id = :owner_id AND p.status = ANY(:statuses) "
+        "ORDER BY p.updated_at DESC LIMIT 20 OFFSET 0"
+    ),
+    "execution insert": text(
+        "INSERT INTO bench_executions (id, pipeline_id, status, started_at, records_processed) "
+        "VALUES (:id, :pipeline_id, 'running', now(), 0)"
+    ),
+}
+
+
+async def seed(engine, users: int = 200, pipelines_per_user: int = 10):
+    async with engine.begin() as conn:
+        for statement in SETUP:
+            await conn.execute(text(statement))
+        user_rows = [
+            {"id": uuid.uuid4(), "email": f"user{i}@example.com", "role": "user"}
+            for i in range(users)
+        ]
+        await conn.execute(
+            text("INSERT INTO bench_users (id, email, is_active, role) VALUES (:id, :email, true, :role)"),
+            user_rows
+        )
+        pipeline_rows = [
+            {"id": uuid.uuid4(), "owner_id": user["id"], "name": f"pipeline {i}",
+             "status": ("active", "draft", "paused")[i % 3]}
+            for user in user_rows for i in range(pipelines_per_user)
+        ]
+        await conn.execute(
+            text("INSERT INTO bench_pipelines (id, owner_id, name, status) "
+                 "VALUES (:id, :owner_id, :name, :status)"),
+            pipeline_rows
+        )
+        await conn.execute(text("ANALYZE"))
+    return user_rows, pipeline_rows
+
+
+async def run_mode(url: str, mode: str, iterations: int, users, pipelines) -> dict:
+    engine = create_async_engine(
+        url,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        connect_args=statement_cache_args(mode, 256)
+    )
+    timings = {name: [] for name in QUERIES}
+    try:
+        for i in range(iterations):
+            user = users[i % len(users)]
+            params = {
+                "user lookup": {"email": user["email"]},
+                "pipeline list": {"owner_id": user["id"], "statuses": ["active", "paused"]},
+                "execution insert": {"id": uuid.uuid4(), "pipeline_id": pipelines[i % len(pipelines)]["id"]},
+            }
+            # One transaction per request, as behind PgBouncer transaction pooling
+            async with engine.begin() as conn:
+                for name, query in QUERIES.items():
+                    started = time.perf_counter()
+                    await conn.execute(query, params[name])
+                    timings[name].append(time.perf_counter() - started)
+    finally:
+        await engine.dispose()
+    return timings
+
+
+def percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def main(url: str, modes, iterations: int, warmup: int):
+    seed_engine = create_async_engine(url, connect_args=statement_cache_args("disabled", 0))
+    try:
+        users, pipelines = await seed(seed_engine)
+        results = {}
+        for mode in modes:
+            timings = await run_mode(url, mode, iterations + warmup, users, pipelines)
+            results[mode] = {name: values[warmup:] for name, values in timings.items()}
+        async with seed_engine.begin() as conn:
+            await conn.execute(text(TEARDOWN))
+    finally:
+        await seed_engine.dispose()
+
+    print(f"{iterations} iterations per mode after {warmup} warm-up, one connection\n")
+    print(f"{'query':<18} {'mode':<10} {'p50 us':>9} {'p95 us':>9} {'mean us':>9}")
+    for name in QUERIES:
+        for mode in modes:
+            values = results[mode][name]
+            print(
+                f"{name:<18} {mode:<10} {statistics.median(values) * 1e6:>9.1f} "
+                f"{percentile(values, 0.95) * 1e6:>9.1f} {statistics.fmean(values) * 1e6:>9.1f}"
+            )
+        print()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default=os.environ.get("DATABASE_URL"))
+    parser.add_argument("--modes", nargs="+", choices=STATEMENT_CACHE_MODES, default=list(STATEMENT_CACHE_MODES))
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=100)
+    args = parser.parse_args()
+    if not args.url or "postgresql" not in args.url:
+        parser.error("--url (or DATABASE_URL) must point at a PostgreSQL database")
+    asyncio.run(main(args.url, args.modes, args.iterations, args.warmup))
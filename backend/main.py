@@ -8,9 +8,12 @@ import os
 # Import core components
 from app.core.config import settings
 from app.core.database import init_db, close_db
+from app.core.replicas import replica_router
 from app.core.redis import init_redis, close_redis
 from app.core.openapi_config import setup_openapi_docs
-from app.core.cache_manager import warm_cache_on_startup
+from app.core.cache_manager import warm_cache_on_startup, start_cache_invalidation_listener
+from app.core.rate_limiter import start_rate_limit_sampler
+from app.core.audit_logger import audit_writer
 from app.services.performance_service import start_performance_monitoring
 from app.services.metrics_service import start_background_metrics_collection
 from app.core.prometheus_middleware import PrometheusMiddleware
@@ -26,7 +29,8 @@ from app.middleware.rate_limiting import GlobalRateLimitMiddleware, APIRateLimit
 from app.middleware.csrf_protection import CSRFProtectionMiddleware
 from app.middleware.audit_middleware import AuditLoggingMiddleware, SecurityAuditMiddleware
 from app.core.tenant_middleware import TenantMiddleware
-from app.middleware.rate_limiter import rate_limit_middleware
+from app.middleware.rate_limiter import RateLimitMiddleware
+from app.middleware.request_session import RequestSessionMiddleware
 
 
 @asynccontextmanager
@@ -49,8 +53,20 @@ async def lifespan(app: FastAPI):
     
     # Initialize cache warming
     if redis_connected:
-        await warm_cache_on_startup()
-        print("✅ Cache warming completed")
+        warmer_task = await warm_cache_on_startup()
+        print("✅ Cache warming started")
+        
+        # Keep this worker's L1 cache coherent with the others
+        invalidation_task = await start_cache_invalidation_listener()
+        print("✅ Cache invalidation listener started")
+        
+        # Rate limiting reads system load and reputation from local state
+        sampler_task = await start_rate_limit_sampler()
+        print("✅ Rate limit sampler started")
+    
+    # Persist audit events in batches off the request path
+    audit_writer.start()
+    print("✅ Audit writer started")
     
     # Start performance monitoring in background
     monitoring_task = await start_performance_monitoring()
@@ -79,10 +95,39 @@ async def lifespan(app: FastAPI):
             pass  # Task was cancelled
         print("✅ Metrics collection stopped")
     
+    if locals().get('warmer_task'):
+        warmer_task.cancel()
+        try:
+            await warmer_task
+        except:
+            pass  # Task was cancelled
+        print("✅ Cache warmer stopped")
+    
+    if 'invalidation_task' in locals():
+        invalidation_task.cancel()
+        try:
+            await invalidation_task
+        except:
+            pass  # Task was cancelled
+        print("✅ Cache invalidation listener stopped")
+    
+    if 'sampler_task' in locals():
+        sampler_task.cancel()
+        try:
+            await sampler_task
+        except:
+            pass  # Task was cancelled
+        print("✅ Rate limit sampler stopped")
+    
+    # Flush queued audit events while the database and Redis are still up
+    await audit_writer.stop()
+    print("✅ Audit writer drained")
+    
     # Shutdown
     await close_redis()
     print("✅ Redis connection closed")
     
+    await replica_router.dispose()
     await close_db()
     print("✅ Database connection closed")
 
@@ -106,7 +151,7 @@ from app.middleware.security_headers import SecurityHeadersMiddleware
 app.add_middleware(SecurityHeadersMiddleware)
 
 # Enhanced rate limiting middleware with DDoS protection
-app.middleware("http")(rate_limit_middleware)
+app.add_middleware(RateLimitMiddleware)
 
 # Rate limiting middleware (added first for early protection)
 app.add_middleware(
@@ -162,6 +207,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request-scoped database session (added last so every middleware and
+# dependency above shares it; opened lazily, closed after the response)
+app.add_middleware(RequestSessionMiddleware)
+
 # Setup comprehensive OpenAPI documentation
 setup_openapi_docs(app)
 
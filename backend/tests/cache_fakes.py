@@ -0,0 +1,66 @@
+"""
+Shared Redis fakes for tests of the multi-layer cache.
+
+Import the ``fake_redis`` fixture into a test module to run
+``cache_manager`` against a fresh in-process L1 and a ``FakeRedisManager``
+as L2.
+"""
+
+import pytest
+
+from app.core import cache_manager as cache_module
+from app.core.cache_manager import MemoryCache
+
+
+class FakeRedisManager:
+    """Binary get/set, deletes and tag sets used by the multi-layer cache."""
+
+    def __init__(self):
+        self.values = {}
+        self.sets = {}
+        self.gets = 0
+
+    async def get_binary(self, key):
+        self.gets += 1
+        return self.values.get(key)
+
+    async def setex_binary(self, key, ttl, value):
+        self.values[key] = value
+
+    async def delete(self, *keys):
+        removed = 0
+        for key in keys:
+            removed += int(self.values.pop(key, None) is not None or self.sets.pop(key, None) is not None)
+        return removed
+
+    async def smembers(self, key):
+        return set(self.sets.get(key, ()))
+
+    async def publish(self, channel, message):
+        return 0
+
+    async def pipeline(self):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+
+    def sadd(self, key, member):
+        self.client.sets.setdefault(key, set()).add(member)
+
+    def expire(self, *args, **kwargs):
+        pass
+
+    async def execute(self):
+        return []
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    client = FakeRedisManager()
+    monkeypatch.setattr(cache_module.cache_manager, "l1_cache", MemoryCache())
+    monkeypatch.setattr(cache_module.cache_manager.l2_cache, "redis", client)
+    monkeypatch.setattr(cache_module.cache_warmer, "note_invalidation", lambda count: None)
+    return client
@@ -0,0 +1,209 @@
+"""
+Tests for API key hashing, verification and the verified-key cache.
+"""
+
+import hashlib
+import pytest
+from datetime import datetime, timedelta
+
+import bcrypt
+
+from app.core import api_key_manager as manager_module
+from app.core.api_key_auth import (
+    APIKeyCache, generate_api_key, get_api_key_id, hash_api_key, verify_api_key,
+    verify_legacy_api_key
+)
+from app.core.config import settings
+from app.core.api_key_manager import APIKeyManager
+from app.models.api_key import APIKey
+
+from tests.cache_fakes import fake_redis  # noqa: F401 - fixture
+
+
+class FakeResult:
+    def __init__(self, value):
+        self.value = value
+
+    def scalar_one_or_none(self):
+        return self.value
+
+
+class FakeSession:
+    """Returns one API key row for every SELECT and counts statements."""
+
+    def __init__(self, row):
+        self.row = row
+        self.statements = []
+        self.executed = []
+        self.commits = 0
+
+    async def execute(self, statement):
+        self.statements.append(statement.__visit_name__)
+        self.executed.append(statement)
+        return FakeResult(self.row)
+
+    async def commit(self):
+        self.commits += 1
+
+
+class TestAPIKeyHashing:
+    """Test the key format and HMAC verification."""
+
+    def test_key_id_is_embedded_in_the_key(self):
+        key = generate_api_key()
+
+        key_id = get_api_key_id(key)
+
+        assert key.startswith(f"dk_{key_id}_")
+        assert get_api_key_id("not-a-key") is None
+        assert get_api_key_id("dk__secret") is None
+        assert get_api_key_id("xx_abc_secret") is None
+
+    def test_hash_is_keyed_and_verification_exact(self):
+        key = generate_api_key()
+        hashed = hash_api_key(key)
+
+        assert key not in hashed and len(hashed) == 64
+        assert verify_api_key(key, hashed)
+        assert not verify_api_key(key + "x", hashed)
+        assert not verify_api_key(key, None)
+
+    def test_production_requires_a_dedicated_hash_secret(self, monkeypatch):
+        monkeypatch.setattr(settings, "API_KEY_HASH_SECRET", None)
+        monkeypatch.setattr(settings, "ENVIRONMENT", "production")
+
+        with pytest.raises(RuntimeError):
+            hash_api_key(generate_api_key())
+
+        monkeypatch.setattr(settings, "API_KEY_HASH_SECRET", "stable-secret")
+        assert len(hash_api_key(generate_api_key())) == 64
+
+    def test_legacy_hashes_verify_until_disabled(self, monkeypatch):
+        key = generate_api_key()
+        sha256 = hashlib.sha256(key.encode()).hexdigest()
+        bcrypted = bcrypt.hashpw(key.encode(), bcrypt.gensalt(rounds=4)).decode()
+
+        assert verify_legacy_api_key(key, sha256)
+        assert verify_legacy_api_key(key, bcrypted)
+        assert not verify_legacy_api_key(key + "x", sha256)
+        assert not verify_legacy_api_key(key + "x", bcrypted)
+        assert not verify_legacy_api_key(key, hash_api_key(key))
+
+        monkeypatch.setattr(settings, "API_KEY_LEGACY_VERIFICATION", False)
+        assert not verify_legacy_api_key(key, sha256)
+
+
+class TestAPIKeyCache:
+    """Test cache hits, bad secrets and invalidation."""
+
+    @pytest.mark.asyncio
+    async def test_repeat_authentication_skips_the_loader(self, fake_redis):
+        cache = APIKeyCache(ttl=60, negative_ttl=30, touch_interval=60)
+        key = generate_api_key()
+        loads = []
+
+        async def load(key_id):
+            loads.append(key_id)
+            return {"key_id": key_id, "key_hash": hash_api_key(key), "scopes": ["read"]}
+
+        first = await cache.authenticate("user", key, load)
+        first["scopes"].append("admin")
+        second = await cache.authenticate("user", key, load)
+
+        assert loads == [get_api_key_id(key)]
+        assert second["scopes"] == ["read"]
+        assert not any(key.encode() in value for value in fake_redis.values.values())
+
+    @pytest.mark.asyncio
+    async def test_wrong_secret_is_rejected_from_cache(self, fake_redis):
+        cache = APIKeyCache(ttl=60, negative_ttl=30, touch_interval=60)
+        key = generate_api_key()
+        forged = key[:-4] + "AAAA"
+        loads = []
+
+        async def load(key_id):
+            loads.append(key_id)
+            return {"key_id": key_id, "key_hash": hash_api_key(key)}
+
+        assert await cache.authenticate("user", key, load)
+        for _ in range(3):
+            assert await cache.authenticate("user", forged, load) is None
+        assert await cache.authenticate("user", "garbage", load) is None
+        assert len(loads) == 1
+
+    @pytest.mark.asyncio
+    async def test_unknown_and_revoked_keys(self, fake_redis):
+        cache = APIKeyCache(ttl=60, negative_ttl=30, touch_interval=60)
+        key = generate_api_key()
+        records = {}
+
+        async def load(key_id):
+            return records.get(key_id)
+
+        assert await cache.authenticate("user", key, load) is None
+        records[get_api_key_id(key)] = {"key_id": get_api_key_id(key), "key_hash": hash_api_key(key)}
+        # The miss is cached until invalidated
+        assert await cache.authenticate("user", key, load) is None
+
+        await cache.invalidate("user", get_api_key_id(key))
+        assert await cache.authenticate("user", key, load)
+
+        # Revocation drops the cached record
+        records.clear()
+        await cache.invalidate("user", get_api_key_id(key))
+        assert await cache.authenticate("user", key, load) is None
+
+    def test_last_used_writes_are_throttled(self):
+        cache = APIKeyCache(ttl=60, negative_ttl=30, touch_interval=60)
+
+        assert cache.touch_due("k1")
+        assert not cache.touch_due("k1")
+        assert cache.touch_due("k2")
+
+
+class TestAPIKeyManager:
+    """Test the manager's single verification path."""
+
+    @pytest.mark.asyncio
+    async def test_validate_uses_one_lookup_then_the_cache(self, fake_redis, monkeypatch):
+        monkeypatch.setattr(manager_module, "api_key_cache", APIKeyCache(ttl=60, negative_ttl=30, touch_interval=60))
+        manager = APIKeyManager()
+        plain_key, hashed_key = manager.generate_api_key()
+        row = APIKey(
+            id=get_api_key_id(plain_key), user_id="6f1c2a9e-0000-4000-8000-000000000001",
+            name="ci", key_hash=hashed_key, key_type="service", scopes=["read"], rate_limit=100,
+            expires_at=datetime.utcnow() + timedelta(days=1)
+        )
+        db = FakeSession(row)
+
+        for _ in range(5):
+            valid, details, error = await manager.validate_api_key(plain_key, "read", None, None, db)
+            assert valid and error is None
+        denied = await manager.validate_api_key(plain_key, "admin", None, None, db)
+
+        assert details["key_id"] == row.id and details["type"] == "service"
+        assert denied[0] is False and "scope" in denied[2]
+        # One SELECT, plus a single throttled last-used UPDATE
+        assert db.statements == ["select", "update"]
+        assert db.commits == 1
+
+    @pytest.mark.asyncio
+    async def test_legacy_sha256_key_is_rehashed_on_first_use(self, fake_redis, monkeypatch):
+        monkeypatch.setattr(manager_module, "api_key_cache", APIKeyCache(ttl=60, negative_ttl=30, touch_interval=60))
+        manager = APIKeyManager()
+        plain_key = generate_api_key()
+        row = APIKey(
+            id=get_api_key_id(plain_key), user_id="6f1c2a9e-0000-4000-8000-000000000001",
+            name="ci", key_hash=hashlib.sha256(plain_key.encode()).hexdigest(), key_type="service",
+            scopes=["read"], rate_limit=100
+        )
+        db = FakeSession(row)
+
+        record = await manager.authenticate(plain_key, db)
+
+        assert record["key_hash"] == hash_api_key(plain_key)
+        rehash = db.executed[1].compile().params
+        assert db.statements == ["select", "update", "update"]
+        assert rehash["key_hash"] == hash_api_key(plain_key)
+        assert await manager.authenticate(plain_key[:-4] + "AAAA", db) is None
+
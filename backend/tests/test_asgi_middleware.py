@@ -0,0 +1,182 @@
+"""
+Tests for the pure-ASGI middleware base and the middlewares built on it.
+"""
+
+import pytest
+import httpx
+from unittest.mock import AsyncMock
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, Response
+from starlette.routing import Route
+
+from app.core.asgi import HTTPMiddleware
+
+
+def _client(app):
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://testserver")
+
+
+async def _ok(request):
+    return PlainTextResponse("ok")
+
+
+async def _echo(request):
+    return JSONResponse({"body": (await request.body()).decode()})
+
+
+async def _cookies(request):
+    response = PlainTextResponse("ok")
+    response.set_cookie("a", "1")
+    response.set_cookie("b", "2")
+    return response
+
+
+async def _fail(request):
+    raise RuntimeError("boom")
+
+
+def _app(*middleware):
+    app = Starlette(routes=[
+        Route("/ok", _ok),
+        Route("/echo", _echo, methods=["POST"]),
+        Route("/cookies", _cookies),
+        Route("/fail", _fail),
+    ])
+    for cls, kwargs in middleware:
+        app.add_middleware(cls, **kwargs)
+    return app
+
+
+class RecordingMiddleware(HTTPMiddleware):
+    def __init__(self, app):
+        super().__init__(app)
+        self.events = []
+
+    async def before_request(self, request):
+        if request.url.path == "/blocked":
+            return PlainTextResponse("blocked", status_code=429)
+        self.events.append("before")
+        return None
+
+    async def on_response_start(self, request, status_code, headers):
+        self.events.append(("start", status_code))
+        headers["X-Hooked"] = "yes"
+
+    async def after_response(self, request, status_code, error):
+        self.events.append(("after", status_code, type(error).__name__ if error else None))
+
+
+class TestHTTPMiddleware:
+    """Test hook ordering, short-circuiting and pass-through of response messages."""
+
+    @pytest.mark.asyncio
+    async def test_hooks_run_in_order_and_edit_headers(self):
+        middleware = RecordingMiddleware(_app())
+
+        async with _client(middleware) as client:
+            response = await client.get("/ok")
+            blocked = await client.get("/blocked")
+
+        assert response.headers["x-hooked"] == "yes"
+        assert blocked.status_code == 429
+        assert "x-hooked" not in blocked.headers
+        assert middleware.events == ["before", ("start", 200), ("after", 200, None)]
+
+    @pytest.mark.asyncio
+    async def test_streamed_messages_are_forwarded_unbuffered(self):
+        async def streaming_app(scope, receive, send):
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            sent.append("first chunk sent")
+            await send({"type": "http.response.body", "body": b"a", "more_body": True})
+            await send({"type": "http.response.body", "body": b"b", "more_body": False})
+
+        sent = []
+        received = []
+
+        async def send(message):
+            # The first chunk reaches the server before the app produces the next one
+            received.append((message["type"], message.get("body"), list(sent)))
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        scope = {"type": "http", "method": "GET", "path": "/", "headers": [], "query_string": b""}
+        await RecordingMiddleware(streaming_app)(scope, receive, send)
+
+        assert received == [
+            ("http.response.start", None, []),
+            ("http.response.body", b"a", ["first chunk sent"]),
+            ("http.response.body", b"b", ["first chunk sent"]),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_errors_reach_after_response_and_propagate(self):
+        middleware = RecordingMiddleware(_app())
+
+        with pytest.raises(RuntimeError):
+            async with _client(middleware) as client:
+                await client.get("/fail")
+
+        assert middleware.events[-1] == ("after", 500, "RuntimeError")
+
+
+class TestConvertedMiddleware:
+    """Test behaviour the BaseHTTPMiddleware versions provided."""
+
+    @pytest.mark.asyncio
+    async def test_security_headers_keep_every_set_cookie(self):
+        from app.middleware.security_headers import SecurityHeadersMiddleware
+
+        app = _app((SecurityHeadersMiddleware, {}))
+        async with _client(app) as client:
+            response = await client.get("/cookies")
+            preflight = await client.options("/cookies", headers={"Origin": "http://localhost:3000"})
+
+        assert response.headers["x-content-type-options"] == "nosniff"
+        assert "content-security-policy" in response.headers
+        assert "x-request-id" in response.headers
+        assert len(response.headers.get_list("set-cookie")) == 2
+        assert preflight.status_code == 204
+        assert preflight.headers["access-control-allow-origin"] == "http://localhost:3000"
+
+    @pytest.mark.asyncio
+    async def test_global_rate_limit_headers_and_rejection(self, monkeypatch):
+        from app.middleware import rate_limiting
+
+        check = AsyncMock(side_effect=[
+            (True, {"remaining_attempts": 9}),
+            (False, {"remaining_attempts": 0}),
+        ])
+        monkeypatch.setattr(rate_limiting.rate_limiter, "check_rate_limit", check)
+
+        app = _app((rate_limiting.GlobalRateLimitMiddleware, {"max_requests": 10, "window_seconds": 60}))
+        async with _client(app) as client:
+            allowed = await client.get("/ok")
+            denied = await client.get("/ok")
+            skipped = await client.get("/health")
+
+        assert allowed.headers["x-ratelimit-remaining"] == "9"
+        assert allowed.headers["x-ratelimit-scope"] == "global"
+        assert denied.status_code == 429
+        assert denied.json()["error"] == "RATE_LIMIT_EXCEEDED"
+        assert skipped.status_code == 404
+        assert check.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_audit_middleware_logs_body_without_consuming_it(self, monkeypatch):
+        from app.middleware import audit_middleware
+
+        log_event = AsyncMock()
+        monkeypatch.setattr(audit_middleware.audit_logger, "log_event", log_event)
+
+        app = _app((audit_middleware.AuditLoggingMiddleware, {"log_request_body": True}))
+        async with _client(app) as client:
+            response = await client.post("/echo", json={"name": "pipeline"})
+
+        assert response.json() == {"body": '{"name":"pipeline"}'}
+        logged = log_event.await_args.kwargs
+        assert logged["response_status"] == 200
+        assert logged["outcome"] == "SUCCESS"
+        assert logged["details"]["body"] == {"name": "pipeline"}
+        assert "response_headers" in logged["details"]
@@ -0,0 +1,181 @@
+"""
+Tests for the batched audit log writer.
+"""
+
+import asyncio
+import pytest
+import pytest_asyncio
+from unittest.mock import AsyncMock, Mock
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from app.core import audit_logger as audit_module
+from app.core.audit_logger import AuditLog, AuditWriter, AuditEventType, AuditSeverity
+
+
+class FakeRedis:
+    """Counts pipelines and evaluates INCRBY for the alert counters."""
+
+    def __init__(self):
+        self.counters = {}
+        self.pipelines = 0
+        self.alerts = []
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.calls.append((name, args))
+        return queue
+
+    async def execute(self):
+        self.client.pipelines += 1
+        results = []
+        for name, args in self.calls:
+            if name == "incrby":
+                self.client.counters[args[0]] = self.client.counters.get(args[0], 0) + args[1]
+                results.append(self.client.counters[args[0]])
+            else:
+                if name == "lpush" and args[0] == "audit:security_alerts":
+                    self.client.alerts.append(args[1])
+                results.append(True)
+        return results
+
+
+@pytest_asyncio.fixture
+async def session_factory():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(AuditLog.__table__.create)
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    client = FakeRedis()
+    monkeypatch.setattr(audit_module.audit_logger, "_get_redis", AsyncMock(return_value=client))
+    return client
+
+
+@pytest.fixture
+def writer(monkeypatch, session_factory, tmp_path):
+    writer = AuditWriter(
+        max_events=100, batch_size=50, flush_interval_ms=10,
+        spill_path=str(tmp_path / "spill.jsonl"), dead_letter_path=str(tmp_path / "dead_letter.jsonl"),
+        session_factory=session_factory
+    )
+    monkeypatch.setattr(audit_module, "audit_writer", writer)
+    return writer
+
+
+async def _count(session_factory):
+    async with session_factory() as session:
+        return await session.scalar(select(func.count()).select_from(AuditLog))
+
+
+class TestAuditWriter:
+    """Test queueing, batched persistence and shutdown draining."""
+
+    @pytest.mark.asyncio
+    async def test_events_are_queued_then_written_in_batches(self, writer, fake_redis, session_factory):
+        for i in range(120):
+            await audit_module.audit_logger.log_event(
+                AuditEventType.DATA_READ, f"read {i}", severity=AuditSeverity.LOW
+            )
+
+        # Nothing touched the database on the caller's path
+        assert writer.stats()["queued"] == 100
+        assert writer.dropped == 20
+
+        await writer.stop()
+
+        assert await _count(session_factory) == 100
+        assert writer.written == 100
+        # One Redis pipeline per batch of 50
+        assert fake_redis.pipelines == 2
+
+    @pytest.mark.asyncio
+    async def test_drop_newest_keeps_the_queued_events(self, writer):
+        writer.overflow = "drop_newest"
+        for i in range(101):
+            writer.submit({"message": str(i)})
+
+        assert [row["message"] for row in list(writer._queue)[:1]] == ["0"]
+        assert writer.dropped == 1
+        await writer.stop(timeout=0)
+
+    @pytest.mark.asyncio
+    async def test_failed_logins_raise_one_alert_per_batch(self, writer, fake_redis):
+        for _ in range(6):
+            await audit_module.audit_logger.log_event(
+                AuditEventType.USER_LOGIN_FAILED, "login failed", ip_address="10.0.0.1"
+            )
+        await writer.stop()
+
+        assert fake_redis.counters["audit:failed_logins:10.0.0.1"] == 6
+        assert len(fake_redis.alerts) == 1
+
+    @pytest.mark.asyncio
+    async def test_unwritten_events_are_spilled_and_replayed(self, writer, session_factory, tmp_path, monkeypatch):
+        broken = AuditWriter(
+            max_events=100, batch_size=50, flush_interval_ms=10,
+            spill_path=writer.spill_path, session_factory=Mock(side_effect=ConnectionError("db down"))
+        )
+        monkeypatch.setattr(audit_module, "audit_writer", broken)
+        await audit_module.audit_logger.log_event(AuditEventType.ADMIN_ACTION, "changed settings")
+        await asyncio.sleep(0.05)
+        await broken.stop(timeout=0.1)
+
+        assert broken.failed_batches >= 1
+        assert (tmp_path / "spill.jsonl").exists()
+
+        writer.start()
+        await writer.stop()
+
+        assert await _count(session_factory) == 1
+        assert not (tmp_path / "spill.jsonl").exists()
+
+    @pytest.mark.asyncio
+    async def test_rejected_rows_are_isolated_and_dead_lettered(self, writer, fake_redis, session_factory, tmp_path):
+        for i in range(10):
+            # message is NOT NULL; one bad row must not hold back the other nine
+            await audit_module.audit_logger.log_event(
+                AuditEventType.DATA_READ, None if i == 3 else f"read {i}", severity=AuditSeverity.LOW
+            )
+        await writer.stop()
+
+        assert await _count(session_factory) == 9
+        assert writer.written == 9
+        assert writer.rejected == 1
+        assert writer.stats()["queued"] == 0
+        lines = (tmp_path / "dead_letter.jsonl").read_text().splitlines()
+        assert len(lines) == 1 and '"dead_letter"' in lines[0]
+        assert not (tmp_path / "spill.jsonl").exists()
+
+        # Dead letters are kept on restart, not replayed
+        writer.start()
+        await writer.stop()
+        assert await _count(session_factory) == 9
+        assert (tmp_path / "dead_letter.jsonl").read_text().splitlines() == lines
+
+    @pytest.mark.asyncio
+    async def test_oversized_values_are_truncated_to_column_lengths(self, writer, fake_redis, session_factory):
+        await audit_module.audit_logger.log_event(
+            AuditEventType.DATA_READ, "read", request_path="/" + "a" * 600, action="x" * 80,
+            resource_id="r" * 300
+        )
+        await writer.stop()
+
+        async with session_factory() as session:
+            row = (await session.execute(select(AuditLog))).scalar_one()
+        assert len(row.request_path) == 500
+        assert len(row.action) == 50
+        assert len(row.resource_id) == 255
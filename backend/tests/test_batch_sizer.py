@@ -0,0 +1,82 @@
+"""
+Tests for adaptive batch sizing.
+"""
+
+import pytest
+import pandas as pd
+
+from app.services.etl_engine.batch_sizer import AdaptiveBatchSizer, estimate_frame_bytes
+
+
+class TestAdaptiveBatchSizer:
+    """Test batch size adaptation."""
+
+    def test_narrow_fast_rows_grow_batches_up_to_ceiling(self):
+        sizer = AdaptiveBatchSizer(initial_size=1000, floor=100, ceiling=20_000)
+
+        for _ in range(10):
+            # 40 bytes/row, 1000 rows in 10ms -> far below both targets
+            sizer.record(sizer.batch_size, sizer.batch_size * 40, sizer.batch_size * 0.00001)
+
+        assert sizer.batch_size == 20_000
+        # Growth is damped to at most 2x per batch
+        assert sizer.sizes_used[:3] == [1000, 2000, 4000]
+
+    def test_wide_rows_shrink_toward_memory_target(self):
+        sizer = AdaptiveBatchSizer(
+            initial_size=10_000, floor=50, ceiling=100_000, target_batch_bytes=4 * 1024 * 1024
+        )
+
+        for _ in range(10):
+            # 40 KB/row: the 4 MB target allows ~100 rows per batch
+            sizer.record(sizer.batch_size, sizer.batch_size * 40 * 1024, 0.001)
+
+        assert sizer.batch_size == pytest.approx(102, abs=2)
+
+    def test_slow_batches_respect_latency_target(self):
+        sizer = AdaptiveBatchSizer(initial_size=1000, floor=10, ceiling=100_000, target_batch_seconds=0.5)
+
+        for _ in range(10):
+            # 1ms per row -> 500 rows per batch meets the 0.5s target
+            sizer.record(sizer.batch_size, sizer.batch_size * 10, sizer.batch_size * 0.001)
+
+        assert sizer.batch_size == pytest.approx(500, abs=5)
+
+    def test_connector_limits_and_overrides(self):
+        sizer = AdaptiveBatchSizer.for_connector("mysql", {"max_batch_size": 2000, "initial_size": 5000})
+
+        assert sizer.floor == 500
+        assert sizer.ceiling == 2000
+        assert sizer.batch_size == 2000
+
+        with pytest.raises(ValueError):
+            AdaptiveBatchSizer(floor=10, ceiling=5)
+
+    def test_summary_reports_chosen_sizes(self):
+        sizer = AdaptiveBatchSizer(initial_size=1000, floor=100, ceiling=4000)
+        sizer.observe(pd.DataFrame({"a": range(1000)}), 0.001)
+        sizer.observe(pd.DataFrame({"a": range(2000)}), 0.002)
+
+        summary = sizer.summary()
+        assert summary["initial_batch_size"] == 1000
+        assert summary["max_batch_size_used"] == 2000
+        assert summary["final_batch_size"] == 4000
+        assert summary["batches"] == 2
+        assert summary["rows"] == 3000
+
+    def test_estimate_frame_bytes_samples_large_frames(self):
+        df = pd.DataFrame({"text": ["x" * 100] * 10_000, "n": range(10_000)})
+
+        exact = int(df.memory_usage(deep=True, index=False).sum())
+        assert estimate_frame_bytes(df) == pytest.approx(exact, rel=0.05)
+        assert estimate_frame_bytes(df.iloc[0:0]) == 0
+
+    def test_every_connector_accepts_a_batch_sizer(self):
+        import inspect
+        from app.services.connectors.base_connector import BaseConnector
+        from app.services.connectors.csv_connector import CSVConnector
+        from app.services.connectors.postgres_connector import PostgreSQLConnector
+
+        for connector_class in (BaseConnector, CSVConnector, PostgreSQLConnector):
+            for method in (connector_class.extract_data, connector_class.load_data):
+                assert inspect.signature(method).parameters["batch_sizer"].default is None
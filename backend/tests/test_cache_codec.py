@@ -0,0 +1,100 @@
+"""
+Tests for the Redis cache codec.
+"""
+
+import json
+import uuid
+import pytest
+import numpy as np
+from datetime import date, datetime
+from decimal import Decimal
+
+from app.core import cache_codec as codec_module
+from app.core.cache_codec import (
+    CacheCodec, CacheCodecError, COMPRESSION_NONE, COMPRESSION_ZLIB, FORMAT_VERSION, MARKER
+)
+
+
+SAMPLE = {
+    "generated_at": datetime(2024, 5, 1, 12, 30, 15, 123456),
+    "day": date(2024, 5, 1),
+    "id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+    "cost": Decimal("12.3400"),
+    "series": np.arange(6, dtype=np.float32).reshape(2, 3),
+    "count": np.int64(7),
+    "tags": ["a", "b"],
+    "nested": {"ok": True, "none": None}
+}
+
+
+def _serializers():
+    serializers = ["json"]
+    if codec_module.msgpack is not None:
+        serializers.append("msgpack")
+    return serializers
+
+
+class TestCacheCodec:
+    """Test typed round trips, compression and format versioning."""
+
+    @pytest.mark.parametrize("serializer", _serializers())
+    def test_round_trip_preserves_types(self, serializer):
+        codec = CacheCodec(serializer=serializer, compression="none")
+
+        decoded = codec.decode(codec.encode(SAMPLE))
+
+        assert decoded["generated_at"] == SAMPLE["generated_at"]
+        assert decoded["day"] == SAMPLE["day"]
+        assert decoded["id"] == SAMPLE["id"]
+        assert decoded["cost"] == Decimal("12.3400")
+        assert decoded["series"].dtype == np.float32
+        np.testing.assert_array_equal(decoded["series"], SAMPLE["series"])
+        assert decoded["count"] == 7
+        assert decoded["tags"] == ["a", "b"]
+        assert decoded["nested"] == {"ok": True, "none": None}
+
+    def test_large_payloads_are_compressed(self):
+        codec = CacheCodec(serializer="json", compression="zlib", compression_threshold=256)
+        rows = [{"pipeline": "daily_sales", "status": "completed", "rows": i} for i in range(500)]
+
+        small = codec.encode({"a": 1})
+        large = codec.encode(rows)
+
+        assert small[:2] == bytes((MARKER, FORMAT_VERSION))
+        assert small[2] >> 4 == COMPRESSION_NONE
+        assert large[2] >> 4 == COMPRESSION_ZLIB
+        assert len(large) < len(json.dumps(rows)) / 5
+        assert codec.decode(large) == rows
+
+    def test_reads_values_written_before_the_codec(self):
+        codec = CacheCodec()
+        legacy = json.dumps({"status": "healthy", "timestamp": "2024-05-01T12:00:00"})
+
+        assert codec.decode(legacy) == {"status": "healthy", "timestamp": "2024-05-01T12:00:00"}
+        assert codec.decode(legacy.encode()) == {"status": "healthy", "timestamp": "2024-05-01T12:00:00"}
+
+    def test_defaults_to_json_and_zlib(self):
+        codec = CacheCodec()
+
+        assert codec.serializer.id == codec_module.SERIALIZER_JSON
+        assert codec.compression == COMPRESSION_ZLIB
+
+    def test_unknown_version_is_rejected(self):
+        codec = CacheCodec(compression="none")
+        payload = bytearray(codec.encode({"a": 1}))
+        payload[1] = FORMAT_VERSION + 1
+
+        with pytest.raises(CacheCodecError):
+            codec.decode(bytes(payload))
+
+    def test_missing_optional_backends_fall_back(self, monkeypatch):
+        monkeypatch.setattr(codec_module, "msgpack", None)
+        monkeypatch.setattr(codec_module, "zstandard", None)
+        monkeypatch.setattr(codec_module, "lz4_frame", None)
+
+        codec = CacheCodec(serializer="msgpack", compression="zstd")
+
+        assert codec.serializer.id == codec_module.SERIALIZER_JSON
+        assert codec.compression == COMPRESSION_ZLIB
+        with pytest.raises(ValueError):
+            CacheCodec(compression="brotli")
@@ -137,4 +137,329 @@ async def test_cache_statistics(cache_manager):
     assert stats["l1_hits"] > 0
     assert stats["l1_misses"] > 0
     assert stats["l2_hits"] > 0
-    assert stats["l2_misses"] > 0
\ No newline at end of file
+    assert stats["l2_misses"] > 0
+
+class TestMemoryCache:
+    """Test the L1 LRU cache."""
+
+    @pytest.mark.asyncio
+    async def test_lru_eviction_by_entry_count(self):
+        from app.core.cache_manager import MemoryCache
+        cache = MemoryCache(max_size=2)
+
+        await cache.set("a", 1)
+        await cache.set("b", 2)
+        assert await cache.get("a") == 1  # "b" is now least recently used
+        await cache.set("c", 3)
+
+        assert await cache.get("b") is None
+        assert await cache.get("a") == 1
+        assert await cache.get("c") == 3
+        assert cache.evictions == 1
+
+    @pytest.mark.asyncio
+    async def test_lru_eviction_by_memory_size(self):
+        from app.core.cache_manager import MemoryCache
+        cache = MemoryCache(max_size=100, max_memory_bytes=4096)
+
+        for i in range(10):
+            await cache.set(f"key{i}", "x" * 1000)
+
+        assert cache.memory_bytes <= 4096
+        assert len(cache.cache) < 10
+        assert await cache.get("key9") == "x" * 1000
+        assert await cache.get("key0") is None
+        # A single value larger than the whole budget is not cached
+        assert await cache.set("huge", "x" * 10_000) is False
+
+    @pytest.mark.asyncio
+    async def test_expired_entries_are_swept(self):
+        from app.core.cache_manager import MemoryCache
+        cache = MemoryCache()
+
+        await cache.set("short", 1, ttl=0, tags=["t"])
+        assert cache.purge_expired() == 1
+        await cache.set("stale", 1, ttl=0, tags=["t"])
+        await cache.set("long", 2, ttl=300, tags=["t"])
+
+        # The next write sweeps expired entries without them being read
+        assert "stale" not in cache.cache
+        assert cache.expirations == 2
+        assert cache.tag_index["t"] == {"long"}
+        assert await cache.exists("long")
+
+    @pytest.mark.asyncio
+    async def test_tag_invalidation_and_overwrite(self):
+        from app.core.cache_manager import MemoryCache
+        cache = MemoryCache()
+
+        await cache.set("user:1", "a", tags=["user", "org:1"])
+        await cache.set("user:2", "b", tags=["user"])
+        await cache.set("user:1", "c", tags=["org:1"])  # overwrite drops the "user" tag
+
+        assert cache.tag_index["user"] == {"user:2"}
+        assert await cache.invalidate_by_tag("org:1") == 1
+        assert "org:1" not in cache.tag_index
+        assert await cache.get("user:1") is None
+        assert await cache.delete("user:2") is True
+        assert cache.tag_index == {}
+        assert cache.memory_bytes == 0
+
+
+@pytest.fixture
+def isolated_cache(monkeypatch):
+    """Point the global cache at a fresh L1 and a stubbed-out L2."""
+    from app.core import cache_manager as cache_module
+    from app.core.cache_manager import MemoryCache
+
+    monkeypatch.setattr(cache_module.cache_manager, "l1_cache", MemoryCache())
+    monkeypatch.setattr(cache_module.cache_manager.l2_cache, "get", AsyncMock(return_value=None))
+    monkeypatch.setattr(cache_module.cache_manager.l2_cache, "set", AsyncMock(return_value=True))
+    return cache_module.cache_manager
+
+
+class TestCacheResult:
+    """Test request coalescing and stale-while-revalidate in cache_result."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_run_function_once(self, isolated_cache):
+        import asyncio
+        from app.core.cache_manager import cache_result
+        calls = []
+
+        @cache_result(key_prefix="test.single_flight", ttl=60)
+        async def load(org_id):
+            calls.append(org_id)
+            await asyncio.sleep(0.05)
+            return {"org": org_id}
+
+        results = await asyncio.gather(*(load("org-1") for _ in range(20)))
+
+        assert calls == ["org-1"]
+        assert all(result == {"org": "org-1"} for result in results)
+        assert await load("org-1") == {"org": "org-1"}
+        assert calls == ["org-1"]
+
+    @pytest.mark.asyncio
+    async def test_errors_propagate_to_all_waiters(self, isolated_cache):
+        import asyncio
+        from app.core.cache_manager import cache_result
+
+        @cache_result(key_prefix="test.single_flight_error", ttl=60)
+        async def load():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("boom")
+
+        results = await asyncio.gather(load(), load(), return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+    @pytest.mark.asyncio
+    async def test_expired_value_served_while_refreshing(self, isolated_cache, monkeypatch):
+        import asyncio
+        from app.core import cache_manager as cache_module
+        from app.core.cache_manager import cache_result
+        clock = {"now": 1_000.0}
+        monkeypatch.setattr(cache_module.time, "time", lambda: clock["now"])
+        calls = []
+
+        @cache_result(key_prefix="test.swr", ttl=60, l2_ttl=60, stale_ttl=60, early_expiration_beta=0)
+        async def load():
+            calls.append(clock["now"])
+            await asyncio.sleep(0.01)
+            return len(calls)
+
+        assert await load() == 1
+
+        # Past the fresh window: every caller gets the stale value at once
+        clock["now"] += 90
+        assert await asyncio.gather(*(load() for _ in range(10))) == [1] * 10
+        await asyncio.gather(*cache_module._background_refreshes)
+
+        assert len(calls) == 2
+        assert await load() == 2
+
+    def test_early_expiration_probability(self, monkeypatch):
+        from app.core import cache_manager as cache_module
+        monkeypatch.setattr(cache_module.time, "time", lambda: 1_000.0)
+
+        # Far from expiry with a cheap recompute: never early
+        assert not cache_module._needs_refresh(2_000.0, 0.01, 1.0)
+        # Past expiry: always
+        assert cache_module._needs_refresh(999.0, 0.01, 1.0)
+        # Expensive recompute close to expiry: usually early
+        refreshes = sum(cache_module._needs_refresh(1_001.0, 5.0, 1.0) for _ in range(200))
+        assert refreshes > 100
+
+    def test_key_params_drop_sessions_and_objects(self):
+        from datetime import datetime
+        from app.core.cache_manager import _is_key_param
+
+        assert _is_key_param("org-1")
+        assert _is_key_param(datetime(2024, 1, 1))
+        assert _is_key_param({"ids": [1, 2]})
+        assert not _is_key_param(object())
+        assert not _is_key_param(MagicMock())
+
+
+class TestDistributedInvalidation:
+    """Test Redis tag sets and cross-process L1 invalidation."""
+
+    def _cache(self):
+        from app.core.cache_manager import MultiLayerCache
+        cache = MultiLayerCache()
+        fake_redis = MagicMock()
+        fake_redis.setex_binary = AsyncMock(return_value=True)
+        fake_redis.smembers = AsyncMock(return_value={"dash:1", "dash:2"})
+        fake_redis.delete = AsyncMock(return_value=3)
+        fake_redis.publish = AsyncMock(return_value=1)
+        pipe = MagicMock()
+        pipe.execute = AsyncMock(return_value=[])
+        fake_redis.pipeline = AsyncMock(return_value=pipe)
+        cache.l2_cache.redis = fake_redis
+        return cache, fake_redis, pipe
+
+    @pytest.mark.asyncio
+    async def test_tags_are_indexed_in_redis(self):
+        cache, fake_redis, pipe = self._cache()
+
+        await cache.set("dash:1", {"v": 1}, l2_ttl=600, tags=["org:1"])
+
+        pipe.sadd.assert_called_once_with("tag:org:1", "dash:1")
+        assert pipe.expire.call_count == 2
+        pipe.execute.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_tag_invalidation_is_published_with_keys(self):
+        from app.core.cache_manager import INVALIDATION_CHANNEL
+        cache, fake_redis, _ = self._cache()
+
+        count = await cache.invalidate_by_tag("org:1")
+
+        assert count == 2
+        channel, message = fake_redis.publish.call_args.args
+        payload = json.loads(message)
+        assert channel == INVALIDATION_CHANNEL
+        assert payload["kind"] == "tag"
+        assert payload["value"] == "org:1"
+        assert sorted(payload["keys"]) == ["dash:1", "dash:2"]
+
+    @pytest.mark.asyncio
+    async def test_other_processes_evict_from_l1(self):
+        sender, fake_redis, _ = self._cache()
+        receiver, _, _ = self._cache()
+
+        # Promoted from L2 in the receiver, so it has no local tags
+        await receiver.l1_cache.set("dash:1", {"v": 1})
+        await receiver.l1_cache.set("dash:3", {"v": 3}, tags=["org:1"])
+        await receiver.l1_cache.set("other", {"v": 0})
+
+        await sender.invalidate_by_tag("org:1")
+        message = fake_redis.publish.call_args.args[1]
+
+        assert await receiver.apply_invalidation(message) == 2
+        assert await receiver.l1_cache.get("dash:1") is None
+        assert await receiver.l1_cache.get("dash:3") is None
+        assert await receiver.l1_cache.get("other") == {"v": 0}
+
+        # A process ignores its own messages
+        await sender.l1_cache.set("dash:1", {"v": 1})
+        assert await sender.apply_invalidation(message) == 0
+        assert await sender.apply_invalidation("not json") == 0
+
+    @pytest.mark.asyncio
+    async def test_pattern_and_prefix_invalidation_avoid_keys(self):
+        cache, fake_redis, _ = self._cache()
+        fake_redis.keys = AsyncMock(side_effect=AssertionError("KEYS must not be used"))
+        fake_redis.unlink_matching = AsyncMock(return_value=1)
+
+        await cache.l1_cache.set("user:profile:1", 1)
+        await cache.l1_cache.set("post:1", 2)
+        assert await cache.invalidate_pattern("user:*") == 2
+        assert await cache.l1_cache.get("post:1") == 2
+
+        # cache_result keys are hashed and found through the prefix registry
+        assert await cache.invalidate_by_prefix("analytics.usage") == 3
+        fake_redis.smembers.assert_awaited_with("tag:prefix:analytics.usage")
+
+    @pytest.mark.asyncio
+    async def test_busy_tags_are_pruned_of_expired_keys(self):
+        from app.core import cache_manager as cache_module
+        cache, fake_redis, pipe = self._cache()
+
+        async def members(name):
+            for member in ("dash:1", "dash:2", "dash:3"):
+                yield member
+
+        fake_redis.sscan_iter = members
+        fake_redis.srem = AsyncMock(return_value=2)
+
+        assert await cache.prune_tag("org:1") == 0
+        pipe.execute = AsyncMock(return_value=[1, 0, 0])
+        assert await cache.prune_tag("org:1") == 2
+        fake_redis.srem.assert_awaited_once_with("tag:org:1", "dash:2", "dash:3")
+
+        # Writes to a tag trigger a sweep every TAG_PRUNE_INTERVAL writes
+        with patch.object(cache_module, "TAG_PRUNE_INTERVAL", 3), \
+                patch.object(cache, "prune_tag", AsyncMock()) as prune:
+            for i in range(7):
+                await cache.set(f"dash:{i}", {"v": i}, tags=["org:1"])
+        assert prune.await_count == 2
+
+
+class TestCacheMetrics:
+    """Test per-prefix cache metrics and their Prometheus export."""
+
+    @pytest.mark.asyncio
+    async def test_hits_and_misses_by_prefix_and_layer(self, isolated_cache, monkeypatch):
+        from app.core import cache_manager as cache_module
+        from app.core.cache_manager import CacheMetrics
+
+        metrics = CacheMetrics()
+        monkeypatch.setattr(cache_module, "cache_metrics", metrics)
+        isolated_cache.l2_cache.get.side_effect = lambda key: {"v": 1} if key == "analytics.usage:b" else None
+
+        await isolated_cache.l1_cache.set("analytics.usage:a", {"v": 0})
+        await isolated_cache.get("analytics.usage:a")
+        await isolated_cache.get("analytics.usage:b")
+        await isolated_cache.get("analytics.usage:c")
+        await isolated_cache.get("dashboard_overview:1:7d")
+
+        snapshot = metrics.snapshot()["prefixes"]
+        usage = snapshot["analytics.usage"]
+        assert (usage["l1_hits"], usage["l2_hits"], usage["misses"]) == (1, 1, 1)
+        assert usage["hit_ratio"] == pytest.approx(0.667)
+        assert snapshot["dashboard_overview"]["misses"] == 1
+        assert list(snapshot)[0] == "analytics.usage"
+
+    def test_prefix_cardinality_is_bounded(self):
+        from app.core.cache_manager import CacheMetrics
+
+        metrics = CacheMetrics()
+        metrics.MAX_PREFIXES = 3
+        for i in range(10):
+            metrics.record_get(f"p{i}:key", "miss", 0.001)
+
+        assert len(metrics.prefixes) == 4
+        assert metrics.prefixes[CacheMetrics.OVERFLOW_PREFIX].misses == 7
+
+    def test_events_exported_to_prometheus(self):
+        from prometheus_client import CollectorRegistry
+        from app.core.cache_manager import CacheMetrics
+        from app.services.metrics_service import PrometheusMetrics
+
+        registry = CollectorRegistry()
+        exporter = PrometheusMetrics(registry=registry)
+        metrics = CacheMetrics()
+        metrics.add_listener(exporter.record_cache_event)
+
+        metrics.record_get("analytics.usage:a", "l2", 0.002)
+        metrics.record_set("analytics.usage:a", 0.003, payload_bytes=5000)
+        metrics.record_eviction("l1", "capacity", 2)
+
+        sample = registry.get_sample_value
+        assert sample("cache_requests_total", {"prefix": "analytics.usage", "result": "l2"}) == 1
+        assert sample("cache_payload_bytes_sum", {"prefix": "analytics.usage"}) == 5000
+        assert sample(
+            "cache_operation_duration_seconds_count", {"prefix": "analytics.usage", "operation": "set"}
+        ) == 1
+        assert sample("cache_evictions_total", {"layer": "l1", "reason": "capacity"}) == 2
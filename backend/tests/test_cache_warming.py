@@ -0,0 +1,170 @@
+"""
+Tests for data-driven cache warming.
+"""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+
+from app.core import cache_warming
+from app.core.cache_warming import CacheWarmer
+
+
+class FakeBinaryRedis:
+    """Sorted set and string commands used by the warmer."""
+
+    def __init__(self):
+        self.zset = {}
+        self.values = {}
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+    async def zincrby(self, name, amount, member):
+        self.zset[member] = self.zset.get(member, 0) + amount
+
+    async def set(self, key, value, ex=None):
+        self.values[key] = value
+
+    async def expire(self, key, seconds):
+        return True
+
+    async def zremrangebyrank(self, name, start, end):
+        return 0
+
+    async def zrevrange(self, name, start, end):
+        ranked = sorted(self.zset, key=self.zset.get, reverse=True)
+        return [member.encode() for member in ranked[start:end + 1]]
+
+    async def mget(self, keys):
+        return [self.values.get(key) for key in keys]
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+        return queue
+
+    async def execute(self):
+        return [await getattr(self.client, name)(*args, **kwargs) for name, args, kwargs in self.calls]
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    client = FakeBinaryRedis()
+    monkeypatch.setattr(cache_warming.redis_manager, "connect_binary", AsyncMock(return_value=client))
+    return client
+
+
+@pytest.fixture
+def warmer(monkeypatch, fake_redis):
+    warmer = CacheWarmer(top_n=10, concurrency=2, storm_threshold=5, storm_debounce_seconds=0)
+    monkeypatch.setattr(cache_warming, "cache_warmer", warmer)
+    return warmer
+
+
+class TestCacheWarmer:
+    """Test recording and replay of hot keys."""
+
+    @pytest.mark.asyncio
+    async def test_replays_most_requested_keys_with_bounded_concurrency(self, warmer, fake_redis):
+        running = {"now": 0, "peak": 0}
+        replayed = []
+
+        async def replay(params):
+            running["now"] += 1
+            running["peak"] = max(running["peak"], running["now"])
+            await asyncio.sleep(0.01)
+            replayed.append(params["org_id"])
+            running["now"] -= 1
+
+        warmer.register("analytics.usage", replay)
+        for org, hits in [("org-1", 5), ("org-2", 1), ("org-3", 3), ("org-4", 2)]:
+            for _ in range(hits):
+                warmer.record("analytics.usage", f"analytics.usage:{org}", {"org_id": org})
+        warmer.record("retired.prefix", "retired.prefix:x", {})
+
+        assert await warmer.flush() == 5
+        assert fake_redis.zset["analytics.usage:org-1"] == 5
+
+        result = await warmer.warm(limit=3)
+
+        assert sorted(replayed) == ["org-1", "org-3", "org-4"]
+        assert running["peak"] <= 2
+        assert result["warmed"] == 3
+        assert result["candidates"] == 3
+
+    @pytest.mark.asyncio
+    async def test_replay_does_not_count_as_demand(self, warmer):
+        async def replay(params):
+            warmer.record("analytics.usage", "analytics.usage:org-1", params)
+
+        warmer.register("analytics.usage", replay)
+        warmer.record("analytics.usage", "analytics.usage:org-1", {"org_id": "org-1"})
+        await warmer.warm()
+
+        assert not warmer._counts
+
+    @pytest.mark.asyncio
+    async def test_invalidation_storm_triggers_warm(self, warmer):
+        warmer.register("analytics.usage", AsyncMock())
+        warmer.warm = AsyncMock(return_value={})
+
+        warmer.note_invalidation(2)
+        assert warmer._storm_task is None
+        warmer.note_invalidation(4)
+        await warmer._storm_task
+
+        warmer.warm.assert_awaited_once()
+
+
+class TestCacheResultWarming:
+    """Test that cache_result feeds the warmer."""
+
+    @pytest.mark.asyncio
+    async def test_decorated_calls_are_recorded_and_replayed(self, warmer, fake_redis, monkeypatch):
+        from app.core import cache_manager as cache_module
+        from app.core.cache_manager import MemoryCache, cache_result
+
+        monkeypatch.setattr(cache_module, "cache_warmer", warmer)
+        monkeypatch.setattr(cache_module.cache_manager, "l1_cache", MemoryCache())
+        monkeypatch.setattr(cache_module.cache_manager.l2_cache, "get", AsyncMock(return_value=None))
+        monkeypatch.setattr(cache_module.cache_manager.l2_cache, "set", AsyncMock(return_value=True))
+        monkeypatch.setattr(cache_module.cache_manager, "_index_tags", AsyncMock())
+        calls = []
+
+        @cache_result(key_prefix="test.warm", ttl=60, warm=True)
+        async def report(org_id, days=7):
+            calls.append((org_id, days))
+            return {"org": org_id, "days": days}
+
+        await report("org-1", days=30)
+        await report("org-1", days=30)
+        assert calls == [("org-1", 30)]
+
+        # Simulate a deploy: the in-process cache is gone
+        await cache_module.cache_manager.l1_cache.clear()
+        result = await warmer.warm()
+
+        assert result["warmed"] == 1
+        assert calls == [("org-1", 30), ("org-1", 30)]
+        assert fake_redis.zset[next(iter(fake_redis.zset))] == 2
+
+    def test_key_builder_without_warm_with_is_rejected(self):
+        from app.core.cache_manager import cache_result
+
+        # Recorded key_builder params cannot be passed back to the function
+        with pytest.raises(ValueError):
+            cache_result(key_prefix="test.warm", key_builder=lambda org_id: {"org": org_id}, warm=True)
+
+        cache_result(
+            key_prefix="test.warm",
+            key_builder=lambda org_id: {"org": org_id},
+            warm=True,
+            warm_with=AsyncMock()
+        )
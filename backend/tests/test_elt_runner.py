@@ -0,0 +1,215 @@
+"""
+Tests for the set-based ELT transformation runner.
+"""
+
+import pytest
+from contextlib import asynccontextmanager
+
+from app.services.etl_engine.elt_runner import (
+    ELTRunner, ELTRunnerOptions, ELTStep, MaterializationMode, TransactionMode
+)
+
+
+class FakeTransaction:
+    def __init__(self, connection):
+        self.connection = connection
+
+    async def start(self):
+        self.connection.log.append("BEGIN")
+
+    async def commit(self):
+        self.connection.log.append("COMMIT")
+
+    async def rollback(self):
+        self.connection.log.append("ROLLBACK")
+
+
+class FakePostgresConnection:
+    """Records statements the way an asyncpg connection would receive them."""
+
+    def __init__(self, failing=(), slow_plan=None):
+        self.log = []
+        self.failing = failing
+        self.slow_plan = slow_plan
+
+    def transaction(self):
+        return FakeTransaction(self)
+
+    async def execute(self, statement):
+        self.log.append(statement)
+        if any(marker in statement for marker in self.failing):
+            raise RuntimeError(f"boom: {statement}")
+        return "INSERT 0 5"
+
+    async def fetchval(self, statement):
+        self.log.append(statement)
+        return self.slow_plan
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.rowcount = 5
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement):
+        self.connection.log.append(statement)
+
+
+class FakeMySQLConnection:
+    """Records statements the way an aiomysql connection would receive them."""
+
+    def __init__(self):
+        self.log = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    async def begin(self):
+        self.log.append("BEGIN")
+
+    async def commit(self):
+        self.log.append("COMMIT")
+
+    async def rollback(self):
+        self.log.append("ROLLBACK")
+
+
+class FakeConnector:
+    def __init__(self, connection):
+        self.connection = connection
+        self.acquired = 0
+
+    @asynccontextmanager
+    async def _acquire(self):
+        self.acquired += 1
+        yield self.connection
+
+    def acquire_connection(self):
+        return self._acquire()
+
+
+def _steps():
+    return [
+        ELTStep(id="a", name="stage", sql="SELECT * FROM raw", materialize=MaterializationMode.TEMP,
+                target_table="stage_a"),
+        ELTStep(id="b", name="merge", sql="INSERT INTO final SELECT * FROM stage_a", depends_on=["a"]),
+        ELTStep(id="c", name="audit", sql="INSERT INTO audit SELECT 1", required=False),
+    ]
+
+
+class TestELTRunner:
+    """Test ELT chain execution semantics."""
+
+    @pytest.mark.asyncio
+    async def test_chain_runs_on_single_connection_with_savepoints(self):
+        connection = FakePostgresConnection()
+        connector = FakeConnector(connection)
+
+        result = await ELTRunner(connector, "postgresql").run(_steps())
+
+        assert connector.acquired == 1
+        assert result["status"] == "success"
+        assert result["committed"] is True
+        assert result["records_affected"] == 15
+        assert connection.log[0] == "BEGIN"
+        assert 'CREATE TEMP TABLE "stage_a" AS SELECT * FROM raw' in connection.log
+        assert "SAVEPOINT elt_step_1" in connection.log
+        assert "RELEASE SAVEPOINT elt_step_1" in connection.log
+        # Temp tables are dropped once the chain is done
+        assert connection.log[-1] == 'DROP TABLE IF EXISTS pg_temp."stage_a"'
+
+    @pytest.mark.asyncio
+    async def test_failed_step_skips_dependents(self):
+        connection = FakePostgresConnection(failing=("FROM raw",))
+        steps = _steps()
+        steps[0].required = False
+
+        result = await ELTRunner(FakeConnector(connection), "postgresql").run(steps)
+
+        statuses = {step["step_id"]: step["status"] for step in result["steps"]}
+        assert statuses == {"a": "failed", "b": "skipped", "c": "success"}
+        assert "ROLLBACK TO SAVEPOINT elt_step_0" in connection.log
+        assert result["status"] == "partial"
+        assert result["committed"] is True
+
+    @pytest.mark.asyncio
+    async def test_single_transaction_rolls_back_on_failure(self):
+        connection = FakePostgresConnection(failing=("INSERT INTO final",))
+        options = ELTRunnerOptions(transaction_mode=TransactionMode.SINGLE)
+
+        result = await ELTRunner(FakeConnector(connection), "postgresql", options).run(_steps())
+
+        assert result["status"] == "failed"
+        assert result["aborted_by"] == "b"
+        assert result["committed"] is False
+        assert result["records_affected"] == 0
+        assert "ROLLBACK" in connection.log
+        assert "COMMIT" not in connection.log
+        assert not any("audit" in statement for statement in connection.log)
+
+    @pytest.mark.asyncio
+    async def test_slow_step_captures_explain_plan_without_side_effects(self):
+        connection = FakePostgresConnection(slow_plan='[{"Plan": {}}]')
+        options = ELTRunnerOptions(slow_step_threshold_ms=0)
+        steps = [ELTStep(id="x", name="slow", sql="UPDATE t SET a = 1")]
+
+        result = await ELTRunner(FakeConnector(connection), "postgresql", options).run(steps)
+
+        step = result["steps"][0]
+        assert step["slow"] is True
+        assert step["explain_plan"]["plan"] == '[{"Plan": {}}]'
+        assert result["slow_steps"] == ["x"]
+        explain_index = connection.log.index("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) UPDATE t SET a = 1")
+        assert connection.log[explain_index - 1] == "SAVEPOINT elt_explain_0"
+        assert connection.log[explain_index + 1] == "ROLLBACK TO SAVEPOINT elt_explain_0"
+
+    @pytest.mark.asyncio
+    async def test_schema_qualified_temp_table_is_created_in_pg_temp(self):
+        connection = FakePostgresConnection()
+        steps = [ELTStep(id="a", name="stage", sql="SELECT 1", materialize=MaterializationMode.TEMP,
+                         target_table="analytics.stage_a")]
+
+        await ELTRunner(FakeConnector(connection), "postgresql").run(steps)
+
+        assert 'CREATE TEMP TABLE "stage_a" AS SELECT 1' in connection.log
+        assert connection.log[-1] == 'DROP TABLE IF EXISTS pg_temp."stage_a"'
+
+    @pytest.mark.asyncio
+    async def test_mysql_table_materialisation_runs_without_savepoint(self):
+        connection = FakeMySQLConnection()
+        steps = [
+            ELTStep(id="a", name="stage", sql="SELECT * FROM raw", materialize=MaterializationMode.UNLOGGED,
+                    target_table="stage_a"),
+            ELTStep(id="b", name="tmp", sql="SELECT 1", materialize=MaterializationMode.TEMP,
+                    target_table="tmp_b"),
+        ]
+
+        result = await ELTRunner(FakeConnector(connection), "mysql").run(steps)
+
+        assert result["status"] == "success"
+        # CREATE TABLE commits implicitly and would destroy the savepoint
+        assert "SAVEPOINT elt_step_0" not in connection.log
+        assert "CREATE TABLE `stage_a` AS SELECT * FROM raw" in connection.log
+        assert "SAVEPOINT elt_step_1" in connection.log
+        assert "RELEASE SAVEPOINT elt_step_1" in connection.log
+
+    def test_step_from_transformation_config(self):
+        step = ELTStep.from_transformation({
+            "id": "1",
+            "name": "clean",
+            "sql": "SELECT 1;",
+            "materialize": "UNLOGGED",
+            "target_config": {"target_table": "clean_out"},
+            "depends_on": [0]
+        })
+
+        assert step.sql == "SELECT 1"
+        assert step.materialize == MaterializationMode.UNLOGGED
+        assert step.target_table == "clean_out"
+        assert step.depends_on == ["0"]
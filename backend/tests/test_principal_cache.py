@@ -0,0 +1,127 @@
+"""
+Tests for the authenticated principal cache used by get_current_user.
+"""
+
+import uuid
+import pytest
+from datetime import datetime
+from enum import Enum as PyEnum
+from sqlalchemy import Column, String, Boolean, DateTime, Enum, JSON, Uuid, inspect
+from sqlalchemy.orm import declarative_base
+
+from app.core import cache_manager as cache_module
+from app.core.principal_cache import PrincipalCache
+
+from tests.cache_fakes import fake_redis  # noqa: F401 - fixture
+
+
+Base = declarative_base()
+
+
+class Role(str, PyEnum):
+    ADMIN = "admin"
+    EDITOR = "editor"
+
+
+class Principal(Base):
+    """The parts of ``User`` the cache cares about, outside the app's model registry."""
+    __tablename__ = "principals"
+
+    id = Column(Uuid, primary_key=True)
+    email = Column(String)
+    hashed_password = Column(String)
+    role = Column(Enum(Role))
+    is_active = Column(Boolean)
+    organization_id = Column(Uuid)
+    provider_data = Column(JSON)
+    mfa_secret = Column(String)
+    mfa_backup_codes = Column(JSON)
+    created_at = Column(DateTime)
+
+
+class FakeSession:
+    """Stands in for AsyncSession; ``merge(load=False)`` issues no SQL."""
+
+    def __init__(self):
+        self.merged = []
+
+    async def merge(self, instance, load=True):
+        assert load is False
+        self.merged.append(instance)
+        return instance
+
+
+USER_ID = uuid.uuid4()
+
+
+def _user(**overrides):
+    fields = dict(
+        id=USER_ID, email="ada@example.com", hashed_password="$2b$12$hash",
+        role=Role.EDITOR, is_active=True, organization_id=uuid.uuid4(),
+        provider_data={"github": {"login": "ada"}}, mfa_secret="TOTPSECRET",
+        mfa_backup_codes=["code"], created_at=datetime(2024, 1, 1)
+    )
+    fields.update(overrides)
+    return Principal(**fields)
+
+
+class TestPrincipalCache:
+    """Test cache hits, invalidation and what is stored."""
+
+    @pytest.mark.asyncio
+    async def test_hits_are_attached_without_a_query(self, fake_redis):
+        cache = PrincipalCache(Principal, ttl=60)
+        assert await cache.get(FakeSession(), str(USER_ID), "jti-1") is None
+        await cache.set(_user(), "jti-1")
+
+        session = FakeSession()
+        user = await cache.get(session, str(USER_ID), "jti-1")
+
+        assert session.merged == [user]
+        assert user.id == USER_ID
+        assert user.role is Role.EDITOR
+        assert user.created_at == datetime(2024, 1, 1)
+        # Presented as an already-persisted row, so merge(load=False) accepts it
+        assert inspect(user).detached and inspect(user).has_identity
+        assert not inspect(user).modified
+        assert cache.stats() == {"hits": 1, "misses": 1, "hit_ratio": 0.5}
+
+    @pytest.mark.asyncio
+    async def test_credentials_are_never_cached(self, fake_redis):
+        cache = PrincipalCache(Principal, ttl=60)
+        await cache.set(_user(), "jti-1")
+        # Served from Redis, as another process would see it
+        await cache_module.cache_manager.l1_cache.clear()
+
+        user = await cache.get(FakeSession(), str(USER_ID), "jti-1")
+
+        assert user.email == "ada@example.com"
+        for field in ("hashed_password", "mfa_secret", "mfa_backup_codes"):
+            assert field not in inspect(user).dict
+        assert not any(b"TOTPSECRET" in value or b"hash" in value for value in fake_redis.values.values())
+
+    @pytest.mark.asyncio
+    async def test_each_caller_gets_its_own_copy(self, fake_redis):
+        cache = PrincipalCache(Principal, ttl=60)
+        await cache.set(_user(), "jti-1")
+
+        first = await cache.get(FakeSession(), str(USER_ID), "jti-1")
+        first.provider_data["github"]["login"] = "mallory"
+        second = await cache.get(FakeSession(), str(USER_ID), "jti-1")
+
+        assert second is not first
+        assert second.provider_data == {"github": {"login": "ada"}}
+
+    @pytest.mark.asyncio
+    async def test_invalidation_drops_every_token_of_the_user(self, fake_redis):
+        cache = PrincipalCache(Principal, ttl=60)
+        other = uuid.uuid4()
+        await cache.set(_user(), "jti-1")
+        await cache.set(_user(), "jti-2")
+        await cache.set(_user(id=other), "jti-3")
+
+        await cache.invalidate(USER_ID)
+
+        assert await cache.get(FakeSession(), str(USER_ID), "jti-1") is None
+        assert await cache.get(FakeSession(), str(USER_ID), "jti-2") is None
+        assert (await cache.get(FakeSession(), str(other), "jti-3")).id == other
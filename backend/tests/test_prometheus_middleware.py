@@ -0,0 +1,115 @@
+"""
+Tests for route-template HTTP metrics.
+"""
+
+import uuid
+import pytest
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse
+from prometheus_client import CollectorRegistry
+from prometheus_client.openmetrics.exposition import generate_latest as generate_openmetrics
+
+from app.core import prometheus_middleware
+from app.core.prometheus_middleware import PrometheusMiddleware
+from app.services.metrics_service import PrometheusMetrics
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    registry = CollectorRegistry()
+    monkeypatch.setattr(prometheus_middleware, "metrics", PrometheusMetrics(registry))
+    return registry
+
+
+def _app(**kwargs):
+    app = FastAPI()
+
+    @app.get("/pipelines/{pipeline_id}")
+    async def get_pipeline(pipeline_id: str):
+        return {"id": pipeline_id}
+
+    @app.post("/upload")
+    async def upload(request: Request):
+        return PlainTextResponse(str(len(await request.body())))
+
+    app.add_middleware(PrometheusMiddleware, **kwargs)
+    return app
+
+
+def _client(app):
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://testserver")
+
+
+def _endpoints(registry, metric="http_requests_total"):
+    return {
+        sample.labels["endpoint"]
+        for family in registry.collect() if family.name == metric.replace("_total", "")
+        for sample in family.samples if "endpoint" in sample.labels
+    }
+
+
+class TestPrometheusMiddleware:
+    """Test labels, sizes, in-flight tracking and exemplars."""
+
+    @pytest.mark.asyncio
+    async def test_requests_are_labelled_by_route_template(self, registry):
+        async with _client(_app()) as client:
+            for _ in range(20):
+                await client.get(f"/pipelines/{uuid.uuid4()}")
+            for _ in range(5):
+                await client.get(f"/random/{uuid.uuid4()}")
+            await client.get("/metrics")
+
+        assert _endpoints(registry) == {"/pipelines/{pipeline_id}", "<unmatched>"}
+        assert registry.get_sample_value(
+            "http_requests_total",
+            {"method": "GET", "endpoint": "/pipelines/{pipeline_id}", "status_code": "200"}
+        ) == 20
+        assert registry.get_sample_value(
+            "http_requests_total", {"method": "GET", "endpoint": "<unmatched>", "status_code": "404"}
+        ) == 5
+
+    @pytest.mark.asyncio
+    async def test_scrape_size_stays_constant_as_ids_grow(self, registry):
+        async with _client(_app()) as client:
+            await client.get(f"/pipelines/{uuid.uuid4()}")
+            series = generate_openmetrics(registry).count(b"\n")
+            for _ in range(50):
+                await client.get(f"/pipelines/{uuid.uuid4()}")
+
+        assert generate_openmetrics(registry).count(b"\n") == series
+
+    @pytest.mark.asyncio
+    async def test_sizes_and_in_progress(self, registry):
+        async def chunks():
+            yield b"a" * 100
+            yield b"b" * 50
+
+        async with _client(_app()) as client:
+            await client.post("/upload", content=b"x" * 300)
+            # No Content-Length: counted from the body chunks
+            await client.post("/upload", content=chunks())
+
+        labels = {"method": "POST", "endpoint": "/upload"}
+        assert registry.get_sample_value("http_request_size_bytes_sum", labels) == 450
+        assert registry.get_sample_value("http_response_size_bytes_sum", labels) == len("300") + len("150")
+        assert registry.get_sample_value("http_requests_in_progress", {"method": "POST"}) == 0
+
+    @pytest.mark.asyncio
+    async def test_unknown_methods_share_one_label(self, registry):
+        async with _client(_app()) as client:
+            await client.request("BREW", "/pipelines/1")
+            await client.request("PURGE", "/pipelines/1")
+
+        assert registry.get_sample_value(
+            "http_requests_total",
+            {"method": "OTHER", "endpoint": "/pipelines/{pipeline_id}", "status_code": "405"}
+        ) == 2
+
+    @pytest.mark.asyncio
+    async def test_exemplars_carry_the_request_id(self, registry):
+        async with _client(_app(exemplars=True)) as client:
+            await client.get("/pipelines/1", headers={"X-Request-ID": "req-123"})
+
+        assert 'request_id="req-123"' in generate_openmetrics(registry).decode()
@@ -0,0 +1,263 @@
+"""
+Tests for Redis-backed rate limiting and local token leases.
+"""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+
+from app.core import token_lease
+from app.core.token_lease import TokenLeaseLimiter
+from app.middleware.rate_limiter import (
+    RateLimiter, RateLimitConfig, RateLimitStrategy, SLIDING_WINDOW_SCRIPT, TOKEN_BUCKET_SCRIPT
+)
+
+
+class FakeScript:
+    def __init__(self, client, source):
+        self.registered_client = client
+        self.source = source
+
+    async def __call__(self, keys=None, args=None):
+        self.registered_client.calls.append((self.source, list(keys), list(args)))
+        return self.registered_client.replies.pop(0)
+
+
+class FakeRedis:
+    """Records script invocations and replays canned script results."""
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.calls = []
+        self.registered = 0
+
+    def register_script(self, source):
+        self.registered += 1
+        return FakeScript(self, source)
+
+
+def _limiter(replies):
+    limiter = RateLimiter()
+    limiter.enabled = True
+    limiter.redis_client = FakeRedis(replies)
+    return limiter
+
+
+class TestSlidingWindow:
+    """Test the sliding-window script call and result mapping."""
+
+    @pytest.mark.asyncio
+    async def test_all_windows_checked_in_one_call(self):
+        limiter = _limiter([[1, 3], [1, 4]])
+        config = RateLimitConfig(requests_per_minute=5, requests_per_hour=0, requests_per_day=100)
+
+        allowed, metadata = await limiter._sliding_window_check("1.2.3.4:u1", 7230.5, config)
+        await limiter._sliding_window_check("1.2.3.4:u1", 7231.0, config)
+
+        assert allowed is True
+        assert metadata == {"requests": 3}
+        # One script invocation per check, registered once
+        assert len(limiter.redis_client.calls) == 2
+        assert limiter.redis_client.registered == 1
+
+        source, keys, args = limiter.redis_client.calls[0]
+        assert source == SLIDING_WINDOW_SCRIPT
+        # Disabled windows are skipped; each window passes current and previous buckets
+        assert keys == [
+            "rate_limit:1.2.3.4:u1:minute:120", "rate_limit:1.2.3.4:u1:minute:119",
+            "rate_limit:1.2.3.4:u1:day:0", "rate_limit:1.2.3.4:u1:day:-1",
+        ]
+        assert args == [7230.5, 1, 60, 5, 86400, 100]
+
+    @pytest.mark.asyncio
+    async def test_rejection_reports_the_exceeded_window(self):
+        limiter = _limiter([[0, 2, 100, 1800]])
+        config = RateLimitConfig(requests_per_minute=5, requests_per_hour=100, requests_per_day=1000)
+
+        allowed, metadata = await limiter._sliding_window_check("1.2.3.4:u1", 100.0, config)
+
+        assert allowed is False
+        assert metadata == {"limit": 100, "window": "hour", "requests": 100, "retry_after": 1800}
+
+    @pytest.mark.asyncio
+    async def test_fails_open_when_redis_errors(self):
+        limiter = _limiter([])
+
+        allowed, metadata = await limiter._sliding_window_check("1.2.3.4:u1", 100.0, RateLimitConfig())
+
+        assert allowed is True
+        assert metadata == {}
+
+
+class TestTokenBucket:
+    """Test the token bucket script call and result mapping."""
+
+    @pytest.mark.asyncio
+    async def test_token_bucket_is_one_atomic_call(self):
+        limiter = _limiter([[1, 4, 0], [0, 0, 2]])
+        config = RateLimitConfig(requests_per_minute=30, burst_size=5, strategy=RateLimitStrategy.TOKEN_BUCKET)
+
+        assert await limiter._token_bucket_check("ip:u", 50.0, config) == (True, {"tokens_remaining": 4})
+        assert await limiter._token_bucket_check("ip:u", 50.1, config) == (
+            False, {"tokens_remaining": 0, "retry_after": 2}
+        )
+
+        source, keys, args = limiter.redis_client.calls[0]
+        assert source == TOKEN_BUCKET_SCRIPT
+        assert keys == ["rate_limit:bucket:ip:u"]
+        assert args == [5, 0.5, 50.0, 1, 300]
+
+
+class LeaseRedis:
+    """Emulates the lease script with a plain counter per window."""
+
+    def __init__(self):
+        self.used = {}
+        self.calls = 0
+        self.fail = False
+
+    def register_script(self, source):
+        client = self
+
+        class Script:
+            registered_client = client
+
+            async def __call__(self, keys=None, args=None):
+                client.calls += 1
+                if client.fail:
+                    raise ConnectionError("redis down")
+                await asyncio.sleep(0)
+                granted = args[1]
+                for index in range((len(args) - 3) // 2):
+                    key, limit = keys[1 + 2 * index], args[4 + 2 * index]
+                    granted = max(0, min(granted, limit - client.used.get(key, 0)))
+                    if granted == 0:
+                        return [0, client.used.get(keys[1], 0), 30, index + 1]
+                for index in range((len(args) - 3) // 2):
+                    key = keys[1 + 2 * index]
+                    client.used[key] = client.used.get(key, 0) + granted
+                return [granted, client.used[keys[1]], 0, 0]
+
+        return Script()
+
+
+@pytest.fixture
+def lease_redis(monkeypatch):
+    client = LeaseRedis()
+    monkeypatch.setattr(token_lease.redis_manager, "connect", AsyncMock(return_value=client))
+    return client
+
+
+class TestTokenLease:
+    """Test local spending of tokens leased from Redis."""
+
+    @pytest.mark.asyncio
+    async def test_hot_identifier_mostly_served_locally(self, lease_redis):
+        limiter = TokenLeaseLimiter(max_lease=50, lease_ttl=60)
+        windows = [("minute", 60, 1000)]
+
+        for _ in range(200):
+            allowed, _ = await limiter.acquire("api-key-1", windows)
+            assert allowed
+            await asyncio.sleep(0)
+
+        # Leases of 50 tokens, topped up in the background
+        assert lease_redis.calls <= 5
+        assert limiter.stats()["local_hits"] >= 195
+
+    @pytest.mark.asyncio
+    async def test_limit_is_never_exceeded_and_denials_stay_local(self, lease_redis):
+        limiter = TokenLeaseLimiter(max_lease=50, lease_ttl=60)
+        windows = [("minute", 60, 40)]
+
+        results = [(await limiter.acquire("ip-1", windows))[0] for _ in range(45)]
+        calls_at_denial = lease_redis.calls
+        allowed, info = await limiter.acquire("ip-1", windows)
+
+        assert results.count(True) == 40
+        assert allowed is False
+        assert info["retry_after"] >= 1
+        assert info["window_index"] == 1
+        assert lease_redis.calls == calls_at_denial
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_one_refill(self, lease_redis):
+        limiter = TokenLeaseLimiter(max_lease=50, lease_ttl=60)
+        windows = [("minute", 60, 1000)]
+
+        results = await asyncio.gather(*(limiter.acquire("ip-1", windows) for _ in range(10)))
+
+        assert all(allowed for allowed, _ in results)
+        assert lease_redis.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_redis_failure_is_reported_to_the_caller(self, lease_redis):
+        lease_redis.fail = True
+        limiter = TokenLeaseLimiter(max_lease=50, lease_ttl=60)
+
+        with pytest.raises(ConnectionError):
+            await limiter.acquire("ip-1", [("minute", 60, 1000)])
+
+    @pytest.mark.asyncio
+    async def test_middleware_uses_leases_for_large_limits(self, lease_redis, monkeypatch):
+        from app.middleware import rate_limiter as middleware_module
+
+        monkeypatch.setattr(middleware_module, "token_lease_limiter", TokenLeaseLimiter(max_lease=50, lease_ttl=60))
+        limiter = _limiter([])
+        config = RateLimitConfig(requests_per_minute=1000, requests_per_hour=20000, requests_per_day=0)
+
+        for _ in range(20):
+            allowed, metadata = await limiter._sliding_window_check("1.2.3.4:u1", 100.0, config)
+            assert allowed
+
+        assert metadata == {"requests": 20}
+        assert lease_redis.calls == 1
+        assert limiter.redis_client.calls == []
+
+
+class TestAdaptiveRateLimiterSampling:
+    """Test that per-request checks use sampled load and local reputation."""
+
+    @pytest.mark.asyncio
+    async def test_check_does_not_query_load_or_persist_reputation(self, lease_redis, monkeypatch):
+        from app.core import rate_limiter as core_module
+        from app.core.rate_limiter import AdaptiveRateLimiter
+
+        monkeypatch.setattr(core_module, "token_lease_limiter", TokenLeaseLimiter(max_lease=50, lease_ttl=60))
+        limiter = AdaptiveRateLimiter()
+        limiter.redis = AsyncMock()
+        limiter.redis.get.return_value = None
+
+        for _ in range(10):
+            allowed, info = await limiter.check_rate_limit("user:1", 1000, 3600)
+            assert allowed
+
+        limiter.redis.info.assert_not_awaited()
+        limiter.redis.setex.assert_not_awaited()
+        # Reputation was read once, then served from memory
+        assert limiter.redis.get.await_count == 1
+        assert info["reputation"] == pytest.approx(0.6)
+        assert lease_redis.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_leased_checks_enforce_the_burst_limit(self, lease_redis, monkeypatch):
+        from app.core import rate_limiter as core_module
+        from app.core.rate_limiter import AdaptiveRateLimiter
+
+        monkeypatch.setattr(core_module, "token_lease_limiter", TokenLeaseLimiter(max_lease=50, lease_ttl=60))
+        limiter = AdaptiveRateLimiter()
+        limiter.redis = AsyncMock()
+        limiter.redis.get.return_value = None
+        # Burst tokens already spent by other processes within the last window + 60s
+        monkeypatch.setattr(limiter, "_compute_limits", lambda base_max, reputation, load: (1000, 1000))
+        allowed, _ = await limiter.check_rate_limit("user:2", 1000, 3600)
+        burst_keys = [key for key in lease_redis.used if ":burst:" in key]
+        assert allowed and burst_keys
+        lease_redis.used[burst_keys[0]] = 1000
+        core_module.token_lease_limiter.forget_prefix("adaptive:user:2:")
+
+        allowed, info = await limiter.check_rate_limit("user:2", 1000, 3600)
+
+        assert allowed is False
+        assert info["burst_blocked"] is True
+        limiter.redis.setex.assert_awaited_once_with("rate_limit_block:user:2_burst", 60, "burst_blocked")
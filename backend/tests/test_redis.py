@@ -0,0 +1,242 @@
+"""
+Tests for Redis helpers and session indexes.
+"""
+
+import asyncio
+import fnmatch
+import pytest
+
+from app.core import redis as redis_module
+from app.core.redis import SessionManager, CacheService, GetBatcher, unlink_matching
+
+
+class FakeRedis:
+    """Just enough of redis.asyncio.Redis for the helpers under test."""
+
+    def __init__(self):
+        self.values = {}
+        self.sets = {}
+        self.unlink_calls = []
+        self.round_trips = 0
+
+    async def keys(self, pattern):
+        raise AssertionError("KEYS must not be used")
+
+    async def scan_iter(self, match=None, count=None):
+        for key in list(self.values) + list(self.sets):
+            if match is None or fnmatch.fnmatchcase(key, match):
+                yield key
+
+    async def unlink(self, *keys):
+        self.unlink_calls.append(keys)
+        removed = 0
+        for key in keys:
+            if self.values.pop(key, None) is not None or self.sets.pop(key, None) is not None:
+                removed += 1
+        return removed
+
+    async def delete(self, *keys):
+        return await self.unlink(*keys)
+
+    async def setex(self, key, ttl, value):
+        self.values[key] = value
+
+    async def set(self, key, value, keepttl=False):
+        self.values[key] = value
+        return True
+
+    async def mset(self, mapping):
+        self.values.update(mapping)
+
+    async def get(self, key):
+        self.round_trips += 1
+        return self.values.get(key)
+
+    async def mget(self, keys):
+        self.round_trips += 1
+        return [self.values.get(key) for key in keys]
+
+    async def incr(self, key):
+        self.values[key] = int(self.values.get(key, 0)) + 1
+        return self.values[key]
+
+    async def ttl(self, key):
+        return 3600
+
+    async def expire(self, key, seconds, **kwargs):
+        return key in self.values or key in self.sets
+
+    async def sadd(self, key, *members):
+        self.sets.setdefault(key, set()).update(members)
+
+    async def srem(self, key, *members):
+        self.sets.get(key, set()).difference_update(members)
+
+    async def smembers(self, key):
+        return set(self.sets.get(key, set()))
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+        return queue
+
+    async def execute(self, raise_on_error=True):
+        round_trips = self.client.round_trips
+        results = []
+        for name, args, kwargs in self.calls:
+            try:
+                results.append(await getattr(self.client, name)(*args, **kwargs))
+            except Exception as e:
+                if raise_on_error:
+                    raise
+                results.append(e)
+        # Queued commands travel together
+        self.client.round_trips = round_trips + 1
+        self.calls = []
+        return results
+
+    async def reset(self):
+        self.calls = []
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    client = FakeRedis()
+
+    async def get_redis():
+        return client
+
+    monkeypatch.setattr(CacheService, "get_redis", staticmethod(get_redis))
+    monkeypatch.setattr(CacheService, "get_binary_redis", staticmethod(get_redis))
+    monkeypatch.setattr(redis_module.redis_manager, "connect", get_redis)
+    monkeypatch.setattr(redis_module.redis_manager, "connect_binary", get_redis)
+    return client
+
+
+class TestUnlinkMatching:
+    """Test SCAN-based pattern deletion."""
+
+    @pytest.mark.asyncio
+    async def test_deletes_matches_in_batches(self, fake_redis):
+        for i in range(5):
+            fake_redis.values[f"cache:user:{i}"] = "x"
+        fake_redis.values["cache:post:1"] = "x"
+
+        removed = await unlink_matching(fake_redis, "cache:user:*", batch_size=2)
+
+        assert removed == 5
+        assert [len(batch) for batch in fake_redis.unlink_calls] == [2, 2, 1]
+        assert list(fake_redis.values) == ["cache:post:1"]
+
+    @pytest.mark.asyncio
+    async def test_cache_service_uses_scan(self, fake_redis):
+        fake_redis.values.update({"a:1": "x", "a:2": "x", "b:1": "x"})
+
+        assert sorted(await CacheService.keys("a:*")) == ["a:1", "a:2"]
+        assert await CacheService.clear_pattern("a:*") == 2
+        assert list(fake_redis.values) == ["b:1"]
+
+
+class TestSessionIndex:
+    """Test per-user session lookups through the session index."""
+
+    @pytest.mark.asyncio
+    async def test_user_sessions_come_from_index(self, fake_redis):
+        first = await SessionManager.create_session("user-1", {"ip": "1.1.1.1"})
+        second = await SessionManager.create_session("user-1", {"ip": "2.2.2.2"})
+        await SessionManager.create_session("user-2", {"ip": "3.3.3.3"})
+
+        assert fake_redis.sets["user_sessions:user-1"] == {first, second}
+
+        sessions = await SessionManager.get_user_sessions("user-1")
+        assert {s["session_id"] for s in sessions} == {first, second}
+
+        # Expired sessions are pruned from the index on read
+        del fake_redis.values[f"session:{second}"]
+        sessions = await SessionManager.get_user_sessions("user-1")
+        assert [s["session_id"] for s in sessions] == [first]
+        assert fake_redis.sets["user_sessions:user-1"] == {first}
+
+    @pytest.mark.asyncio
+    async def test_clear_and_delete_update_index(self, fake_redis):
+        first = await SessionManager.create_session("user-1", {})
+        await SessionManager.create_session("user-1", {})
+        other = await SessionManager.create_session("user-2", {})
+
+        assert await SessionManager.delete_session(first) is True
+        assert first not in fake_redis.sets["user_sessions:user-1"]
+
+        assert await SessionManager.clear_user_sessions("user-1") == 1
+        assert "user_sessions:user-1" not in fake_redis.sets
+        assert list(fake_redis.values) == [f"session:{other}"]
+
+
+class TestBatching:
+    """Test pipelined batches and GET coalescing."""
+
+    @pytest.mark.asyncio
+    async def test_batch_sends_queued_commands_in_one_round_trip(self, fake_redis):
+        fake_redis.values["a"] = "1"
+
+        async with redis_module.redis_manager.batch() as batch:
+            value = batch.get("a")
+            counter = batch.incr("hits")
+            failing = batch.hget("a", "field")  # not supported by the fake, so it fails
+            assert not value.done()
+
+        assert fake_redis.round_trips == 1
+        assert value.result() == "1"
+        assert counter.result() == 1
+        assert isinstance(failing.exception(), Exception)
+
+    @pytest.mark.asyncio
+    async def test_batch_is_discarded_when_block_fails(self, fake_redis):
+        with pytest.raises(RuntimeError):
+            async with redis_module.redis_manager.batch() as batch:
+                counter = batch.incr("hits")
+                raise RuntimeError("boom")
+
+        assert counter.cancelled()
+        assert fake_redis.round_trips == 0
+        assert "hits" not in fake_redis.values
+
+    @pytest.mark.asyncio
+    async def test_concurrent_gets_share_one_mget(self, fake_redis):
+        fake_redis.values.update({"a": "1", "b": "2"})
+        batcher = GetBatcher(redis_module.redis_manager)
+
+        results = await asyncio.gather(
+            batcher.get("a"), batcher.get("b"), batcher.get("a"), batcher.get("missing")
+        )
+
+        assert results == ["1", "2", "1", None]
+        assert fake_redis.round_trips == 1
+
+        # Gets in later ticks are flushed separately
+        assert await batcher.get("b") == "2"
+        assert fake_redis.round_trips == 2
+
+    @pytest.mark.asyncio
+    async def test_mget_and_mset_round_trip_values(self, fake_redis):
+        assert await CacheService.mset({"k1": {"n": 1}, "k2": [1, 2]}, expire=60)
+        assert await CacheService.mget(["k1", "missing", "k2"]) == [{"n": 1}, None, [1, 2]]
+
+    @pytest.mark.asyncio
+    async def test_session_read_refreshes_in_place(self, fake_redis):
+        session_id = await SessionManager.create_session("user-1", {"ip": "1.1.1.1"})
+        assert fake_redis.round_trips == 1
+
+        session = await SessionManager.get_session(session_id)
+
+        assert session["user_id"] == "user-1"
+        # One GET and one SET KEEPTTL, no TTL lookup
+        assert fake_redis.round_trips == 2
@@ -0,0 +1,156 @@
+"""
+Tests for lag-aware read replica routing.
+"""
+
+import asyncio
+import pytest
+import pytest_asyncio
+from contextlib import asynccontextmanager
+import httpx
+from fastapi import Depends, FastAPI, Request
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core import database
+from app.core.database import PoolMetrics, get_db, instrumented_pool
+from app.core.replicas import ReplicaRouter, get_read_db
+from app.core import replicas as replicas_module
+from app.middleware.request_session import RequestSessionMiddleware
+
+pytest.importorskip("aiosqlite")
+
+
+class FakeLagRouter(ReplicaRouter):
+    """Reports lag from a dict instead of querying pg_last_xact_replay_timestamp()."""
+
+    def __init__(self, urls, lags, **kwargs):
+        super().__init__(urls=urls, max_lag=10, **kwargs)
+        self.lags = lags
+        self.checks = 0
+
+    async def replica_lag(self, conn):
+        self.checks += 1
+        await conn.execute(text("SELECT 1"))
+        lag = self.lags[conn.engine.url.database]
+        if isinstance(lag, Exception):
+            raise lag
+        return lag
+
+
+@pytest.fixture
+def pool_metrics(monkeypatch):
+    pool_metrics = PoolMetrics()
+    monkeypatch.setattr(database, "pool_metrics", pool_metrics)
+    return pool_metrics
+
+
+@pytest.fixture
+def sqlite_engine(tmp_path):
+    def factory(url, name):
+        return create_async_engine(f"sqlite+aiosqlite:///{tmp_path / url}", poolclass=instrumented_pool(name))
+    return factory
+
+
+@pytest_asyncio.fixture
+async def make_router(sqlite_engine, tmp_path, monkeypatch, pool_metrics):
+    primary = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}", poolclass=instrumented_pool("primary"))
+    monkeypatch.setattr(
+        database, "AsyncSessionFactory",
+        async_sessionmaker(primary, class_=AsyncSession, expire_on_commit=False)
+    )
+    routers = []
+
+    def make(lags, **kwargs):
+        router = FakeLagRouter(list(lags), {str(tmp_path / url): lag for url, lag in lags.items()},
+                               engine_factory=sqlite_engine, **kwargs)
+        routers.append(router)
+        return router
+
+    yield make
+    for router in routers:
+        await router.dispose()
+    await primary.dispose()
+
+
+class TestReplicaRouter:
+    """Test replica choice, lag budget and fallback to the primary."""
+
+    @pytest.mark.asyncio
+    async def test_round_robin_skips_lagging_replicas(self, make_router):
+        router = make_router({"a.db": 0.5, "b.db": 60.0, "c.db": 2.0}, check_interval=60)
+
+        chosen = [(await router.choose()).name for _ in range(4)]
+
+        assert chosen == ["replica0", "replica2", "replica0", "replica2"]
+        # Each lag sampled once within the check interval
+        assert router.checks == 3
+        assert router.stats()["replicas"]["replica1"] == {"healthy": True, "lag_seconds": 60.0, "routed": 0}
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_the_primary_and_recovers(self, make_router):
+        router = make_router({"a.db": ConnectionError("replica down")}, check_interval=0)
+
+        assert await router.choose() is None
+        assert router.fallbacks == 1
+
+        router.lags[next(iter(router.lags))] = 15.0
+        assert await router.choose() is None
+
+        router.lags[next(iter(router.lags))] = 1.0
+        assert (await router.choose()).name == "replica0"
+        assert router.fallbacks == 2
+
+    @pytest.mark.asyncio
+    async def test_check_timeout_covers_a_hanging_connect(self, make_router):
+        router = make_router({"a.db": 0.0}, check_timeout=0.05)
+
+        class HangingEngine:
+            @asynccontextmanager
+            async def connect(self):
+                await asyncio.sleep(3600)
+                yield
+
+        real_engine = router.replicas[0].engine
+        router.replicas[0].engine = HangingEngine()
+        try:
+            assert await asyncio.wait_for(router.choose(), 1) is None
+        finally:
+            router.replicas[0].engine = real_engine
+        assert router.replicas[0].healthy is False
+        assert router.fallbacks == 1
+
+    @pytest.mark.asyncio
+    async def test_no_replicas_means_primary(self, make_router):
+        router = make_router({})
+
+        assert await router.choose() is None
+        assert router.fallbacks == 0
+        async with router.session() as session:
+            assert session.bind is database.AsyncSessionFactory.kw["bind"]
+
+    @pytest.mark.asyncio
+    async def test_read_dependency_uses_replica_or_shared_session(self, make_router, monkeypatch, pool_metrics):
+        router = make_router({"a.db": 0.0}, check_interval=60)
+        monkeypatch.setattr(replicas_module, "replica_router", router)
+        app = FastAPI()
+
+        @app.get("/stats")
+        async def stats(request: Request, db=Depends(get_db), read_db=Depends(get_read_db)):
+            await read_db.execute(text("SELECT 1"))
+            request.app.state.seen = (db, read_db)
+            return {}
+
+        app.add_middleware(RequestSessionMiddleware)
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://testserver") as client:
+            await client.get("/stats")
+            db, read_db = app.state.seen
+            assert read_db is not db
+            assert read_db.bind is router.replicas[0].engine
+            assert "replica0" in pool_metrics.snapshot()["pools"]
+
+            # Lagging replica: reads share the request's primary session
+            router.lags[next(iter(router.lags))] = 30.0
+            router.replicas[0].checked_at = float("-inf")
+            await client.get("/stats")
+            db, read_db = app.state.seen
+            assert read_db is db
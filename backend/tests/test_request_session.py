@@ -0,0 +1,140 @@
+"""
+Tests for the request-scoped database session and pool checkout metrics.
+"""
+
+import asyncio
+import pytest
+import pytest_asyncio
+import httpx
+from fastapi import Depends, FastAPI, Request
+from prometheus_client import CollectorRegistry
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core import database
+from app.core.asgi import HTTPMiddleware
+from app.core.database import InstrumentedQueuePool, PoolMetrics, get_db, get_session
+from app.middleware.request_session import RequestSessionMiddleware
+from app.services.metrics_service import PrometheusMetrics
+
+pytest.importorskip("aiosqlite")
+
+
+@pytest.fixture
+def pool_metrics(monkeypatch):
+    pool_metrics = PoolMetrics()
+    monkeypatch.setattr(database, "pool_metrics", pool_metrics)
+    return pool_metrics
+
+
+@pytest_asyncio.fixture
+async def engine(tmp_path, monkeypatch, pool_metrics):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'test.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=2,
+        max_overflow=0,
+        pool_timeout=0.05
+    )
+    monkeypatch.setattr(
+        database, "AsyncSessionFactory",
+        async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    )
+    yield engine
+    await engine.dispose()
+
+
+class LookupMiddleware(HTTPMiddleware):
+    """Queries the database before the route runs, like TenantMiddleware."""
+
+    async def before_request(self, request: Request):
+        async for db in get_session(request):
+            await db.execute(text("SELECT 1"))
+            request.state.middleware_session = db
+        return None
+
+
+def _app():
+    app = FastAPI()
+
+    async def current_user(db: AsyncSession = Depends(get_db)):
+        await db.execute(text("SELECT 1"))
+        return db
+
+    @app.get("/sessions")
+    async def sessions(request: Request, user_db=Depends(current_user), db: AsyncSession = Depends(get_session)):
+        await db.execute(text("SELECT 1"))
+        request.app.state.seen = (request.state.middleware_session, user_db, db)
+        return {"in_transaction": db.in_transaction()}
+
+    app.add_middleware(LookupMiddleware)
+    app.add_middleware(RequestSessionMiddleware)
+    return app
+
+
+def _client(app):
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://testserver")
+
+
+class TestRequestSession:
+    """Test session sharing, cleanup and pool metrics."""
+
+    @pytest.mark.asyncio
+    async def test_middleware_and_dependencies_share_one_connection(self, engine, pool_metrics):
+        peak = []
+        pool_metrics.add_listener(lambda event, status=None, **fields: peak.append(status["checked_out"]))
+        app = _app()
+
+        async with _client(app) as client:
+            response = await client.get("/sessions")
+
+        middleware_db, user_db, db = app.state.seen
+        assert response.json() == {"in_transaction": True}
+        assert middleware_db is user_db is db
+        assert pool_metrics.checkouts == 1
+        assert max(peak) == 1
+        # Closed by the middleware after the response, connection returned
+        assert not db.in_transaction()
+        assert pool_metrics.snapshot()["pools"]["primary"]["checked_out"] == 0
+
+    @pytest.mark.asyncio
+    async def test_requests_get_their_own_sessions(self, engine, pool_metrics):
+        app = _app()
+
+        async with _client(app) as client:
+            await client.get("/sessions")
+            first = app.state.seen[0]
+            await client.get("/sessions")
+
+        assert app.state.seen[0] is not first
+        assert pool_metrics.checkouts == 2
+
+    @pytest.mark.asyncio
+    async def test_sessions_outside_a_request_are_closed_by_the_caller(self, engine, pool_metrics):
+        sessions = []
+        for _ in range(2):
+            async for db in get_session():
+                await db.execute(text("SELECT 1"))
+                sessions.append(db)
+
+        assert sessions[0] is not sessions[1]
+        assert not sessions[1].in_transaction()
+        assert pool_metrics.snapshot()["pools"]["primary"]["checked_out"] == 0
+
+    @pytest.mark.asyncio
+    async def test_saturation_is_exported(self, engine, pool_metrics):
+        registry = CollectorRegistry()
+        pool_metrics.add_listener(PrometheusMetrics(registry).record_pool_event)
+
+        held = [await engine.connect() for _ in range(2)]
+        with pytest.raises(exc.TimeoutError):
+            await engine.connect()
+        assert registry.get_sample_value("database_pool_connections", {"pool": "primary", "state": "checked_out"}) == 2
+        assert registry.get_sample_value("database_pool_connections", {"pool": "primary", "state": "limit"}) == 2
+        await asyncio.gather(*(connection.close() for connection in held))
+
+        assert pool_metrics.timeouts == 1
+        assert registry.get_sample_value("database_pool_checkout_timeouts_total", {"pool": "primary"}) == 1
+        assert registry.get_sample_value("database_pool_checkout_wait_seconds_count", {"pool": "primary"}) == 2
+        assert registry.get_sample_value("database_pool_connections", {"pool": "primary", "state": "checked_out"}) == 0
+        assert registry.get_sample_value("database_connections_active") == 0
@@ -0,0 +1,39 @@
+"""
+Tests for the prepared statement caching modes.
+"""
+
+import pytest
+
+from app.core.database import STATEMENT_CACHE_MODES, statement_cache_args
+
+
+class TestStatementCacheArgs:
+    """Test the asyncpg arguments of each mode."""
+
+    def test_named_mode_caches_with_per_connection_names(self):
+        args = statement_cache_args("named", 256)
+
+        assert args == {"statement_cache_size": 256, "prepared_statement_cache_size": 256}
+
+    def test_pgbouncer_mode_uses_unique_names_without_asyncpg_cache(self):
+        args = statement_cache_args("pgbouncer", 128)
+        name_func = args["prepared_statement_name_func"]
+
+        assert args["statement_cache_size"] == 0
+        assert args["prepared_statement_cache_size"] == 128
+        names = {name_func() for _ in range(1000)}
+        assert len(names) == 1000
+        assert all(name.startswith("__asyncpg_") for name in names)
+
+    def test_disabled_mode_uses_unnamed_uncached_statements(self):
+        args = statement_cache_args("disabled", 256)
+
+        assert args["statement_cache_size"] == 0
+        assert args["prepared_statement_cache_size"] == 0
+        # An empty name is PostgreSQL's unnamed statement
+        assert args["prepared_statement_name_func"]() == ""
+
+    def test_unknown_modes_are_rejected(self):
+        assert STATEMENT_CACHE_MODES == ("named", "pgbouncer", "disabled")
+        with pytest.raises(ValueError):
+            statement_cache_args("session", 100)
@@ -0,0 +1,102 @@
+"""
+Tests for the tenant resolution cache.
+"""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+
+from app.core import cache_manager as cache_module
+from app.core.tenant_cache import TenantCache
+from app.models.tenant import Tenant
+
+from tests.cache_fakes import fake_redis  # noqa: F401 - fixture
+
+
+def _tenant(**overrides):
+    fields = dict(
+        id="t-1", name="Acme", slug="acme", plan_type="professional",
+        is_active=True, is_suspended=False, feature_flags={"api_access": True}
+    )
+    fields.update(overrides)
+    return Tenant(**fields)
+
+
+class TestTenantCache:
+    """Test L1/L2 hits, negative entries and invalidation."""
+
+    @pytest.mark.asyncio
+    async def test_repeat_lookups_skip_the_loader_and_redis(self, fake_redis):
+        cache = TenantCache(ttl=60, l2_ttl=600, negative_ttl=30)
+        load = AsyncMock(return_value=_tenant())
+
+        first = await cache.resolve("slug", "acme", load)
+        gets_after_fill = fake_redis.gets
+        second = await cache.resolve("slug", "acme", load)
+
+        assert load.await_count == 1
+        assert fake_redis.gets == gets_after_fill
+        assert second.id == "t-1" and second.plan_type == "professional"
+        # Each caller gets its own instance
+        second.feature_flags["api_access"] = False
+        assert (await cache.resolve("slug", "acme", load)).feature_flags == {"api_access": True}
+        assert first is not second
+
+    @pytest.mark.asyncio
+    async def test_other_processes_are_served_from_l2(self, fake_redis):
+        cache = TenantCache(ttl=60, l2_ttl=600, negative_ttl=30)
+        load = AsyncMock(return_value=_tenant())
+        await cache.resolve("id", "t-1", load)
+
+        # A fresh process: empty L1, shared Redis
+        await cache_module.cache_manager.l1_cache.clear()
+        tenant = await cache.resolve("id", "t-1", load)
+
+        assert load.await_count == 1
+        assert tenant.slug == "acme"
+
+    @pytest.mark.asyncio
+    async def test_unknown_slugs_are_cached_until_invalidated(self, fake_redis):
+        cache = TenantCache(ttl=60, l2_ttl=600, negative_ttl=30)
+        load = AsyncMock(return_value=None)
+
+        for _ in range(5):
+            assert await cache.resolve("slug", "nobody", load) is None
+        assert load.await_count == 1
+
+        # Creating the tenant clears its slug's cached miss
+        await cache.invalidate("t-9", "nobody")
+        load.return_value = _tenant(id="t-9", slug="nobody")
+
+        assert (await cache.resolve("slug", "nobody", load)).id == "t-9"
+
+    @pytest.mark.asyncio
+    async def test_invalidation_drops_every_lookup_for_the_tenant(self, fake_redis):
+        cache = TenantCache(ttl=60, l2_ttl=600, negative_ttl=30)
+        load = AsyncMock(return_value=_tenant())
+        await cache.resolve("id", "t-1", load)
+        await cache.resolve("slug", "acme", load)
+        await cache.resolve("api_key", "secret-key", load, cache_missing=False)
+
+        assert not any("secret-key" in key for key in fake_redis.values)
+
+        await cache.invalidate("t-1")
+        load.return_value = _tenant(is_suspended=True)
+
+        assert (await cache.resolve("slug", "acme", load)).is_suspended is True
+        assert (await cache.resolve("api_key", "secret-key", load)).is_suspended is True
+        assert load.await_count == 5
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_load(self, fake_redis):
+        cache = TenantCache(ttl=60, l2_ttl=600, negative_ttl=30)
+
+        async def load():
+            await asyncio.sleep(0.01)
+            return _tenant()
+
+        load_mock = AsyncMock(side_effect=load)
+        tenants = await asyncio.gather(*(cache.resolve("id", "t-1", load_mock) for _ in range(10)))
+
+        assert load_mock.await_count == 1
+        assert all(tenant.id == "t-1" for tenant in tenants)
@@ -0,0 +1,115 @@
+"""
+Tests for single-scan warehouse validation.
+"""
+
+import pytest
+import pandas as pd
+from datetime import datetime
+
+from app.services.etl_engine.warehouse_validator import (
+    WarehouseValidator, ValidationConfig, ValidationScope
+)
+
+
+class FakeConnector:
+    """Answers catalog queries and the aggregate scan with canned frames."""
+
+    def __init__(self, aggregate_row, estimate=10):
+        self.aggregate_row = aggregate_row
+        self.estimate = estimate
+        self.queries = []
+
+    async def execute_query(self, query):
+        self.queries.append(query)
+        if "information_schema.columns" in query or "INFORMATION_SCHEMA.COLUMNS" in query:
+            return pd.DataFrame([
+                {"column_name": "id", "data_type": "integer"},
+                {"column_name": "email", "data_type": "text"},
+            ])
+        if "pg_class" in query:
+            return pd.DataFrame([{"estimate": self.estimate}])
+        return pd.DataFrame([self.aggregate_row])
+
+
+class TestWarehouseValidator:
+    """Test warehouse-side validation."""
+
+    @pytest.mark.asyncio
+    async def test_single_aggregate_scan(self):
+        connector = FakeConnector({
+            "total_rows": 100, "c0_non_null": 100, "c0_distinct": 100, "c0_min": 1, "c0_max": 100,
+            "c1_non_null": 90, "c1_distinct": 80
+        })
+        validator = WarehouseValidator(connector, "postgresql", ValidationConfig(distinct_columns=["*"]))
+
+        result = await validator.validate("customers")
+
+        data_scans = [q for q in connector.queries if q.startswith("SELECT COUNT(*)")]
+        assert len(data_scans) == 1
+        assert result["rows_validated"] == 100
+        assert result["column_stats"]["email"]["null_ratio"] == pytest.approx(0.10)
+        assert result["column_stats"]["id"]["max"] == 100
+        assert result["column_stats"]["email"]["distinct_estimate"] == 80
+        assert "null_ratio:email" in result["failed_checks"]
+        assert result["data_completeness"] == pytest.approx(95.0)
+
+    @pytest.mark.asyncio
+    async def test_scoped_scan_skips_sampling(self):
+        connector = FakeConnector({"total_rows": 5, "c0_non_null": 5, "c1_non_null": 5}, estimate=10**9)
+        validator = WarehouseValidator(connector, "postgresql")
+        scope = ValidationScope(batch_column="etl_batch_id", batch_id="exec-1")
+
+        result = await validator.validate("customers", scope=scope)
+
+        scan = connector.queries[-1]
+        assert "WHERE \"etl_batch_id\" = 'exec-1'" in scan
+        assert "TABLESAMPLE" not in scan
+        assert result["scoped"] is True
+        assert result["sampled"] is False
+
+    @pytest.mark.asyncio
+    async def test_large_table_is_sampled(self):
+        connector = FakeConnector({"total_rows": 1000, "c0_non_null": 1000, "c1_non_null": 1000}, estimate=10**8)
+        validator = WarehouseValidator(connector, "postgresql", ValidationConfig(sample_percent=0.5))
+
+        result = await validator.validate("events")
+
+        assert "TABLESAMPLE SYSTEM (0.5)" in connector.queries[-1]
+        assert result["sampled"] is True
+
+    def test_range_rules_and_watermark_in_query(self):
+        validator = WarehouseValidator(None, "mysql", ValidationConfig(
+            range_rules={"age": {"min": 0, "max": 130}}
+        ))
+        scope = ValidationScope(watermark_column="loaded_at", watermark=datetime(2025, 1, 1, 12, 0))
+
+        query = validator.build_aggregate_query(
+            "people", None, [{"name": "age", "type": "int"}], scope
+        )
+
+        assert "COUNT(DISTINCT" not in query
+        assert "SUM(CASE WHEN `age` < 0 OR `age` > 130 THEN 1 ELSE 0 END) AS c0_out_of_range" in query
+        assert "WHERE `loaded_at` >= '2025-01-01 12:00:00'" in query
+
+    def test_distinct_counts_skip_types_without_equality(self):
+        validator = WarehouseValidator(None, "postgresql", ValidationConfig(distinct_columns=["*"]))
+        columns = [{"name": "id", "type": "integer"}, {"name": "payload", "type": "json"},
+                   {"name": "doc", "type": "xml"}]
+
+        query = validator.build_aggregate_query("events", None, columns, ValidationScope())
+
+        assert 'COUNT(DISTINCT "id") AS c0_distinct' in query
+        assert query.count("COUNT(DISTINCT") == 1
+
+    @pytest.mark.asyncio
+    async def test_dotted_table_name_is_split_into_schema_and_table(self):
+        connector = FakeConnector({"total_rows": 5, "c0_non_null": 5, "c1_non_null": 5})
+        validator = WarehouseValidator(connector, "postgresql")
+
+        result = await validator.validate("analytics.customers")
+
+        catalog, estimate, scan = connector.queries
+        assert "table_schema = 'analytics' AND table_name = 'customers'" in catalog
+        assert '\'"analytics"."customers"\'' in estimate
+        assert scan.endswith('FROM "analytics"."customers"')
+        assert result["rows_validated"] == 5